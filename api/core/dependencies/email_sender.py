@@ -1,7 +1,5 @@
 from typing import Optional
-from fastapi_mail import FastMail, MessageSchema, ConnectionConfig, MessageType
 from api.utils.settings import settings
-from premailer import transform
 
 
 
@@ -11,6 +9,9 @@ async def send_email(
     subject: str, 
     context: Optional[dict] = None
 ):
+    from fastapi_mail import FastMail, MessageSchema, ConnectionConfig, MessageType
+    from premailer import transform
+
     from main import email_templates
 
     conf = ConnectionConfig(
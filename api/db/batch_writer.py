@@ -0,0 +1,166 @@
+"""Buffered, batched inserts for append-only tables.
+
+`BatchWriter.add(row)` puts a row in an in-process buffer and returns at
+once; a background thread writes the buffer with one multi-row INSERT every
+`flush_interval_ms`, or sooner once `max_batch` rows are waiting.
+
+Durability trade-off: a row is only in memory until its batch is written,
+so a worker that is killed (SIGKILL, OOM, crash) loses up to one interval's
+worth of rows. A graceful shutdown flushes everything through `close()`
+(called from the lifespan shutdown). Memory is bounded by `max_buffer`:
+when the buffer is full `add` waits up to `put_timeout` seconds for the
+writer to catch up, then drops the row and counts it in `stats["dropped"]`.
+
+A batch that fails is retried row by row, so one bad row (e.g. a foreign
+key violation) does not take the rest of the batch with it.
+"""
+
+import os
+import queue
+import threading
+import time
+from typing import List, Optional
+
+from sqlalchemy import Table, insert
+from sqlalchemy.exc import SQLAlchemyError
+
+from api.utils.logger import logger
+
+
+class BatchWriter:
+    """Writes rows for one table in batches from a background thread"""
+
+    def __init__(
+        self,
+        table: Table,
+        engine=None,
+        flush_interval_ms: float = 200,
+        max_batch: int = 500,
+        max_buffer: int = 10000,
+        put_timeout: float = 1.0,
+    ):
+        self.table = table
+        self._engine = engine
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_batch = max_batch
+        self.max_buffer = max_buffer
+        self.put_timeout = put_timeout
+        self.stats = {"written": 0, "dropped": 0, "failed": 0, "batches": 0}
+        self._reset()
+        # a forked worker starts with an empty buffer and no thread
+        os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        self._buffer = queue.Queue(maxsize=self.max_buffer)
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._flush_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._thread_lock = threading.Lock()
+
+    @property
+    def engine(self):
+        if self._engine is None:
+            from api.db.database import engine
+
+            self._engine = engine
+        return self._engine
+
+    def add(self, row: dict) -> bool:
+        '''Queues `row` for insertion; False if it had to be dropped'''
+
+        self._ensure_thread()
+        try:
+            self._buffer.put(row, timeout=self.put_timeout)
+        except queue.Full:
+            self.stats["dropped"] += 1
+            logger.warning(f"{self.table.name} buffer full, dropped a row")
+            return False
+        if self._buffer.qsize() >= self.max_batch:
+            self._wake.set()
+        return True
+
+    def pending(self) -> int:
+        return self._buffer.qsize()
+
+    def _ensure_thread(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(
+                    target=self._run, name=f"{self.table.name}-writer", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def _take(self) -> List[dict]:
+        rows = []
+        while len(rows) < self.max_batch:
+            try:
+                rows.append(self._buffer.get_nowait())
+            except queue.Empty:
+                break
+        return rows
+
+    def flush(self) -> int:
+        '''Writes everything buffered so far; returns the number of rows written'''
+
+        written = 0
+        with self._flush_lock:
+            while True:
+                rows = self._take()
+                if not rows:
+                    return written
+                written += self._write(rows)
+
+    def _write(self, rows: List[dict]) -> int:
+        try:
+            with self.engine.begin() as conn:
+                conn.execute(insert(self.table).values(rows))
+        except SQLAlchemyError as exc:
+            logger.warning(f"Batch insert into {self.table.name} failed, retrying row by row: {exc}")
+            return self._write_one_by_one(rows)
+        self.stats["written"] += len(rows)
+        self.stats["batches"] += 1
+        return len(rows)
+
+    def _write_one_by_one(self, rows: List[dict]) -> int:
+        written = 0
+        for row in rows:
+            try:
+                with self.engine.begin() as conn:
+                    conn.execute(insert(self.table).values(row))
+                written += 1
+            except SQLAlchemyError as exc:
+                self.stats["failed"] += 1
+                logger.error(f"Dropped a {self.table.name} row that could not be written: {exc}")
+        self.stats["written"] += written
+        return written
+
+    def clear(self):
+        '''Drops everything buffered without writing it'''
+
+        self._take_all()
+
+    def _take_all(self):
+        while self._take():
+            pass
+
+    def close(self, timeout: float = 10):
+        '''Stops the background thread and writes whatever is still buffered'''
+
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        deadline = time.monotonic() + timeout
+        while self.pending() and time.monotonic() < deadline:
+            self.flush()
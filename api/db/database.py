@@ -2,6 +2,7 @@
 """
 from sqlalchemy.orm import sessionmaker, scoped_session, declarative_base
 from sqlalchemy import create_engine
+from api.db.query_log import query_log
 from api.utils.settings import settings, BASE_DIR
 
 
@@ -31,10 +32,17 @@ def get_db_engine(test_mode: bool = False):
             f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
         )
 
+        return create_engine(
+            DATABASE_URL,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+        )
+
     return create_engine(DATABASE_URL)
 
 
 engine = get_db_engine()
+query_log.install(engine)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
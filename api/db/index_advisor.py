@@ -0,0 +1,379 @@
+"""Index advisor.
+
+Proposes B-tree indexes from two sources:
+    * the models: foreign key columns that no index covers (an index covers
+      a column list when that list is a leading prefix of its columns),
+    * the statement fingerprints of the slow query log: columns compared with
+      `=` / `IN` in WHERE clauses, grouped per table into composite indexes,
+      followed by the ORDER BY column, and made partial when the statement
+      filters out soft-deleted rows (`is_deleted = false`).
+
+Accepted candidates can be rendered as an Alembic revision, and their effect
+measured with `compare_plans`, which EXPLAINs a probe query before and after
+creating each index inside a transaction that is rolled back.
+
+`ILIKE '%x%'` filters cannot use a B-tree index; they are reported as notes
+(a pg_trgm GIN index or full text search is needed there).
+"""
+
+import re
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import MetaData, Table, UniqueConstraint, text
+from sqlalchemy.engine import Engine
+
+
+SOFT_DELETE_COLUMN = "is_deleted"
+
+_FROM_RE = re.compile(r"\bFROM\s+\"?(\w+)\"?(?:\s+(?:AS\s+)?(\w+))?", re.IGNORECASE)
+_JOIN_RE = re.compile(r"\bJOIN\s+\"?(\w+)\"?(?:\s+(?:AS\s+)?(\w+))?", re.IGNORECASE)
+_WHERE_RE = re.compile(
+    r"\bWHERE\b(.*?)(?:\bGROUP BY\b|\bORDER BY\b|\bLIMIT\b|\bOFFSET\b|\bFOR UPDATE\b|$)",
+    re.IGNORECASE | re.DOTALL,
+)
+_ORDER_RE = re.compile(r"\bORDER BY\s+(?:\"?(\w+)\"?\.)?\"?(\w+)\"?", re.IGNORECASE)
+_EQUALITY_RE = re.compile(
+    r"(?:\"?(\w+)\"?\.)?\"?(\w+)\"?\s*(?:=\s*\?|IN\s*\(\?\+?\)|IS\s+NULL)", re.IGNORECASE
+)
+_LIKE_RE = re.compile(r"(?:\"?(\w+)\"?\.)?\"?(\w+)\"?\s+I?LIKE\s+\?", re.IGNORECASE)
+_SOFT_DELETE_RE = re.compile(
+    rf"(?:\w+\.)?{SOFT_DELETE_COLUMN}\s*(?:=\s*false|IS\s+(?:NOT\s+TRUE|FALSE)|=\s*0\b)",
+    re.IGNORECASE,
+)
+_KEYWORDS = {
+    "WHERE", "JOIN", "ON", "LEFT", "RIGHT", "INNER", "OUTER", "FULL", "CROSS",
+    "ORDER", "GROUP", "LIMIT", "OFFSET", "FOR", "UNION", "HAVING",
+}
+_COST_RE = re.compile(r"cost=[\d.]+\.\.([\d.]+)")
+
+
+@dataclass
+class IndexCandidate:
+    """A proposed index"""
+
+    table: str
+    columns: Tuple[str, ...]
+    partial: bool = False
+    reasons: List[str] = field(default_factory=list)
+    total_ms: float = 0.0  # time spent by the statements that would use it
+
+    @property
+    def name(self) -> str:
+        suffix = "_active" if self.partial else ""
+        return f"idx_{self.table}_{'_'.join(self.columns)}{suffix}"
+
+    @property
+    def where(self) -> Optional[str]:
+        return f"{SOFT_DELETE_COLUMN} = false" if self.partial else None
+
+    def describe(self) -> str:
+        where = f" WHERE {self.where}" if self.partial else ""
+        return f"{self.name} ON {self.table} ({', '.join(self.columns)}){where}"
+
+
+@dataclass
+class IndexAdvice:
+    """Result of one advisor run"""
+
+    candidates: List[IndexCandidate]
+    notes: List[str]
+
+
+def index_prefixes(table: Table) -> List[Tuple[str, ...]]:
+    '''Column lists of every index on `table`, including PK and unique constraints'''
+
+    prefixes = []
+    if table.primary_key.columns:
+        prefixes.append(tuple(column.name for column in table.primary_key.columns))
+    for index in table.indexes:
+        prefixes.append(tuple(column.name for column in index.columns))
+    for constraint in table.constraints:
+        if isinstance(constraint, UniqueConstraint):
+            prefixes.append(tuple(column.name for column in constraint.columns))
+    for column in table.columns:
+        if column.index or column.unique:
+            prefixes.append((column.name,))
+    return prefixes
+
+
+def is_covered(table: Table, columns: Sequence[str]) -> bool:
+    '''Whether an existing index starts with `columns` (in any order)'''
+
+    wanted = set(columns)
+    return any(
+        len(prefix) >= len(wanted) and set(prefix[: len(wanted)]) == wanted
+        for prefix in index_prefixes(table)
+    )
+
+
+class IndexAdvisor:
+    """Proposes indexes for the tables of `metadata`"""
+
+    def __init__(self, metadata: MetaData):
+        self.metadata = metadata
+
+    def advise(self, statements: Iterable[dict] = ()) -> IndexAdvice:
+        '''Candidates from the models and from `statements`.
+
+        `statements` are entries of the slow query log (`query_log.snapshot()`
+        or `merge_snapshots(...)`): dicts with at least "statement" and
+        "total_ms". Candidates are returned heaviest first.
+        '''
+
+        candidates: Dict[Tuple[str, Tuple[str, ...], bool], IndexCandidate] = {}
+        notes: List[str] = []
+
+        def propose(table: Table, columns: Tuple[str, ...], partial: bool, reason: str, total_ms: float = 0.0):
+            if is_covered(table, columns):
+                return
+            key = (table.name, columns, partial)
+            candidate = candidates.get(key)
+            if candidate is None:
+                candidate = candidates[key] = IndexCandidate(table.name, columns, partial)
+            if reason not in candidate.reasons:
+                candidate.reasons.append(reason)
+            candidate.total_ms += total_ms
+
+        for _, table in sorted(self.metadata.tables.items()):
+            for foreign_key in table.foreign_keys:
+                column = foreign_key.parent
+                propose(table, (column.name,), False, f"foreign key to {foreign_key.target_fullname}")
+
+        for entry in statements:
+            statement, total_ms = entry["statement"], entry.get("total_ms", 0.0)
+            for table, columns, partial in self.statement_candidates(statement):
+                propose(table, columns, partial, f"filter in [{entry.get('id', '?')}]", total_ms)
+            notes.extend(self.like_notes(statement))
+
+        # a composite candidate makes a single-column one on its leading column redundant
+        composites = {
+            (table, columns[0], partial): candidate
+            for (table, columns, partial), candidate in candidates.items()
+            if len(columns) > 1
+        }
+        for (table, columns, partial), candidate in list(candidates.items()):
+            merged = composites.get((table, columns[0], partial)) if len(columns) == 1 else None
+            if merged is not None:
+                merged.reasons.extend(r for r in candidate.reasons if r not in merged.reasons)
+                merged.total_ms += candidate.total_ms
+                del candidates[(table, columns, partial)]
+
+        ordered = sorted(
+            candidates.values(), key=lambda c: (c.total_ms, len(c.reasons)), reverse=True
+        )
+        return IndexAdvice(candidates=ordered, notes=sorted(set(notes)))
+
+    def _tables(self, statement: str) -> Dict[str, Table]:
+        '''Tables referenced by `statement`, by name and alias'''
+
+        tables = {}
+        for name, alias in _FROM_RE.findall(statement) + _JOIN_RE.findall(statement):
+            table = self.metadata.tables.get(name)
+            if table is not None:
+                tables[name] = table
+                if alias and alias.upper() not in _KEYWORDS:
+                    tables[alias] = table
+        return tables
+
+    def _resolve(self, tables: Dict[str, Table], qualifier: str, column: str) -> Optional[Table]:
+        if qualifier:
+            table = tables.get(qualifier)
+            return table if table is not None and column in table.columns else None
+        matches = {t.name: t for t in tables.values() if column in t.columns}
+        return next(iter(matches.values())) if len(matches) == 1 else None
+
+    def statement_candidates(self, statement: str):
+        '''(table, columns, partial) index candidates for one normalized statement'''
+
+        tables = self._tables(statement)
+        where = _WHERE_RE.search(statement)
+        if not tables or where is None:
+            return []
+
+        clause = where.group(1)
+        equalities: Dict[str, List[str]] = {}
+        for qualifier, column in _EQUALITY_RE.findall(clause):
+            table = self._resolve(tables, qualifier, column)
+            if table is None or column == SOFT_DELETE_COLUMN:
+                continue
+            columns = equalities.setdefault(table.name, [])
+            if column not in columns:
+                columns.append(column)
+
+        partial = bool(_SOFT_DELETE_RE.search(clause))
+        order = _ORDER_RE.search(statement)
+
+        results = []
+        for table_name, columns in equalities.items():
+            table = self.metadata.tables[table_name]
+            if table.primary_key.columns and set(columns) >= {c.name for c in table.primary_key.columns}:
+                continue  # already a primary key lookup
+            if order is not None:
+                order_table = self._resolve(tables, order.group(1), order.group(2))
+                if order_table is table and order.group(2) not in columns:
+                    columns = columns + [order.group(2)]
+            results.append(
+                (table, tuple(columns), partial and SOFT_DELETE_COLUMN in table.columns)
+            )
+        return results
+
+    def like_notes(self, statement: str) -> List[str]:
+        tables = self._tables(statement)
+        notes = []
+        for qualifier, column in _LIKE_RE.findall(statement):
+            table = self._resolve(tables, qualifier, column)
+            if table is not None:
+                notes.append(
+                    f"{table.name}.{column} is matched with LIKE/ILIKE; a B-tree index "
+                    f"cannot serve '%x%' patterns (consider a pg_trgm GIN index)"
+                )
+        return notes
+
+
+def render_migration(
+    candidates: Sequence[IndexCandidate],
+    revision: str,
+    down_revision: Optional[str] = None,
+    message: str = "add advised indexes",
+) -> str:
+    '''Alembic revision creating `candidates` without locking writes on PostgreSQL'''
+
+    upgrade, downgrade = [], []
+    for candidate in candidates:
+        where = (
+            f",\n            postgresql_where=sa.text({candidate.where!r}),"
+            if candidate.partial
+            else ","
+        )
+        upgrade.append(
+            f"        op.create_index(\n"
+            f"            {candidate.name!r},\n"
+            f"            {candidate.table!r},\n"
+            f"            {list(candidate.columns)!r}{where}\n"
+            f"            postgresql_concurrently=True,\n"
+            f"            if_not_exists=True,\n"
+            f"        )"
+        )
+        downgrade.append(
+            f"        op.drop_index(\n"
+            f"            {candidate.name!r},\n"
+            f"            table_name={candidate.table!r},\n"
+            f"            postgresql_concurrently=True,\n"
+            f"            if_exists=True,\n"
+            f"        )"
+        )
+
+    return f'''"""{message}
+
+Revision ID: {revision}
+Revises: {down_revision or ""}
+Create Date: {datetime.now(timezone.utc).isoformat(sep=" ")}
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = {revision!r}
+down_revision: Union[str, None] = {down_revision!r}
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+{chr(10).join(upgrade) or "        pass"}
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+{chr(10).join(downgrade) or "        pass"}
+'''
+
+
+@dataclass
+class PlanComparison:
+    """EXPLAIN output of a probe query without and with a candidate index"""
+
+    candidate: IndexCandidate
+    query: str
+    before: str
+    after: str
+    before_cost: Optional[float] = None
+    after_cost: Optional[float] = None
+
+    @property
+    def uses_index(self) -> bool:
+        return self.candidate.name in self.after
+
+
+def _explain(conn, dialect: str, query: str, params: dict) -> str:
+    prefix = "EXPLAIN QUERY PLAN " if dialect == "sqlite" else "EXPLAIN "
+    rows = conn.execute(text(prefix + query), params).fetchall()
+    return "\n".join(" ".join(str(value) for value in row) for row in rows)
+
+
+def _cost(plan: str) -> Optional[float]:
+    match = _COST_RE.search(plan)
+    return float(match.group(1)) if match else None
+
+
+def compare_plans(engine: Engine, candidates: Sequence[IndexCandidate]) -> List[PlanComparison]:
+    '''EXPLAINs a lookup on each candidate's columns before and after creating it.
+
+    The probe filters on values taken from an existing row, so run this on a
+    seeded database. Each index is created inside a transaction that is
+    rolled back, leaving the schema untouched.
+    '''
+
+    comparisons = []
+    dialect = engine.dialect.name
+    for candidate in candidates:
+        with engine.connect() as conn:
+            transaction = conn.begin()
+            if dialect == "sqlite":
+                # pysqlite only opens transactions for DML; make the DDL part of one
+                conn.exec_driver_sql("BEGIN")
+            try:
+                columns = ", ".join(candidate.columns)
+                row = conn.execute(
+                    text(f"SELECT {columns} FROM {candidate.table} LIMIT 1")
+                ).first()
+                values = (
+                    dict(zip(candidate.columns, row))
+                    if row
+                    else {column: "" for column in candidate.columns}
+                )
+                conditions = [f"{column} = :{column}" for column in candidate.columns]
+                if candidate.partial:
+                    conditions.append(
+                        f"{SOFT_DELETE_COLUMN} = 0" if dialect == "sqlite" else candidate.where
+                    )
+                query = f"SELECT * FROM {candidate.table} WHERE {' AND '.join(conditions)}"
+
+                before = _explain(conn, dialect, query, values)
+                where = f" WHERE {conditions[-1]}" if candidate.partial else ""
+                conn.execute(
+                    text(f"CREATE INDEX {candidate.name} ON {candidate.table} ({columns}){where}")
+                )
+                after = _explain(conn, dialect, query, values)
+            finally:
+                transaction.rollback()
+
+        comparisons.append(
+            PlanComparison(
+                candidate=candidate,
+                query=query,
+                before=before,
+                after=after,
+                before_cost=_cost(before),
+                after_cost=_cost(after),
+            )
+        )
+    return comparisons
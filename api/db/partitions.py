@@ -0,0 +1,230 @@
+"""Monthly range partitions for append-only, time-stamped tables.
+
+On PostgreSQL the table is declared `PARTITION BY RANGE (<column>)` and
+stored as one child table per calendar month, named `<table>_YYYY_MM`, plus
+a `<table>_default` partition that catches rows outside every range (so an
+insert never fails for lack of a partition). Queries filtered on the column
+only scan the months they cover, and retention drops or detaches whole
+months, which is instant and leaves no dead rows to vacuum.
+
+`ensure` creates the partitions from the current month to `months_ahead`
+months out; it runs at startup and with every retention run. The model
+creates the default partition together with the table. `convert`
+turns an existing plain table into a partitioned one.
+
+Other databases (SQLite in development) keep a single table; retention
+there is one ranged DELETE on the indexed column.
+"""
+
+import re
+from datetime import date, datetime, timezone
+from typing import List, Optional, Tuple
+
+from sqlalchemy import Table, func, select, text
+from sqlalchemy.engine import Connection
+
+
+def month_start(value: date) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(value: date, months: int) -> date:
+    index = value.year * 12 + value.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+class MonthlyPartitions:
+    """Creates, lists and retires the monthly partitions of `table`"""
+
+    def __init__(self, table: Table, column: str, months_ahead: int = 2):
+        self.table = table
+        self.column = column
+        self.months_ahead = months_ahead
+        self._name_re = re.compile(rf"^{re.escape(table.name)}_(\d{{4}})_(\d{{2}})$")
+
+    @property
+    def default_partition(self) -> str:
+        return f"{self.table.name}_default"
+
+    def partition_name(self, month: date) -> str:
+        return f"{self.table.name}_{month.year:04d}_{month.month:02d}"
+
+    def _quote(self, conn: Connection, name: str) -> str:
+        return conn.dialect.identifier_preparer.quote(name)
+
+    def is_partitioned(self, conn: Connection) -> bool:
+        if conn.dialect.name != "postgresql":
+            return False
+        return bool(
+            conn.execute(
+                text(
+                    "SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid "
+                    "WHERE c.relname = :name AND c.relnamespace = current_schema()::regnamespace"
+                ),
+                {"name": self.table.name},
+            ).scalar()
+        )
+
+    def partitions(self, conn: Connection) -> List[Tuple[str, date]]:
+        '''Monthly partitions that exist, as (name, first day of the month), oldest first'''
+
+        if not self.is_partitioned(conn):
+            return []
+        names = conn.execute(
+            text(
+                "SELECT c.relname FROM pg_inherits i "
+                "JOIN pg_class c ON c.oid = i.inhrelid "
+                "JOIN pg_class p ON p.oid = i.inhparent "
+                "WHERE p.relname = :name AND p.relnamespace = current_schema()::regnamespace"
+            ),
+            {"name": self.table.name},
+        ).scalars()
+        found = []
+        for name in names:
+            match = self._name_re.match(name)
+            if match:
+                found.append((name, date(int(match.group(1)), int(match.group(2)), 1)))
+        return sorted(found, key=lambda item: item[1])
+
+    def create_statements(self, conn: Connection, first: date, last: date) -> List[str]:
+        '''DDL for the missing partitions of the months from `first` to `last`'''
+
+        existing = {name for name, _ in self.partitions(conn)}
+        parent = self._quote(conn, self.table.name)
+        statements = [
+            f"CREATE TABLE IF NOT EXISTS {self._quote(conn, self.partition_name(month))} "
+            f"PARTITION OF {parent} FOR VALUES FROM ('{month.isoformat()}') "
+            f"TO ('{add_months(month, 1).isoformat()}')"
+            for month in _months(month_start(first), month_start(last))
+            if self.partition_name(month) not in existing
+        ]
+        statements.append(
+            f"CREATE TABLE IF NOT EXISTS {self._quote(conn, self.default_partition)} "
+            f"PARTITION OF {parent} DEFAULT"
+        )
+        return statements
+
+    def ensure(self, conn: Connection, today: Optional[date] = None) -> List[str]:
+        '''Creates the partitions up to `months_ahead` months from `today`; returns the DDL run'''
+
+        if not self.is_partitioned(conn):
+            return []
+        today = today or datetime.now(timezone.utc).date()
+        statements = self.create_statements(
+            conn, month_start(today), add_months(month_start(today), self.months_ahead)
+        )
+        for statement in statements:
+            conn.exec_driver_sql(statement)
+        return statements
+
+    def retire(
+        self, conn: Connection, before: date, archive: bool = False, dry_run: bool = False
+    ) -> List[str]:
+        '''Removes every month that ends on or before `before`.
+
+        PostgreSQL partitions are dropped, or with `archive` detached and
+        kept as standalone tables (`<table>_YYYY_MM`) to be dumped and
+        dropped later. On other databases the rows are deleted with one
+        ranged statement; `archive` first copies them to `<table>_archive`.
+        '''
+
+        before = month_start(before)
+        column = self._quote(conn, self.column)
+        parent = self._quote(conn, self.table.name)
+        statements = []
+
+        if self.is_partitioned(conn):
+            for name, month in self.partitions(conn):
+                if add_months(month, 1) > before:
+                    break
+                if archive:
+                    statements.append(
+                        f"ALTER TABLE {parent} DETACH PARTITION {self._quote(conn, name)}"
+                    )
+                else:
+                    statements.append(f"DROP TABLE {self._quote(conn, name)}")
+            # stray old rows that landed in the default partition
+            statements.append(
+                f"DELETE FROM {self._quote(conn, self.default_partition)} "
+                f"WHERE {column} < '{before.isoformat()}'"
+            )
+        else:
+            if archive:
+                archive_table = self._quote(conn, f"{self.table.name}_archive")
+                statements.append(
+                    f"CREATE TABLE IF NOT EXISTS {archive_table} AS "
+                    f"SELECT * FROM {parent} WHERE 0 = 1"
+                )
+                statements.append(
+                    f"INSERT INTO {archive_table} SELECT * FROM {parent} "
+                    f"WHERE {column} < '{before.isoformat()}'"
+                )
+            statements.append(f"DELETE FROM {parent} WHERE {column} < '{before.isoformat()}'")
+
+        if not dry_run:
+            for statement in statements:
+                conn.exec_driver_sql(statement)
+        return statements
+
+    def convert(self, conn: Connection, dry_run: bool = False) -> List[str]:
+        '''Rebuilds a plain PostgreSQL table as a partitioned one, copying its rows.
+
+        The old table is renamed, the partitioned table created from the
+        model, the months holding data created, the rows copied and the old
+        table dropped, all in the caller's transaction. The table is locked
+        for the duration; run it in a maintenance window.
+        '''
+
+        if conn.dialect.name != "postgresql" or self.is_partitioned(conn):
+            return []
+
+        parent = self._quote(conn, self.table.name)
+        old = self._quote(conn, f"{self.table.name}_unpartitioned")
+        oldest = conn.execute(select(func.min(self.table.c[self.column]))).scalar()
+        today = datetime.now(timezone.utc).date()
+
+        statements = [f"ALTER TABLE {parent} RENAME TO {old}"]
+        # free the index names for the new table
+        for (index,) in conn.execute(
+            text(
+                "SELECT indexname FROM pg_indexes "
+                "WHERE tablename = :name AND schemaname = current_schema()"
+            ),
+            {"name": self.table.name},
+        ):
+            statements.append(
+                f"ALTER INDEX {self._quote(conn, index)} RENAME TO {self._quote(conn, index + '_old')}"
+            )
+        if not dry_run:
+            for statement in statements:
+                conn.exec_driver_sql(statement)
+            self.table.create(conn)
+        statements.append(f"CREATE TABLE {parent} (...) PARTITION BY RANGE ({self.column})")
+
+        # the new table has no partitions yet, so every month is missing
+        columns = ", ".join(self._quote(conn, column.name) for column in self.table.columns)
+        values = ", ".join(
+            f"coalesce({self._quote(conn, column.name)}, now())"
+            if column.name == self.column
+            else self._quote(conn, column.name)
+            for column in self.table.columns
+        )
+        rest = self.create_statements(
+            conn,
+            oldest.date() if oldest else today,
+            add_months(month_start(today), self.months_ahead),
+        ) + [
+            f"INSERT INTO {parent} ({columns}) SELECT {values} FROM {old}",
+            f"DROP TABLE {old}",
+        ]
+        if not dry_run:
+            for statement in rest:
+                conn.exec_driver_sql(statement)
+        return statements + rest
+
+
+def _months(first: date, last: date):
+    month = first
+    while month <= last:
+        yield month
+        month = add_months(month, 1)
@@ -0,0 +1,338 @@
+"""Slow query log: per-statement statistics and EXPLAIN capture.
+
+Engine-level cursor hooks fingerprint every SQL statement by replacing its
+literals and bound parameters with `?` (and collapsing `IN (?, ?, ...)`
+lists), then aggregate per fingerprint: count, p50/p95/p99/max latency and
+rows. Latency percentiles are computed from the most recent `sample_size`
+executions of each fingerprint.
+
+Statements slower than SLOW_QUERY_THRESHOLD_MS are queued for an EXPLAIN,
+at most once per fingerprint every SLOW_QUERY_EXPLAIN_INTERVAL seconds. The
+EXPLAIN runs on a background thread with its own connection, so it neither
+delays the request nor touches the request's transaction. Plans are
+estimated only (`EXPLAIN (ANALYZE off)` on PostgreSQL, `EXPLAIN QUERY PLAN`
+on SQLite): the statement itself is never run a second time.
+
+Statistics are per worker. Superadmins can read the live ones through
+`/query-stats`. When QUERY_STATS_DIR is set, each worker also writes a
+snapshot there every minute, which `python -m scripts.dump_query_stats`
+merges across workers.
+"""
+
+import json
+import os
+import queue
+import re
+import threading
+import time
+from hashlib import blake2b
+from typing import Dict, List, Optional
+
+from sqlalchemy import event
+
+from api.utils.logger import logger
+from api.utils.settings import settings
+
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"(?<![\w$])-?\d+(?:\.\d+)?(?:e[+-]?\d+)?\b", re.IGNORECASE)
+_PARAM_RE = re.compile(r"%\(\w+\)s|%s|(?<!:):\w+|\$\d+")
+_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACE_RE = re.compile(r"\s+")
+
+_EXPLAIN_PREFIXES = {
+    "postgresql": "EXPLAIN (ANALYZE off) ",
+    "sqlite": "EXPLAIN QUERY PLAN ",
+}
+
+_SKIP = "query_log_skip"
+_START = "query_log_start"
+
+
+def fingerprint(statement: str) -> str:
+    '''Normalizes `statement` so executions differing only in values match.
+
+    Example:
+        "SELECT * FROM users WHERE email = 'a@b.c' AND id IN (1, 2)"
+        -> "SELECT * FROM users WHERE email = ? AND id IN (?+)"
+    '''
+
+    text = _STRING_RE.sub("?", statement)
+    text = _PARAM_RE.sub("?", text)
+    text = _NUMBER_RE.sub("?", text)
+    text = _LIST_RE.sub("(?+)", text)
+    return _SPACE_RE.sub(" ", text).strip()
+
+
+def fingerprint_id(normalized: str) -> str:
+    return blake2b(normalized.encode(), digest_size=8).hexdigest()
+
+
+def _percentile(ordered: List[float], percent: float) -> float:
+    if not ordered:
+        return 0.0
+    index = max(int(round(percent / 100 * len(ordered) + 0.5)) - 1, 0)
+    return ordered[min(index, len(ordered) - 1)]
+
+
+class StatementStats:
+    """Aggregates for one statement fingerprint"""
+
+    __slots__ = (
+        "id", "statement", "count", "total_ms", "max_ms", "rows",
+        "samples", "sample_index", "explain", "explain_at",
+    )
+
+    def __init__(self, normalized: str, sample_size: int):
+        self.id = fingerprint_id(normalized)
+        self.statement = normalized
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.rows = 0
+        self.samples = [0.0] * sample_size
+        self.sample_index = 0
+        self.explain: Optional[str] = None
+        self.explain_at: Optional[float] = None
+
+    def add(self, elapsed_ms: float, rows: int):
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.rows += rows
+        if elapsed_ms > self.max_ms:
+            self.max_ms = elapsed_ms
+        # ring buffer of recent latencies for the percentiles
+        self.samples[self.sample_index % len(self.samples)] = elapsed_ms
+        self.sample_index += 1
+
+    def recent_samples(self) -> List[float]:
+        return self.samples[: min(self.sample_index, len(self.samples))]
+
+    def to_dict(self) -> dict:
+        ordered = sorted(self.recent_samples())
+        return {
+            "id": self.id,
+            "statement": self.statement,
+            "count": self.count,
+            "total_ms": round(self.total_ms, 3),
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "p50_ms": round(_percentile(ordered, 50), 3),
+            "p95_ms": round(_percentile(ordered, 95), 3),
+            "p99_ms": round(_percentile(ordered, 99), 3),
+            "max_ms": round(self.max_ms, 3),
+            "rows": self.rows,
+            "mean_rows": round(self.rows / self.count, 2) if self.count else 0.0,
+            "explain": self.explain,
+            "samples": [round(sample, 3) for sample in self.recent_samples()],
+        }
+
+
+class QueryLog:
+    """Collects statement statistics from the engines it is installed on"""
+
+    def __init__(
+        self,
+        threshold_ms: float = 200,
+        explain_interval: float = 300,
+        max_fingerprints: int = 2000,
+        sample_size: int = 512,
+        snapshot_dir: str = "",
+        snapshot_interval: float = 60,
+    ):
+        self.threshold_ms = threshold_ms
+        self.explain_interval = explain_interval
+        self.max_fingerprints = max_fingerprints
+        self.sample_size = sample_size
+        self.snapshot_dir = snapshot_dir
+        self.snapshot_interval = snapshot_interval
+        self._stats: Dict[str, StatementStats] = {}
+        self._fingerprints: Dict[str, str] = {}  # raw statement -> fingerprint
+        self._lock = threading.Lock()
+        self._jobs = queue.Queue(maxsize=100)
+        self._worker: Optional[threading.Thread] = None
+        # threads do not survive a fork; forked workers start their own
+        os.register_at_fork(after_in_child=self._after_fork)
+
+    def install(self, engine):
+        '''Attaches the cursor hooks to `engine`'''
+
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+        if self.snapshot_dir:
+            self._ensure_worker()
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if not conn.info.get(_SKIP):
+            conn.info.setdefault(_START, []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if conn.info.get(_SKIP):
+            return
+        elapsed_ms = (time.perf_counter() - conn.info[_START].pop()) * 1000
+        rows = cursor.rowcount if cursor.rowcount and cursor.rowcount > 0 else 0
+        stats = self.record(statement, elapsed_ms, rows)
+
+        if (
+            stats is not None
+            and elapsed_ms >= self.threshold_ms
+            and not executemany
+            and (
+                stats.explain_at is None
+                or time.monotonic() - stats.explain_at >= self.explain_interval
+            )
+        ):
+            stats.explain_at = time.monotonic()
+            self._queue_explain(conn.engine, statement, parameters, stats)
+
+    def record(self, statement: str, elapsed_ms: float, rows: int = 0) -> Optional[StatementStats]:
+        '''Adds one execution of `statement`; None once the fingerprint table is full'''
+
+        normalized = self._fingerprints.get(statement)
+        if normalized is None:
+            normalized = fingerprint(statement)
+            if len(self._fingerprints) < self.max_fingerprints * 4:
+                self._fingerprints[statement] = normalized
+
+        with self._lock:
+            stats = self._stats.get(normalized)
+            if stats is None:
+                if len(self._stats) >= self.max_fingerprints:
+                    return None
+                stats = self._stats[normalized] = StatementStats(
+                    normalized, self.sample_size
+                )
+            stats.add(elapsed_ms, rows)
+        return stats
+
+    def _queue_explain(self, engine, statement, parameters, stats: StatementStats):
+        if statement.lstrip()[:6].upper() not in ("SELECT", "UPDATE", "DELETE", "INSERT"):
+            return
+        self._ensure_worker()
+        try:
+            self._jobs.put_nowait((engine, statement, parameters, stats))
+        except queue.Full:
+            pass
+
+    def explain(self, engine, statement: str, parameters) -> str:
+        '''Returns the estimated plan of `statement` as text'''
+
+        prefix = _EXPLAIN_PREFIXES.get(engine.dialect.name, "EXPLAIN ")
+        with engine.connect() as conn:
+            conn.info[_SKIP] = True
+            try:
+                rows = conn.exec_driver_sql(prefix + statement, parameters).fetchall()
+            finally:
+                conn.info.pop(_SKIP, None)
+                conn.rollback()
+        return "\n".join(" ".join(str(value) for value in row) for row in rows)
+
+    def _after_fork(self):
+        self._lock = threading.Lock()
+        self._jobs = queue.Queue(maxsize=100)
+        self._worker = None
+        if self.snapshot_dir:
+            self._ensure_worker()
+
+    def _ensure_worker(self):
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(
+                target=self._run, name="query-log", daemon=True
+            )
+            self._worker.start()
+
+    def _run(self):
+        next_snapshot = time.monotonic() + self.snapshot_interval
+        while True:
+            try:
+                job = self._jobs.get(timeout=max(next_snapshot - time.monotonic(), 0.1))
+            except queue.Empty:
+                job = None
+
+            if job is not None:
+                engine, statement, parameters, stats = job
+                try:
+                    stats.explain = self.explain(engine, statement, parameters)
+                except Exception as exc:
+                    stats.explain = f"EXPLAIN failed: {exc}"
+                    logger.warning(f"Could not explain slow query {stats.id}: {exc}")
+
+            if self.snapshot_dir and time.monotonic() >= next_snapshot:
+                next_snapshot = time.monotonic() + self.snapshot_interval
+                try:
+                    self.write_snapshot()
+                except OSError as exc:
+                    logger.warning(f"Could not write query stats snapshot: {exc}")
+
+    def snapshot(self, sort_by: str = "total_ms", limit: Optional[int] = None) -> List[dict]:
+        '''Statistics per fingerprint, heaviest first'''
+
+        with self._lock:
+            entries = [stats.to_dict() for stats in self._stats.values()]
+        entries.sort(key=lambda entry: entry[sort_by], reverse=True)
+        for entry in entries:
+            entry.pop("samples")
+        return entries[:limit] if limit else entries
+
+    def write_snapshot(self):
+        '''Writes this worker's statistics to `snapshot_dir`/<pid>.json'''
+
+        os.makedirs(self.snapshot_dir, exist_ok=True)
+        with self._lock:
+            entries = [stats.to_dict() for stats in self._stats.values()]
+        path = os.path.join(self.snapshot_dir, f"{os.getpid()}.json")
+        with open(path + ".tmp", "w") as file:
+            json.dump(entries, file)
+        os.replace(path + ".tmp", path)
+
+    def get(self, stats_id: str) -> Optional[dict]:
+        with self._lock:
+            for stats in self._stats.values():
+                if stats.id == stats_id:
+                    entry = stats.to_dict()
+                    entry.pop("samples")
+                    return entry
+        return None
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+
+def merge_snapshots(snapshot_dir: str) -> List[dict]:
+    '''Combines the snapshot files of all workers into one list of statistics'''
+
+    merged: Dict[str, dict] = {}
+    for name in os.listdir(snapshot_dir):
+        if not name.endswith(".json"):
+            continue
+        with open(os.path.join(snapshot_dir, name)) as file:
+            entries = json.load(file)
+        for entry in entries:
+            current = merged.get(entry["id"])
+            if current is None:
+                merged[entry["id"]] = dict(entry)
+                continue
+            current["count"] += entry["count"]
+            current["total_ms"] += entry["total_ms"]
+            current["rows"] += entry["rows"]
+            current["max_ms"] = max(current["max_ms"], entry["max_ms"])
+            current["samples"] += entry["samples"]
+            current["explain"] = current["explain"] or entry["explain"]
+
+    for entry in merged.values():
+        ordered = sorted(entry.pop("samples"))
+        count = entry["count"]
+        entry["mean_ms"] = round(entry["total_ms"] / count, 3) if count else 0.0
+        entry["mean_rows"] = round(entry["rows"] / count, 2) if count else 0.0
+        entry["p50_ms"] = round(_percentile(ordered, 50), 3)
+        entry["p95_ms"] = round(_percentile(ordered, 95), 3)
+        entry["p99_ms"] = round(_percentile(ordered, 99), 3)
+
+    return sorted(merged.values(), key=lambda entry: entry["total_ms"], reverse=True)
+
+
+query_log = QueryLog(
+    threshold_ms=settings.SLOW_QUERY_THRESHOLD_MS,
+    explain_interval=settings.SLOW_QUERY_EXPLAIN_INTERVAL,
+    snapshot_dir=settings.QUERY_STATS_DIR,
+)
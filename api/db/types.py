@@ -0,0 +1,65 @@
+"""Column types shared by the models."""
+
+import uuid
+
+from sqlalchemy import CHAR, LargeBinary, String
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.types import TypeDecorator
+
+from api.utils.settings import settings
+
+
+class UUIDString(TypeDecorator):
+    """Primary and foreign key ids, handled as strings in Python.
+
+    By default the column is a plain VARCHAR holding the 36 character text
+    form. With DB_NATIVE_UUID enabled it is stored compactly instead: a
+    native `uuid` (16 bytes) on PostgreSQL, a 16 byte BLOB on SQLite and
+    CHAR(36) elsewhere. Values read back are always the canonical text form,
+    so models, services and serializers keep working with `str` ids.
+
+    Existing databases are converted with `python -m scripts.migrate_uuid_columns`
+    before the setting is turned on.
+    """
+
+    impl = String
+    cache_ok = True
+
+    @staticmethod
+    def _uuid(value) -> uuid.UUID:
+        # an id that is no UUID (from a path, body or cursor) matches no row
+        # instead of failing the query; generated ids are never the nil UUID
+        try:
+            return uuid.UUID(str(value))
+        except ValueError:
+            return uuid.UUID(int=0)
+
+    def load_dialect_impl(self, dialect):
+        if not settings.DB_NATIVE_UUID:
+            return dialect.type_descriptor(String())
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(postgresql.UUID(as_uuid=False))
+        if dialect.name == "sqlite":
+            return dialect.type_descriptor(LargeBinary(16))
+        return dialect.type_descriptor(CHAR(36))
+
+    def process_bind_param(self, value, dialect):
+        if value is None or not settings.DB_NATIVE_UUID:
+            return value
+        if dialect.name == "sqlite":
+            return self._uuid(value).bytes
+        return str(self._uuid(value))
+
+    def process_literal_param(self, value, dialect):
+        if value is None or not settings.DB_NATIVE_UUID:
+            return value
+        if dialect.name == "sqlite":
+            return f"X'{self._uuid(value).hex}'"
+        return f"'{self._uuid(value)}'"
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return value
+        if isinstance(value, (bytes, memoryview)):
+            return str(uuid.UUID(bytes=bytes(value)))
+        return str(value)
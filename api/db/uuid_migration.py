@@ -0,0 +1,183 @@
+"""Converts existing id columns from text to compact UUID storage.
+
+Every column typed `UUIDString` (primary keys, foreign keys and the
+association tables) is converted in a single transaction:
+    * PostgreSQL: foreign key constraints touching the converted tables are
+      dropped, each table is rewritten once with
+      `ALTER COLUMN ... TYPE uuid USING col::uuid`, then the constraints are
+      recreated from their original definitions. Indexes are rebuilt by the
+      type change. Tables are locked for the duration; run it in a
+      maintenance window.
+    * SQLite: column types cannot be altered, but SQLite stores a value with
+      the type it was written with, so the text ids are rewritten in place
+      as 16 byte blobs, which is what `UUIDString` binds once DB_NATIVE_UUID
+      is on.
+
+Turn DB_NATIVE_UUID on once the conversion has run.
+"""
+
+import re
+import uuid
+from typing import Dict, List, Tuple
+
+from sqlalchemy import MetaData, text
+from sqlalchemy.engine import Connection, Engine
+
+from api.db.types import UUIDString
+
+
+_UUID_RE = "^[0-9a-fA-F]{8}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{12}$"
+
+
+def uuid_columns(metadata: MetaData) -> Dict[str, List[str]]:
+    '''Columns typed UUIDString, by table name'''
+
+    columns = {}
+    for name, table in sorted(metadata.tables.items()):
+        found = [column.name for column in table.columns if isinstance(column.type, UUIDString)]
+        if found:
+            columns[name] = found
+    return columns
+
+
+def _invalid_ids(conn: Connection, pending: List[Tuple[str, str]]) -> List[str]:
+    quote = conn.dialect.identifier_preparer.quote
+    problems = []
+    for table, column in pending:
+        count = conn.execute(
+            text(
+                f"SELECT count(*) FROM {quote(table)} "
+                f"WHERE {quote(column)} IS NOT NULL AND {quote(column)}::text !~ :pattern"
+            ),
+            {"pattern": _UUID_RE},
+        ).scalar()
+        if count:
+            problems.append(f"{table}.{column}: {count} value(s) are not UUIDs")
+    return problems
+
+
+def postgres_statements(conn: Connection, metadata: MetaData) -> List[str]:
+    '''DDL converting the remaining text id columns to uuid; empty when done'''
+
+    targets = uuid_columns(metadata)
+    rows = conn.execute(
+        text(
+            "SELECT table_name, column_name FROM information_schema.columns "
+            "WHERE table_schema = current_schema() AND data_type <> 'uuid'"
+        )
+    ).fetchall()
+    pending = sorted(
+        (table, column) for table, column in rows if column in targets.get(table, ())
+    )
+    if not pending:
+        return []
+
+    problems = _invalid_ids(conn, pending)
+    if problems:
+        raise ValueError("Cannot convert ids to uuid:\n" + "\n".join(problems))
+
+    quote = conn.dialect.identifier_preparer.quote
+    tables = {table for table, _ in pending}
+    foreign_keys = [
+        (name, table, definition)
+        for name, table, referred, definition in conn.execute(
+            text(
+                "SELECT c.conname, cl.relname, rf.relname, pg_get_constraintdef(c.oid) "
+                "FROM pg_constraint c "
+                "JOIN pg_class cl ON cl.oid = c.conrelid "
+                "JOIN pg_class rf ON rf.oid = c.confrelid "
+                "JOIN pg_namespace n ON n.oid = cl.relnamespace "
+                "WHERE c.contype = 'f' AND n.nspname = current_schema() "
+                "ORDER BY cl.relname, c.conname"
+            )
+        ).fetchall()
+        if table in tables or referred in tables
+    ]
+
+    statements = [
+        f"ALTER TABLE {quote(table)} DROP CONSTRAINT {quote(name)}"
+        for name, table, _ in foreign_keys
+    ]
+    for table in sorted(tables):
+        alterations = ", ".join(
+            f"ALTER COLUMN {quote(column)} TYPE uuid USING {quote(column)}::uuid"
+            for pending_table, column in pending
+            if pending_table == table
+        )
+        statements.append(f"ALTER TABLE {quote(table)} {alterations}")
+    statements += [
+        f"ALTER TABLE {quote(table)} ADD CONSTRAINT {quote(name)} {definition}"
+        for name, table, definition in foreign_keys
+    ]
+    return statements
+
+
+def _uuid_blob(value):
+    if isinstance(value, str) and re.match(_UUID_RE, value):
+        return uuid.UUID(value).bytes
+    return value
+
+
+def convert_sqlite(conn: Connection, metadata: MetaData, dry_run: bool = False) -> int:
+    '''Rewrites text ids as 16 byte blobs; returns the number of values converted'''
+
+    quote = conn.dialect.identifier_preparer.quote
+    existing = {
+        row[0] for row in conn.exec_driver_sql("SELECT name FROM sqlite_master WHERE type = 'table'")
+    }
+    conn.connection.dbapi_connection.create_function(
+        "uuid_blob", 1, _uuid_blob, deterministic=True
+    )
+
+    converted = 0
+    for table, columns in uuid_columns(metadata).items():
+        if table not in existing:
+            continue
+        for column in columns:
+            condition = f"typeof({quote(column)}) = 'text'"
+            invalid = conn.execute(
+                text(f"SELECT {quote(column)} FROM {quote(table)} WHERE {condition}")
+            ).scalars()
+            bad = [value for value in invalid if not re.match(_UUID_RE, value)]
+            if bad:
+                raise ValueError(
+                    f"Cannot convert ids to uuid: {table}.{column} has "
+                    f"{len(bad)} non-UUID value(s), e.g. {bad[0]!r}"
+                )
+            if dry_run:
+                converted += conn.execute(
+                    text(f"SELECT count(*) FROM {quote(table)} WHERE {condition}")
+                ).scalar()
+            else:
+                converted += conn.execute(
+                    text(
+                        f"UPDATE {quote(table)} SET {quote(column)} = uuid_blob({quote(column)}) "
+                        f"WHERE {condition}"
+                    )
+                ).rowcount
+    return converted
+
+
+def migrate(engine: Engine, metadata: MetaData, dry_run: bool = False) -> List[str]:
+    '''Converts `engine`'s database; returns a summary of what was (or would be) done'''
+
+    if engine.dialect.name == "postgresql":
+        with engine.begin() as conn:
+            statements = postgres_statements(conn, metadata)
+            if not dry_run:
+                for statement in statements:
+                    conn.exec_driver_sql(statement)
+        return statements
+
+    if engine.dialect.name == "sqlite":
+        with engine.connect() as conn:
+            # parents and children are rewritten one after the other
+            conn.exec_driver_sql("PRAGMA foreign_keys = OFF")
+            conn.commit()
+            with conn.begin():
+                # pysqlite opens transactions lazily; take the write lock up front
+                conn.exec_driver_sql("BEGIN IMMEDIATE")
+                converted = convert_sqlite(conn, metadata, dry_run=dry_run)
+        return [f"{converted} id value(s) {'to convert' if dry_run else 'converted'} to BLOB(16)"]
+
+    raise NotImplementedError(f"UUID conversion is not supported on {engine.dialect.name}")
@@ -0,0 +1,137 @@
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from hashlib import blake2b
+from typing import Optional
+
+from fastapi import Request, Response
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+
+# Cache-Control presets used by the read-heavy routes
+NO_CACHE = "no-cache"
+PUBLIC_SHORT = "public, max-age=60"
+PUBLIC_LONG = "public, max-age=3600"
+
+
+@dataclass(frozen=True)
+class Validators:
+    """ETag and Last-Modified values describing one version of a resource"""
+
+    etag: str
+    last_modified: Optional[datetime] = None
+
+
+def weak_etag(*parts) -> str:
+    '''Builds a weak ETag from the string form of `parts`'''
+
+    digest = blake2b("|".join(str(part) for part in parts).encode(), digest_size=12)
+    return f'W/"{digest.hexdigest()}"'
+
+
+def row_validators(obj, *extra) -> Validators:
+    '''Validators for a single row, derived from its (id, updated_at)'''
+
+    return Validators(
+        etag=weak_etag(obj.id, obj.updated_at, *extra),
+        last_modified=obj.updated_at,
+    )
+
+
+def collection_validators(db: Session, model, *criteria, extra=()) -> Validators:
+    '''Validators for a collection, derived from max(updated_at) and count.
+
+    This costs one aggregate query and lets a caller answer 304 without
+    loading the collection itself. `criteria` narrows the collection the same
+    way the listing does; `extra` folds request variants (e.g. search
+    parameters) into the ETag.
+    '''
+
+    version = (
+        db.query(
+            func.max(model.updated_at).label("last_modified"),
+            func.count(model.id).label("total"),
+        )
+        .filter(*criteria)
+        .one()
+    )
+    return Validators(
+        etag=weak_etag(
+            model.__tablename__, version.last_modified, version.total, *extra
+        ),
+        last_modified=version.last_modified,
+    )
+
+
+def _as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).replace(microsecond=0)
+
+
+def is_not_modified(request: Request, validators: Validators) -> bool:
+    '''Evaluates If-None-Match / If-Modified-Since against `validators`.
+
+    If-None-Match takes precedence when both are present (RFC 9110 13.2.2)
+    and is compared weakly, so W/"x" matches "x".
+    '''
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        current = validators.etag.removeprefix("W/")
+        return any(
+            tag.strip().removeprefix("W/") == current
+            for tag in if_none_match.split(",")
+        )
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and isinstance(validators.last_modified, datetime):
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        return _as_utc(validators.last_modified) <= _as_utc(since)
+
+    return False
+
+
+def set_validator_headers(
+    response: Response, validators: Validators, cache_control: str = NO_CACHE
+) -> Response:
+    '''Adds ETag, Last-Modified and Cache-Control headers to `response`'''
+
+    response.headers["ETag"] = validators.etag
+    if isinstance(validators.last_modified, datetime):
+        response.headers["Last-Modified"] = format_datetime(
+            _as_utc(validators.last_modified), usegmt=True
+        )
+    response.headers["Cache-Control"] = cache_control
+    return response
+
+
+def not_modified_response(
+    request: Request, validators: Validators, cache_control: str = NO_CACHE
+) -> Optional[Response]:
+    '''Returns an empty 304 response if the client's copy is current, else None.
+
+    Example use:
+        ``` python
+        validators = collection_validators(db, FAQ)
+        not_modified = not_modified_response(request, validators)
+        if not_modified:
+            return not_modified
+
+        response = success_response(...)
+        return set_validator_headers(response, validators)
+        ```
+    '''
+
+    if not is_not_modified(request, validators):
+        return None
+
+    return set_validator_headers(
+        Response(status_code=304), validators, cache_control=cache_control
+    )
@@ -0,0 +1,286 @@
+"""Shared async HTTP client for calls to third-party providers.
+
+Every outbound provider call (Stripe, Flutterwave, Twilio, Google and
+Facebook OAuth) goes through `provider_clients.request(provider, ...)`, which
+uses one connection-pooled `httpx.AsyncClient` per worker, opened at startup
+and closed at shutdown (or when a new transport or event loop replaces it).
+Per provider it adds:
+
+    * a timeout (`ProviderConfig.timeout`, connect capped at `connect_timeout`);
+    * retries with full jitter. A request that never reached the provider
+      (connection refused, connect or pool timeout) is always retried; a
+      timed-out read or a 429/502/503/504 only for idempotent requests
+      (GET/HEAD/OPTIONS/PUT/DELETE, or ones carrying an Idempotency-Key), so
+      a payment is never submitted twice;
+    * a circuit breaker: after `failure_threshold` consecutive failures the
+      provider is not called for `reset_timeout` seconds and callers get
+      `ProviderUnavailable` at once; one trial call then decides whether it
+      closes again (a trial that is cancelled lets the next call try);
+    * latency, retry and breaker metrics (api/utils/metrics.py).
+
+Tests swap the network for a local handler with
+`provider_clients.set_transport(httpx.MockTransport(handler))`.
+"""
+
+import asyncio
+import random
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Set
+
+import httpx
+
+from api.utils.logger import logger
+from api.utils.metrics import PROVIDER_CIRCUIT_OPENED, PROVIDER_LATENCY, PROVIDER_RETRIES
+from api.utils.settings import settings
+
+
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+RETRY_STATUSES = {429, 502, 503, 504}
+# the request was never sent, so retrying cannot duplicate it
+NOT_SENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+class ProviderError(Exception):
+    """A provider call failed without a response"""
+
+    def __init__(self, provider: str, message: str):
+        super().__init__(f"{provider}: {message}")
+        self.provider = provider
+
+
+class ProviderUnavailable(ProviderError):
+    """The provider's circuit breaker is open"""
+
+
+@dataclass
+class ProviderConfig:
+    """Timeouts, retries and circuit breaker thresholds of one provider"""
+
+    timeout: float = 10
+    connect_timeout: float = 3
+    retries: int = 2
+    backoff: float = 0.2
+    max_backoff: float = 2
+    failure_threshold: int = 5
+    reset_timeout: float = 30
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker: closed, open, then half-open for one trial"""
+
+    def __init__(self, provider: str, failure_threshold: int, reset_timeout: float):
+        self.provider = provider
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half-open" and not self._trial:
+            self._trial = True
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._trial = False
+
+    def release(self):
+        '''Gives up a trial that ended without an outcome (cancelled, or a bug), so another can run'''
+
+        self._trial = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self._trial or self.failures >= self.failure_threshold:
+            if self.opened_at is None or self._trial:
+                PROVIDER_CIRCUIT_OPENED.labels(self.provider).inc()
+                logger.warning(f"Circuit opened for {self.provider} after {self.failures} failure(s)")
+            self.opened_at = time.monotonic()
+            self._trial = False
+
+
+class ProviderClients:
+    """The pooled client and the per-provider policies around it"""
+
+    def __init__(
+        self,
+        providers: Dict[str, ProviderConfig],
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+    ):
+        self.providers = providers
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+        )
+        self.breakers = {
+            name: CircuitBreaker(name, config.failure_threshold, config.reset_timeout)
+            for name, config in providers.items()
+        }
+        self._transport: Optional[httpx.AsyncBaseTransport] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # closes of replaced clients still running
+        self._closing: Set[asyncio.Task] = set()
+
+    def set_transport(self, transport: Optional[httpx.AsyncBaseTransport]):
+        '''Routes every call through `transport` (e.g. httpx.MockTransport); None restores the network'''
+
+        self._transport = transport
+        self._discard_client()
+        self.reset()
+
+    def reset(self):
+        for breaker in self.breakers.values():
+            breaker.record_success()
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            # pooled connections belong to the loop that opened them
+            self._discard_client()
+            self._client = httpx.AsyncClient(limits=self.limits, transport=self._transport)
+            self._loop = loop
+        return self._client
+
+    def _discard_client(self):
+        '''Drops the current client, closing its connections on the loop that opened them'''
+
+        client, loop = self._client, self._loop
+        self._client = self._loop = None
+        if client is None or loop is None or loop.is_closed():
+            # nothing can await on it any more; the sockets go with the client
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+
+        if loop.is_running() and running is not loop:
+            asyncio.run_coroutine_threadsafe(self._close_quietly(client), loop)
+        elif running is None:
+            loop.run_until_complete(self._close_quietly(client))
+        else:
+            # the old loop is idle (or this one): close from here, as far as it goes
+            closing = running.create_task(self._close_quietly(client))
+            self._closing.add(closing)
+            closing.add_done_callback(self._closing.discard)
+
+    @staticmethod
+    async def _close_quietly(client: httpx.AsyncClient):
+        try:
+            await client.aclose()
+        except Exception as exc:
+            logger.warning(f"Could not close a replaced provider client: {exc}")
+
+    async def start(self):
+        self.client
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _retry_delay(self, config: ProviderConfig, attempt: int, response=None) -> float:
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        if retry_after and retry_after.isdigit() and int(retry_after) <= config.max_backoff:
+            return float(retry_after)
+        return random.uniform(0, min(config.max_backoff, config.backoff * 2**attempt))
+
+    async def request(
+        self,
+        provider: str,
+        method: str,
+        url: str,
+        idempotent: Optional[bool] = None,
+        **kwargs,
+    ) -> httpx.Response:
+        """Sends a request to `provider`, retrying and tripping its breaker as configured.
+
+        Any response, including 4xx and 5xx, is returned; `ProviderError` is
+        raised when there is none after the retries, `ProviderUnavailable`
+        while the breaker is open.
+        """
+
+        config = self.providers[provider]
+        breaker = self.breakers[provider]
+        method = method.upper()
+        if idempotent is None:
+            headers = kwargs.get("headers") or {}
+            idempotent = method in IDEMPOTENT_METHODS or any(
+                key.lower() == "idempotency-key" for key in headers
+            )
+        kwargs.setdefault(
+            "timeout", httpx.Timeout(config.timeout, connect=min(config.connect_timeout, config.timeout))
+        )
+
+        if not breaker.allow():
+            PROVIDER_LATENCY.labels(provider, "circuit_open").observe(0)
+            raise ProviderUnavailable(provider, "circuit open, not calling the provider")
+
+        start = time.perf_counter()
+        attempt = 0
+        try:
+            while True:
+                response = error = None
+                try:
+                    response = await self.client.request(method, url, **kwargs)
+                except httpx.HTTPError as exc:
+                    error = exc
+
+                retryable = (
+                    isinstance(error, NOT_SENT_ERRORS)
+                    or (idempotent and isinstance(error, httpx.TransportError))
+                    or (idempotent and response is not None and response.status_code in RETRY_STATUSES)
+                )
+                if not retryable or attempt >= config.retries:
+                    break
+                PROVIDER_RETRIES.labels(provider).inc()
+                await asyncio.sleep(self._retry_delay(config, attempt, response))
+                attempt += 1
+        except BaseException:
+            # cancelled, or not the provider's fault: no outcome for the breaker
+            breaker.release()
+            raise
+
+        elapsed = time.perf_counter() - start
+        if error is not None:
+            breaker.record_failure()
+            PROVIDER_LATENCY.labels(provider, "error").observe(elapsed)
+            raise ProviderError(provider, f"{type(error).__name__}: {error}") from error
+
+        if response.status_code >= 500:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        PROVIDER_LATENCY.labels(provider, f"{response.status_code // 100}xx").observe(elapsed)
+        return response
+
+
+provider_clients = ProviderClients(
+    {
+        "stripe": ProviderConfig(timeout=settings.STRIPE_TIMEOUT),
+        "flutterwave": ProviderConfig(timeout=settings.FLUTTERWAVE_TIMEOUT),
+        "twilio": ProviderConfig(timeout=settings.TWILIO_TIMEOUT),
+        "google": ProviderConfig(timeout=settings.OAUTH_PROVIDER_TIMEOUT),
+        "facebook": ProviderConfig(timeout=settings.OAUTH_PROVIDER_TIMEOUT),
+    },
+    max_connections=settings.PROVIDER_MAX_CONNECTIONS,
+    max_keepalive_connections=settings.PROVIDER_MAX_KEEPALIVE_CONNECTIONS,
+)
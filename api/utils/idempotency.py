@@ -0,0 +1,259 @@
+"""Idempotency-Key support for POST requests.
+
+A client that may retry a POST (a payment, a checkout) sends a unique
+`Idempotency-Key` header with it. `IdempotencyMiddleware` then makes sure
+that a POST to one of its `paths` is executed once per caller and key:
+
+    * the first request runs as usual and its response is stored with a
+      fingerprint of the method, path, query and body;
+    * a retry with the same key gets the stored response back, marked with
+      `Idempotent-Replayed: true`, without the route running again;
+    * a duplicate arriving while the first one still runs waits for it (up
+      to IDEMPOTENCY_WAIT_TIMEOUT, then 409) instead of racing it;
+    * reusing a key for a different request is refused with 422.
+
+Keys are per caller (the user of the bearer token, or the client address),
+so two users cannot collide. A response worth retrying (5xx, 408, 409, 425,
+429) or an authentication failure (401, 403), as well as an exception,
+releases the key and the next retry executes the request again. Set-Cookie
+headers are not stored. The store is in api/v1/services/idempotency.py.
+
+Other paths, and POSTs without the header, pass straight through.
+
+Routes that call a provider can pass the key on, so the provider
+deduplicates too and the POST can be retried safely:
+
+    ``` python
+    stripe.checkout.Session.create_async(..., **provider_idempotency("checkout"))
+    ```
+"""
+
+import asyncio
+import hashlib
+from contextvars import ContextVar
+from typing import Iterable, List, Optional, Tuple
+
+from fastapi import Request, status
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
+
+from api.db.database import SessionLocal
+from api.utils.rate_limit import rate_limit_key
+from api.utils.settings import settings
+from api.v1.services.idempotency import (
+    CLAIMED,
+    COMPLETED,
+    MISMATCH,
+    PROCESSING,
+    IdempotencyService,
+)
+
+
+HEADER = "idempotency-key"
+MAX_KEY_LENGTH = 255
+UNSTORED_HEADERS = {b"set-cookie"}
+# responses the client should retry (or fix its credentials and retry), so not replayed
+UNSTORED_STATUSES = {401, 403, 408, 409, 425, 429}
+
+# "<scope>:<key>" of the request being executed, for passing on to providers
+_current_key: ContextVar[Optional[str]] = ContextVar("idempotency_key", default=None)
+
+
+def provider_idempotency(operation: str) -> dict:
+    '''`idempotency_key=` keyword for a provider SDK call, or nothing without a key.
+
+    The key sent is derived from the caller, their key and `operation`, so it
+    is unique per provider call and does not reveal the caller's key.
+    '''
+
+    key = _current_key.get()
+    if key is None:
+        return {}
+    return {"idempotency_key": hashlib.sha256(f"{key}:{operation}".encode()).hexdigest()}
+
+
+def fingerprint(method: str, path: str, query: bytes, body: bytes) -> str:
+    digest = hashlib.sha256()
+    for part in (method.encode(), path.encode(), query, body):
+        digest.update(len(part).to_bytes(8, "big"))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+def _error(status_code: int, message: str, headers: Optional[dict] = None) -> JSONResponse:
+    return JSONResponse(
+        status_code=status_code,
+        content={"status": False, "status_code": status_code, "message": message},
+        headers=headers,
+    )
+
+
+class IdempotencyMiddleware:
+    """Executes a POST to one of `paths` at most once per caller and Idempotency-Key"""
+
+    poll_interval = 0.05
+    max_poll_interval = 1.0
+
+    def __init__(self, app, paths: Iterable[str] = ()):
+        self.app = app
+        self.paths = {path.rstrip("/") for path in paths}
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "POST"
+            or scope["path"].rstrip("/") not in self.paths
+        ):
+            await self.app(scope, receive, send)
+            return
+        key = next(
+            (value.decode("latin-1") for name, value in scope["headers"] if name == HEADER.encode()),
+            None,
+        )
+        if key is None:
+            await self.app(scope, receive, send)
+            return
+        if not key or len(key) > MAX_KEY_LENGTH:
+            response = _error(
+                status.HTTP_400_BAD_REQUEST,
+                f"Idempotency-Key must be 1 to {MAX_KEY_LENGTH} characters",
+            )
+            await response(scope, receive, send)
+            return
+
+        body, connected = await self._read_body(receive)
+        if not connected:
+            return
+        caller = rate_limit_key(Request(scope))
+        request_fingerprint = fingerprint(
+            scope["method"], scope["path"], scope.get("query_string", b""), body
+        )
+
+        outcome, stored = await self._claim_or_wait(
+            caller, key, scope["method"], scope["path"], request_fingerprint
+        )
+        if outcome == CLAIMED:
+            await self._execute(scope, body, receive, send, caller, key)
+            return
+        if outcome == COMPLETED:
+            await self._replay(stored, send)
+            return
+        if outcome == MISMATCH:
+            response = _error(
+                status.HTTP_422_UNPROCESSABLE_ENTITY,
+                "Idempotency-Key was already used for a different request",
+            )
+        else:
+            response = _error(
+                status.HTTP_409_CONFLICT,
+                "A request with this Idempotency-Key is still in progress",
+                headers={"Retry-After": "1"},
+            )
+        await response(scope, receive, send)
+
+    @staticmethod
+    async def _read_body(receive) -> Tuple[bytes, bool]:
+        '''The whole request body, and False if the client disconnected while sending it'''
+
+        chunks = []
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return b"".join(chunks), False
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                return b"".join(chunks), True
+
+    async def _claim_or_wait(self, caller, key, method, path, request_fingerprint):
+        '''Claims the key, or polls the claim of a running duplicate until it completes'''
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.IDEMPOTENCY_WAIT_TIMEOUT
+        interval = self.poll_interval
+        while True:
+            outcome, stored = await run_in_threadpool(
+                self._claim, caller, key, method, path, request_fingerprint
+            )
+            if outcome != PROCESSING or loop.time() >= deadline:
+                return outcome, stored
+            await asyncio.sleep(min(interval, max(deadline - loop.time(), 0)))
+            interval = min(interval * 2, self.max_poll_interval)
+
+    @staticmethod
+    def _claim(caller, key, method, path, request_fingerprint):
+        with SessionLocal() as db:
+            outcome, row = IdempotencyService.claim(
+                db, caller, key, method, path, request_fingerprint
+            )
+            if row is not None:
+                db.expunge(row)
+            return outcome, row
+
+    @staticmethod
+    def _complete(caller, key, status_code, headers, body):
+        with SessionLocal() as db:
+            IdempotencyService.complete(db, caller, key, status_code, headers, body)
+
+    @staticmethod
+    def _release(caller, key):
+        with SessionLocal() as db:
+            IdempotencyService.release(db, caller, key)
+
+    async def _execute(self, scope, body, receive, send, caller, key):
+        sent_body = False
+
+        async def replay_body():
+            nonlocal sent_body
+            if not sent_body:
+                sent_body = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        response_status = None
+        response_headers: List[List[str]] = []
+        chunks = []
+
+        async def capture(message):
+            nonlocal response_status
+            if message["type"] == "http.response.start":
+                response_status = message["status"]
+                response_headers.extend(
+                    [name.decode("latin-1"), value.decode("latin-1")]
+                    for name, value in message.get("headers", [])
+                    if name.lower() not in UNSTORED_HEADERS
+                )
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+            await send(message)
+
+        token = _current_key.set(f"{caller}:{key}")
+        try:
+            await self.app(scope, replay_body, capture)
+        except BaseException:
+            await run_in_threadpool(self._release, caller, key)
+            raise
+        finally:
+            _current_key.reset(token)
+
+        if (
+            response_status is not None
+            and response_status < 500
+            and response_status not in UNSTORED_STATUSES
+        ):
+            await run_in_threadpool(
+                self._complete, caller, key, response_status, response_headers, b"".join(chunks)
+            )
+        else:
+            await run_in_threadpool(self._release, caller, key)
+
+    @staticmethod
+    async def _replay(stored, send):
+        headers = [
+            (name.encode("latin-1"), value.encode("latin-1"))
+            for name, value in stored.response_headers or []
+        ]
+        headers.append((b"idempotent-replayed", b"true"))
+        await send(
+            {"type": "http.response.start", "status": stored.response_status, "headers": headers}
+        )
+        await send({"type": "http.response.body", "body": stored.response_body or b""})
@@ -0,0 +1,146 @@
+"""Startup and shutdown of a worker process.
+
+The lifespan hook in main.py calls `lifecycle.startup(app)` before the
+worker serves traffic and `lifecycle.shutdown(app)` once it has drained.
+Modules register what they need with decorators:
+
+    * `on_startup(name, required=True)`: runs once, in registration order.
+      A failing required step leaves the worker not ready; optional ones
+      are only logged.
+    * `on_shutdown(name)`: runs in reverse registration order.
+    * `background(name)`: a long-running coroutine started after the
+      startup steps and cancelled at shutdown.
+
+Steps take the app as their only argument and may be sync (run in the
+threadpool) or async.
+
+Liveness and readiness are reported separately: `/probe` answers as soon as
+the process is up, `/ready` only once every required step has succeeded and
+no background worker has died, so load balancers route to warmed workers.
+"""
+
+import asyncio
+import time
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from api.utils.logger import logger
+
+
+@dataclass
+class StepResult:
+    """Outcome of one startup step"""
+
+    name: str
+    ok: bool
+    required: bool
+    duration_ms: float
+    error: Optional[str] = None
+
+
+class Lifecycle:
+    """Registry of startup/shutdown steps and background workers"""
+
+    def __init__(self):
+        self._startup: List[Tuple[str, Callable, bool]] = []
+        self._shutdown: List[Tuple[str, Callable]] = []
+        self._background: List[Tuple[str, Callable]] = []
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self.results: List[StepResult] = []
+        self.started = False
+
+    def on_startup(self, name: str, required: bool = True):
+        def decorator(func):
+            self._startup.append((name, func, required))
+            return func
+
+        return decorator
+
+    def on_shutdown(self, name: str):
+        def decorator(func):
+            self._shutdown.append((name, func))
+            return func
+
+        return decorator
+
+    def background(self, name: str):
+        def decorator(func):
+            self._background.append((name, func))
+            return func
+
+        return decorator
+
+    async def _call(self, func, app):
+        if asyncio.iscoroutinefunction(func):
+            return await func(app)
+        return await run_in_threadpool(func, app)
+
+    async def startup(self, app):
+        self.results = []
+        for name, func, required in self._startup:
+            start = time.perf_counter()
+            error = None
+            try:
+                await self._call(func, app)
+            except Exception as exc:
+                error = f"{type(exc).__name__}: {exc}"
+                log = logger.error if required else logger.warning
+                log(f"Startup step '{name}' failed: {error}")
+            self.results.append(
+                StepResult(
+                    name=name,
+                    ok=error is None,
+                    required=required,
+                    duration_ms=round((time.perf_counter() - start) * 1000, 2),
+                    error=error,
+                )
+            )
+
+        for name, func in self._background:
+            self._tasks[name] = asyncio.create_task(func(app), name=name)
+        self.started = True
+
+    async def shutdown(self, app):
+        self.started = False
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks = {}
+
+        for name, func in reversed(self._shutdown):
+            try:
+                await self._call(func, app)
+            except Exception as exc:
+                logger.warning(f"Shutdown step '{name}' failed: {exc}")
+
+    def worker_states(self) -> Dict[str, str]:
+        states = {}
+        for name, task in self._tasks.items():
+            if not task.done():
+                states[name] = "running"
+            elif task.cancelled():
+                states[name] = "cancelled"
+            else:
+                states[name] = "failed" if task.exception() else "finished"
+        return states
+
+    @property
+    def ready(self) -> bool:
+        return (
+            self.started
+            and all(result.ok for result in self.results if result.required)
+            and "failed" not in self.worker_states().values()
+        )
+
+    def status(self) -> dict:
+        return {
+            "ready": self.ready,
+            "steps": [asdict(result) for result in self.results],
+            "workers": self.worker_states(),
+        }
+
+
+lifecycle = Lifecycle()
@@ -1,4 +1,7 @@
+import base64
+import json
 from typing import Any, Dict, List, Optional
+from fastapi import HTTPException, status
 from fastapi.encoders import jsonable_encoder
 from sqlalchemy.orm import Session
 from api.db.database import Base
@@ -103,3 +106,22 @@ def paginated_response(
             )
         }
     )
+
+
+def encode_cursor(*values: Any) -> str:
+    '''Opaque keyset pagination cursor holding the sort key of the last item of a page'''
+
+    raw = json.dumps(jsonable_encoder(list(values)), separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    '''Values of a cursor made by `encode_cursor`; 400 if it is not one of `size` values'''
+
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except ValueError:
+        values = None
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    return values
@@ -0,0 +1,283 @@
+"""Opt-in sampling profiler for production requests.
+
+While a request is profiled, a background thread snapshots every thread's
+stack (`sys._current_frames`) every `interval` seconds and counts identical
+stacks. The result is kept in the collapsed "folded stacks" format
+(`frame;frame;frame count` per line), which flamegraph.pl, speedscope and
+inferno render directly.
+
+A request is profiled when:
+    * it carries `X-Profile: <PROFILER_TOKEN>`; the profile id is returned
+      in the `X-Profile-Id` response header,
+    * a superadmin armed the profiler for its path (`POST /profiler/arm`),
+    * or background sampling picks it (1 in PROFILER_SAMPLE_RATE requests)
+      and it turns out slower than PROFILER_SLOW_THRESHOLD_MS.
+
+The last PROFILER_MAX_PROFILES profiles are kept in memory per worker and
+can be listed and downloaded by superadmins. Only one request is sampled at
+a time; requests arriving while the sampler is busy run unprofiled. Stacks of
+other threads busy at the same time are included, rooted at their thread
+name, and idle threads are skipped.
+"""
+
+import hmac
+import itertools
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from uuid_extensions import uuid7
+
+from api.utils.settings import settings
+
+
+# leaf functions of threads that are waiting rather than working
+_IDLE_LEAVES = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("selectors.py", "select"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+}
+
+_ROOT = os.getcwd() + os.sep
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    filename = code.co_filename
+    if filename.startswith(_ROOT):
+        filename = filename[len(_ROOT):]
+    else:
+        _, _, tail = filename.rpartition("site-packages" + os.sep)
+        filename = tail or filename
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """Samples the stacks of all running threads at a fixed interval"""
+
+    def __init__(self, interval: float = 0.001):
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self._run, name="sampling-profiler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _run(self):
+        own_ident = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own_ident:
+                    continue
+                code = frame.f_code
+                if (os.path.basename(code.co_filename), code.co_name) in _IDLE_LEAVES:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def collapsed(self) -> str:
+        '''Profile in folded stacks format, heaviest stacks first'''
+
+        return "".join(
+            f"{stack} {count}\n" for stack, count in self.stacks.most_common()
+        )
+
+
+@dataclass
+class ProfileRecord:
+    """A finished request profile"""
+
+    method: str
+    path: str
+    status_code: int
+    duration_ms: float
+    trigger: str  # "header", "armed" or "sampled"
+    samples: int
+    collapsed: str = field(repr=False)
+    id: str = field(default_factory=lambda: str(uuid7()))
+    created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+
+    def summary(self) -> dict:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "status_code": self.status_code,
+            "duration_ms": round(self.duration_ms, 2),
+            "trigger": self.trigger,
+            "samples": self.samples,
+            "created_at": self.created_at.isoformat(),
+        }
+
+
+class ProfileStore:
+    """Ring buffer of the most recent profiles"""
+
+    def __init__(self, max_profiles: int = 20):
+        self._profiles = deque(maxlen=max_profiles)
+        self._lock = threading.Lock()
+
+    def add(self, record: ProfileRecord):
+        with self._lock:
+            self._profiles.append(record)
+
+    def get(self, profile_id: str) -> Optional[ProfileRecord]:
+        with self._lock:
+            return next((p for p in self._profiles if p.id == profile_id), None)
+
+    def all(self) -> List[ProfileRecord]:
+        '''Profiles, newest first'''
+        with self._lock:
+            return list(reversed(self._profiles))
+
+    def clear(self):
+        with self._lock:
+            self._profiles.clear()
+
+
+class ProfilerConfig:
+    """Runtime profiler settings, adjustable by superadmins (per worker)"""
+
+    def __init__(self, sample_rate: int, slow_threshold_ms: float, interval: float):
+        self.sample_rate = sample_rate
+        self.slow_threshold_ms = slow_threshold_ms
+        self.interval = interval
+        self._armed: List[str] = []
+        self._lock = threading.Lock()
+
+    def arm(self, path_prefix: str, count: int = 1):
+        '''Profiles the next `count` requests whose path starts with `path_prefix`'''
+        with self._lock:
+            self._armed.extend([path_prefix] * count)
+
+    def take_armed(self, path: str) -> bool:
+        with self._lock:
+            for index, prefix in enumerate(self._armed):
+                if path.startswith(prefix):
+                    del self._armed[index]
+                    return True
+        return False
+
+    def armed(self) -> List[str]:
+        with self._lock:
+            return list(self._armed)
+
+    def reset(self):
+        with self._lock:
+            self._armed.clear()
+
+
+profile_store = ProfileStore(max_profiles=settings.PROFILER_MAX_PROFILES)
+profiler_config = ProfilerConfig(
+    sample_rate=settings.PROFILER_SAMPLE_RATE,
+    slow_threshold_ms=settings.PROFILER_SLOW_THRESHOLD_MS,
+    interval=settings.PROFILER_INTERVAL_MS / 1000,
+)
+
+# a single sampler runs at a time: it already sees every thread
+_sampler_lock = threading.Lock()
+_request_counter = itertools.count(1)
+
+
+def _trigger(scope) -> Optional[str]:
+    token = settings.PROFILER_TOKEN
+    if token:
+        for name, value in scope["headers"]:
+            if name == b"x-profile":
+                # bytes: compare_digest refuses non-ASCII str
+                if hmac.compare_digest(value, token.encode()):
+                    return "header"
+                break
+
+    if profiler_config.take_armed(scope["path"]):
+        return "armed"
+
+    rate = profiler_config.sample_rate
+    if rate > 0 and next(_request_counter) % rate == 0:
+        return "sampled"
+
+    return None
+
+
+class ProfilingMiddleware:
+    """ASGI middleware profiling the requests selected by `_trigger`"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trigger = _trigger(scope)
+        if trigger is None or not _sampler_lock.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+
+        profiler = SamplingProfiler(interval=profiler_config.interval)
+        record_id = str(uuid7())
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if trigger == "header":
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (b"x-profile-id", record_id.encode())
+                    ]
+            await send(message)
+
+        start = time.perf_counter()
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profiler.stop()
+            _sampler_lock.release()
+            duration_ms = (time.perf_counter() - start) * 1000
+
+            if trigger != "sampled" or duration_ms >= profiler_config.slow_threshold_ms:
+                profile_store.add(
+                    ProfileRecord(
+                        id=record_id,
+                        method=scope["method"],
+                        path=scope["path"],
+                        status_code=status_code,
+                        duration_ms=duration_ms,
+                        trigger=trigger,
+                        samples=profiler.samples,
+                        collapsed=profiler.collapsed(),
+                    )
+                )
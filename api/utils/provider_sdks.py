@@ -0,0 +1,75 @@
+"""Transports that send the Stripe and Twilio SDKs' requests through `provider_clients`.
+
+Both SDKs let the application supply the HTTP client they use; these
+adapters hand their requests to the shared pool so SDK calls get the same
+timeouts, retries, circuit breaker and metrics as direct calls. Only the
+SDKs' async methods (`create_async`, `retrieve_async`, ...) are supported.
+
+The module imports the SDKs, so it is imported lazily by their services.
+"""
+
+import asyncio
+import logging
+
+import stripe
+from twilio.http import AsyncHttpClient
+from twilio.http.response import Response as TwilioResponse
+
+from api.utils.http_client import ProviderError, provider_clients
+
+
+class StripeHTTPClient(stripe.HTTPClient):
+    name = "provider_clients"
+
+    def request(self, method, url, headers, post_data=None):
+        raise RuntimeError("Use the Stripe SDK's *_async methods")
+
+    def request_stream(self, method, url, headers, post_data=None):
+        raise RuntimeError("Use the Stripe SDK's *_async methods")
+
+    async def request_async(self, method, url, headers, post_data=None):
+        try:
+            response = await provider_clients.request(
+                "stripe", method, url, headers=headers, content=post_data
+            )
+        except ProviderError as exc:
+            raise stripe.APIConnectionError(f"Error communicating with Stripe: {exc}")
+        return response.content, response.status_code, response.headers
+
+    async def request_stream_async(self, method, url, headers, post_data=None):
+        content, status_code, response_headers = await self.request_async(
+            method, url, headers, post_data
+        )
+
+        async def chunks():
+            yield content
+
+        return chunks(), status_code, response_headers
+
+    async def sleep_async(self, secs):
+        await asyncio.sleep(secs)
+
+    async def close_async(self):
+        pass
+
+
+class TwilioHTTPClient(AsyncHttpClient):
+    def __init__(self):
+        super().__init__(logging.getLogger("twilio.http_client"), True)
+
+    async def request(
+        self,
+        method,
+        uri,
+        params=None,
+        data=None,
+        headers=None,
+        auth=None,
+        timeout=None,
+        allow_redirects=False,
+    ) -> TwilioResponse:
+        kwargs = {"params": params, "data": data, "headers": headers, "auth": auth}
+        if timeout is not None:
+            kwargs["timeout"] = timeout
+        response = await provider_clients.request("twilio", method, uri, **kwargs)
+        return TwilioResponse(response.status_code, response.text, response.headers)
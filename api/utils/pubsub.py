@@ -0,0 +1,247 @@
+"""In-process publish/subscribe for pushing events to open connections.
+
+Subscribers (e.g. a server-sent events stream) call `broker.subscribe(...)`
+from the event loop and read events from the returned `Subscription`.
+Publishers call `broker.publish(channel, event)` from anywhere, including
+threadpool routes, once the change the event describes is committed.
+
+Events reach subscribers through a pluggable `PubSubBackend`:
+    * `MemoryBackend`: delivers within the publishing process, the default.
+      With several workers a subscriber only sees events published by its
+      own worker.
+    * `PostgresBackend`: `pg_notify` on one channel, with a listener thread
+      per worker doing `LISTEN`, so every worker delivers every event.
+      `publish_many` packs events into as few payloads as fit under
+      PostgreSQL's 8000 byte limit; a single event over it is rejected, so
+      publish ids and let subscribers load the rest if events can be that
+      large.
+
+A subscriber that falls `queue_size` events behind is marked `lagged` and
+should end its stream; clients then resume from their last event id.
+"""
+
+import asyncio
+import json
+import select
+import threading
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import func, select as sql_select
+
+from api.utils.logger import logger
+from api.utils.settings import settings
+
+
+Deliver = Callable[[str, dict], None]
+
+
+class Subscription:
+    """Events of some channels, queued for one subscriber"""
+
+    def __init__(self, channels: Iterable[str], queue_size: int):
+        self.channels = frozenset(channels)
+        self.loop = asyncio.get_running_loop()
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.lagged = False
+
+    def _put(self, event: dict):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.lagged = True
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[dict]:
+        '''Next event; None if none arrived within `timeout` seconds'''
+
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class PubSubBackend(ABC):
+    """Carries published events to the `deliver` callback of every worker"""
+
+    def start(self, deliver: Deliver):
+        self.deliver = deliver
+
+    def stop(self):
+        pass
+
+    @abstractmethod
+    def publish(self, channel: str, event: dict):
+        ...
+
+    def publish_many(self, events: List[Tuple[str, dict]]):
+        for channel, event in events:
+            self.publish(channel, event)
+
+
+class MemoryBackend(PubSubBackend):
+    """Delivers events within this process only"""
+
+    def publish(self, channel: str, event: dict):
+        self.deliver(channel, event)
+
+
+class PostgresBackend(PubSubBackend):
+    """Delivers events to every worker through PostgreSQL LISTEN/NOTIFY"""
+
+    # NOTIFY payloads must stay under 8000 bytes
+    max_payload = 7900
+
+    def __init__(self, engine, pg_channel: str = "hng_events", poll_interval: float = 1.0):
+        self.engine = engine
+        self.pg_channel = pg_channel
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def publish(self, channel: str, event: dict):
+        self.publish_many([(channel, event)])
+
+    def publish_many(self, events: List[Tuple[str, dict]]):
+        '''Packs the events into as few NOTIFY payloads as fit, sent in one transaction'''
+
+        payloads, batch, size = [], [], 0
+        for channel, event in events:
+            item = json.dumps([channel, event], default=str)
+            if batch and size + len(item) + 1 > self.max_payload:
+                payloads.append(batch)
+                batch, size = [], 0
+            batch.append(item)
+            size += len(item) + 1
+        if batch:
+            payloads.append(batch)
+
+        with self.engine.begin() as conn:
+            for batch in payloads:
+                payload = "[" + ",".join(batch) + "]"
+                conn.execute(sql_select(func.pg_notify(self.pg_channel, payload)))
+
+    def start(self, deliver: Deliver):
+        super().start(deliver)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._listen, name="pubsub-listener", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(self.poll_interval * 2)
+            self._thread = None
+
+    def _listen(self):
+        while not self._stop.is_set():
+            try:
+                self._listen_once()
+            except Exception as exc:
+                logger.warning(f"Event listener lost its connection, reconnecting: {exc}")
+                self._stop.wait(self.poll_interval)
+
+    def _listen_once(self):
+        connection = self.engine.raw_connection()
+        try:
+            driver = connection.driver_connection
+            driver.autocommit = True
+            with driver.cursor() as cursor:
+                cursor.execute(f'LISTEN "{self.pg_channel}"')
+            while not self._stop.is_set():
+                if select.select([driver], [], [], self.poll_interval) == ([], [], []):
+                    continue
+                driver.poll()
+                while driver.notifies:
+                    notify = driver.notifies.pop(0)
+                    for channel, event in json.loads(notify.payload):
+                        self.deliver(channel, event)
+        finally:
+            connection.invalidate()
+
+
+class Broker:
+    """Routes published events to the subscriptions of this process"""
+
+    def __init__(self, backend: PubSubBackend, queue_size: int = 100):
+        self.queue_size = queue_size
+        self._subscriptions: Dict[str, Set[Subscription]] = {}
+        self._lock = threading.Lock()
+        self.set_backend(backend)
+
+    def set_backend(self, backend: PubSubBackend):
+        self.backend = backend
+        if isinstance(backend, MemoryBackend):
+            backend.start(self._deliver)
+
+    def start(self):
+        '''Starts receiving events published by other workers'''
+
+        if not isinstance(self.backend, MemoryBackend):
+            self.backend.start(self._deliver)
+
+    def stop(self):
+        if not isinstance(self.backend, MemoryBackend):
+            self.backend.stop()
+
+    def subscribe(self, *channels: str) -> Subscription:
+        '''Subscribes to `channels`; call from the event loop'''
+
+        subscription = Subscription(channels, self.queue_size)
+        with self._lock:
+            for channel in subscription.channels:
+                self._subscriptions.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            for channel in subscription.channels:
+                subscribers = self._subscriptions.get(channel)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._subscriptions[channel]
+
+    def subscriber_count(self, channel: str) -> int:
+        return len(self._subscriptions.get(channel, ()))
+
+    def publish(self, channel: str, event: dict):
+        '''Sends `event` to the subscribers of `channel` in every worker'''
+
+        try:
+            self.backend.publish(channel, event)
+        except Exception as exc:
+            # subscribers resume from the database; never fail the write
+            logger.warning(f"Could not publish to {channel}: {exc}")
+
+    def publish_many(self, events: List[Tuple[str, dict]]):
+        '''Publishes (channel, event) pairs, batched where the backend allows'''
+
+        try:
+            self.backend.publish_many(events)
+        except Exception as exc:
+            logger.warning(f"Could not publish {len(events)} event(s): {exc}")
+
+    def _deliver(self, channel: str, event: dict):
+        with self._lock:
+            subscribers = list(self._subscriptions.get(channel, ()))
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription._put, event)
+            except RuntimeError:
+                # its event loop is closed
+                self.unsubscribe(subscription)
+
+    def clear(self):
+        with self._lock:
+            self._subscriptions.clear()
+
+
+def _make_backend() -> PubSubBackend:
+    if settings.PUBSUB_BACKEND == "postgres":
+        from api.db.database import engine
+
+        return PostgresBackend(engine, pg_channel=settings.PUBSUB_PG_CHANNEL)
+    return MemoryBackend()
+
+
+broker = Broker(_make_backend(), queue_size=settings.NOTIFICATION_STREAM_QUEUE_SIZE)
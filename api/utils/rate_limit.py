@@ -0,0 +1,321 @@
+"""Shared rate limiting for the whole application.
+
+There is a single `limiter` for every router. It enforces limits with a
+sliding-window counter: the count of the previous fixed window, weighted by
+how much of it still overlaps the sliding window, plus the count of the
+current one. That smooths out the burst a plain fixed window allows at a
+window boundary, and each key needs only two counters.
+
+Counters live in a pluggable `RateLimitStore`:
+    * `MemoryRateLimitStore`: per process, the default. With several
+      workers each one enforces the limit separately.
+    * `SQLiteRateLimitStore`: a file shared by every worker on a host, so
+      the limit holds across workers. It stands in for Redis on single-host
+      deployments.
+
+Anything implementing `RateLimitStore` (e.g. a Redis client) can be plugged
+in with `limiter.set_store(...)`.
+"""
+
+import asyncio
+import os
+import random
+import re
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import wraps
+from typing import Callable, Optional, Tuple
+
+from fastapi import HTTPException, Request, Response, status
+from jose import JWTError, jwt
+
+from api.utils.settings import settings
+
+
+_PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+_LIMIT_RE = re.compile(r"^\s*(\d+)\s*(?:/|per)\s*(\d+)?\s*(second|minute|hour|day)s?\s*$")
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """`amount` units of cost allowed per `window` seconds"""
+
+    amount: int
+    window: int
+
+    @classmethod
+    def parse(cls, value: str) -> "RateLimit":
+        '''Parses strings such as "1000/minute", "10 per 5 minutes"'''
+
+        match = _LIMIT_RE.match(value)
+        if not match:
+            raise ValueError(f"Invalid rate limit: {value!r}")
+        amount, multiple, period = match.groups()
+        return cls(int(amount), int(multiple or 1) * _PERIODS[period])
+
+    def __str__(self):
+        return f"{self.amount} per {self.window} seconds"
+
+
+@dataclass(frozen=True)
+class RateLimitResult:
+    """Outcome of one rate limit check"""
+
+    allowed: bool
+    limit: RateLimit
+    remaining: int
+    reset_after: int  # seconds until the current window rolls over
+
+    def headers(self) -> dict:
+        '''Standard RateLimit headers (IETF draft-ietf-httpapi-ratelimit-headers)'''
+
+        headers = {
+            "RateLimit-Limit": str(self.limit.amount),
+            "RateLimit-Remaining": str(self.remaining),
+            "RateLimit-Reset": str(self.reset_after),
+            "RateLimit-Policy": f"{self.limit.amount};w={self.limit.window}",
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(self.reset_after)
+        return headers
+
+
+def _sliding_window(
+    window_index: int, previous: float, current: float, stored_index: Optional[int]
+) -> Tuple[float, float]:
+    '''Shifts the stored (previous, current) counters to `window_index`'''
+
+    if stored_index == window_index:
+        return previous, current
+    if stored_index == window_index - 1:
+        return current, 0
+    return 0, 0
+
+
+def _evaluate(limit: RateLimit, cost: int, now: float, previous: float, current: float):
+    '''Returns the new current counter and the result of a hit of `cost`'''
+
+    elapsed = now % limit.window
+    weight = 1 - elapsed / limit.window
+    used = previous * weight + current
+    allowed = used + cost <= limit.amount
+    if allowed:
+        current += cost
+        used += cost
+    return (
+        current,
+        RateLimitResult(
+            allowed=allowed,
+            limit=limit,
+            remaining=max(int(limit.amount - used), 0),
+            reset_after=max(int(limit.window - elapsed), 1),
+        ),
+    )
+
+
+class RateLimitStore(ABC):
+    """Storage for sliding-window counters"""
+
+    @abstractmethod
+    def hit(self, key: str, limit: RateLimit, cost: int) -> RateLimitResult:
+        '''Atomically checks `key` against `limit` and records `cost` if allowed'''
+
+    @abstractmethod
+    def reset(self):
+        pass
+
+
+class MemoryRateLimitStore(RateLimitStore):
+    """Per-process counters, bounded to `max_keys` keys (least recently used go first)"""
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._counters = OrderedDict()  # key -> (window_index, previous, current)
+        self._lock = threading.Lock()
+
+    def hit(self, key: str, limit: RateLimit, cost: int) -> RateLimitResult:
+        now = time.time()
+        window_index = int(now // limit.window)
+        with self._lock:
+            stored_index, previous, current = self._counters.get(key, (None, 0, 0))
+            previous, current = _sliding_window(
+                window_index, previous, current, stored_index
+            )
+            current, result = _evaluate(limit, cost, now, previous, current)
+            self._counters[key] = (window_index, previous, current)
+            self._counters.move_to_end(key)
+            while len(self._counters) > self.max_keys:
+                self._counters.popitem(last=False)
+        return result
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+
+
+class SQLiteRateLimitStore(RateLimitStore):
+    """Counters in a SQLite file shared by all workers on a host"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        # a forked worker must not share the parent's connection
+        os.register_at_fork(after_in_child=self._forget_connections)
+        self._connection().execute(
+            """
+            CREATE TABLE IF NOT EXISTS rate_limits (
+                key TEXT PRIMARY KEY,
+                window_index INTEGER NOT NULL,
+                previous REAL NOT NULL,
+                current REAL NOT NULL,
+                expires_at REAL NOT NULL
+            )
+            """
+        )
+
+    def _forget_connections(self):
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def hit(self, key: str, limit: RateLimit, cost: int) -> RateLimitResult:
+        now = time.time()
+        window_index = int(now // limit.window)
+        conn = self._connection()
+        with conn:
+            # the write lock makes read-evaluate-write atomic across workers
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT window_index, previous, current FROM rate_limits WHERE key = ?",
+                (key,),
+            ).fetchone()
+            stored_index, previous, current = row or (None, 0, 0)
+            previous, current = _sliding_window(
+                window_index, previous, current, stored_index
+            )
+            current, result = _evaluate(limit, cost, now, previous, current)
+            conn.execute(
+                "INSERT OR REPLACE INTO rate_limits VALUES (?, ?, ?, ?, ?)",
+                (key, window_index, previous, current, (window_index + 2) * limit.window),
+            )
+            # sweep stale keys on a small fraction of hits
+            if random.random() < 0.01:
+                conn.execute("DELETE FROM rate_limits WHERE expires_at < ?", (now,))
+        return result
+
+    def reset(self):
+        self._connection().execute("DELETE FROM rate_limits")
+
+
+def rate_limit_key(request: Request) -> str:
+    '''Keys authenticated requests by user and anonymous ones by client address.
+
+    The bearer token is only decoded here, not checked against the database;
+    a forged or expired token falls back to the client address.
+    '''
+
+    authorization = request.headers.get("authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() == "bearer" and token:
+        try:
+            payload = jwt.decode(
+                token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
+            )
+        except JWTError:
+            payload = {}
+        if payload.get("user_id"):
+            return f"user:{payload['user_id']}"
+
+    return f"ip:{request.client.host if request.client else '127.0.0.1'}"
+
+
+class RateLimiter:
+    """Decorates routes with sliding-window limits on a shared store"""
+
+    def __init__(self, store: RateLimitStore, key_func: Callable[[Request], str]):
+        self.store = store
+        self.key_func = key_func
+
+    def set_store(self, store: RateLimitStore):
+        self.store = store
+
+    def reset(self):
+        self.store.reset()
+
+    def check(self, request: Request, limit: RateLimit, scope: str, cost: int = 1):
+        '''Records a hit for `request`; raises 429 with RateLimit headers when over the limit'''
+
+        result = self.store.hit(f"{scope}:{self.key_func(request)}", limit, cost)
+        if not result.allowed:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail=f"Rate limit exceeded: {limit}",
+                headers=result.headers(),
+            )
+        return result
+
+    def limit(self, limit_value: str, cost: int = 1):
+        '''Limits a route to `limit_value` (e.g. "1000/minute") per user or client.
+
+        `cost` weights expensive endpoints: each call consumes `cost` units
+        of the limit. Like slowapi, the route must accept a `request: Request`
+        argument. The RateLimit headers are added to the returned response,
+        or to the injected `response: Response` when the route returns data.
+        '''
+
+        limit = RateLimit.parse(limit_value)
+
+        def decorator(func):
+            scope = f"{func.__module__}.{func.__name__}"
+
+            def before(kwargs):
+                request = kwargs.get("request")
+                if not isinstance(request, Request):
+                    raise Exception(
+                        f'No "request: Request" argument on rate limited route "{scope}"'
+                    )
+                return self.check(request, limit, scope, cost)
+
+            def after(result: RateLimitResult, kwargs, response):
+                target = response if isinstance(response, Response) else kwargs.get("response")
+                if isinstance(target, Response):
+                    target.headers.update(result.headers())
+                return response
+
+            if asyncio.iscoroutinefunction(func):
+
+                @wraps(func)
+                async def wrapper(*args, **kwargs):
+                    result = before(kwargs)
+                    return after(result, kwargs, await func(*args, **kwargs))
+
+            else:
+
+                @wraps(func)
+                def wrapper(*args, **kwargs):
+                    result = before(kwargs)
+                    return after(result, kwargs, func(*args, **kwargs))
+
+            return wrapper
+
+        return decorator
+
+
+def _make_store() -> RateLimitStore:
+    if settings.RATE_LIMIT_STORAGE == "sqlite":
+        return SQLiteRateLimitStore(settings.RATE_LIMIT_SQLITE_PATH)
+    return MemoryRateLimitStore()
+
+
+limiter = RateLimiter(_make_store(), key_func=rate_limit_key)
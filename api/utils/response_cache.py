@@ -0,0 +1,407 @@
+"""Tag-based response cache for public GET endpoints.
+
+Routes opt in with `cache_response`, which stores the serialized response
+body under one or more tags (e.g. "faq"). Service-layer writes purge those
+tags with `invalidates_cache`, so a cached page never outlives the data it
+was built from by more than the write that changed it.
+
+Two backends ship with it:
+    * `LRUCacheBackend`: in-process, bounded, the default. Each worker has
+      its own copy, so a write on one worker only purges that worker's
+      entries; the others catch up when their entries expire (`ttl`).
+    * `SQLiteCacheBackend`: a file shared by every worker on the host, so
+      invalidation is seen by all of them.
+
+Anything implementing `CacheBackend` (e.g. a Redis client) can be plugged in
+with `response_cache.set_backend(...)`.
+"""
+
+import asyncio
+import inspect
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from functools import wraps
+from typing import Dict, Iterable, Optional
+
+from fastapi import Request, Response
+
+from api.utils.conditional_request import Validators, is_not_modified
+from api.utils.settings import settings
+
+
+@dataclass
+class CachedResponse:
+    """A serialized response, as stored by the cache backends"""
+
+    body: bytes
+    status_code: int = 200
+    headers: Dict[str, str] = field(default_factory=dict)
+    media_type: Optional[str] = "application/json"
+
+    def to_response(self) -> Response:
+        return Response(
+            content=self.body,
+            status_code=self.status_code,
+            headers=self.headers,
+            media_type=self.media_type,
+        )
+
+
+class CacheBackend(ABC):
+    """Storage for cached responses, indexed by key and by tag"""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[CachedResponse]:
+        pass
+
+    @abstractmethod
+    def set(self, key: str, value: CachedResponse, tags: Iterable[str], ttl: int):
+        pass
+
+    @abstractmethod
+    def invalidate_tags(self, tags: Iterable[str]):
+        pass
+
+    @abstractmethod
+    def clear(self):
+        pass
+
+
+class LRUCacheBackend(CacheBackend):
+    """In-process LRU cache bounded to `max_entries` responses"""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (expires_at, tags, value)
+        self._tags = {}  # tag -> set of keys
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, _, value = entry
+            if expires_at <= time.monotonic():
+                self._discard(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: CachedResponse, tags: Iterable[str], ttl: int):
+        tags = tuple(tags)
+        with self._lock:
+            self._discard(key)
+            self._entries[key] = (time.monotonic() + ttl, tags, value)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._discard(next(iter(self._entries)))
+
+    def invalidate_tags(self, tags: Iterable[str]):
+        with self._lock:
+            for tag in tags:
+                for key in self._tags.pop(tag, ()):
+                    self._discard(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+
+    def _discard(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[1]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """Cache stored in a SQLite file shared by all workers on a host"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        # a forked worker must not share the parent's connection
+        os.register_at_fork(after_in_child=self._forget_connections)
+        with self._connection() as conn:
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS cache_entries (
+                    key TEXT PRIMARY KEY,
+                    expires_at REAL NOT NULL,
+                    status_code INTEGER NOT NULL,
+                    headers TEXT NOT NULL,
+                    media_type TEXT,
+                    body BLOB NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS cache_tags (
+                    tag TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    PRIMARY KEY (tag, key)
+                );
+                """
+            )
+
+    def _forget_connections(self):
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        row = (
+            self._connection()
+            .execute(
+                "SELECT status_code, headers, media_type, body FROM cache_entries "
+                "WHERE key = ? AND expires_at > ?",
+                (key, time.time()),
+            )
+            .fetchone()
+        )
+        if row is None:
+            return None
+        status_code, headers, media_type, body = row
+        return CachedResponse(
+            body=bytes(body),
+            status_code=status_code,
+            headers=json.loads(headers),
+            media_type=media_type,
+        )
+
+    def set(self, key: str, value: CachedResponse, tags: Iterable[str], ttl: int):
+        conn = self._connection()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                "INSERT OR REPLACE INTO cache_entries VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    time.time() + ttl,
+                    value.status_code,
+                    json.dumps(value.headers),
+                    value.media_type,
+                    value.body,
+                ),
+            )
+            conn.execute("DELETE FROM cache_tags WHERE key = ?", (key,))
+            conn.executemany(
+                "INSERT OR IGNORE INTO cache_tags VALUES (?, ?)",
+                [(tag, key) for tag in tags],
+            )
+            # expired entries are swept lazily by whichever worker writes
+            conn.execute(
+                "DELETE FROM cache_entries WHERE expires_at <= ?", (time.time(),)
+            )
+
+    def invalidate_tags(self, tags: Iterable[str]):
+        tags = list(tags)
+        if not tags:
+            return
+        marks = ",".join("?" for _ in tags)
+        conn = self._connection()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                f"DELETE FROM cache_entries WHERE key IN "
+                f"(SELECT key FROM cache_tags WHERE tag IN ({marks}))",
+                tags,
+            )
+            conn.execute(f"DELETE FROM cache_tags WHERE tag IN ({marks})", tags)
+
+    def clear(self):
+        conn = self._connection()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("DELETE FROM cache_entries")
+            conn.execute("DELETE FROM cache_tags")
+
+
+class ResponseCache:
+    """Front for the configured backend, shared by routes and services"""
+
+    def __init__(self, backend: CacheBackend):
+        self.backend = backend
+
+    def set_backend(self, backend: CacheBackend):
+        self.backend = backend
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        return self.backend.get(key)
+
+    def set(self, key: str, value: CachedResponse, tags: Iterable[str], ttl: int):
+        self.backend.set(key, value, tags, ttl)
+
+    def invalidate(self, *tags: str):
+        '''Purges every cached response carrying any of `tags`'''
+        self.backend.invalidate_tags(tags)
+
+    def clear(self):
+        self.backend.clear()
+
+
+def _make_backend() -> CacheBackend:
+    if settings.RESPONSE_CACHE_BACKEND == "sqlite":
+        return SQLiteCacheBackend(settings.RESPONSE_CACHE_PATH)
+    return LRUCacheBackend(max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES)
+
+
+response_cache = ResponseCache(_make_backend())
+
+
+def _cache_key(request: Request) -> str:
+    query = sorted(request.query_params.multi_items())
+    return f"{request.url.path}?{query}"
+
+
+def _serve_cached(request: Request, cached: CachedResponse) -> Response:
+    etag = cached.headers.get("etag")
+    if etag:
+        last_modified = cached.headers.get("last-modified")
+        validators = Validators(
+            etag=etag,
+            last_modified=parsedate_to_datetime(last_modified) if last_modified else None,
+        )
+        if is_not_modified(request, validators):
+            headers = {
+                name: value
+                for name, value in cached.headers.items()
+                if name in ("etag", "last-modified", "cache-control")
+            }
+            return Response(status_code=304, headers=headers)
+    return cached.to_response()
+
+
+def _store(key: str, response, tags, ttl: int):
+    if not isinstance(response, Response) or response.status_code != 200:
+        return
+    headers = {
+        name: value
+        for name, value in response.headers.items()
+        if name not in ("content-length", "content-type")
+    }
+    response_cache.set(
+        key,
+        CachedResponse(
+            body=bytes(response.body),
+            status_code=response.status_code,
+            headers=headers,
+            media_type=response.media_type,
+        ),
+        tags,
+        ttl,
+    )
+
+
+def cache_response(tags: Iterable[str], ttl: int = 60):
+    '''Caches a GET endpoint's serialized 200 responses under `tags`.
+
+    The cache key is the request path and query string. Dependencies such as
+    authentication still run on every request; only the endpoint body is
+    skipped on a hit. Cached ETag/Last-Modified headers are honoured, so
+    conditional requests are answered with 304 straight from the cache.
+
+    Example use:
+        ``` python
+        @faq.get("")
+        @cache_response(tags=["faq"], ttl=300)
+        async def get_all_faqs(db: Session = Depends(get_db)):
+            ...
+        ```
+    '''
+
+    tags = tuple(tags)
+
+    def decorator(func):
+        signature = inspect.signature(func)
+        request_param = next(
+            (
+                name
+                for name, param in signature.parameters.items()
+                if param.annotation is Request
+            ),
+            None,
+        )
+        if request_param is None:
+            # ask FastAPI for the request without changing the endpoint's own signature
+            request_param = "_cache_request"
+            parameters = list(signature.parameters.values())
+            parameters.append(
+                inspect.Parameter(
+                    request_param, inspect.Parameter.KEYWORD_ONLY, annotation=Request
+                )
+            )
+            wrapper_signature = signature.replace(parameters=parameters)
+            pop_request = True
+        else:
+            wrapper_signature = signature
+            pop_request = False
+
+        def split_request(kwargs):
+            if pop_request:
+                return kwargs.pop(request_param)
+            return kwargs[request_param]
+
+        if asyncio.iscoroutinefunction(func):
+
+            @wraps(func)
+            async def wrapper(*args, **kwargs):
+                request = split_request(kwargs)
+                key = _cache_key(request)
+                cached = response_cache.get(key)
+                if cached is not None:
+                    return _serve_cached(request, cached)
+                response = await func(*args, **kwargs)
+                _store(key, response, tags, ttl)
+                return response
+
+        else:
+
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                request = split_request(kwargs)
+                key = _cache_key(request)
+                cached = response_cache.get(key)
+                if cached is not None:
+                    return _serve_cached(request, cached)
+                response = func(*args, **kwargs)
+                _store(key, response, tags, ttl)
+                return response
+
+        wrapper.__signature__ = wrapper_signature
+        return wrapper
+
+    return decorator
+
+
+def invalidates_cache(*tags: str):
+    '''Purges `tags` from the response cache after the decorated write succeeds'''
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            result = func(*args, **kwargs)
+            response_cache.invalidate(*tags)
+            return result
+
+        return wrapper
+
+    return decorator
@@ -35,5 +35,159 @@ class Settings(BaseSettings):
     TWILIO_AUTH_TOKEN: str = config("TWILIO_AUTH_TOKEN")
     TWILIO_PHONE_NUMBER: str = config("TWILIO_PHONE_NUMBER")
 
+    # Store ids as native UUID (PostgreSQL) / BLOB(16) (SQLite) instead of text;
+    # convert existing data with scripts/migrate_uuid_columns.py first
+    DB_NATIVE_UUID: bool = config("DB_NATIVE_UUID", default=False, cast=bool)
+
+    # Connection pool per worker (PostgreSQL); opened in full at startup
+    DB_POOL_SIZE: int = config("DB_POOL_SIZE", default=5, cast=int)
+    DB_MAX_OVERFLOW: int = config("DB_MAX_OVERFLOW", default=10, cast=int)
+
+    # Per-worker cache of users' organisation roles (seconds, users kept)
+    PERMISSION_CACHE_TTL: float = config("PERMISSION_CACHE_TTL", default=60, cast=float)
+    PERMISSION_CACHE_MAX_USERS: int = config(
+        "PERMISSION_CACHE_MAX_USERS", default=10000, cast=int
+    )
+
+    # Activity logs are buffered and written in batches: every N ms or M events,
+    # holding at most ACTIVITY_LOG_BUFFER_SIZE events in memory
+    ACTIVITY_LOG_FLUSH_INTERVAL_MS: float = config(
+        "ACTIVITY_LOG_FLUSH_INTERVAL_MS", default=200, cast=float
+    )
+    ACTIVITY_LOG_BATCH_SIZE: int = config("ACTIVITY_LOG_BATCH_SIZE", default=500, cast=int)
+    ACTIVITY_LOG_BUFFER_SIZE: int = config("ACTIVITY_LOG_BUFFER_SIZE", default=10000, cast=int)
+
+    # Activity logs are kept in monthly partitions (PostgreSQL); months older than
+    # ACTIVITY_LOG_RETENTION_MONTHS are dropped, or detached when ACTIVITY_LOG_ARCHIVE
+    ACTIVITY_LOG_PARTITIONS_AHEAD: int = config("ACTIVITY_LOG_PARTITIONS_AHEAD", default=2, cast=int)
+    ACTIVITY_LOG_RETENTION_MONTHS: int = config(
+        "ACTIVITY_LOG_RETENTION_MONTHS", default=12, cast=int
+    )
+    ACTIVITY_LOG_ARCHIVE: bool = config("ACTIVITY_LOG_ARCHIVE", default=False, cast=bool)
+
+    # Public GET endpoints requested at startup to fill the response cache (comma separated)
+    WARMUP_CACHE_PATHS: str = config(
+        "WARMUP_CACHE_PATHS",
+        default="/api/v1/faqs,/api/v1/privacy-policy,/api/v1/regions,/api/v1/testimonials",
+    )
+
+    # Production server (serve.py); WEB_CONCURRENCY=0 means one worker per CPU
+    WEB_CONCURRENCY: int = config("WEB_CONCURRENCY", default=0, cast=int)
+    SERVER_PRELOAD: bool = config("SERVER_PRELOAD", default=True, cast=bool)
+    SERVER_MAX_REQUESTS: int = config("SERVER_MAX_REQUESTS", default=10000, cast=int)
+    SERVER_MAX_REQUESTS_JITTER: int = config(
+        "SERVER_MAX_REQUESTS_JITTER", default=1000, cast=int
+    )
+    SERVER_GRACEFUL_TIMEOUT: int = config("SERVER_GRACEFUL_TIMEOUT", default=30, cast=int)
+
+    # Response cache: "memory" (per-worker LRU) or "sqlite" (shared file)
+    RESPONSE_CACHE_BACKEND: str = config("RESPONSE_CACHE_BACKEND", default="memory")
+    RESPONSE_CACHE_PATH: str = config(
+        "RESPONSE_CACHE_PATH", default="/tmp/hng_response_cache.db"
+    )
+    RESPONSE_CACHE_MAX_ENTRIES: int = config(
+        "RESPONSE_CACHE_MAX_ENTRIES", default=1024, cast=int
+    )
+
+    # Pub/sub for pushed events: "memory" (per worker) or "postgres" (LISTEN/NOTIFY)
+    PUBSUB_BACKEND: str = config("PUBSUB_BACKEND", default="memory")
+    PUBSUB_PG_CHANNEL: str = config("PUBSUB_PG_CHANNEL", default="hng_events")
+
+    # Notification stream (SSE): keep-alive interval (seconds), events a slow client
+    # may fall behind before it is disconnected, notifications replayed on resume
+    NOTIFICATION_STREAM_HEARTBEAT: float = config(
+        "NOTIFICATION_STREAM_HEARTBEAT", default=15, cast=float
+    )
+    NOTIFICATION_STREAM_QUEUE_SIZE: int = config(
+        "NOTIFICATION_STREAM_QUEUE_SIZE", default=100, cast=int
+    )
+    NOTIFICATION_STREAM_REPLAY_LIMIT: int = config(
+        "NOTIFICATION_STREAM_REPLAY_LIMIT", default=100, cast=int
+    )
+
+    # Members notified per bulk insert when notifying a whole organisation
+    NOTIFICATION_FANOUT_CHUNK_SIZE: int = config(
+        "NOTIFICATION_FANOUT_CHUNK_SIZE", default=1000, cast=int
+    )
+    # a running fan-out that committed no chunk for this many seconds counts as
+    # interrupted and may be resumed
+    NOTIFICATION_FANOUT_LEASE_TIMEOUT: float = config(
+        "NOTIFICATION_FANOUT_LEASE_TIMEOUT", default=300, cast=float
+    )
+
+    # API status history: raw samples are kept for API_STATUS_SAMPLE_RETENTION_DAYS,
+    # hourly and daily rollups for their own periods; old rows are pruned at most
+    # once per API_STATUS_PRUNE_INTERVAL (seconds) when statuses are recorded
+    API_STATUS_SAMPLE_RETENTION_DAYS: int = config(
+        "API_STATUS_SAMPLE_RETENTION_DAYS", default=7, cast=int
+    )
+    API_STATUS_HOURLY_RETENTION_DAYS: int = config(
+        "API_STATUS_HOURLY_RETENTION_DAYS", default=30, cast=int
+    )
+    API_STATUS_DAILY_RETENTION_DAYS: int = config(
+        "API_STATUS_DAILY_RETENTION_DAYS", default=365, cast=int
+    )
+    API_STATUS_PRUNE_INTERVAL: float = config(
+        "API_STATUS_PRUNE_INTERVAL", default=3600, cast=float
+    )
+
+    # In-process synthetic monitor: probe the API groups every INTERVAL seconds
+    # (0 disables it), CONCURRENCY groups at a time; a probe slower than SLOW_MS
+    # marks its group Degraded, one without a response in TIMEOUT seconds Down
+    SYNTHETIC_MONITOR_INTERVAL: float = config("SYNTHETIC_MONITOR_INTERVAL", default=300, cast=float)
+    SYNTHETIC_MONITOR_CONCURRENCY: int = config("SYNTHETIC_MONITOR_CONCURRENCY", default=4, cast=int)
+    SYNTHETIC_MONITOR_TIMEOUT: float = config("SYNTHETIC_MONITOR_TIMEOUT", default=10, cast=float)
+    SYNTHETIC_MONITOR_SLOW_MS: float = config("SYNTHETIC_MONITOR_SLOW_MS", default=2000, cast=float)
+
+    # Rate limit counters: "memory" (per worker) or "sqlite" (shared file)
+    RATE_LIMIT_STORAGE: str = config("RATE_LIMIT_STORAGE", default="memory")
+    RATE_LIMIT_SQLITE_PATH: str = config(
+        "RATE_LIMIT_SQLITE_PATH", default="/tmp/hng_rate_limits.db"
+    )
+
+    # Directory shared by all workers for Prometheus metrics; empty for single-process mode
+    PROMETHEUS_MULTIPROC_DIR: str = config("PROMETHEUS_MULTIPROC_DIR", default="")
+
+    # Request profiler: X-Profile header token (empty disables it), background
+    # sampling of 1 in N requests (0 disables it) kept when slower than the threshold
+    PROFILER_TOKEN: str = config("PROFILER_TOKEN", default="")
+    PROFILER_SAMPLE_RATE: int = config("PROFILER_SAMPLE_RATE", default=0, cast=int)
+    PROFILER_SLOW_THRESHOLD_MS: float = config(
+        "PROFILER_SLOW_THRESHOLD_MS", default=500, cast=float
+    )
+    PROFILER_INTERVAL_MS: float = config("PROFILER_INTERVAL_MS", default=1, cast=float)
+    PROFILER_MAX_PROFILES: int = config("PROFILER_MAX_PROFILES", default=20, cast=int)
+
+    # Slow query log: EXPLAIN statements slower than the threshold, at most once per
+    # fingerprint per interval (seconds); per-worker snapshots go to QUERY_STATS_DIR
+    SLOW_QUERY_THRESHOLD_MS: float = config(
+        "SLOW_QUERY_THRESHOLD_MS", default=200, cast=float
+    )
+    SLOW_QUERY_EXPLAIN_INTERVAL: float = config(
+        "SLOW_QUERY_EXPLAIN_INTERVAL", default=300, cast=float
+    )
+    QUERY_STATS_DIR: str = config("QUERY_STATS_DIR", default="")
+
+    # Outbound provider calls (api/utils/http_client.py): pool size shared by all
+    # providers and each provider's total timeout in seconds
+    PROVIDER_MAX_CONNECTIONS: int = config("PROVIDER_MAX_CONNECTIONS", default=100, cast=int)
+    PROVIDER_MAX_KEEPALIVE_CONNECTIONS: int = config(
+        "PROVIDER_MAX_KEEPALIVE_CONNECTIONS", default=20, cast=int
+    )
+    STRIPE_TIMEOUT: float = config("STRIPE_TIMEOUT", default=20, cast=float)
+    FLUTTERWAVE_TIMEOUT: float = config("FLUTTERWAVE_TIMEOUT", default=15, cast=float)
+    TWILIO_TIMEOUT: float = config("TWILIO_TIMEOUT", default=10, cast=float)
+    OAUTH_PROVIDER_TIMEOUT: float = config("OAUTH_PROVIDER_TIMEOUT", default=10, cast=float)
+
+    # Idempotency-Key requests: stored responses are kept KEY_TTL seconds and pruned at
+    # most once per PRUNE_INTERVAL; a duplicate waits up to WAIT_TIMEOUT seconds for the
+    # first request, whose claim counts as abandoned after LOCK_TIMEOUT seconds
+    IDEMPOTENCY_KEY_TTL: int = config("IDEMPOTENCY_KEY_TTL", default=86400, cast=int)
+    IDEMPOTENCY_WAIT_TIMEOUT: float = config("IDEMPOTENCY_WAIT_TIMEOUT", default=30, cast=float)
+    IDEMPOTENCY_LOCK_TIMEOUT: float = config("IDEMPOTENCY_LOCK_TIMEOUT", default=300, cast=float)
+    IDEMPOTENCY_PRUNE_INTERVAL: float = config(
+        "IDEMPOTENCY_PRUNE_INTERVAL", default=3600, cast=float
+    )
+
 
 settings = Settings()
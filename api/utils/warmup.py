@@ -0,0 +1,133 @@
+"""Startup and shutdown steps of the API, registered on `lifecycle`.
+
+Importing this module registers them; main.py does so before the app starts.
+"""
+
+import os
+
+import httpx
+
+from api.db.database import SessionLocal, engine
+from api.db.query_log import query_log
+from api.utils.http_client import provider_clients
+from api.utils.lifecycle import lifecycle
+from api.utils.logger import logger
+from api.utils.pubsub import broker
+from api.utils.settings import settings
+from api.v1.services.activity_logs import activity_log_partitions, activity_log_writer
+from api.v1.services.permissions.catalog import role_catalog
+from api.v1.services.synthetic_monitor import synthetic_monitor
+
+
+@lifecycle.on_startup("database pool")
+def open_db_pool(app):
+    '''Opens the pool's connections now instead of on the first requests'''
+
+    size = engine.pool.size() if hasattr(engine.pool, "size") else 1
+    connections = [engine.connect() for _ in range(size)]
+    try:
+        for connection in connections:
+            connection.exec_driver_sql("SELECT 1")
+    finally:
+        for connection in connections:
+            connection.close()
+
+
+@lifecycle.on_startup("email templates")
+def compile_email_templates(app):
+    '''Compiles every email template into the Jinja environment's cache'''
+
+    environment = app.state.email_templates.env
+    for name in environment.list_templates(extensions=["html"]):
+        environment.get_template(name)
+
+
+@lifecycle.on_startup("seed roles and permissions", required=False)
+def seed_roles(app):
+    from scripts.populate_db import populate_roles_and_permissions
+
+    populate_roles_and_permissions()
+
+
+@lifecycle.on_startup("role catalog")
+def load_role_catalog(app):
+    with SessionLocal() as db:
+        role_catalog.load(db)
+
+
+@lifecycle.on_startup("activity log partitions", required=False)
+def create_activity_log_partitions(app):
+    '''Creates this and the coming months' partitions (PostgreSQL only)'''
+
+    with engine.begin() as conn:
+        activity_log_partitions.ensure(conn)
+
+
+@lifecycle.on_startup("event listener")
+def start_event_listener(app):
+    '''Receives events published by the other workers (PUBSUB_BACKEND=postgres)'''
+
+    broker.start()
+
+
+@lifecycle.on_startup("provider HTTP client")
+async def open_provider_client(app):
+    '''Creates the pooled client used for Stripe, Flutterwave, Twilio and OAuth calls'''
+
+    await provider_clients.start()
+
+
+@lifecycle.on_startup("public caches", required=False)
+async def prime_public_caches(app):
+    '''Requests the public cached endpoints once so the first visitors hit the cache'''
+
+    paths = [path.strip() for path in settings.WARMUP_CACHE_PATHS.split(",") if path.strip()]
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://warmup") as client:
+        for path in paths:
+            response = await client.get(path)
+            if response.status_code != 200:
+                logger.warning(f"Cache warm-up of {path} returned {response.status_code}")
+
+
+@lifecycle.background("synthetic monitor")
+async def run_synthetic_monitor(app):
+    '''Probes the API groups in-process and records their status (SYNTHETIC_MONITOR_INTERVAL)'''
+
+    if synthetic_monitor.interval > 0:
+        await synthetic_monitor.run_forever(app)
+
+
+@lifecycle.on_shutdown("database pool")
+def close_db_pool(app):
+    engine.dispose()
+
+
+@lifecycle.on_shutdown("provider HTTP client")
+async def close_provider_client(app):
+    await provider_clients.close()
+
+
+@lifecycle.on_shutdown("event listener")
+def stop_event_listener(app):
+    broker.stop()
+
+
+@lifecycle.on_shutdown("query stats snapshot")
+def write_query_stats(app):
+    if query_log.snapshot_dir:
+        query_log.write_snapshot()
+
+
+@lifecycle.on_shutdown("metrics")
+def release_metrics(app):
+    from api.utils.metrics import mark_process_dead
+
+    mark_process_dead(os.getpid())
+
+
+@lifecycle.on_shutdown("activity log buffer")
+def flush_activity_logs(app):
+    '''Writes buffered activity logs before the database pool is closed'''
+
+    activity_log_writer.close()
@@ -1,15 +1,16 @@
 from api.v1.models.activity_logs import ActivityLog
-from api.v1.models.api_status import APIStatus
+from api.v1.models.api_status import APIStatus, APIStatusRollup, APIStatusSample
 from api.v1.models.billing_plan import BillingPlan
 from api.v1.models.comment import Comment, CommentLike, CommentDislike
 from api.v1.models.contact_us import ContactUs
 from api.v1.models.message import Message
 from api.v1.models.payment import Payment
+from api.v1.models.idempotency import IdempotencyKey
 from api.v1.models.waitlist import Waitlist
 from api.v1.models.user import User
 from api.v1.models.organisation import Organisation
 from api.v1.models.profile import Profile
-from api.v1.models.notifications import Notification
+from api.v1.models.notifications import Notification, NotificationCounter, NotificationFanout
 from api.v1.models.product import ProductVariant, ProductCategory, Product
 from api.v1.models.blog import Blog, BlogLike, BlogDislike
 from api.v1.models.job import Job, JobApplication
@@ -1,14 +1,40 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey
+from datetime import datetime, timezone
+from sqlalchemy import DDL, Column, String, DateTime, ForeignKey, Index, event
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
+from api.db.types import UUIDString
 from api.v1.models.base_model import BaseTableModel
 
 
 class ActivityLog(BaseTableModel):
     __tablename__ = "activity_logs"
 
-    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(UUIDString, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     action = Column(String, nullable=False)
-    timestamp = Column(DateTime(timezone=True), server_default=func.now())
+    # partition key on PostgreSQL (monthly ranges, see api/db/partitions.py),
+    # which must be part of the primary key there
+    timestamp = Column(
+        DateTime(timezone=True),
+        primary_key=True,
+        default=lambda: datetime.now(timezone.utc),
+        server_default=func.now(),
+    )
 
     user = relationship("User", back_populates="activity_logs")
+
+    __table_args__ = (
+        Index("idx_activity_logs_user_id_timestamp", "user_id", "timestamp"),
+        Index("idx_activity_logs_timestamp", "timestamp"),
+        {"postgresql_partition_by": "RANGE (timestamp)"},
+    )
+
+
+# the catch-all partition comes with the table (create_all included), so an
+# insert never fails even before the startup step adds the monthly ones
+event.listen(
+    ActivityLog.__table__,
+    "after_create",
+    DDL(
+        "CREATE TABLE IF NOT EXISTS activity_logs_default PARTITION OF activity_logs DEFAULT"
+    ).execute_if(dialect="postgresql"),
+)
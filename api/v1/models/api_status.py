@@ -1,7 +1,13 @@
-from sqlalchemy import Column, DateTime, String, Text, Numeric, func
+from datetime import datetime, timezone
+from sqlalchemy import Column, DateTime, Float, Index, Integer, String, Text, Numeric, UniqueConstraint, func
+from uuid_extensions import uuid7
+from api.db.types import UUIDString
+from api.v1.models.associations import Base
 from api.v1.models.base_model import BaseTableModel
 
 class APIStatus(BaseTableModel):
+    """The latest status of each API group"""
+
     __tablename__ = "api_status"
 
     api_group = Column(String, nullable=False)
@@ -9,3 +15,46 @@ class APIStatus(BaseTableModel):
     last_checked = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     response_time = Column(Numeric, nullable=True)
     details = Column(Text, nullable=True)
+
+    # one current row per group; batch ingestion upserts on it
+    __table_args__ = (UniqueConstraint("api_group", name="uq_api_status_api_group"),)
+
+
+class APIStatusSample(Base):
+    """One recorded check of an API group; rows are only ever appended (and pruned)"""
+
+    __tablename__ = "api_status_samples"
+
+    id = Column(UUIDString, primary_key=True, default=lambda: str(uuid7()))
+    api_group = Column(String, nullable=False)
+    status = Column(String, nullable=False)
+    response_time = Column(Float, nullable=True)
+    checked_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=lambda: datetime.now(timezone.utc),
+        server_default=func.now(),
+    )
+
+    __table_args__ = (
+        Index("idx_api_status_samples_api_group_checked_at", "api_group", "checked_at"),
+        Index("idx_api_status_samples_checked_at", "checked_at"),
+    )
+
+
+class APIStatusRollup(Base):
+    """Uptime and response time percentiles of an API group over one hour or day"""
+
+    __tablename__ = "api_status_rollups"
+
+    api_group = Column(String, primary_key=True)
+    period = Column(String(4), primary_key=True)  # "hour" or "day"
+    bucket = Column(DateTime(timezone=True), primary_key=True)
+    samples = Column(Integer, nullable=False, default=0)
+    up = Column(Integer, nullable=False, default=0)
+    p50 = Column(Float, nullable=True)
+    p95 = Column(Float, nullable=True)
+
+    __table_args__ = (
+        Index("idx_api_status_rollups_period_bucket", "period", "bucket"),
+    )
@@ -3,10 +3,10 @@
 from sqlalchemy import (
         Column,
         ForeignKey,
-        String,
         Table,
         Enum
     )
+from api.db.types import UUIDString
 from api.db.database import Base
 
 
@@ -14,11 +14,11 @@ user_organisation_association = Table(
     "user_organisation",
     Base.metadata,
     Column(
-        "user_id", String, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+        "user_id", UUIDString, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
     ),
     Column(
         "organisation_id",
-        String,
+        UUIDString,
         ForeignKey("organisations.id", ondelete="CASCADE"),
         primary_key=True,
     ),
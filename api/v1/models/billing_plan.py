@@ -1,6 +1,7 @@
 # app/models/billing_plan.py
 from sqlalchemy import Column, String, ARRAY, ForeignKey, Numeric, Boolean
 from sqlalchemy.orm import relationship
+from api.db.types import UUIDString
 from api.v1.models.base_model import BaseTableModel
 
 
@@ -8,7 +9,7 @@ class BillingPlan(BaseTableModel):
     __tablename__ = "billing_plans"
 
     organisation_id = Column(
-        String, ForeignKey("organisations.id", ondelete="CASCADE"), nullable=False
+        UUIDString, ForeignKey("organisations.id", ondelete="CASCADE"), nullable=False
     )
     name = Column(String, nullable=False)
     price = Column(Numeric, nullable=False)
@@ -24,9 +25,9 @@ class BillingPlan(BaseTableModel):
 class UserSubscription(BaseTableModel):
     __tablename__ = "user_subscriptions"
 
-    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
-    plan_id = Column(String, ForeignKey("billing_plans.id", ondelete="CASCADE"), nullable=False)
-    organisation_id = Column(String, ForeignKey("organisations.id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(UUIDString, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    plan_id = Column(UUIDString, ForeignKey("billing_plans.id", ondelete="CASCADE"), nullable=False)
+    organisation_id = Column(UUIDString, ForeignKey("organisations.id", ondelete="CASCADE"), nullable=False)
     active = Column(Boolean, default=True)
     start_date = Column(String, nullable=False)
     end_date = Column(String, nullable=True)
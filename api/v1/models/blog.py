@@ -1,8 +1,9 @@
 #!/usr/bin/env python3
 """The Blog Post Model."""
 
-from sqlalchemy import Column, String, Text, ForeignKey, Boolean, text
+from sqlalchemy import Column, String, Text, ForeignKey, Boolean, Integer, Index, text
 from sqlalchemy.orm import relationship
+from api.db.types import UUIDString
 from api.v1.models.base_model import BaseTableModel
 
 
@@ -10,7 +11,7 @@ class Blog(BaseTableModel):
     __tablename__ = "blogs"
 
     author_id = Column(
-        String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+        UUIDString, ForeignKey("users.id", ondelete="CASCADE"), nullable=False
     )
     title = Column(String, nullable=False)
     content = Column(Text, nullable=False)
@@ -20,6 +21,11 @@ class Blog(BaseTableModel):
     tags = Column(
         Text, nullable=True
     )  # Assuming tags are stored as a comma-separated string
+    # Denormalized counters, kept in step with blog_likes/blog_dislikes
+    likes_count = Column(Integer, nullable=False, default=0, server_default=text("0"))
+    dislikes_count = Column(
+        Integer, nullable=False, default=0, server_default=text("0")
+    )
 
     author = relationship("User", back_populates="blogs")
     comments = relationship(
@@ -32,25 +38,39 @@ class Blog(BaseTableModel):
         "BlogDislike", back_populates="blog", cascade="all, delete-orphan"
     )
 
+    __table_args__ = (
+        # Partial index backing the public feed, which never shows soft-deleted posts
+        Index(
+            "idx_blogs_feed_created_at",
+            "created_at",
+            postgresql_where=text("is_deleted = false"),
+            sqlite_where=text("is_deleted = 0"),
+        ),
+    )
+
 
 class BlogDislike(BaseTableModel):
     __tablename__ = "blog_dislikes"
 
-    blog_id = Column(String, ForeignKey("blogs.id", ondelete="CASCADE"), nullable=False)
-    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    blog_id = Column(UUIDString, ForeignKey("blogs.id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(UUIDString, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     ip_address = Column(String, nullable=True)
 
     # Relationships
     blog = relationship("Blog", back_populates="dislikes")
     user = relationship("User", back_populates="blog_dislikes")
 
+    __table_args__ = (Index("idx_blog_dislikes_blog_id_user_id", "blog_id", "user_id"),)
+
 
 class BlogLike(BaseTableModel):
     __tablename__ = "blog_likes"
 
-    blog_id = Column(String, ForeignKey("blogs.id", ondelete="CASCADE"), nullable=False)
-    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    blog_id = Column(UUIDString, ForeignKey("blogs.id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(UUIDString, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     ip_address = Column(String, nullable=True)
 
     blog = relationship("Blog", back_populates="likes")
     user = relationship("User", back_populates="blog_likes")
+
+    __table_args__ = (Index("idx_blog_likes_blog_id_user_id", "blog_id", "user_id"),)
@@ -1,14 +1,20 @@
-from sqlalchemy import Column, String, Text, ForeignKey
+from sqlalchemy import Column, String, Text, ForeignKey, Integer, Index, text
 from sqlalchemy.orm import relationship
+from api.db.types import UUIDString
 from api.v1.models.base_model import BaseTableModel
 
 
 class Comment(BaseTableModel):
     __tablename__ = "comments"
 
-    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
-    blog_id = Column(String, ForeignKey("blogs.id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(UUIDString, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    blog_id = Column(UUIDString, ForeignKey("blogs.id", ondelete="CASCADE"), nullable=False)
     content = Column(Text, nullable=False)
+    # Denormalized counters, kept in step with comment_likes/comment_dislikes
+    likes_count = Column(Integer, nullable=False, default=0, server_default=text("0"))
+    dislikes_count = Column(
+        Integer, nullable=False, default=0, server_default=text("0")
+    )
 
     user = relationship("User", back_populates="comments")
     blog = relationship("Blog", back_populates="comments")
@@ -19,14 +25,17 @@ class Comment(BaseTableModel):
         "CommentDislike", back_populates="comment", cascade="all, delete-orphan"
     )
 
+    # a blog's comments are listed newest first
+    __table_args__ = (Index("idx_comments_blog_id_created_at", "blog_id", "created_at"),)
+
 
 class CommentLike(BaseTableModel):
     __tablename__ = "comment_likes"
 
     comment_id = Column(
-        String, ForeignKey("comments.id", ondelete="CASCADE"), nullable=False
+        UUIDString, ForeignKey("comments.id", ondelete="CASCADE"), nullable=False
     )
-    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(UUIDString, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     ip_address = Column(String, nullable=True)
 
     comment = relationship("Comment", back_populates="likes")
@@ -37,9 +46,9 @@ class CommentDislike(BaseTableModel):
     __tablename__ = "comment_dislikes"
 
     comment_id = Column(
-        String, ForeignKey("comments.id", ondelete="CASCADE"), nullable=False
+        UUIDString, ForeignKey("comments.id", ondelete="CASCADE"), nullable=False
     )
-    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(UUIDString, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     ip_address = Column(String, nullable=True)
 
     comment = relationship("Comment", back_populates="dislikes")
@@ -1,6 +1,7 @@
 from sqlalchemy import Column, String, Text, ForeignKey
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
+from api.db.types import UUIDString
 from api.v1.models.base_model import BaseTableModel
 
 
@@ -11,6 +12,6 @@ class ContactUs(BaseTableModel):
     email = Column(String, nullable=False)
     title = Column(String, nullable=False)
     message = Column(Text, nullable=False)
-    org_id = Column(String, ForeignKey('organisations.id', ondelete="CASCADE"), nullable=True)
+    org_id = Column(UUIDString, ForeignKey('organisations.id', ondelete="CASCADE"), nullable=True)
 
     organisation = relationship("Organisation", back_populates="contact_us")
\ No newline at end of file
@@ -1,5 +1,6 @@
-from sqlalchemy import Column, String, ForeignKey, Boolean
+from sqlalchemy import Column, ForeignKey, Boolean
 from sqlalchemy.orm import relationship
+from api.db.types import UUIDString
 from api.v1.models.base_model import BaseTableModel
 
 
@@ -14,5 +15,5 @@ class DataPrivacySetting(BaseTableModel):
     allow_analytics = Column(Boolean, server_default='true')
     personalized_ads = Column(Boolean, server_default='false')
 
-    user_id = Column(String, ForeignKey('users.id', ondelete="CASCADE"), nullable=False)
+    user_id = Column(UUIDString, ForeignKey('users.id', ondelete="CASCADE"), nullable=False)
     user = relationship("User", back_populates="data_privacy_setting")
@@ -0,0 +1,33 @@
+from datetime import datetime, timezone
+from sqlalchemy import Column, DateTime, Index, Integer, JSON, LargeBinary, String, func
+from api.v1.models.associations import Base
+
+
+class IdempotencyKey(Base):
+    """A POST request sent with an Idempotency-Key header and, once done, its response.
+
+    While `status` is "processing" the row is the lock that makes concurrent
+    duplicates wait; rows are deleted in bulk once `expires_at` has passed.
+    """
+
+    __tablename__ = "idempotency_keys"
+
+    scope = Column(String, primary_key=True)  # "user:<id>" or "ip:<address>"
+    key = Column(String(255), primary_key=True)
+    method = Column(String(10), nullable=False)
+    path = Column(String, nullable=False)
+    fingerprint = Column(String(64), nullable=False)
+    status = Column(String(10), nullable=False, default="processing")  # or "completed"
+    response_status = Column(Integer, nullable=True)
+    response_headers = Column(JSON, nullable=True)
+    response_body = Column(LargeBinary, nullable=True)
+    locked_at = Column(DateTime(timezone=True), nullable=False)
+    created_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=lambda: datetime.now(timezone.utc),
+        server_default=func.now(),
+    )
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (Index("idx_idempotency_keys_expires_at", "expires_at"),)
@@ -1,8 +1,9 @@
 #!/usr/bin/env python3
 """ The Job Model Class
 """
-from sqlalchemy import Column, String, Text, ForeignKey, Enum
+from sqlalchemy import Column, String, Text, ForeignKey, Enum, Index
 from sqlalchemy.orm import relationship
+from api.db.types import UUIDString
 from api.v1.models.base_model import BaseTableModel
 
 
@@ -10,7 +11,7 @@ class Job(BaseTableModel):
     __tablename__ = "jobs"
 
     author_id = Column(
-        String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+        UUIDString, ForeignKey("users.id", ondelete="CASCADE"), nullable=False
     )
     title = Column(Text, nullable=False)
     description = Column(Text, nullable=False)
@@ -28,7 +29,7 @@ class JobApplication(BaseTableModel):
     __tablename__ = "job_applications"
 
     job_id = Column(
-        String, ForeignKey("jobs.id", ondelete="CASCADE"), nullable=False
+        UUIDString, ForeignKey("jobs.id", ondelete="CASCADE"), nullable=False
     )
     applicant_name = Column(String, nullable=False)
     applicant_email = Column(String, nullable=False)
@@ -38,3 +39,8 @@ class JobApplication(BaseTableModel):
     application_status = Column(Enum('pending', 'accepted', 'rejected', name='application_status'), default="pending")
 
     job = relationship('Job', back_populates='applications')
+
+    # applications are looked up per job, and per (job, applicant) for duplicates
+    __table_args__ = (
+        Index('idx_job_applications_job_id_applicant_email', 'job_id', 'applicant_email'),
+    )
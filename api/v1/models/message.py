@@ -2,6 +2,7 @@
 from sqlalchemy import Column, String, Text, ForeignKey
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
+from api.db.types import UUIDString
 from api.v1.models.base_model import BaseTableModel
 
 
@@ -10,6 +11,6 @@ class Message(BaseTableModel):
 
     message = Column(Text, nullable=False)
     phone_number = Column(String, nullable=True)
-    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(UUIDString, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
 
     user = relationship("User", back_populates="messages")
@@ -1,5 +1,6 @@
 from sqlalchemy import Column, String, Text, ForeignKey, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
+from api.db.types import UUIDString
 from api.v1.models.base_model import BaseTableModel
 
 
@@ -20,7 +21,7 @@ class NewsletterSubscriber(BaseTableModel):
 
     email: Mapped[str] = mapped_column(String(120), nullable=False)
     newsletter_id: Mapped[str] = mapped_column(
-        ForeignKey("newsletters.id"), nullable=True
+        UUIDString, ForeignKey("newsletters.id"), nullable=True
     )
 
     newsletter: Mapped["Newsletter"] = relationship(
@@ -1,18 +1,65 @@
-from sqlalchemy import Column, String, Text, ForeignKey, Boolean
+from sqlalchemy import Column, DateTime, Integer, String, Text, ForeignKey, Boolean, Index, text
 from sqlalchemy.orm import relationship
+from api.db.types import UUIDString
+from api.v1.models.associations import Base
 from api.v1.models.base_model import BaseTableModel
 
 
 class Notification(BaseTableModel):
     __tablename__ = "notifications"
 
-    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=True)
+    user_id = Column(UUIDString, ForeignKey("users.id", ondelete="CASCADE"), nullable=True)
     title = Column(String, nullable=False)
     message = Column(Text, nullable=False)
     status = Column(String, default="unread")  # unread, read
 
     user = relationship("User", back_populates="notifications", primaryjoin="Notification.user_id==User.id", foreign_keys=[user_id])
 
+    __table_args__ = (
+        Index("idx_notifications_user_id_status", "user_id", "status"),
+        # keyset pagination of a user's notifications
+        Index("idx_notifications_user_id_id", "user_id", "id"),
+    )
+
+
+class NotificationCounter(Base):
+    """A user's number of unread notifications, kept by the notification service"""
+
+    __tablename__ = "notification_counters"
+
+    user_id = Column(UUIDString, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    unread = Column(Integer, nullable=False, default=0, server_default=text("0"))
+
+
+class NotificationFanout(BaseTableModel):
+    """One notification sent to every member of an organisation, and its progress.
+
+    Members are processed in user id order; `last_user_id` is how far the
+    fan-out got, so an interrupted one resumes where it stopped. `locked_at`
+    is the lease of the process running it, renewed with every chunk.
+    """
+
+    __tablename__ = "notification_fanouts"
+
+    organisation_id = Column(
+        UUIDString, ForeignKey("organisations.id", ondelete="CASCADE"), nullable=False
+    )
+    sender_id = Column(UUIDString, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    title = Column(String, nullable=False)
+    message = Column(Text, nullable=False)
+    # NotificationSetting flag a member must have on to receive it; None for everyone
+    setting = Column(String, nullable=True)
+    status = Column(String, nullable=False, default="pending")  # pending, running, completed, failed
+    total = Column(Integer, nullable=False, default=0)
+    sent = Column(Integer, nullable=False, default=0)
+    skipped = Column(Integer, nullable=False, default=0)
+    last_user_id = Column(UUIDString, nullable=True)
+    error = Column(Text, nullable=True)
+    locked_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (Index("idx_notification_fanouts_organisation_id", "organisation_id"),)
+
 
 class NotificationSetting(BaseTableModel):
     __tablename__ = "notification_settings"
@@ -26,6 +73,6 @@ class NotificationSetting(BaseTableModel):
     slack_notifications_always_send_email_notifications = Column(Boolean, server_default='false')
     slack_notifications_announcement_and_update_emails = Column(Boolean, server_default='false')
 
-    user_id = Column(String, ForeignKey('users.id', ondelete="CASCADE"), nullable=False)
+    user_id = Column(UUIDString, ForeignKey('users.id', ondelete="CASCADE"), nullable=False)
     user = relationship("User", back_populates="notification_setting")
 
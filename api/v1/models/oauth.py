@@ -1,5 +1,6 @@
 from sqlalchemy import Column, String, ForeignKey
 from sqlalchemy.orm import relationship
+from api.db.types import UUIDString
 from api.v1.models.base_model import BaseTableModel
 
 
@@ -7,7 +8,7 @@ class OAuth(BaseTableModel):
     __tablename__ = "oauth"
 
     user_id = Column(
-        String, ForeignKey("users.id", ondelete="CASCADE"), unique=True, nullable=False
+        UUIDString, ForeignKey("users.id", ondelete="CASCADE"), unique=True, nullable=False
     )
     provider = Column(String, nullable=False)
     sub = Column(String, nullable=False)
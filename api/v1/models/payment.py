@@ -1,12 +1,13 @@
 from sqlalchemy import Column, String, ForeignKey, Numeric
 from sqlalchemy.orm import relationship
+from api.db.types import UUIDString
 from api.v1.models.base_model import BaseTableModel
 
 
 class Payment(BaseTableModel):
     __tablename__ = "payments"
 
-    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(UUIDString, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     amount = Column(Numeric, nullable=False)
     currency = Column(String, nullable=False)
     status = Column(String, nullable=False)  # e.g., completed, pending
@@ -1,8 +1,9 @@
-from sqlalchemy import Table, Column, ForeignKey, String
+from sqlalchemy import Table, Column, ForeignKey
+from api.db.types import UUIDString
 from api.v1.models.base_model import BaseTableModel
 
 role_permissions = Table(
     'role_permissions', BaseTableModel.metadata,
-    Column('role_id', String, ForeignKey('roles.id', ondelete='CASCADE'), primary_key=True),
-    Column('permission_id', String, ForeignKey('permissions.id', ondelete='CASCADE'), primary_key=True)
+    Column('role_id', UUIDString, ForeignKey('roles.id', ondelete='CASCADE'), primary_key=True),
+    Column('permission_id', UUIDString, ForeignKey('permissions.id', ondelete='CASCADE'), primary_key=True)
 )
@@ -10,9 +10,11 @@ from sqlalchemy import (
     Integer,
     Enum as SQLAlchemyEnum,
     Boolean,
+    Index,
     DateTime,
     func,
 )
+from api.db.types import UUIDString
 from api.v1.models.base_model import BaseTableModel
 from api.v1.models import User
 from sqlalchemy.orm import relationship
@@ -35,10 +37,10 @@ class Product(BaseTableModel):
     description = Column(Text, nullable=True)
     price = Column(Numeric, nullable=False)
     org_id = Column(
-        String, ForeignKey("organisations.id", ondelete="CASCADE"), nullable=False
+        UUIDString, ForeignKey("organisations.id", ondelete="CASCADE"), nullable=False
     )
     category_id = Column(
-        String, ForeignKey("product_categories.id", ondelete="CASCADE"), nullable=False
+        UUIDString, ForeignKey("product_categories.id", ondelete="CASCADE"), nullable=False
     )
     quantity = Column(Integer, default=0)
     image_url = Column(String, nullable=False)
@@ -59,6 +61,8 @@ class Product(BaseTableModel):
                          cascade='all, delete-orphan')
     comments = relationship("ProductComment", back_populates="product", cascade="all, delete-orphan")
 
+    __table_args__ = (Index("idx_products_org_id", "org_id"),)
+
 
     def __str__(self):
         return self.name
@@ -70,7 +74,7 @@ class ProductVariant(BaseTableModel):
     size = Column(String, nullable=False)
     stock = Column(Integer, default=1)
     price = Column(Numeric)
-    product_id = Column(String, ForeignKey("products.id", ondelete="CASCADE"))
+    product_id = Column(UUIDString, ForeignKey("products.id", ondelete="CASCADE"))
     product = relationship("Product", back_populates="variants")
 
 
@@ -87,8 +91,8 @@ class ProductCategory(BaseTableModel):
 class ProductComment(BaseTableModel):
     __tablename__ = "product_comments"
 
-    product_id = Column(String, ForeignKey("products.id", ondelete="CASCADE"), nullable=False)
-    user_id = Column(String, ForeignKey("users.id", ondelete="SET NULL"), nullable=True) 
+    product_id = Column(UUIDString, ForeignKey("products.id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(UUIDString, ForeignKey("users.id", ondelete="SET NULL"), nullable=True) 
     content = Column(Text, nullable=False)
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
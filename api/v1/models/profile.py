@@ -3,6 +3,7 @@
 
 from sqlalchemy import Column, String, Text, ForeignKey, DateTime, func
 from sqlalchemy.orm import relationship
+from api.db.types import UUIDString
 from api.v1.models.base_model import BaseTableModel
 
 
@@ -10,7 +11,7 @@ class Profile(BaseTableModel):
     __tablename__ = "profiles"
 
     user_id = Column(
-        String, ForeignKey("users.id", ondelete="CASCADE"), unique=True, nullable=False
+        UUIDString, ForeignKey("users.id", ondelete="CASCADE"), unique=True, nullable=False
     )
     username = Column(String, nullable=True)
     pronouns = Column(String, nullable=True)
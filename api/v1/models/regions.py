@@ -1,11 +1,12 @@
 from sqlalchemy import Column, String, ForeignKey, Integer
 from sqlalchemy.orm import relationship
+from api.db.types import UUIDString
 from api.v1.models.base_model import BaseTableModel
 
 class Region(BaseTableModel):
     __tablename__ = "regions"
 
-    user_id = Column(String, ForeignKey('users.id', ondelete="CASCADE"), nullable=False)
+    user_id = Column(UUIDString, ForeignKey('users.id', ondelete="CASCADE"), nullable=False)
     region = Column(String, nullable=False)
     language = Column(String, nullable=True)
     timezone = Column(String, nullable=True)
@@ -1,5 +1,6 @@
 from sqlalchemy import String, ForeignKey
 from sqlalchemy.orm import relationship, mapped_column, Mapped
+from api.db.types import UUIDString
 from api.v1.models.base_model import BaseTableModel
 
 
@@ -8,7 +9,7 @@ class ResetPasswordToken(BaseTableModel):
     Represents password reset tokens
     """
     __tablename__ = "reset_password_tokens"
-    user_id: Mapped[str] = mapped_column(String, ForeignKey("users.id", ondelete="CASCADE"),
+    user_id: Mapped[str] = mapped_column(UUIDString, ForeignKey("users.id", ondelete="CASCADE"),
                         unique=True)
     jti: Mapped[str] = mapped_column(String)
    
@@ -1,7 +1,8 @@
 from sqlalchemy import (Column, Integer, Float,
-                        ForeignKey, Index, String)
+                        ForeignKey, Index)
 from sqlalchemy.orm import relationship
 
+from api.db.types import UUIDString
 from api.v1.models.base_model import BaseTableModel
 
 
@@ -9,11 +10,11 @@ class Sales(BaseTableModel):
     __tablename__ = 'sales'
     quantity = Column(Integer, nullable=False)
     amount = Column(Float, nullable=False)
-    product_id = Column(String, ForeignKey('products.id', ondelete='CASCADE'),
+    product_id = Column(UUIDString, ForeignKey('products.id', ondelete='CASCADE'),
                         nullable=False)
-    organisation_id = Column(String, ForeignKey('organisations.id', ondelete='CASCADE'),
+    organisation_id = Column(UUIDString, ForeignKey('organisations.id', ondelete='CASCADE'),
                              nullable=False)
-    payment_id = Column(String, ForeignKey('payments.id', ondelete='CASCADE'),
+    payment_id = Column(UUIDString, ForeignKey('payments.id', ondelete='CASCADE'),
                              nullable=True)
 
 
@@ -25,4 +26,6 @@ class Sales(BaseTableModel):
    
     __table_args__ = (
         Index('idx_sales_created_at', 'created_at'),
+        # per-organisation analytics filter on the org and a date range
+        Index('idx_sales_organisation_id_created_at', 'organisation_id', 'created_at'),
     )
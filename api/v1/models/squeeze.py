@@ -7,6 +7,7 @@ from sqlalchemy import (
     ForeignKey,
     Enum as SQLAlchemyEnum,
 )
+from api.db.types import UUIDString
 from api.v1.models.base_model import BaseTableModel
 from sqlalchemy.orm import relationship
 from enum import Enum
@@ -22,7 +23,7 @@ class Squeeze(BaseTableModel):
 
     title = Column(String, nullable=False)
     email = Column(String, nullable=False)
-    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(UUIDString, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     url_slug = Column(String, nullable=True)
     headline = Column(String, nullable=True)
     sub_headline = Column(String, nullable=True)
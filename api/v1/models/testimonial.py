@@ -1,5 +1,6 @@
 from sqlalchemy import Column, String, ForeignKey, Text, Float
 from sqlalchemy.orm import relationship
+from api.db.types import UUIDString
 from api.v1.models.base_model import BaseTableModel
 
 
@@ -9,7 +10,7 @@ class Testimonial(BaseTableModel):
     client_designation = Column(String, nullable=True)
     client_name = Column(String, nullable=True)
     author_id = Column(
-        String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+        UUIDString, ForeignKey("users.id", ondelete="CASCADE"), nullable=False
     )
     comments = Column(Text, nullable=True)
     content = Column(Text, nullable=False)
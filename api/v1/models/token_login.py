@@ -1,5 +1,6 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey
+from sqlalchemy import Column, String, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
+from api.db.types import UUIDString
 from api.v1.models.base_model import BaseTableModel
 
 
@@ -7,9 +8,11 @@ class TokenLogin(BaseTableModel):
     __tablename__ = "token_logins"
 
     user_id = Column(
-        String, ForeignKey("users.id", ondelete="CASCADE"), unique=True, nullable=False
+        UUIDString, ForeignKey("users.id", ondelete="CASCADE"), unique=True, nullable=False
     )
     token = Column(String, nullable=False)
     expiry_time = Column(DateTime, nullable=False)
 
     user = relationship("User", back_populates="token_login")
+
+    __table_args__ = (Index("idx_token_logins_token", "token"),)
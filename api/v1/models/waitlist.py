@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime
+from sqlalchemy import Column, String, DateTime, Index
 from sqlalchemy.sql import func
 from api.v1.models.base_model import BaseTableModel
 
@@ -9,3 +9,5 @@ class Waitlist(BaseTableModel):
     email = Column(String, nullable=False)
     full_name = Column(String, nullable=False)
     joined_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (Index("idx_waitlist_email", "email"),)
@@ -18,6 +18,8 @@ from api.v1.routes.billing_plan import bill_plan
 from api.v1.routes.google_login import google_auth
 from api.v1.routes.invitations import invites
 from api.v1.routes.profiles import profile
+from api.v1.routes.profiler import profiler
+from api.v1.routes.query_stats import query_stats
 from api.v1.routes.jobs import jobs
 from api.v1.routes.payment import payment
 from api.v1.routes.organisation import organisation
@@ -96,3 +98,5 @@ api_version_one.include_router(team)
 api_version_one.include_router(terms_and_conditions)
 api_version_one.include_router(product_comment)
 api_version_one.include_router(subscription_)
+api_version_one.include_router(profiler)
+api_version_one.include_router(query_stats)
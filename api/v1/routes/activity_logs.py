@@ -1,8 +1,10 @@
-from fastapi import APIRouter, Depends, status, HTTPException
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter, Depends, Query, status, HTTPException
 from fastapi.encoders import jsonable_encoder
 from sqlalchemy.orm import Session
 from api.v1.models.user import User
-from api.v1.schemas.activity_logs import ActivityLogCreate, ActivityLogResponse
+from api.v1.schemas.activity_logs import ActivityLogCreate, ActivityLogPageResponse
 from api.v1.services.activity_logs import activity_log_service
 from api.v1.services.user import user_service
 from api.db.database import get_db
@@ -30,29 +32,45 @@ async def create_activity_log(
     )
 
 
-@activity_logs.get("", response_model=list[ActivityLogResponse])
-async def get_all_activity_logs(current_user: User = Depends(user_service.get_current_super_admin), db: Session = Depends(get_db)):
-    '''Get all activity logs'''
+@activity_logs.get("", response_model=ActivityLogPageResponse)
+async def get_all_activity_logs(
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    current_user: User = Depends(user_service.get_current_super_admin),
+    db: Session = Depends(get_db)
+):
+    '''Get all activity logs, newest first, a page at a time'''
 
-    activity_logs = activity_log_service.fetch_all(db=db)
+    activity_logs, next_cursor = activity_log_service.fetch_page(
+        db=db, since=since, until=until, limit=limit, cursor=cursor
+    )
 
     return success_response(
         status_code=200,
         message="Activity logs retrieved successfully",
-        data=jsonable_encoder(activity_logs)
+        data={"items": jsonable_encoder(activity_logs), "next_cursor": next_cursor}
     )
 
 @activity_logs.get("/{user_id}", status_code=status.HTTP_200_OK)
 async def fetch_all_users_activity_log(
     user_id: str,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(user_service.get_current_super_admin)
 ):
     """
-    Get endpoint for admin users get a users activity logs.
+    Get endpoint for admin users get a users activity logs, newest first.
 
     Args:
         user_id (str): the id of user
+        since, until: optional time window, since inclusive and until exclusive
+        limit: the page size
+        cursor: the next_cursor of the previous page
         current_user: the admin user
         db: the database session object
 
@@ -61,15 +79,19 @@ async def fetch_all_users_activity_log(
     """
 
 
-    activity_logs = activity_log_service.fetch_all(
+    activity_logs, next_cursor = activity_log_service.fetch_page(
         db=db,
-        user_id=user_id
+        user_id=user_id,
+        since=since,
+        until=until,
+        limit=limit,
+        cursor=cursor
     )
 
     return success_response(
         status_code=status.HTTP_200_OK,
         message="Activity logs fetched successfully!",
-        data=jsonable_encoder(activity_logs)
+        data={"items": jsonable_encoder(activity_logs), "next_cursor": next_cursor}
     )
 
 @activity_logs.delete("/{log_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -1,23 +1,42 @@
+from datetime import datetime, timezone
 from typing import Annotated
 from api.db.database import get_db
-from api.v1.schemas.api_status import APIStatusPost
-from api.v1.services.api_status import APIStatusService
+from api.utils.conditional_request import (
+    collection_validators,
+    not_modified_response,
+    set_validator_headers,
+)
+from api.v1.models.api_status import APIStatus
+from api.v1.schemas.api_status import APIStatusBatch, APIStatusPost
+from api.v1.services.api_status import APIStatusService, bucket_start
+from api.utils.gzip_request import GzipRoute
+from api.utils.response_cache import cache_response
 from api.utils.success_response import success_response
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Request, status
 from sqlalchemy.orm import Session
 
-api_status = APIRouter(prefix='/api-status', tags=['API Status'])
+api_status = APIRouter(prefix='/api-status', tags=['API Status'], route_class=GzipRoute)
 
 
 @api_status.get('', response_model=success_response, status_code=200)
-async def get_api_status(db: Annotated[Session, Depends(get_db)]):
-    all_status = APIStatusService.fetch_all(db)
+@cache_response(tags=["api_status"], ttl=60)
+def get_api_status(request: Request, db: Annotated[Session, Depends(get_db)]):
+    # the status page polls, so always revalidate but answer 304 when unchanged;
+    # the rollup windows move every hour even without new statuses
+    current_hour = bucket_start(datetime.now(timezone.utc), "hour")
+    validators = collection_validators(db, APIStatus, extra=(current_hour,))
+    not_modified = not_modified_response(request, validators)
+    if not_modified:
+        return not_modified
 
-    return success_response(
+    overview = APIStatusService.overview(db)
+
+    response = success_response(
         message='All API Status fetched successfully',
-        data=all_status,
+        data=overview,
         status_code=status.HTTP_200_OK
     )
+    return set_validator_headers(response, validators)
 
 
 @api_status.post('', response_model=success_response, status_code=201)
@@ -32,3 +51,19 @@ async def post_api_status(
         data=new_status,
         status_code=status.HTTP_201_CREATED
     )
+
+
+@api_status.post('/batch', response_model=success_response, status_code=201)
+def post_api_status_batch(
+    schema: APIStatusBatch,
+    db: Annotated[Session, Depends(get_db)]
+):
+    """Records every status of a monitoring run at once; the body may be gzip-compressed"""
+
+    updated = APIStatusService.upsert_many(db, schema.statuses)
+
+    return success_response(
+        message='API Statuses recorded successfully',
+        data={"api_groups": updated, "samples": len(schema.statuses)},
+        status_code=status.HTTP_201_CREATED
+    )
@@ -1,6 +1,4 @@
 from datetime import timedelta
-from slowapi import Limiter
-from slowapi.util import get_remote_address
 
 from fastapi import (BackgroundTasks, Depends,
                      status, APIRouter,
@@ -10,6 +8,7 @@ from sqlalchemy.orm import Session
 from typing import Annotated
 
 from api.core.dependencies.email_sender import send_email
+from api.utils.rate_limit import limiter
 from api.utils.success_response import auth_response, success_response
 from api.utils.send_mail import send_magic_link
 from api.v1.models import User
@@ -30,11 +29,9 @@ from api.v1.services.profile import profile_service
 
 auth = APIRouter(prefix="/auth", tags=["Authentication"])
 
-# Initialize rate limiter
-limiter = Limiter(key_func=get_remote_address)
   
 @auth.post("/register", status_code=status.HTTP_201_CREATED, response_model=auth_response)
-@limiter.limit("1000/minute")  # Limit to 1000 requests per minute per IP
+@limiter.limit("1000/minute", cost=10)  # hashing and org creation make this expensive
 def register(request: Request, background_tasks: BackgroundTasks, response: Response, user_schema: UserCreate, db: Session = Depends(get_db)):
     '''Endpoint for a user to register their account'''
 
@@ -94,7 +91,7 @@ def register(request: Request, background_tasks: BackgroundTasks, response: Resp
 
 
 @auth.post(path="/register-super-admin", status_code=status.HTTP_201_CREATED, response_model=auth_response)
-@limiter.limit("1000/minute")  # Limit to 5 requests per minute per IP
+@limiter.limit("1000/minute", cost=10)
 def register_as_super_admin(request: Request, user: UserCreate, db: Session = Depends(get_db)):
     """Endpoint for super admin creation"""
 
@@ -138,7 +135,7 @@ def register_as_super_admin(request: Request, user: UserCreate, db: Session = De
 
 
 @auth.post("/login", status_code=status.HTTP_200_OK, response_model=auth_response)
-@limiter.limit("1000/minute")  # Limit to 1000 requests per minute per IP
+@limiter.limit("1000/minute", cost=5)  # password hashing makes this expensive
 def login(request: Request, login_request: LoginRequest, db: Session = Depends(get_db)):
     """Endpoint to log in a user"""
 
@@ -179,7 +176,7 @@ def login(request: Request, login_request: LoginRequest, db: Session = Depends(g
 
 
 @auth.post("/logout", status_code=status.HTTP_200_OK)
-@limiter.limit("1000/minute")  # Limit to 1000 requests per minute per IP
+@limiter.limit("1000/minute")  # Limit to 1000 requests per minute per user or IP
 def logout(
     request: Request, 
     response: Response,
@@ -197,7 +194,7 @@ def logout(
 
 
 @auth.post("/refresh-access-token", status_code=status.HTTP_200_OK)
-@limiter.limit("1000/minute")  # Limit to 1000 requests per minute per IP
+@limiter.limit("1000/minute")  # Limit to 1000 requests per minute per user or IP
 def refresh_access_token(
     request: Request, response: Response, db: Session = Depends(get_db)
 ):
@@ -231,7 +228,7 @@ def refresh_access_token(
 
 
 @auth.post("/request-token", status_code=status.HTTP_200_OK)
-@limiter.limit("1000/minute")  # Limit to 1000 requests per minute per IP
+@limiter.limit("1000/minute")  # Limit to 1000 requests per minute per user or IP
 async def request_signin_token(request: Request, background_tasks: BackgroundTasks,
     email_schema: EmailRequest, db: Session = Depends(get_db)
 ):
@@ -265,7 +262,7 @@ async def request_signin_token(request: Request, background_tasks: BackgroundTas
 
 
 @auth.post("/verify-token", status_code=status.HTTP_200_OK, response_model=auth_response)
-@limiter.limit("1000/minute")  # Limit to 1000 requests per minute per IP
+@limiter.limit("1000/minute")  # Limit to 1000 requests per minute per user or IP
 async def verify_signin_token(
     request: Request, 
     token_schema: TokenRequest, db: Session = Depends(get_db)
@@ -308,7 +305,7 @@ async def verify_signin_token(
 
 # TODO: Fix magic link authentication
 @auth.post("/magic-link", status_code=status.HTTP_200_OK)
-@limiter.limit("1000/minute")  # Limit to 1000 requests per minute per IP
+@limiter.limit("1000/minute")  # Limit to 1000 requests per minute per user or IP
 def request_magic_link(
     request: Request, 
     requests: MagicLinkRequest, background_tasks: BackgroundTasks,
@@ -335,7 +332,7 @@ def request_magic_link(
 
 
 @auth.post("/magic-link/verify")
-@limiter.limit("1000/minute")  # Limit to 1000 requests per minute per IP
+@limiter.limit("1000/minute")  # Limit to 1000 requests per minute per user or IP
 async def verify_magic_link(request: Request, token_schema: Token, db: Session = Depends(get_db)):
     user, access_token = AuthService.verify_magic_token(token_schema.token, db)
     user_organizations = organisation_service.retrieve_user_organizations(user, db)
@@ -369,7 +366,7 @@ async def verify_magic_link(request: Request, token_schema: Token, db: Session =
 
 
 @auth.put("/password", status_code=200)
-@limiter.limit("1000/minute")  # Limit to 1000 requests per minute per IP
+@limiter.limit("1000/minute")  # Limit to 1000 requests per minute per user or IP
 async def change_password(
     request: Request, 
     schema: ChangePasswordSchema,
@@ -388,7 +385,7 @@ async def change_password(
 @auth.get("/@me",
           status_code=status.HTTP_200_OK,
           response_model=AuthMeResponse)
-@limiter.limit("1000/minute")  # Limit to 1000 requests per minute per IP
+@limiter.limit("1000/minute")  # Limit to 1000 requests per minute per user or IP
 def get_current_user_details(
     request: Request, 
     db: Annotated[Session, Depends(get_db)],
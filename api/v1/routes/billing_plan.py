@@ -1,11 +1,22 @@
 from fastapi import (
     APIRouter,
     Depends,
+    Request,
     status,
 )
 from fastapi.encoders import jsonable_encoder
 from sqlalchemy.orm import Session
+from api.utils.conditional_request import (
+    NO_CACHE,
+    PUBLIC_SHORT,
+    collection_validators,
+    not_modified_response,
+    row_validators,
+    set_validator_headers,
+)
 from api.utils.success_response import success_response
+from api.utils.response_cache import cache_response
+from api.v1.models.billing_plan import BillingPlan
 from api.v1.models.user import User
 from api.v1.services.billing_plan import billing_plan_service
 from api.db.database import get_db
@@ -19,22 +30,31 @@ bill_plan = APIRouter(prefix="/organisations", tags=["Billing-Plan"])
 
 
 @bill_plan.get("/{organisation_id}/billing-plans", response_model=GetBillingPlanListResponse)
+@cache_response(tags=["billing_plan"], ttl=300)
 async def retrieve_all_billing_plans(
-    organisation_id: str, db: Session = Depends(get_db)
+    organisation_id: str, request: Request, db: Session = Depends(get_db)
 ):
     """
     Endpoint to get all billing plans
     """
 
+    validators = collection_validators(
+        db, BillingPlan, BillingPlan.organisation_id == organisation_id
+    )
+    not_modified = not_modified_response(request, validators, PUBLIC_SHORT)
+    if not_modified:
+        return not_modified
+
     plans = billing_plan_service.fetch_all(db=db, organisation_id=organisation_id)
 
-    return success_response(
+    response = success_response(
         status_code=status.HTTP_200_OK,
         message="Plans fetched successfully",
         data={
             "plans": jsonable_encoder(plans),
         },
     )
+    return set_validator_headers(response, validators, PUBLIC_SHORT)
 
 
 @bill_plan.post("/billing-plans", response_model=CreateBillingPlanResponse)
@@ -97,6 +117,7 @@ async def delete_a_billing_plan(
 @bill_plan.get('/billing-plans/{billing_plan_id}', response_model=CreateBillingPlanResponse)
 async def retrieve_single_billing_plans(
     billing_plan_id: str,
+    request: Request,
     db: Session = Depends(get_db),
     _: User = Depends(user_service.get_current_user)
 ):
@@ -106,8 +127,16 @@ async def retrieve_single_billing_plans(
 
     billing_plan = billing_plan_service.fetch(db, billing_plan_id)
 
-    return success_response(
+    # authenticated route, so only private caches may keep it
+    cache_control = f"private, {NO_CACHE}"
+    validators = row_validators(billing_plan)
+    not_modified = not_modified_response(request, validators, cache_control)
+    if not_modified:
+        return not_modified
+
+    response = success_response(
         status_code=status.HTTP_200_OK,
         message="Plan fetched successfully",
         data=jsonable_encoder(billing_plan)
-    )
\ No newline at end of file
+    )
+    return set_validator_headers(response, validators, cache_control)
\ No newline at end of file
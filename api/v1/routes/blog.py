@@ -1,13 +1,18 @@
 from fastapi import (
     APIRouter, Depends, HTTPException, status, 
-    HTTPException, Response, Request
+    HTTPException, Query, Response, Request
 )
 from fastapi.encoders import jsonable_encoder
 from sqlalchemy.orm import Session
 from typing import Annotated
 
 from api.db.database import get_db
-from api.utils.pagination import paginated_response
+from api.utils.conditional_request import (
+    PUBLIC_SHORT,
+    not_modified_response,
+    row_validators,
+    set_validator_headers,
+)
 from api.utils.success_response import success_response
 from api.v1.models.user import User
 from api.v1.models.blog import Blog, BlogDislike, BlogLike
@@ -49,24 +54,43 @@ def create_blog(
 
 
 @blog.get("/", response_model=success_response)
-def get_all_blogs(db: Session = Depends(get_db), limit: int = 10, skip: int = 0):
-    """Endpoint to get all blogs"""
-
-    return paginated_response(
-        db=db,
-        model=Blog,
-        limit=limit,
-        skip=skip,
+def get_all_blogs(
+    db: Session = Depends(get_db),
+    limit: int = Query(10, ge=1),
+    skip: int = Query(0, ge=0),
+):
+    """Endpoint to get all blogs
+
+    Each item carries its author summary, like/dislike/comment counts and
+    an excerpt, so no follow-up requests per post are needed.
+    """
+
+    blog_service = BlogService(db)
+    total, items = blog_service.fetch_feed(skip=skip, limit=limit)
+
+    return success_response(
+        status_code=200,
+        message="Successfully fetched items",
+        data={
+            "pages": int(total / limit) + (total % limit > 0),
+            "total": total,
+            "skip": skip,
+            "limit": limit,
+            "items": jsonable_encoder(items),
+        },
     )
 
 
 @blog.get("/{id}", response_model=BlogPostResponse)
-def get_blog_by_id(id: str, db: Session = Depends(get_db)):
+def get_blog_by_id(id: str, request: Request, db: Session = Depends(get_db)):
     """
     Retrieve a blog post by its Id.
 
+    Answers 304 Not Modified when the client's ETag/Last-Modified is current.
+
     Args:
         id (str): The ID of the blog post.
+        request (Request): The request, for its conditional headers.
         db (Session): The database session.
 
     Returns:
@@ -79,11 +103,17 @@ def get_blog_by_id(id: str, db: Session = Depends(get_db)):
 
     blog_post = blog_service.fetch(id)
 
-    return success_response(
+    validators = row_validators(blog_post)
+    not_modified = not_modified_response(request, validators, PUBLIC_SHORT)
+    if not_modified:
+        return not_modified
+
+    response = success_response(
         message="Blog post retrieved successfully!",
         status_code=200,
         data=jsonable_encoder(blog_post),
     )
+    return set_validator_headers(response, validators, PUBLIC_SHORT)
 
 
 @blog.put("/{id}", response_model=BlogUpdateResponseModel)
@@ -194,6 +224,60 @@ def dislike_blog_post(
     )
 
 
+@blog.delete("/{blog_id}/like")
+def unlike_blog_post(
+    blog_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(user_service.get_current_user),
+):
+    """Endpoint to remove the current user's `like` from a blog post.
+
+    return:
+        The `"objects_count"` in `data` is the number of likes left
+    """
+    blog_service = BlogService(db)
+    blog_p = blog_service.fetch(blog_id)
+
+    if not blog_service.delete_blog_like(blog_p.id, current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="You have not liked this blog post",
+        )
+
+    return success_response(
+        status_code=status.HTTP_200_OK,
+        message="Like removed successfully.",
+        data={'objects_count': blog_service.num_of_likes(blog_p.id)},
+    )
+
+
+@blog.delete("/{blog_id}/dislike")
+def undislike_blog_post(
+    blog_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(user_service.get_current_user),
+):
+    """Endpoint to remove the current user's `dislike` from a blog post.
+
+    return:
+        The `"objects_count"` in `data` is the number of dislikes left
+    """
+    blog_service = BlogService(db)
+    blog_p = blog_service.fetch(blog_id)
+
+    if not blog_service.delete_blog_dislike(blog_p.id, current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="You have not disliked this blog post",
+        )
+
+    return success_response(
+        status_code=status.HTTP_200_OK,
+        message="Dislike removed successfully.",
+        data={'objects_count': blog_service.num_of_dislikes(blog_p.id)},
+    )
+
+
 @blog.delete("/{id}", status_code=204)
 async def delete_blog_post(
     id: str,
@@ -28,7 +28,7 @@ async def facebook_login(request: OAuthToken, db: Annotated[Session, Depends(get
 
         # hit the Facebook Graph API to validate the access token
         try:
-            fb_user_id = fb_user_service.validate_facebook_token(access_token)
+            fb_user_id = await fb_user_service.validate_facebook_token(access_token)
         except Exception as e:
             return e
         if not fb_user_id:
@@ -38,7 +38,7 @@ async def facebook_login(request: OAuthToken, db: Annotated[Session, Depends(get
                 error=COULD_NOT_VALIDATE_CRED,
             )
             return response
-        fb_user_data = fb_user_service.get_facebook_user_data(access_token)
+        fb_user_data = await fb_user_service.get_facebook_user_data(access_token)
 
         # retrieve the user from the database
         try:
@@ -1,10 +1,17 @@
-from fastapi import APIRouter, Depends, status, Query
+from fastapi import APIRouter, Depends, Request, status, Query
 from fastapi.encoders import jsonable_encoder
 from sqlalchemy.orm import Session
 from typing import Optional
 
 from api.db.database import get_db
+from api.utils.conditional_request import (
+    PUBLIC_SHORT,
+    collection_validators,
+    not_modified_response,
+    set_validator_headers,
+)
 from api.utils.pagination import paginated_response
+from api.utils.response_cache import cache_response
 from api.utils.success_response import success_response
 from api.v1.models.faq import FAQ
 from api.v1.models.user import User
@@ -16,12 +23,19 @@ faq = APIRouter(prefix="/faqs", tags=["Frequently Asked Questions"])
 
 
 @faq.get("", response_model=success_response, status_code=200)
+@cache_response(tags=["faq"], ttl=300)
 async def get_all_faqs(
+    request: Request,
     db: Session = Depends(get_db),
     keyword: Optional[str] = Query(None, min_length=1)
 ):
     """Endpoint to get all FAQs or search by keyword in both question and answer"""
 
+    validators = collection_validators(db, FAQ, extra=(keyword,))
+    not_modified = not_modified_response(request, validators, PUBLIC_SHORT)
+    if not_modified:
+        return not_modified
+
     query_params = {}
     if keyword:
         query_params["question"] = keyword
@@ -30,11 +44,12 @@ async def get_all_faqs(
     grouped_faqs = faq_service.fetch_all_grouped_by_category(
         db=db, **query_params)
 
-    return success_response(
+    response = success_response(
         status_code=200,
         message="FAQs retrieved successfully",
         data=jsonable_encoder(grouped_faqs),
     )
+    return set_validator_headers(response, validators, PUBLIC_SHORT)
 
 
 @faq.post("", response_model=success_response, status_code=201)
@@ -55,6 +70,7 @@ async def create_faq(
 
 
 @faq.get("/{id}", response_model=success_response, status_code=200)
+@cache_response(tags=["faq"], ttl=300)
 async def get_single_faq(id: str, db: Session = Depends(get_db)):
     """Endpoint to get a single FAQ"""
 
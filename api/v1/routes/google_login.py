@@ -15,7 +15,7 @@ from api.utils.success_response import success_response
 from api.v1.schemas.google_oauth import OAuthToken
 from api.v1.services.user import user_service
 from fastapi.encoders import jsonable_encoder
-import requests
+from api.utils.http_client import ProviderError, provider_clients
 from datetime import timedelta
 
 google_auth = APIRouter(prefix="/auth", tags=["Authentication"])
@@ -48,8 +48,13 @@ async def google_login(background_tasks: BackgroundTasks, token_request: OAuthTo
     try:
 
         id_token = token_request.id_token
-        profile_endpoint = f'https://www.googleapis.com/oauth2/v3/tokeninfo?id_token={id_token}'
-        profile_response = requests.get(profile_endpoint)
+        profile_endpoint = 'https://www.googleapis.com/oauth2/v3/tokeninfo'
+        try:
+            profile_response = await provider_clients.request(
+                "google", "GET", profile_endpoint, params={"id_token": id_token}
+            )
+        except ProviderError:
+            raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Could not reach Google, please try again later")
         
         if profile_response.status_code != 200:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid token or failed to fetch user info")
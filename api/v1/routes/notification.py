@@ -1,13 +1,25 @@
-from fastapi import Depends, status, APIRouter, Path, HTTPException
+from fastapi import BackgroundTasks, Body, Depends, Header, Query, status, APIRouter, Path, HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from api.utils.pubsub import broker
 from api.utils.success_response import success_response
 from api.v1.models import User
-from typing import Annotated
+from typing import Annotated, Optional
 from api.db.database import get_db
 from api.v1.services.user import user_service
-from api.v1.services.notification import notification_service
+from api.v1.services.notification import notification_channels, notification_service
+from api.v1.services.notification_fanout import notification_fanout_service
+from api.v1.services.organisation import organisation_service
+from api.v1.models.notifications import NotificationFanout
 
-from api.v1.schemas.notification import NotificationCreate
+from api.v1.schemas.notification import (
+    NotificationCreate,
+    NotificationFanoutRead,
+    NotificationsMarkRead,
+    OrganisationNotificationCreate,
+)
 
 
 notification = APIRouter(prefix="/notifications", tags=["Notifications"])
@@ -32,6 +44,69 @@ def send_notification(
     )
 
 
+def check_org_admin(user: User, org_id: str, db: Session):
+    if user.is_superadmin:
+        return
+    role = organisation_service.get_organisation_user_role(user.id, org_id, db)
+    if role not in ["admin", "owner"]:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions")
+
+
+@notification.post(
+    "/organisations/{org_id}",
+    summary="Notify every member of an organisation",
+    description="Sends a notification to each active member of the organisation, "
+    "optionally only to those with the NotificationSetting flag `setting` on. "
+    "Runs in the background; poll the returned fan-out for progress.",
+    status_code=status.HTTP_202_ACCEPTED,
+)
+def notify_organisation(
+    org_id: str,
+    schema: OrganisationNotificationCreate,
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(user_service.get_current_user),
+    db: Session = Depends(get_db),
+):
+    check_org_admin(current_user, org_id, db)
+    fanout = notification_fanout_service.create(
+        db,
+        org_id,
+        title=schema.title,
+        message=schema.message,
+        sender_id=current_user.id,
+        setting=schema.setting,
+    )
+    background_tasks.add_task(notification_fanout_service.run_in_background, fanout.id)
+
+    return success_response(
+        status_code=202,
+        message="Organisation notification accepted",
+        data=jsonable_encoder(NotificationFanoutRead.model_validate(fanout)),
+    )
+
+
+@notification.get(
+    "/fan-outs/{fanout_id}",
+    summary="Progress of an organisation notification",
+    status_code=status.HTTP_200_OK,
+)
+def get_notification_fanout(
+    fanout_id: str,
+    current_user: User = Depends(user_service.get_current_user),
+    db: Session = Depends(get_db),
+):
+    fanout = db.get(NotificationFanout, fanout_id)
+    if fanout is None:
+        raise HTTPException(status_code=404, detail="Notification fan-out not found")
+    check_org_admin(current_user, fanout.organisation_id, db)
+
+    return success_response(
+        status_code=200,
+        message="Notification fan-out fetched successfully",
+        data=jsonable_encoder(NotificationFanoutRead.model_validate(fanout)),
+    )
+
+
 @notification.patch(
     "/{id}",
     summary="Mark a notification as read",
@@ -51,15 +126,86 @@ def mark_notification_as_read(
     return success_response(status_code=200, message="Notification marked as read")
 
 
+@notification.post(
+    "/read-all",
+    summary="Mark notifications as read",
+    description="Marks all of the current user's notifications as read, or with `up_to` "
+    "only that notification and the older ones",
+    status_code=status.HTTP_200_OK,
+)
+def mark_all_notifications_as_read(
+    schema: Optional[NotificationsMarkRead] = Body(None),
+    current_user: User = Depends(user_service.get_current_user),
+    db: Session = Depends(get_db),
+):
+    updated = notification_service.mark_all_as_read(
+        current_user, db, up_to=schema.up_to if schema else None
+    )
+    return success_response(
+        status_code=200,
+        message="Notifications marked as read",
+        data={
+            "updated": updated,
+            "unread_count": notification_service.unread_count(current_user, db),
+        },
+    )
+
+
 @notification.get("/current-user")
 def get_current_user_notifications(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
     current_user: User = Depends(user_service.get_current_user),
     db: Session = Depends(get_db),
 ):
-    data = notification_service.get_current_user_notifications(current_user, db)
+    data = notification_service.get_current_user_notifications(
+        current_user, db, limit=limit, cursor=cursor
+    )
     return success_response(status_code=200, message="All notifications", data=data)
 
 
+@notification.get("/unread-count")
+def get_unread_notification_count(
+    current_user: User = Depends(user_service.get_current_user),
+    db: Session = Depends(get_db),
+):
+    return success_response(
+        status_code=200,
+        message="Unread notification count",
+        data={"unread_count": notification_service.unread_count(current_user, db)},
+    )
+
+
+@notification.get(
+    "/stream",
+    summary="Stream notifications",
+    description="Server-sent events stream of the current user's new notifications. "
+    "Reconnecting clients send the Last-Event-ID header to receive what they missed.",
+)
+async def stream_notifications(
+    last_event_id: Optional[str] = Header(None),
+    current_user: User = Depends(user_service.get_current_user),
+    db: Session = Depends(get_db),
+):
+    # subscribe first so nothing sent during the replay query is missed
+    subscription = broker.subscribe(*notification_channels(current_user.id))
+    missed = []
+    try:
+        if last_event_id:
+            missed = await run_in_threadpool(
+                notification_service.missed_notifications, current_user, db, last_event_id
+            )
+    except Exception:
+        broker.unsubscribe(subscription)
+        raise
+
+    return StreamingResponse(
+        notification_service.stream(subscription, missed),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @notification.get(
     "/{notification_id}",
     summary="Fetch a notification",
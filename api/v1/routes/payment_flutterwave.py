@@ -11,10 +11,11 @@ from api.db.database import get_db
 from api.v1.models import User
 from decouple import config
 from uuid_extensions import uuid7
-import requests
 from api.v1.routes.payment import payment
 from api.v1.models.billing_plan import BillingPlan
 from api.utils.settings import settings
+from api.utils.http_client import ProviderError, ProviderUnavailable, provider_clients
+from api.utils.logger import logger
 
 @payment.post("/flutterwave", response_model=success_response)
 async def pay_with_flutterwave(
@@ -42,26 +43,48 @@ async def pay_with_flutterwave(
     }
 
     try:
-        response = requests.post(FLUTTERWAVE_URL, json=data, headers=header)
-        response=response.json()
-
-        # save payment detail
-        payment_service = PaymentService()
-        payment_data = {
-            "user_id":current_user.id,
-            "amount": float(plan.price),
-            "currency":plan.currency,
-            "status": "pending",
-            "method": "card",
-            "transaction_id":transaction_id
-        }
-        payment_service.create(db, payment_data)
-
-        return success_response(
-            status_code=status.HTTP_200_OK,
-            message='Payment initiated successfully',
-            data={"payment_url": response['data']['link']},
+        response = await provider_clients.request(
+            "flutterwave", "POST", FLUTTERWAVE_URL, json=data, headers=header
+        )
+    except ProviderUnavailable:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail='Payment provider is unavailable, please try again later',
         )
-    except Exception as e:
-        print(e)
+    except ProviderError as e:
+        logger.warning(f"Flutterwave payment initialization failed: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail='Payment provider could not be reached, please try again',
+        )
+
+    # only a rejected request is the client's error; anything else is the
+    # provider's, and a 5xx lets an Idempotency-Key retry run again
+    if 400 <= response.status_code < 500:
         raise HTTPException(status_code=400, detail='Error initializing payment')
+    try:
+        payment_url = response.json()['data']['link']
+    except (ValueError, KeyError, TypeError):
+        logger.warning(f"Flutterwave answered {response.status_code} without a payment link")
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail='Payment provider returned an invalid response, please try again',
+        )
+
+    # save payment detail
+    payment_service = PaymentService()
+    payment_data = {
+        "user_id":current_user.id,
+        "amount": float(plan.price),
+        "currency":plan.currency,
+        "status": "pending",
+        "method": "card",
+        "transaction_id":transaction_id
+    }
+    payment_service.create(db, payment_data)
+
+    return success_response(
+        status_code=status.HTTP_200_OK,
+        message='Payment initiated successfully',
+        data={"payment_url": payment_url},
+    )
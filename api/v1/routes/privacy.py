@@ -9,6 +9,15 @@ from api.v1.schemas.privacy_policies import (
     PrivacyPolicyCreate, PrivacyPolicyResponse, PrivacyPolicyUpdate
 )
 from api.db.database import get_db
+from api.utils.response_cache import cache_response
+from api.utils.conditional_request import (
+    PUBLIC_LONG,
+    collection_validators,
+    not_modified_response,
+    row_validators,
+    set_validator_headers,
+)
+from api.v1.models.privacy import PrivacyPolicy
 from api.v1.services.privacy_policies import privacy_service
 from api.v1.services.user import user_service
 
@@ -29,26 +38,40 @@ def create_privacy(privacy: PrivacyPolicyCreate, db: Session = Depends(get_db),
 
 
 @privacies.get("", response_model=List[PrivacyPolicyResponse])
-def get_privacies(db: Session = Depends(get_db)):
+@cache_response(tags=["privacy_policy"], ttl=3600)
+def get_privacies(request: Request, db: Session = Depends(get_db)):
     """Get All Privacies"""
+    validators = collection_validators(db, PrivacyPolicy)
+    not_modified = not_modified_response(request, validators, PUBLIC_LONG)
+    if not_modified:
+        return not_modified
+
     privacy_items = privacy_service.fetch_all(db)
     
-    return success_response(
+    response = success_response(
         status_code=200,
         message='Privacies retrieved successfully',
         data=jsonable_encoder(privacy_items)
     )
+    return set_validator_headers(response, validators, PUBLIC_LONG)
 
 
 @privacies.get("/{privacy_id}", response_model=PrivacyPolicyResponse)
-def get_privacy(privacy_id: str, db: Session = Depends(get_db)):
+@cache_response(tags=["privacy_policy"], ttl=3600)
+def get_privacy(privacy_id: str, request: Request, db: Session = Depends(get_db)):
     privacy = privacy_service.fetch(db, privacy_id)
+
+    validators = row_validators(privacy)
+    not_modified = not_modified_response(request, validators, PUBLIC_LONG)
+    if not_modified:
+        return not_modified
     
-    return success_response (
+    response = success_response (
         status_code=200,
         message='privacy retrieved successfully',
         data=jsonable_encoder(privacy)
     )
+    return set_validator_headers(response, validators, PUBLIC_LONG)
     
 @privacies.delete("/{privacy_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_privacy(privacy_id: str, db: Session = Depends(get_db), superadmin_user: User = Depends(user_service.get_current_super_admin)):
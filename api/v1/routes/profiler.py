@@ -0,0 +1,98 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import PlainTextResponse
+
+from api.utils.profiler import profile_store, profiler_config
+from api.utils.success_response import success_response
+from api.v1.models.user import User
+from api.v1.schemas.profiler import ProfilerArm, ProfilerConfigUpdate
+from api.v1.services.user import user_service
+
+profiler = APIRouter(prefix="/profiler", tags=["Profiler"])
+
+
+def _config_data() -> dict:
+    return {
+        "sample_rate": profiler_config.sample_rate,
+        "slow_threshold_ms": profiler_config.slow_threshold_ms,
+        "armed": profiler_config.armed(),
+    }
+
+
+@profiler.get("/profiles", status_code=status.HTTP_200_OK)
+async def list_profiles(
+    current_user: User = Depends(user_service.get_current_super_admin),
+):
+    """Lists the profiles kept by this worker, newest first"""
+
+    return success_response(
+        status_code=200,
+        message="Profiles retrieved successfully",
+        data=[record.summary() for record in profile_store.all()],
+    )
+
+
+@profiler.get("/profiles/{profile_id}", response_class=PlainTextResponse)
+async def download_profile(
+    profile_id: str,
+    current_user: User = Depends(user_service.get_current_super_admin),
+):
+    """Downloads a profile in folded stacks format, ready for flamegraph tools"""
+
+    record = profile_store.get(profile_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+
+    return PlainTextResponse(
+        record.collapsed,
+        headers={
+            "Content-Disposition": f'attachment; filename="profile-{record.id}.folded"'
+        },
+    )
+
+
+@profiler.get("/config", status_code=status.HTTP_200_OK)
+async def get_profiler_config(
+    current_user: User = Depends(user_service.get_current_super_admin),
+):
+    """Shows the background profiler settings of this worker"""
+
+    return success_response(
+        status_code=200,
+        message="Profiler settings retrieved successfully",
+        data=_config_data(),
+    )
+
+
+@profiler.patch("/config", status_code=status.HTTP_200_OK)
+async def update_profiler_config(
+    schema: ProfilerConfigUpdate,
+    current_user: User = Depends(user_service.get_current_super_admin),
+):
+    """Changes background sampling on this worker until it restarts"""
+
+    if schema.sample_rate is not None:
+        profiler_config.sample_rate = schema.sample_rate
+    if schema.slow_threshold_ms is not None:
+        profiler_config.slow_threshold_ms = schema.slow_threshold_ms
+
+    return success_response(
+        status_code=200,
+        message="Profiler settings updated successfully",
+        data=_config_data(),
+    )
+
+
+@profiler.post("/arm", status_code=status.HTTP_200_OK)
+async def arm_profiler(
+    schema: ProfilerArm,
+    current_user: User = Depends(user_service.get_current_super_admin),
+):
+    """Profiles the next requests whose path starts with `path_prefix`"""
+
+    profiler_config.arm(schema.path_prefix, schema.count)
+
+    return success_response(
+        status_code=200,
+        message="Profiler armed successfully",
+        data=_config_data(),
+    )
@@ -5,7 +5,6 @@ from fastapi import (Depends, APIRouter,
                      BackgroundTasks)
 from sqlalchemy.orm import Session
 from typing import Annotated
-from PIL import Image
 from io import BytesIO
 from fastapi.responses import JSONResponse
 import os
@@ -136,6 +135,8 @@ async def upload_profile_image(
     if file.content_type not in ["image/jpeg", "image/png"]:
         raise HTTPException(status_code=400, detail="Invalid file format. Only JPG and PNG are supported.")
 
+    from PIL import Image
+
     try:
         image = Image.open(BytesIO(await file.read()))
         image = image.resize((300, 300))
@@ -0,0 +1,52 @@
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+
+from api.db.query_log import query_log
+from api.utils.success_response import success_response
+from api.v1.models.user import User
+from api.v1.services.user import user_service
+
+query_stats = APIRouter(prefix="/query-stats", tags=["Query Stats"])
+
+
+@query_stats.get("", status_code=status.HTTP_200_OK)
+async def get_query_stats(
+    sort_by: Literal["total_ms", "count", "mean_ms", "p95_ms", "p99_ms", "max_ms", "rows"] = "total_ms",
+    limit: int = Query(50, ge=1, le=1000),
+    current_user: User = Depends(user_service.get_current_super_admin),
+):
+    """Statement statistics of this worker, heaviest first"""
+
+    return success_response(
+        status_code=200,
+        message="Query statistics retrieved successfully",
+        data=query_log.snapshot(sort_by=sort_by, limit=limit),
+    )
+
+
+@query_stats.get("/{stats_id}", status_code=status.HTTP_200_OK)
+async def get_statement_stats(
+    stats_id: str,
+    current_user: User = Depends(user_service.get_current_super_admin),
+):
+    """Statistics and captured EXPLAIN plan for one statement fingerprint"""
+
+    stats = query_log.get(stats_id)
+    if stats is None:
+        raise HTTPException(status_code=404, detail="Statement not found")
+
+    return success_response(
+        status_code=200,
+        message="Query statistics retrieved successfully",
+        data=stats,
+    )
+
+
+@query_stats.delete("", status_code=status.HTTP_204_NO_CONTENT)
+async def reset_query_stats(
+    current_user: User = Depends(user_service.get_current_super_admin),
+):
+    """Clears the statistics of this worker"""
+
+    query_log.reset()
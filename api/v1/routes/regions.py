@@ -9,6 +9,7 @@ from api.v1.schemas.regions import (
     RegionCreate, RegionOut, RegionUpdate
 )
 from api.db.database import get_db
+from api.utils.response_cache import cache_response
 from api.v1.services.regions import region_service
 from api.v1.services.user import user_service
 
@@ -28,6 +29,7 @@ def create_region(region: RegionCreate, db: Session = Depends(get_db),
     )
 
 @regions.get("", response_model=List[RegionOut])
+@cache_response(tags=["region"], ttl=300)
 def get_regions_or_timezones(
     db: Session = Depends(get_db),
     timezones: Optional[bool] = Query(False, description="Set to true to fetch unique time zones")
@@ -10,7 +10,7 @@ from typing import Annotated
 sms = APIRouter(prefix="/sms/send", tags=["SMS"])
 
 @sms.post("/", status_code=status.HTTP_200_OK, response_model=SMSRequest)
-def send_sms_endpoint(
+async def send_sms_endpoint(
     sms_request: SMSRequest,
     current_user: Annotated[User, Depends(user_service.get_current_user)],
 
@@ -25,7 +25,7 @@ def send_sms_endpoint(
         dict: The response containing status and message SID or error details.
     """
     try:
-        result = send_sms(sms_request.phone_number, sms_request.message)
+        result = await send_sms(sms_request.phone_number, sms_request.message)
 
         if result.get("status") == "error":
             raise HTTPException(
@@ -1,7 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session
-import stripe
-from api.v1.services.stripe_payment import stripe_payment_request, \
+from api.v1.services.stripe_payment import stripe_payment_request, get_stripe, \
 update_user_plan, fetch_all_organisations_with_users_and_plans, get_all_plans
 import json
 from api.v1.schemas.stripe import PlanUpgradeRequest
@@ -19,20 +18,19 @@ from dotenv import load_dotenv, find_dotenv
 
 load_dotenv(find_dotenv())
 
-stripe.api_key = os.getenv('STRIPE_SECRET_KEY')
 endpoint_secret = os.getenv('STRIPE_WEBHOOK_SECRET')
 
 subscription_ = APIRouter(prefix="/payment", tags=["subscribe-plan"])
 
 
 @subscription_.post("/stripe/upgrade-plan")
-def stripe_payment(
+async def stripe_payment(
     plan_upgrade_request: PlanUpgradeRequest, 
     request: Request, 
     db: Session = Depends(get_db), 
     current_user: User = Depends(user_service.get_current_user)
     ):
-    return stripe_payment_request(db, plan_upgrade_request.user_id, request, plan_upgrade_request.plan_name) 
+    return await stripe_payment_request(db, plan_upgrade_request.user_id, request, plan_upgrade_request.plan_name) 
 
 @subscription_.get("/stripe/success")
 def success_upgrade(session_id: str):
@@ -45,9 +43,10 @@ def success_upgrade(session_id: str):
 
 @subscription_.get("/stripe/status")
 async def verify_payment(session_id: str, db: Session = Depends(get_db)):
+    stripe = get_stripe()
     try:
         # Retrieve the session from Stripe
-        session = stripe.checkout.Session.retrieve(session_id)
+        session = await stripe.checkout.Session.retrieve_async(session_id)
 
         # Check if the payment was successful
         if session.payment_status == "paid":
@@ -100,6 +99,7 @@ async def webhook_received(
 
     payload = await request.body()
     event = None
+    stripe = get_stripe()
 
     try:
         event = stripe.Event.construct_from(json.loads(payload), stripe.api_key)
@@ -8,6 +8,7 @@ from sqlalchemy.orm.session import Session
 from starlette import status
 
 from api.db.database import get_db
+from api.utils.response_cache import cache_response
 from api.utils.logger import logger
 from api.utils.success_response import success_response
 from api.v1.models.user import User
@@ -25,6 +26,7 @@ team = APIRouter(prefix="/teams", tags=["Teams"])
     response_model=success_response,
     status_code=status.HTTP_200_OK
 )
+@cache_response(tags=["team"], ttl=300)
 def get_all_team_members(
     db: Session = Depends(get_db),
     su: User = Depends(user_service.get_current_super_admin)
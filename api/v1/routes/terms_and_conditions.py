@@ -1,6 +1,13 @@
-from fastapi import APIRouter, Depends, status, HTTPException
+from fastapi import APIRouter, Depends, Request, status, HTTPException
 from sqlalchemy.orm import Session
 from api.db.database import get_db
+from api.utils.response_cache import cache_response, response_cache
+from api.utils.conditional_request import (
+    PUBLIC_LONG,
+    not_modified_response,
+    row_validators,
+    set_validator_headers,
+)
 from api.utils.success_response import success_response
 from api.v1.services.terms_and_conditions import terms_and_conditions_service
 from api.v1.schemas.terms_and_conditions import DeleteResponseModel, UpdateTermsAndConditions
@@ -12,8 +19,10 @@ terms_and_conditions = APIRouter(
 )
 
 @terms_and_conditions.get("/{id}", response_model=success_response, status_code=200)
+@cache_response(tags=["terms"], ttl=3600)
 async def get_terms_and_conditions(
     id: str,
+    request: Request,
     db: Session = Depends(get_db)
 ):
     """Endpoint to get term and condition based on id"""
@@ -23,11 +32,18 @@ async def get_terms_and_conditions(
             message="Term and condition not found",
             status_code=status.HTTP_404_NOT_FOUND,
         )
-    return success_response(
+
+    validators = row_validators(tc)
+    not_modified = not_modified_response(request, validators, PUBLIC_LONG)
+    if not_modified:
+        return not_modified
+
+    response = success_response(
         data=tc.to_dict(),
         message="success",
         status_code=status.HTTP_200_OK
     )
+    return set_validator_headers(response, validators, PUBLIC_LONG)
 
 @terms_and_conditions.patch("/{id}", response_model=success_response, status_code=200)
 async def update_terms_and_conditions(
@@ -72,6 +88,7 @@ async def create_terms_and_conditions(
     db.add(new_tc)
     db.commit()
     db.refresh(new_tc)
+    response_cache.invalidate("terms")
 
     return success_response(
         data=new_tc.to_dict(),
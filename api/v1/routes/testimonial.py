@@ -4,6 +4,7 @@ Module contains CRUD routes for testimonial
 """
 from fastapi.encoders import jsonable_encoder
 from api.db.database import get_db
+from api.utils.response_cache import cache_response
 from sqlalchemy.orm import Session
 from api.v1.models.user import User
 from fastapi import Depends, APIRouter, status,Query
@@ -20,6 +21,7 @@ testimonial = APIRouter(prefix="/testimonials", tags=['Testimonial'])
 
 
 @testimonial.get("", status_code=status.HTTP_200_OK)
+@cache_response(tags=["testimonial"], ttl=300)
 def get_testimonials(
     page_size: Annotated[int, Query(ge=1, description="Number of products per page")] = 10,
     page: Annotated[int, Query(ge=1, description="Page number (starts from 1)")] = 0,
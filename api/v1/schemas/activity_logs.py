@@ -1,5 +1,6 @@
 from pydantic import BaseModel
 from datetime import datetime
+from typing import List, Optional
 
 
 
@@ -9,6 +10,20 @@ class ActivityLogCreate(BaseModel):
 
 
 class ActivityLogResponse(BaseModel):
+    id: str
     action: str
     user_id: str
     timestamp: datetime
+
+
+class ActivityLogPage(BaseModel):
+    items: List[ActivityLogResponse]
+    # pass back as `cursor` for the next page; None on the last page
+    next_cursor: Optional[str] = None
+
+
+class ActivityLogPageResponse(BaseModel):
+    status_code: int
+    success: bool
+    message: str
+    data: ActivityLogPage
@@ -29,6 +29,18 @@ class APIStatusPost(BaseModel):
         populate_by_name = True
 
 
+class APIStatusBatch(BaseModel):
+    """
+    Pydantic model for recording the results of a whole monitoring run.
+
+    Attributes:
+        statuses (List[APIStatusPost]): One status per checked API group; when a
+            group appears more than once the last status is its current one.
+    """
+
+    statuses: List[APIStatusPost] = Field(..., min_length=1, max_length=1000)
+
+
 class APIStatusUpdate(BaseModel):
     """
     Pydantic model for updating an existing API status.
@@ -33,6 +33,8 @@ class BlogResponse(BaseModel):
     tags: Optional[List[str]]
     is_deleted: bool
     excerpt: Optional[str]
+    likes_count: int = 0
+    dislikes_count: int = 0
     created_at: datetime
     updated_at: datetime
 
@@ -49,6 +51,8 @@ class BlogPostResponse(BaseModel):
     is_deleted: bool
     excerpt: Optional[str]
     tags: Optional[str]
+    likes_count: int = 0
+    dislikes_count: int = 0
     created_at: datetime
     updated_at: datetime
 
@@ -56,6 +60,27 @@ class BlogPostResponse(BaseModel):
         from_attributes = True
 
 
+class BlogAuthorSummary(BaseModel):
+    id: str
+    first_name: Optional[str]
+    last_name: Optional[str]
+    avatar_url: Optional[str]
+
+
+class BlogFeedItem(BaseModel):
+    id: str
+    title: str
+    excerpt: Optional[str]
+    image_url: Optional[str]
+    tags: Optional[str]
+    likes_count: int = 0
+    dislikes_count: int = 0
+    comments_count: int = 0
+    author: BlogAuthorSummary
+    created_at: datetime
+    updated_at: datetime
+
+
 class BlogLikeDislikeCreate(BaseModel):
     id: str
     blog_id: str
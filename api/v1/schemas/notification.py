@@ -1,5 +1,6 @@
 from pydantic import BaseModel
 from datetime import datetime
+from typing import Optional
 
 
 class NotificationBase(BaseModel):
@@ -14,6 +15,34 @@ class NotificationCreate(BaseModel):
     message: str
 
 
+class OrganisationNotificationCreate(BaseModel):
+    title: str
+    message: str
+    # NotificationSetting flag members must have on, e.g. "mobile_push_notifications"
+    setting: Optional[str] = None
+
+
+class NotificationFanoutRead(BaseModel):
+    id: str
+    organisation_id: str
+    title: str
+    status: str
+    total: int
+    sent: int
+    skipped: int
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class NotificationsMarkRead(BaseModel):
+    # mark only this notification and the older ones; all when omitted
+    up_to: Optional[str] = None
+
+
 class NotificationRead(NotificationBase):
     id: str
     created_at: datetime
@@ -0,0 +1,17 @@
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+
+class ProfilerConfigUpdate(BaseModel):
+    """Schema for changing the background profiler settings"""
+
+    sample_rate: Optional[int] = Field(None, ge=0)
+    slow_threshold_ms: Optional[float] = Field(None, ge=0)
+
+
+class ProfilerArm(BaseModel):
+    """Schema for profiling the next requests to a path"""
+
+    path_prefix: str = Field(..., min_length=1)
+    count: int = Field(1, ge=1, le=100)
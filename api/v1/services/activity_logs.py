@@ -1,8 +1,41 @@
+from datetime import datetime, timezone
+from sqlalchemy import tuple_
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 from sqlalchemy.exc import SQLAlchemyError
+from uuid_extensions import uuid7
+from api.db.batch_writer import BatchWriter
+from api.db.partitions import MonthlyPartitions
+from api.utils.pagination import decode_cursor, encode_cursor
+from api.utils.settings import settings
 from api.v1.models.activity_logs import ActivityLog
-from typing import Optional, Any
+from api.v1.models.user import User
+from typing import Optional, Any, List, Tuple
+
+
+# Activity logs are written in batches; see api/db/batch_writer.py for what
+# that means for durability. A log shows up in reads once its batch is written.
+activity_log_writer = BatchWriter(
+    ActivityLog.__table__,
+    flush_interval_ms=settings.ACTIVITY_LOG_FLUSH_INTERVAL_MS,
+    max_batch=settings.ACTIVITY_LOG_BATCH_SIZE,
+    max_buffer=settings.ACTIVITY_LOG_BUFFER_SIZE,
+    # requests wait at most this long for room in a full buffer
+    put_timeout=0.1,
+)
+
+# monthly partitions on PostgreSQL; see api/db/partitions.py
+activity_log_partitions = MonthlyPartitions(
+    ActivityLog.__table__,
+    "timestamp",
+    months_ahead=settings.ACTIVITY_LOG_PARTITIONS_AHEAD,
+)
+
+
+def _utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
 
 
 
@@ -10,13 +43,22 @@ class ActivityLogService:
     """Activity Log service"""
 
     def create_activity_log(self, db: Session, user_id: str, action: str):
-        """Creates a new activity log"""
+        """Queues a new activity log for the batch writer"""
 
-        activity_log = ActivityLog(user_id=user_id, action=action)
-        db.add(activity_log)
-        db.commit()
-        db.refresh(activity_log)
-        return activity_log
+        # the batch would only fail on the foreign key, long after the request
+        if db.query(User.id).filter(User.id == user_id).first() is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="User not found"
+            )
+
+        row = {
+            "id": str(uuid7()),
+            "user_id": user_id,
+            "action": action,
+            "timestamp": datetime.now(timezone.utc),
+        }
+        activity_log_writer.add(row)
+        return ActivityLog(**row)
 
     def fetch_all(self, db: Session, **query_params: Optional[Any]):
         """Fetch all products with option tto search using query parameters"""
@@ -33,6 +75,52 @@ class ActivityLogService:
         
         return query.all()
     
+    def fetch_page(
+        self,
+        db: Session,
+        user_id: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[ActivityLog], Optional[str]]:
+        """Newest first page of logs in [since, until), optionally for one user.
+
+        Pages are keyset paginated on (timestamp, id): `cursor` is the
+        `next_cursor` returned with the previous page, None after the last.
+        The time window lets PostgreSQL scan only the partitions it covers.
+        """
+
+        conditions = []
+        if user_id:
+            conditions.append(ActivityLog.user_id == user_id)
+        if since:
+            conditions.append(ActivityLog.timestamp >= _utc(since))
+        if until:
+            conditions.append(ActivityLog.timestamp < _utc(until))
+        if cursor:
+            timestamp, log_id = decode_cursor(cursor, 2)
+            try:
+                timestamp = _utc(datetime.fromisoformat(timestamp))
+            except (TypeError, ValueError):
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+            conditions.append(ActivityLog.timestamp <= timestamp)
+            conditions.append(tuple_(ActivityLog.timestamp, ActivityLog.id) < (timestamp, log_id))
+
+        logs = list(
+            db.query(ActivityLog)
+            .filter(*conditions)
+            .order_by(ActivityLog.timestamp.desc(), ActivityLog.id.desc())
+            .limit(limit + 1)
+            .all()
+        )
+
+        next_cursor = None
+        if len(logs) > limit:
+            logs = logs[:limit]
+            next_cursor = encode_cursor(_utc(logs[-1].timestamp), logs[-1].id)
+        return logs, next_cursor
+
     def delete_activity_log_by_id(self, db: Session, log_id: str):
         log = db.query(ActivityLog).filter(ActivityLog.id == log_id).first()
 
@@ -1,25 +1,94 @@
-from typing import Any, List, Optional
-from api.core.base.services import Service
+import math
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from fastapi import HTTPException, status as http_status
+from sqlalchemy import and_, delete, func, insert, or_, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
-from api.v1.models.api_status import APIStatus
+from uuid_extensions import uuid7
+
+from api.core.base.services import Service
+from api.utils.logger import logger
+from api.utils.response_cache import invalidates_cache
+from api.utils.settings import settings
+from api.v1.models.api_status import APIStatus, APIStatusRollup, APIStatusSample
 from api.v1.schemas.api_status import APIStatusPost
-from fastapi import HTTPException
+
+
+_UPSERT = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+PERIODS = {"hour": timedelta(hours=1), "day": timedelta(days=1)}
+# rollups shown on the status page: the last 24 hours and the last 30 days
+WINDOWS = {"hour": 24, "day": 30}
+# any other status (e.g. "Degraded") still counts as up
+DOWN_STATUSES = ("Down",)
+
+_prune_lock = threading.Lock()
+_last_pruned: Optional[float] = None
+
+
+def bucket_start(moment: datetime, period: str) -> datetime:
+    '''Start of the hour or day (UTC) that `moment` falls in'''
+
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    start = moment.astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    if period == "day":
+        start = start.replace(hour=0)
+    return start
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    '''Nearest-rank percentile `q` (0-100) of the sorted `values`'''
+
+    if not values:
+        return None
+    rank = max(math.ceil(q / 100 * len(values)), 1)
+    return values[rank - 1]
+
+
+def _sample(schema: APIStatusPost, checked_at: datetime) -> dict:
+    return {
+        "id": str(uuid7()),
+        "api_group": schema.api_group,
+        "status": schema.status,
+        "response_time": float(schema.response_time) if schema.response_time is not None else None,
+        "checked_at": checked_at,
+    }
+
+
+def _summary(rollups: List[dict]) -> Optional[float]:
+    samples = sum(rollup["samples"] for rollup in rollups)
+    if not samples:
+        return None
+    return round(100 * sum(rollup["up"] for rollup in rollups) / samples, 2)
 
 
 class APIStatusService(Service):
+    """Latest status, history and rollups of the monitored API groups.
+
+    Every recorded status updates the group's row in `api_status` and is
+    appended to `api_status_samples`. The hourly and daily rollups (uptime
+    and p50/p95 response time) of the buckets a sample lands in are then
+    recomputed from that bucket's samples only, so rollups stay exact without
+    rescanning the history. Old samples and rollups are pruned with one
+    DELETE per table.
+    """
 
     @staticmethod
     def fetch(db: Session, status_id) -> APIStatus:
-        status = db.query(APIStatus).get(status_id).first()
+        return db.get(APIStatus, status_id)
 
-        return status
-    
     @staticmethod
     def fetch_by_api_group(db: Session, api_group) -> APIStatus:
         status = db.query(APIStatus).filter(APIStatus.api_group == api_group).first()
 
         return status
-    
+
     @staticmethod
     def fetch_all(db: Session, **query_params: Optional[Any]) -> List[APIStatus]:
         query = db.query(APIStatus)
@@ -33,12 +102,14 @@ class APIStatusService(Service):
         return query.all()
 
     @staticmethod
+    @invalidates_cache("api_status")
     def upsert(db: Session, schema: APIStatusPost) -> APIStatus:
         """
-        Upsert an API status record into the database.
+        Record the status of an API group.
 
-        This method attempts to insert a new API status record based on the provided schema.
-        If a record with the same api_group already exists, it will be updated with the new values.
+        The group's current status record is created or updated, the check is
+        appended to the status history and the group's hourly and daily
+        rollups are brought up to date, all in one transaction.
 
         Parameters:
             db (Session): The SQLAlchemy database session to perform the operation.
@@ -48,72 +119,355 @@ class APIStatusService(Service):
             APIStatus: The created or updated API status record.
 
         Raises:
-            SQLAlchemyError: If there is an issue with the database operation.
+            HTTPException: If there is an issue with the database operation.
+        """
+
+        checked_at = datetime.now(timezone.utc)
+        try:
+            current = APIStatusService._set_current(db, schema)
+            db.add(APIStatusSample(**_sample(schema, checked_at)))
+            db.flush()
+            APIStatusService.refresh_rollups(db, [(schema.api_group, checked_at)])
+            db.commit()
+            db.refresh(current)
+        except SQLAlchemyError:
+            db.rollback()
+            raise HTTPException(
+                status_code=http_status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="A database error occurred."
+            )
+
+        APIStatusService.prune_if_due(db)
+        return current
+
+    @staticmethod
+    @invalidates_cache("api_status")
+    def upsert_many(db: Session, schemas: List[APIStatusPost]) -> int:
         """
+        Record a batch of statuses (e.g. one monitoring run) in one transaction.
 
+        The current rows are written with one multi-row upsert on `api_group`
+        (the last status of a group in the batch wins), the samples with one
+        bulk insert, and the rollups of the touched buckets are refreshed
+        together.
+
+        Returns:
+            int: The number of API groups updated.
+        """
+
+        checked_at = datetime.now(timezone.utc)
+        latest = {schema.api_group: schema for schema in schemas}
         try:
-            existing_status = db.query(APIStatus).filter(APIStatus.api_group == schema.api_group).first()
-
-            if existing_status:
-                existing_status.api_group = schema.api_group
-                existing_status.status = schema.status
-                existing_status.response_time = schema.response_time
-                existing_status.details = schema.details
-
-                db.commit()
-                db.refresh(existing_status)
-                return existing_status
-            
-            status = APIStatus(
-                api_group=schema.api_group,
-                status=schema.status,
-                response_time=schema.response_time,
-                details=schema.details,
+            upsert = _UPSERT.get(db.get_bind().dialect.name)
+            if upsert is None:
+                for schema in latest.values():
+                    APIStatusService._set_current(db, schema)
+            else:
+                statement = upsert(APIStatus).values(
+                    [
+                        {
+                            "id": str(uuid7()),
+                            "api_group": schema.api_group,
+                            "status": schema.status,
+                            "response_time": schema.response_time,
+                            "details": schema.details,
+                            "last_checked": checked_at,
+                            "updated_at": checked_at,
+                        }
+                        for schema in latest.values()
+                    ]
+                )
+                db.execute(
+                    statement.on_conflict_do_update(
+                        index_elements=[APIStatus.api_group],
+                        set_={
+                            column: statement.excluded[column]
+                            for column in (
+                                "status",
+                                "response_time",
+                                "details",
+                                "last_checked",
+                                "updated_at",
+                            )
+                        },
+                    )
+                )
+
+            db.execute(
+                insert(APIStatusSample.__table__), [_sample(schema, checked_at) for schema in schemas]
             )
-            db.add(status)
+            APIStatusService.refresh_rollups(db, [(group, checked_at) for group in latest])
             db.commit()
-            db.refresh(status)
-            return status
-    
-        except Exception as e:
+        except SQLAlchemyError:
             db.rollback()
             raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                status_code=http_status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="A database error occurred."
             )
 
-    # @staticmethod
-    # def update(db: Session, schema: APIStatusPost) -> APIStatus:
-    #     status = APIStatus(
-    #         api_group=schema.api_group,
-    #         status=schema.status,
-    #         response_time=schema.response_time,
-    #         details=schema.details,
-    #     )
-    #     db.add(status)
-    #     db.commit()
-    #     db.refresh(status)
-    #     return status
-    
+        APIStatusService.prune_if_due(db)
+        return len(latest)
+
     @staticmethod
+    def _set_current(db: Session, schema: APIStatusPost) -> APIStatus:
+        current = db.query(APIStatus).filter(APIStatus.api_group == schema.api_group).first()
+        if current is None:
+            current = APIStatus(api_group=schema.api_group)
+            db.add(current)
+        current.status = schema.status
+        current.response_time = schema.response_time
+        current.details = schema.details
+        return current
+
+    @staticmethod
+    def refresh_rollups(db: Session, checks: Iterable[Tuple[str, datetime]]):
+        """Recomputes the rollups of the buckets the (api_group, checked_at) `checks` fall in.
+
+        Each touched bucket is rebuilt from its own samples, read with one
+        query per touched day; the caller commits.
+        """
+
+        # every touched hour lies within a touched day: read each day's samples once
+        days: Dict[datetime, Set[str]] = {}
+        touched = set()
+        for api_group, checked_at in checks:
+            days.setdefault(bucket_start(checked_at, "day"), set()).add(api_group)
+            for period in PERIODS:
+                touched.add((api_group, period, bucket_start(checked_at, period)))
+
+        samples: Dict[Tuple[str, str, datetime], List[tuple]] = {key: [] for key in touched}
+        for day, api_groups in days.items():
+            rows = db.execute(
+                select(
+                    APIStatusSample.api_group,
+                    APIStatusSample.checked_at,
+                    APIStatusSample.status,
+                    APIStatusSample.response_time,
+                ).where(
+                    APIStatusSample.api_group.in_(api_groups),
+                    APIStatusSample.checked_at >= day,
+                    APIStatusSample.checked_at < day + PERIODS["day"],
+                )
+            )
+            for api_group, checked_at, status, response_time in rows:
+                for period in PERIODS:
+                    key = (api_group, period, bucket_start(checked_at, period))
+                    if key in samples:
+                        samples[key].append((status, response_time))
+
+        rows = []
+        for (api_group, period, bucket), bucket_samples in sorted(samples.items()):
+            response_times = sorted(
+                response_time for _, response_time in bucket_samples if response_time is not None
+            )
+            rows.append(
+                {
+                    "api_group": api_group,
+                    "period": period,
+                    "bucket": bucket,
+                    "samples": len(bucket_samples),
+                    "up": sum(1 for status, _ in bucket_samples if status not in DOWN_STATUSES),
+                    "p50": percentile(response_times, 50),
+                    "p95": percentile(response_times, 95),
+                }
+            )
+        if not rows:
+            return
+
+        upsert = _UPSERT.get(db.get_bind().dialect.name)
+        if upsert is None:
+            for row in rows:
+                db.merge(APIStatusRollup(**row))
+            return
+
+        statement = upsert(APIStatusRollup).values(rows)
+        db.execute(
+            statement.on_conflict_do_update(
+                index_elements=[
+                    APIStatusRollup.api_group,
+                    APIStatusRollup.period,
+                    APIStatusRollup.bucket,
+                ],
+                set_={
+                    column: statement.excluded[column]
+                    for column in ("samples", "up", "p50", "p95")
+                },
+            )
+        )
+
+    @staticmethod
+    def overview(db: Session, now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """Current status of every API group with its recent hourly and daily rollups.
+
+        Two queries: the current statuses, and the rollups of every group
+        inside the status page windows.
+        """
+
+        now = now or datetime.now(timezone.utc)
+        since = {
+            period: bucket_start(now, period) - span * (WINDOWS[period] - 1)
+            for period, span in PERIODS.items()
+        }
+        rollups = db.execute(
+            select(APIStatusRollup)
+            .where(
+                or_(
+                    *(
+                        and_(APIStatusRollup.period == period, APIStatusRollup.bucket >= start)
+                        for period, start in since.items()
+                    )
+                )
+            )
+            .order_by(APIStatusRollup.api_group, APIStatusRollup.period, APIStatusRollup.bucket)
+        ).scalars()
+
+        history: Dict[str, Dict[str, List[dict]]] = {}
+        for rollup in rollups:
+            group = history.setdefault(rollup.api_group, {"hour": [], "day": []})
+            group[rollup.period].append(
+                {
+                    "bucket": bucket_start(rollup.bucket, rollup.period),
+                    "samples": rollup.samples,
+                    "up": rollup.up,
+                    "uptime": round(100 * rollup.up / rollup.samples, 2) if rollup.samples else None,
+                    "p50_response_time": rollup.p50,
+                    "p95_response_time": rollup.p95,
+                }
+            )
+
+        overview = []
+        for current in APIStatusService.fetch_all(db):
+            group = history.get(current.api_group, {"hour": [], "day": []})
+            overview.append(
+                {
+                    **{
+                        column.name: getattr(current, column.name)
+                        for column in APIStatus.__table__.columns
+                    },
+                    "uptime_24h": _summary(group["hour"]),
+                    "uptime_30d": _summary(group["day"]),
+                    "hourly": group["hour"],
+                    "daily": group["day"],
+                }
+            )
+        return overview
+
+    @staticmethod
+    @invalidates_cache("api_status")
+    def prune(db: Session, now: Optional[datetime] = None) -> Dict[str, int]:
+        """Deletes samples and rollups older than their retention periods.
+
+        Returns:
+            dict: rows deleted from the samples, hourly and daily rollups
+        """
+
+        now = now or datetime.now(timezone.utc)
+        cutoffs = {
+            "samples": (
+                APIStatusSample,
+                APIStatusSample.checked_at,
+                now - timedelta(days=settings.API_STATUS_SAMPLE_RETENTION_DAYS),
+                (),
+            ),
+            "hour": (
+                APIStatusRollup,
+                APIStatusRollup.bucket,
+                now - timedelta(days=settings.API_STATUS_HOURLY_RETENTION_DAYS),
+                (APIStatusRollup.period == "hour",),
+            ),
+            "day": (
+                APIStatusRollup,
+                APIStatusRollup.bucket,
+                now - timedelta(days=settings.API_STATUS_DAILY_RETENTION_DAYS),
+                (APIStatusRollup.period == "day",),
+            ),
+        }
+        deleted = {}
+        for name, (model, column, before, criteria) in cutoffs.items():
+            deleted[name] = db.execute(
+                delete(model)
+                .where(column < before, *criteria)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+        db.commit()
+        return deleted
+
+    @staticmethod
+    def prune_if_due(db: Session) -> Optional[Dict[str, int]]:
+        '''Prunes unless this process already did within API_STATUS_PRUNE_INTERVAL'''
+
+        global _last_pruned
+        with _prune_lock:
+            now = time.monotonic()
+            if _last_pruned is not None and now - _last_pruned < settings.API_STATUS_PRUNE_INTERVAL:
+                return None
+            _last_pruned = now
+
+        try:
+            return APIStatusService.prune(db)
+        except SQLAlchemyError as exc:
+            db.rollback()
+            logger.warning(f"Could not prune API status history: {exc}")
+            return None
+
+    @staticmethod
+    def deduplicate(db: Session) -> int:
+        """Keeps only the most recently updated status row of each API group.
+
+        Run once before adding the unique constraint on `api_group` to a
+        database that predates it.
+
+        Returns:
+            int: number of duplicate rows deleted
+        """
+
+        ranked = select(
+            APIStatus.id,
+            func.row_number()
+            .over(
+                partition_by=APIStatus.api_group,
+                order_by=(APIStatus.updated_at.desc(), APIStatus.id.desc()),
+            )
+            .label("rank"),
+        ).subquery()
+        deleted = db.execute(
+            delete(APIStatus)
+            .where(APIStatus.id.in_(select(ranked.c.id).where(ranked.c.rank > 1)))
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.commit()
+        return deleted
+
+    @staticmethod
+    @invalidates_cache("api_status")
     def delete_by_api_group(db: Session, api_group) -> APIStatus:
         status = db.query(APIStatus).filter(APIStatus.api_group == api_group).first()
-        db.delete(status)
+        for model in (APIStatus, APIStatusSample, APIStatusRollup):
+            db.execute(
+                delete(model)
+                .where(model.api_group == api_group)
+                .execution_options(synchronize_session=False)
+            )
         db.commit()
         return status
-    
+
     @staticmethod
-    def delete_all(db: Session) -> List[APIStatus]:
-        statuses = db.query(APIStatus).all()
-        for status in statuses:
-            db.delete(status)
+    @invalidates_cache("api_status")
+    def delete_all(db: Session) -> int:
+        """Deletes every API status with its history; returns the statuses deleted"""
+
+        deleted = db.execute(
+            delete(APIStatus).execution_options(synchronize_session=False)
+        ).rowcount
+        for model in (APIStatusSample, APIStatusRollup):
+            db.execute(delete(model).execution_options(synchronize_session=False))
         db.commit()
-        return status
-    
+        return deleted
+
     @staticmethod
     def create():
         pass
 
     @staticmethod
     def update():
-        pass
\ No newline at end of file
+        pass
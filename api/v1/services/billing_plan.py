@@ -3,6 +3,7 @@ from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from api.v1.models.billing_plan import BillingPlan
 from typing import Any, Optional
 from api.core.base.services import Service
+from api.utils.response_cache import invalidates_cache
 from api.v1.schemas.plans import CreateBillingPlanSchema
 from api.utils.db_validators import check_model_existence
 from fastapi import HTTPException, status
@@ -11,6 +12,7 @@ from fastapi import HTTPException, status
 class BillingPlanService(Service):
     """Product service functionality"""
 
+    @invalidates_cache("billing_plan")
     def create(self, db: Session, request: CreateBillingPlanSchema):
         """
         Create and return a new billing plan, ensuring a plan name can only exist 
@@ -81,6 +83,7 @@ class BillingPlanService(Service):
 
 
 
+    @invalidates_cache("billing_plan")
     def delete(self, db: Session, id: str):
         """
         delete a plan by plan id
@@ -100,6 +103,7 @@ class BillingPlanService(Service):
 
         return billing_plan
 
+    @invalidates_cache("billing_plan")
     def update(self, db: Session, id: str, schema):
         """
         fetch and update a billing plan
@@ -1,6 +1,7 @@
 from typing import Optional
 
 from fastapi import HTTPException, status
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
 from api.core.base.services import Service
@@ -8,7 +9,12 @@ from api.utils.db_validators import check_model_existence
 from api.v1.models.blog import Blog, BlogDislike, BlogLike
 from api.v1.models.comment import Comment
 from api.v1.models.user import User
-from api.v1.schemas.blog import BlogCreate
+from api.v1.schemas.blog import BlogAuthorSummary, BlogCreate, BlogFeedItem
+from api.v1.services.like_counter import like_counter_service
+
+
+# Length of the excerpt derived from the content for posts without one
+FEED_EXCERPT_LENGTH = 200
 
 
 class BlogService:
@@ -32,6 +38,87 @@ class BlogService:
         blogs = self.db.query(Blog).filter(Blog.is_deleted == False).all()
         return blogs
 
+    def fetch_feed(self, skip: int = 0, limit: int = 10):
+        """Fetch a page of the public blog feed in a single query.
+
+        Each item carries the author summary, like/dislike/comment counts and
+        an excerpt. Soft-deleted posts are excluded, which lets the query use
+        the partial `idx_blogs_feed_created_at` index.
+
+        Returns:
+            tuple: total number of live posts and the list of `BlogFeedItem`
+        """
+
+        comments_count = (
+            select(func.count(Comment.id))
+            .where(Comment.blog_id == Blog.id)
+            .correlate(Blog)
+            .scalar_subquery()
+        )
+        rows = (
+            self.db.query(
+                Blog.id,
+                Blog.title,
+                func.coalesce(
+                    Blog.excerpt, func.substr(Blog.content, 1, FEED_EXCERPT_LENGTH)
+                ).label("excerpt"),
+                Blog.image_url,
+                Blog.tags,
+                Blog.likes_count,
+                Blog.dislikes_count,
+                comments_count.label("comments_count"),
+                Blog.created_at,
+                Blog.updated_at,
+                User.id.label("author_id"),
+                User.first_name,
+                User.last_name,
+                User.avatar_url,
+                # total number of live posts, computed in the same round trip
+                func.count().over().label("total"),
+            )
+            .join(User, Blog.author_id == User.id)
+            .filter(Blog.is_deleted == False)
+            .order_by(Blog.created_at.desc(), Blog.id.desc())
+            .offset(skip)
+            .limit(limit)
+            .all()
+        )
+
+        if rows:
+            total = rows[0].total
+        elif skip:
+            # past the last page, the window total is not available
+            total = (
+                self.db.query(func.count(Blog.id))
+                .filter(Blog.is_deleted == False)
+                .scalar()
+            )
+        else:
+            total = 0
+
+        items = [
+            BlogFeedItem(
+                id=row.id,
+                title=row.title,
+                excerpt=row.excerpt,
+                image_url=row.image_url,
+                tags=row.tags,
+                likes_count=row.likes_count or 0,
+                dislikes_count=row.dislikes_count or 0,
+                comments_count=row.comments_count or 0,
+                author=BlogAuthorSummary(
+                    id=row.author_id,
+                    first_name=row.first_name,
+                    last_name=row.last_name,
+                    avatar_url=row.avatar_url,
+                ),
+                created_at=row.created_at,
+                updated_at=row.updated_at,
+            )
+            for row in rows
+        ]
+        return total, items
+
     def fetch(self, blog_id: str):
         """Fetch a blog post by its ID"""
 
@@ -84,6 +171,7 @@ class BlogService:
             blog_id=blog_id, user_id=user_id, ip_address=ip_address
         )
         db.add(blog_like)
+        like_counter_service.increment(db, Blog.likes_count, blog_id)
         db.commit()
         db.refresh(blog_like)
         return blog_like
@@ -96,10 +184,31 @@ class BlogService:
             blog_id=blog_id, user_id=user_id, ip_address=ip_address
         )
         db.add(blog_dislike)
+        like_counter_service.increment(db, Blog.dislikes_count, blog_id)
         db.commit()
         db.refresh(blog_dislike)
         return blog_dislike
 
+    def delete_blog_like(self, blog_id: str, user_id: str) -> bool:
+        """Removes a user's like from a blog post; False when there was none"""
+        blog_like = self.fetch_blog_like(blog_id, user_id)
+        if not blog_like:
+            return False
+        self.db.delete(blog_like)
+        like_counter_service.decrement(self.db, Blog.likes_count, blog_id)
+        self.db.commit()
+        return True
+
+    def delete_blog_dislike(self, blog_id: str, user_id: str) -> bool:
+        """Removes a user's dislike from a blog post; False when there was none"""
+        blog_dislike = self.fetch_blog_dislike(blog_id, user_id)
+        if not blog_dislike:
+            return False
+        self.db.delete(blog_dislike)
+        like_counter_service.decrement(self.db, Blog.dislikes_count, blog_id)
+        self.db.commit()
+        return True
+
     def fetch_blog_like(self, blog_id: str, user_id: str):
         """Fetch a blog like by blog ID & ID of user who liked it"""
         blog_like = (
@@ -136,11 +245,11 @@ class BlogService:
 
     def num_of_likes(self, blog_id: str) -> int:
         """Get the number of likes a blog post has"""
-        return self.db.query(BlogLike).filter_by(blog_id=blog_id).count()
+        return self.db.query(Blog.likes_count).filter_by(id=blog_id).scalar() or 0
 
     def num_of_dislikes(self, blog_id: str) -> int:
         """Get the number of dislikes a blog post has"""
-        return self.db.query(BlogDislike).filter_by(blog_id=blog_id).count()
+        return self.db.query(Blog.dislikes_count).filter_by(id=blog_id).scalar() or 0
 
     def delete(self, blog_id: str):
         post = self.fetch(blog_id=blog_id)
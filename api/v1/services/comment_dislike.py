@@ -6,6 +6,7 @@ from api.core.base.services import Service
 from api.utils.db_validators import check_model_existence
 from api.v1.models import Comment, CommentDislike
 from api.v1.models.comment import Comment
+from api.v1.services.like_counter import like_counter_service
 
 
 class CommentDislikeService(Service):
@@ -28,6 +29,7 @@ class CommentDislikeService(Service):
             comment_id=comment_id, user_id=user_id, ip_address=client_ip
         )
         db.add(new_dislike)
+        like_counter_service.increment(db, Comment.dislikes_count, comment_id)
         db.commit()
         db.refresh(new_dislike)
         return new_dislike
@@ -70,8 +72,9 @@ class CommentDislikeService(Service):
     def delete(self, db: Session, id: str):
         """Deletes a comment"""
 
-        comment = self.fetch(id=id)
-        db.delete(comment)
+        comment_dislike = self.fetch(db=db, id=id)
+        db.delete(comment_dislike)
+        like_counter_service.decrement(db, Comment.dislikes_count, comment_dislike.comment_id)
         db.commit()
 
 
@@ -5,6 +5,7 @@ from api.core.base.services import Service
 from api.utils.db_validators import check_model_existence
 from api.v1.models import Comment, CommentLike
 from api.v1.models.comment import Comment
+from api.v1.services.like_counter import like_counter_service
 
 
 class CommentLikeService(Service):
@@ -24,6 +25,7 @@ class CommentLikeService(Service):
             comment_id=comment_id, user_id=user_id, ip_address=client_ip
         )
         db.add(new_like)
+        like_counter_service.increment(db, Comment.likes_count, comment_id)
         db.commit()
         db.refresh(new_like)
         return new_like
@@ -64,8 +66,9 @@ class CommentLikeService(Service):
     def delete(self, db: Session, id: str):
         """Deletes a comment like"""
 
-        comment = self.fetch(id=id)
-        db.delete(comment)
+        comment_like = self.fetch(db=db, id=id)
+        db.delete(comment_like)
+        like_counter_service.decrement(db, Comment.likes_count, comment_like.comment_id)
         db.commit()
 
 
@@ -1,15 +1,20 @@
 from typing import Optional
-from fastapi_mail import FastMail, MessageSchema, ConnectionConfig
 from pydantic import EmailStr
 import os
 from dotenv import load_dotenv
 from fastapi import BackgroundTasks
+from functools import cached_property
 
 load_dotenv()
 
 class EmailService:
-    def __init__(self):
-        self.conf = ConnectionConfig(
+    # fastapi_mail is slow to import; the client is built on the first email
+
+    @cached_property
+    def conf(self):
+        from fastapi_mail import ConnectionConfig
+
+        return ConnectionConfig(
             MAIL_USERNAME=os.getenv("MAIL_USERNAME"),
             MAIL_PASSWORD=os.getenv("MAIL_PASSWORD"),
             MAIL_FROM=os.getenv("MAIL_FROM"),
@@ -20,7 +25,12 @@ class EmailService:
             MAIL_STARTTLS = False,
             MAIL_SSL_TLS = True,
         )
-        self.fast_mail = FastMail(self.conf)
+
+    @cached_property
+    def fast_mail(self):
+        from fastapi_mail import FastMail
+
+        return FastMail(self.conf)
 
     async def send_email(
         self, 
@@ -30,6 +40,8 @@ class EmailService:
         body: str, 
         from_name: Optional[str] = None
     ):
+        from fastapi_mail import MessageSchema
+
         message = MessageSchema(
             subject=subject,
             recipients=[to_email],
@@ -42,7 +54,7 @@ class EmailService:
 
         return {"message": "Email sending in the background"}
 
-    async def _send_email_task(self, message: MessageSchema):
+    async def _send_email_task(self, message):
         try:
             await self.fast_mail.send_message(message)
         except Exception as e:
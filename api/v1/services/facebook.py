@@ -1,9 +1,9 @@
-import requests
 from fastapi import Depends, HTTPException
 from sqlalchemy.orm import Session
 from typing import Annotated
 from uuid_extensions import uuid7
 from api.core.base.services import Service
+from api.utils.http_client import provider_clients
 from api.utils.settings import settings
 from api.v1.routes.facebook_login import get_db
 from api.v1.models import *
@@ -85,7 +85,7 @@ class FbUserService(Service):
 
     # ------------ Helper functions ------------ #
     # Validation
-    def validate_facebook_token(self, user_token: str):
+    async def validate_facebook_token(self, user_token: str):
         """Validate Facebook token."""
         if not self.__clientId or not self.__clientSecret:
             raise HTTPException(
@@ -100,7 +100,7 @@ class FbUserService(Service):
             + "&grant_type=client_credentials"
         )
         try:
-            appToken = requests.get(appLink).json()["access_token"]
+            appToken = (await provider_clients.request("facebook", "GET", appLink)).json()["access_token"]
         except (ValueError, KeyError, TypeError) as error:
             return error
         secondAccessToken = (
@@ -110,7 +110,7 @@ class FbUserService(Service):
             + appToken
         )
         try:
-            data = requests.get(secondAccessToken).json()["data"]
+            data = (await provider_clients.request("facebook", "GET", secondAccessToken)).json()["data"]
             if not data.get("is_valid"):
                 return None
             userId = data.get("user_id")
@@ -119,7 +119,7 @@ class FbUserService(Service):
         return userId
 
     # Generation
-    def get_facebook_user_data(self, user_token: str):
+    async def get_facebook_user_data(self, user_token: str):
         """Retrieve Facebook user data."""
         dataLink = (
             "https://graph.facebook.com/v20.0/me?fields="
@@ -127,7 +127,7 @@ class FbUserService(Service):
             + user_token
         )
         try:
-            userData = requests.get(dataLink).json()
+            userData = (await provider_clients.request("facebook", "GET", dataLink)).json()
         except (ValueError, KeyError, TypeError) as error:
             return error
         userData["provider"] = "facebook"
@@ -1,6 +1,7 @@
 from typing import Any, Optional
 from sqlalchemy.orm import Session
 from api.core.base.services import Service
+from api.utils.response_cache import invalidates_cache
 from api.v1.models.faq import FAQ
 from api.v1.schemas.faq import CreateFAQ, UpdateFAQ
 from api.utils.db_validators import check_model_existence
@@ -9,6 +10,7 @@ from api.utils.db_validators import check_model_existence
 class FAQService(Service):
     '''FAQ service functionality'''
 
+    @invalidates_cache("faq")
     def create(self, db: Session, schema: CreateFAQ):
         """Create a new FAQ"""
 
@@ -59,6 +61,7 @@ class FAQService(Service):
         faq = check_model_existence(db, FAQ, faq_id)
         return faq
 
+    @invalidates_cache("faq")
     def update(self, db: Session, faq_id: str, schema: UpdateFAQ):
         """Updates an FAQ"""
 
@@ -73,6 +76,7 @@ class FAQService(Service):
         db.refresh(faq)
         return faq
 
+    @invalidates_cache("faq")
     def delete(self, db: Session, faq_id: str):
         """Deletes an FAQ"""
 
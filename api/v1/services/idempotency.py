@@ -0,0 +1,217 @@
+"""Stored Idempotency-Key requests and their responses.
+
+A request claims its key by inserting a "processing" row; the insert only
+succeeds for the first of several concurrent duplicates, in any worker, so
+the row doubles as the lock the others wait on. The first request then
+stores its response on the row and the duplicates, as well as later
+retries, are answered from it. A claim whose request crashed is taken over
+once it is older than IDEMPOTENCY_LOCK_TIMEOUT.
+
+Rows live IDEMPOTENCY_KEY_TTL seconds and are deleted in bulk, at most once
+per IDEMPOTENCY_PRUNE_INTERVAL per process (or by
+`python -m scripts.prune_idempotency_keys`).
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+
+from sqlalchemy import delete, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from api.utils.logger import logger
+from api.utils.settings import settings
+from api.v1.models.idempotency import IdempotencyKey
+
+
+_UPSERT = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+# outcomes of `claim`
+CLAIMED = "claimed"
+COMPLETED = "completed"
+PROCESSING = "processing"
+MISMATCH = "mismatch"
+
+_prune_lock = threading.Lock()
+_last_pruned: Optional[float] = None
+
+
+def _aware(moment: datetime) -> datetime:
+    # SQLite hands back naive datetimes
+    return moment if moment.tzinfo else moment.replace(tzinfo=timezone.utc)
+
+
+class IdempotencyService:
+    """Claims, completes and expires Idempotency-Key rows"""
+
+    @staticmethod
+    def _insert(db: Session, row: dict) -> bool:
+        upsert = _UPSERT.get(db.get_bind().dialect.name)
+        if upsert is None:
+            try:
+                with db.begin_nested():
+                    db.add(IdempotencyKey(**row))
+                return True
+            except IntegrityError:
+                return False
+
+        result = db.execute(
+            upsert(IdempotencyKey)
+            .values(**row)
+            .on_conflict_do_nothing(index_elements=["scope", "key"])
+        )
+        return result.rowcount == 1
+
+    @staticmethod
+    def claim(
+        db: Session,
+        scope: str,
+        key: str,
+        method: str,
+        path: str,
+        fingerprint: str,
+        now: Optional[datetime] = None,
+    ) -> Tuple[str, Optional[IdempotencyKey]]:
+        """Claims `key` for a request unless it is already known.
+
+        Returns:
+            tuple: (CLAIMED, None) when the caller must execute the request,
+            (COMPLETED, row) when its stored response must be replayed,
+            (PROCESSING, row) while another request holds the claim and
+            (MISMATCH, row) when the key was used for a different request
+        """
+
+        now = now or datetime.now(timezone.utc)
+        row = {
+            "scope": scope,
+            "key": key,
+            "method": method,
+            "path": path,
+            "fingerprint": fingerprint,
+            "status": PROCESSING,
+            "locked_at": now,
+            "created_at": now,
+            "expires_at": now + timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL),
+        }
+        claimed = IdempotencyService._insert(db, row)
+        if not claimed:
+            # an expired row that was not pruned yet does not count
+            claimed = db.execute(
+                delete(IdempotencyKey).where(
+                    IdempotencyKey.scope == scope,
+                    IdempotencyKey.key == key,
+                    IdempotencyKey.expires_at <= now,
+                )
+            ).rowcount == 1 and IdempotencyService._insert(db, row)
+        db.commit()
+        if claimed:
+            return CLAIMED, None
+
+        existing = db.get(IdempotencyKey, (scope, key), populate_existing=True)
+        if existing is None:
+            # deleted in the meantime (expired or released): try once more
+            claimed = IdempotencyService._insert(db, row)
+            db.commit()
+            if claimed:
+                return CLAIMED, None
+            existing = db.get(IdempotencyKey, (scope, key), populate_existing=True)
+
+        if existing.fingerprint != fingerprint:
+            return MISMATCH, existing
+        if existing.status == COMPLETED:
+            return COMPLETED, existing
+
+        stale = now - timedelta(seconds=settings.IDEMPOTENCY_LOCK_TIMEOUT)
+        if _aware(existing.locked_at) <= stale:
+            taken = db.execute(
+                update(IdempotencyKey)
+                .where(
+                    IdempotencyKey.scope == scope,
+                    IdempotencyKey.key == key,
+                    IdempotencyKey.status == PROCESSING,
+                    IdempotencyKey.locked_at == existing.locked_at,
+                )
+                .values(locked_at=now)
+            ).rowcount == 1
+            db.commit()
+            if taken:
+                logger.warning(f"Took over the stale idempotency claim on {method} {path}")
+                return CLAIMED, None
+        return PROCESSING, existing
+
+    @staticmethod
+    def get(db: Session, scope: str, key: str) -> Optional[IdempotencyKey]:
+        return db.get(IdempotencyKey, (scope, key), populate_existing=True)
+
+    @staticmethod
+    def complete(
+        db: Session,
+        scope: str,
+        key: str,
+        status_code: int,
+        headers: List[List[str]],
+        body: bytes,
+    ):
+        '''Stores the response of a claimed request, which releases its duplicates'''
+
+        db.execute(
+            update(IdempotencyKey)
+            .where(IdempotencyKey.scope == scope, IdempotencyKey.key == key)
+            .values(
+                status=COMPLETED,
+                response_status=status_code,
+                response_headers=headers,
+                response_body=body,
+            )
+        )
+        db.commit()
+        IdempotencyService.prune_if_due(db)
+
+    @staticmethod
+    def release(db: Session, scope: str, key: str):
+        '''Drops an unfinished claim so that a retry executes the request again'''
+
+        db.execute(
+            delete(IdempotencyKey).where(
+                IdempotencyKey.scope == scope,
+                IdempotencyKey.key == key,
+                IdempotencyKey.status == PROCESSING,
+            )
+        )
+        db.commit()
+
+    @staticmethod
+    def prune(db: Session, now: Optional[datetime] = None) -> int:
+        """Deletes every expired key in one statement.
+
+        Returns:
+            int: number of keys deleted
+        """
+
+        now = now or datetime.now(timezone.utc)
+        deleted = db.execute(
+            delete(IdempotencyKey).where(IdempotencyKey.expires_at <= now)
+        ).rowcount
+        db.commit()
+        return deleted
+
+    @staticmethod
+    def prune_if_due(db: Session) -> Optional[int]:
+        '''Prunes unless this process already did within IDEMPOTENCY_PRUNE_INTERVAL'''
+
+        global _last_pruned
+        with _prune_lock:
+            now = time.monotonic()
+            if _last_pruned is not None and now - _last_pruned < settings.IDEMPOTENCY_PRUNE_INTERVAL:
+                return None
+            _last_pruned = now
+
+        try:
+            return IdempotencyService.prune(db)
+        except SQLAlchemyError as exc:
+            db.rollback()
+            logger.warning(f"Could not prune idempotency keys: {exc}")
+            return None
@@ -0,0 +1,70 @@
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from api.v1.models.blog import Blog, BlogDislike, BlogLike
+from api.v1.models.comment import Comment, CommentDislike, CommentLike
+
+
+# (counter column, row model, foreign key on the row model) for every
+# denormalized like/dislike counter in the schema
+COUNTERS = (
+    (Blog.likes_count, BlogLike, BlogLike.blog_id),
+    (Blog.dislikes_count, BlogDislike, BlogDislike.blog_id),
+    (Comment.likes_count, CommentLike, CommentLike.comment_id),
+    (Comment.dislikes_count, CommentDislike, CommentDislike.comment_id),
+)
+
+
+class LikeCounterService:
+    """Maintains the denormalized like/dislike counters on blogs and comments.
+
+    The counters are adjusted with a single relative ``UPDATE`` inside the
+    caller's transaction, so they commit (or roll back) together with the
+    like/dislike row that caused the change. ``reconcile`` recomputes them
+    from the like tables to repair any drift (e.g. rows removed by raw SQL).
+    """
+
+    def increment(self, db: Session, counter, obj_id: str):
+        """Adds one to `counter` for the row with id `obj_id`"""
+
+        model = counter.class_
+        db.query(model).filter(model.id == obj_id).update(
+            {counter: counter + 1}, synchronize_session=False
+        )
+
+    def decrement(self, db: Session, counter, obj_id: str):
+        """Subtracts one from `counter` for the row with id `obj_id`, never going below zero"""
+
+        model = counter.class_
+        db.query(model).filter(model.id == obj_id, counter > 0).update(
+            {counter: counter - 1}, synchronize_session=False
+        )
+
+    def reconcile(self, db: Session) -> int:
+        """Recomputes every counter from the like tables.
+
+        Only rows whose stored value has drifted are rewritten.
+
+        Returns:
+            int: number of counter values repaired
+        """
+
+        repaired = 0
+        for counter, row_model, foreign_key in COUNTERS:
+            model = counter.class_
+            actual = (
+                select(func.count(row_model.id))
+                .where(foreign_key == model.id)
+                .scalar_subquery()
+            )
+            repaired += (
+                db.query(model)
+                .filter(counter != actual)
+                .update({counter: actual}, synchronize_session=False)
+            )
+
+        db.commit()
+        return repaired
+
+
+like_counter_service = LikeCounterService()
@@ -1,50 +1,183 @@
+import json
+from typing import AsyncIterator, List, Optional
+
 from fastapi import Depends, HTTPException
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import or_
 from sqlalchemy.orm import Session
 
 from api.core.base.services import Service
 from api.db.database import get_db
+from api.utils.pagination import decode_cursor, encode_cursor
+from api.utils.pubsub import Subscription, broker
+from api.utils.settings import settings
 from api.v1.models.notifications import Notification
 from api.v1.models.user import User
+from api.v1.services.notification_counter import notification_counter_service
+
+
+BROADCAST_CHANNEL = "notifications:all"
+# milliseconds a disconnected client waits before reconnecting
+STREAM_RETRY_MS = 3000
+
+
+def notification_channels(user_id: str):
+    '''Channels a user's stream listens to: their own and the broadcast one'''
+
+    return (f"notifications:{user_id}", BROADCAST_CHANNEL)
+
+
+def notification_event(notification: Notification) -> dict:
+    return jsonable_encoder(
+        {
+            "id": notification.id,
+            "user_id": notification.user_id,
+            "title": notification.title,
+            "message": notification.message,
+            "status": notification.status,
+            "created_at": notification.created_at,
+        }
+    )
+
+
+def format_sse(event: dict) -> str:
+    '''A notification as a server-sent event; its id is what clients resume from'''
+
+    return f"id: {event['id']}\nevent: notification\ndata: {json.dumps(event)}\n\n"
 
 
 class NotificationService(Service):
 
     def send_notification(
-        self, title: str, message: str, db: Session = Depends(get_db)
+        self,
+        title: str,
+        message: str,
+        db: Session = Depends(get_db),
+        user_id: Optional[str] = None,
     ):
-        """Function to send a notification"""
-        new_notification = Notification(title=title, message=message, status="unread")
+        """Function to send a notification, to one user or, without `user_id`, to everyone"""
+        new_notification = Notification(
+            title=title, message=message, status="unread", user_id=user_id
+        )
         db.add(new_notification)
+        if user_id:
+            notification_counter_service.increment(db, user_id)
         db.commit()
         db.refresh(new_notification)
+
+        channel = f"notifications:{user_id}" if user_id else BROADCAST_CHANNEL
+        broker.publish(channel, notification_event(new_notification))
         return new_notification
 
+    def missed_notifications(
+        self, user: User, db: Session, last_event_id: str, limit: Optional[int] = None
+    ) -> List[dict]:
+        """Notifications for `user` newer than `last_event_id`, oldest first.
+
+        Ids are uuid7, which sort by creation time, so the last id a client
+        received is enough to find what it missed.
+        """
+
+        notifications = (
+            db.query(Notification)
+            .filter(
+                or_(Notification.user_id == user.id, Notification.user_id.is_(None)),
+                Notification.id > last_event_id,
+            )
+            .order_by(Notification.id)
+            .limit(limit or settings.NOTIFICATION_STREAM_REPLAY_LIMIT)
+            .all()
+        )
+        return [notification_event(notification) for notification in notifications]
+
+    async def stream(
+        self,
+        subscription: Subscription,
+        missed: List[dict] = (),
+        heartbeat: Optional[float] = None,
+    ) -> AsyncIterator[str]:
+        """Server-sent events: the missed notifications, then new ones as they are sent.
+
+        A comment line is sent every `heartbeat` seconds so proxies keep the
+        connection open. The stream ends when the client falls too far
+        behind; it then reconnects with Last-Event-ID and catches up.
+        """
+
+        heartbeat = heartbeat or settings.NOTIFICATION_STREAM_HEARTBEAT
+        try:
+            yield f"retry: {STREAM_RETRY_MS}\n\n"
+            replayed = set()
+            for event in missed:
+                replayed.add(event["id"])
+                yield format_sse(event)
+
+            while not subscription.lagged:
+                event = await subscription.get(timeout=heartbeat)
+                if event is None:
+                    yield ": keep-alive\n\n"
+                elif event["id"] not in replayed:
+                    yield format_sse(event)
+        finally:
+            broker.unsubscribe(subscription)
+
     def mark_notification_as_read(
         self,
         notification_id: str,
         user: User,
         db: Session = Depends(get_db),
     ):
-        notification = (
+        updated = (
             db.query(Notification)
-            .filter(Notification.id == notification_id, Notification.user_id == user.id)
-            .first()
+            .filter(
+                Notification.id == notification_id,
+                Notification.user_id == user.id,
+                Notification.status != "read",
+            )
+            .update({Notification.status: "read"}, synchronize_session=False)
         )
 
-        if not notification:
-            raise HTTPException(status_code=404, detail="Notification not found")
-
-        # check if the notification is marked as read
-        if notification.status == "read":
+        if not updated:
+            exists = (
+                db.query(Notification.id)
+                .filter(Notification.id == notification_id, Notification.user_id == user.id)
+                .first()
+            )
+            if not exists:
+                raise HTTPException(status_code=404, detail="Notification not found")
+            # already read
             return
 
-        # update notification status
-        notification.status = "read"
+        notification_counter_service.decrement(db, user.id)
+        db.commit()
+
+    def mark_all_as_read(self, user: User, db: Session, up_to: Optional[str] = None) -> int:
+        """Marks the user's unread notifications as read in one UPDATE.
+
+        With `up_to` (a notification id), only that notification and the
+        older ones are marked, e.g. everything the client has displayed.
+
+        Returns:
+            int: number of notifications marked as read
+        """
 
-        # commit changes
+        conditions = [Notification.user_id == user.id, Notification.status == "unread"]
+        if up_to:
+            conditions.append(Notification.id <= up_to)
+
+        updated = (
+            db.query(Notification)
+            .filter(*conditions)
+            .update({Notification.status: "read"}, synchronize_session=False)
+        )
+        # not a reset to zero: a notification committed meanwhile, which this
+        # UPDATE did not see, is still unread and already counted
+        if updated:
+            notification_counter_service.decrement(db, user.id, updated)
         db.commit()
-        db.refresh(notification)
-        return notification
+        return updated
+
+    def unread_count(self, user: User, db: Session) -> int:
+        return notification_counter_service.unread_count(db, user.id)
 
     def delete_notification(
         self,
@@ -65,14 +198,35 @@ class NotificationService(Service):
                 detail="You do not have permission to delete this notification",
             )
 
+        if notification.status == "unread":
+            notification_counter_service.decrement(db, user.id)
         db.delete(notification)
         db.commit()
-        db.refresh()
 
-    def get_current_user_notifications(self, user: User, db: Session = Depends(get_db)):
-        """Endpoint to get current user notifications"""
+    def get_current_user_notifications(
+        self,
+        user: User,
+        db: Session = Depends(get_db),
+        limit: int = 20,
+        cursor: Optional[str] = None,
+    ):
+        """Current user's notifications, newest first, a page at a time.
+
+        Keyset paginated on id (uuid7, so creation order): `cursor` is the
+        `next_cursor` of the previous page, None after the last one.
+        """
+
+        query = db.query(Notification).filter(Notification.user_id == user.id)
+        if cursor:
+            (before,) = decode_cursor(cursor, 1)
+            query = query.filter(Notification.id < before)
 
-        return {"notifications": user.notifications}
+        notifications = list(query.order_by(Notification.id.desc()).limit(limit + 1).all())
+        next_cursor = None
+        if len(notifications) > limit:
+            notifications = notifications[:limit]
+            next_cursor = encode_cursor(notifications[-1].id)
+        return {"notifications": notifications, "next_cursor": next_cursor}
 
     def fetch_notification_by_id(
         self, notification_id: str, db: Session = Depends(get_db)
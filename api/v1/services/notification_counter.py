@@ -0,0 +1,150 @@
+from typing import List
+
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from api.v1.models.notifications import Notification, NotificationCounter
+
+
+_UPSERT = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+class NotificationCounterService:
+    """Maintains each user's count of unread notifications.
+
+    The counter is adjusted inside the caller's transaction, so it commits
+    (or rolls back) together with the notification change that caused it.
+    A user without a counter row gets one computed from the notifications
+    table on first read. ``reconcile`` recomputes every counter to repair
+    drift (e.g. rows changed by raw SQL).
+
+    Only notifications addressed to the user count; broadcasts (no user)
+    have no per-user read state.
+    """
+
+    def increment(self, db: Session, user_id: str, by: int = 1):
+        """Adds `by` to the user's unread counter, creating the row if needed"""
+
+        upsert = _UPSERT.get(db.get_bind().dialect.name)
+        if upsert is not None:
+            statement = upsert(NotificationCounter).values(user_id=user_id, unread=by)
+            db.execute(
+                statement.on_conflict_do_update(
+                    index_elements=[NotificationCounter.user_id],
+                    set_={"unread": NotificationCounter.unread + by},
+                )
+            )
+            return
+
+        result = db.execute(
+            update(NotificationCounter)
+            .where(NotificationCounter.user_id == user_id)
+            .values(unread=NotificationCounter.unread + by)
+        )
+        if result.rowcount == 0:
+            db.execute(insert(NotificationCounter).values(user_id=user_id, unread=by))
+
+    def increment_many(self, db: Session, user_ids: List[str]):
+        """Adds one to the unread counter of each of `user_ids`, in one statement where possible"""
+
+        if not user_ids:
+            return
+        upsert = _UPSERT.get(db.get_bind().dialect.name)
+        if upsert is None:
+            for user_id in user_ids:
+                self.increment(db, user_id)
+            return
+
+        statement = upsert(NotificationCounter).values(
+            [{"user_id": user_id, "unread": 1} for user_id in user_ids]
+        )
+        db.execute(
+            statement.on_conflict_do_update(
+                index_elements=[NotificationCounter.user_id],
+                set_={"unread": NotificationCounter.unread + statement.excluded.unread},
+            )
+        )
+
+    def decrement(self, db: Session, user_id: str, by: int = 1):
+        """Subtracts `by` from the user's unread counter, never going below zero"""
+
+        db.execute(
+            update(NotificationCounter)
+            .where(NotificationCounter.user_id == user_id)
+            .values(
+                unread=func.max(NotificationCounter.unread - by, 0)
+                if db.get_bind().dialect.name == "sqlite"
+                else func.greatest(NotificationCounter.unread - by, 0)
+            )
+        )
+
+    def unread_count(self, db: Session, user_id: str) -> int:
+        """The user's unread count: one primary key lookup once the counter exists"""
+
+        unread = db.execute(
+            select(NotificationCounter.unread).where(NotificationCounter.user_id == user_id)
+        ).scalar_one_or_none()
+        if unread is not None:
+            return unread
+
+        unread = self._count(db, user_id)
+        upsert = _UPSERT.get(db.get_bind().dialect.name)
+        if upsert is not None:
+            db.execute(
+                upsert(NotificationCounter)
+                .values(user_id=user_id, unread=unread)
+                .on_conflict_do_nothing(index_elements=[NotificationCounter.user_id])
+            )
+            db.commit()
+        return unread
+
+    def _count(self, db: Session, user_id: str) -> int:
+        return db.execute(
+            select(func.count(Notification.id)).where(
+                Notification.user_id == user_id, Notification.status == "unread"
+            )
+        ).scalar_one()
+
+    def reconcile(self, db: Session) -> int:
+        """Recomputes every counter from the notifications table.
+
+        Users with unread notifications but no counter get one; only
+        counters whose stored value has drifted are rewritten.
+
+        Returns:
+            int: number of counters created or repaired
+        """
+
+        actual = (
+            select(func.count(Notification.id))
+            .where(
+                Notification.user_id == NotificationCounter.user_id,
+                Notification.status == "unread",
+            )
+            .scalar_subquery()
+        )
+        repaired = (
+            db.query(NotificationCounter)
+            .filter(NotificationCounter.unread != actual)
+            .update({NotificationCounter.unread: actual}, synchronize_session=False)
+        )
+
+        missing = (
+            select(Notification.user_id, func.count(Notification.id))
+            .where(
+                Notification.user_id.is_not(None),
+                Notification.status == "unread",
+                Notification.user_id.not_in(select(NotificationCounter.user_id)),
+            )
+            .group_by(Notification.user_id)
+        )
+        created = db.execute(
+            insert(NotificationCounter).from_select(["user_id", "unread"], missing)
+        ).rowcount
+
+        db.commit()
+        return repaired + max(created, 0)
+
+
+notification_counter_service = NotificationCounterService()
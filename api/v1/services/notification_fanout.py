@@ -0,0 +1,270 @@
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import Boolean, and_, func, insert, or_, select, true, update
+from sqlalchemy.orm import Session
+from uuid_extensions import uuid7
+
+from api.db.database import SessionLocal
+from api.utils.logger import logger
+from api.utils.pubsub import broker
+from api.utils.settings import settings
+from api.v1.models.notifications import Notification, NotificationFanout, NotificationSetting
+from api.v1.models.permissions.user_org_role import user_organisation_roles
+from api.v1.services.notification import notification_channels
+from api.v1.services.notification_counter import notification_counter_service
+
+
+def _setting_flags() -> Dict[str, bool]:
+    '''Boolean NotificationSetting columns and their value for users without settings'''
+
+    flags = {}
+    for column in NotificationSetting.__table__.columns:
+        if isinstance(column.type, Boolean):
+            default = column.server_default.arg if column.server_default is not None else "false"
+            flags[column.name] = str(default).lower() == "true"
+    return flags
+
+
+SETTING_FLAGS = _setting_flags()
+
+
+class NotificationFanoutService:
+    """Sends one notification to every member of an organisation.
+
+    Members come from `user_organisation_roles`, read in user id order a
+    chunk (NOTIFICATION_FANOUT_CHUNK_SIZE) at a time together with the
+    member's NotificationSetting flag, so opted-out members are skipped
+    without a query per user. Each chunk is one bulk insert of the
+    notification rows, one upsert of the unread counters and the progress
+    update of the fan-out, committed together; new notifications are then
+    published to the members' streams in one batch.
+
+    A run holds a lease on the fan-out (`locked_at`), renewed with every
+    chunk. Another run only takes it over once it is older than
+    NOTIFICATION_FANOUT_LEASE_TIMEOUT, and a run whose lease was taken over
+    stops before its next chunk, so no member is notified twice.
+    """
+
+    def create(
+        self,
+        db: Session,
+        org_id: str,
+        title: str,
+        message: str,
+        sender_id: Optional[str] = None,
+        setting: Optional[str] = None,
+    ) -> NotificationFanout:
+        """Records a pending fan-out to the members of `org_id`"""
+
+        if setting is not None and setting not in SETTING_FLAGS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown notification setting '{setting}'",
+            )
+
+        total = db.execute(
+            select(func.count()).select_from(user_organisation_roles).where(
+                user_organisation_roles.c.organisation_id == org_id,
+                user_organisation_roles.c.status == "active",
+            )
+        ).scalar_one()
+        fanout = NotificationFanout(
+            organisation_id=org_id,
+            sender_id=sender_id,
+            title=title,
+            message=message,
+            setting=setting,
+            status="pending",
+            total=total,
+            sent=0,
+            skipped=0,
+        )
+        db.add(fanout)
+        db.commit()
+        db.refresh(fanout)
+        return fanout
+
+    def _members(self, fanout: NotificationFanout, limit: int):
+        '''Next chunk of members after `last_user_id`, with whether each one opted in'''
+
+        member = user_organisation_roles.c.user_id
+        if fanout.setting:
+            flag = func.coalesce(
+                select(getattr(NotificationSetting, fanout.setting))
+                .where(NotificationSetting.user_id == member)
+                .limit(1)
+                .scalar_subquery(),
+                SETTING_FLAGS[fanout.setting],
+            )
+        else:
+            flag = true()
+
+        query = select(member, flag).where(
+            user_organisation_roles.c.organisation_id == fanout.organisation_id,
+            user_organisation_roles.c.status == "active",
+        )
+        if fanout.last_user_id:
+            query = query.where(member > fanout.last_user_id)
+        return query.order_by(member).limit(limit)
+
+    def run(
+        self,
+        db: Session,
+        fanout_id: str,
+        chunk_size: Optional[int] = None,
+        on_progress: Optional[Callable[[NotificationFanout], None]] = None,
+    ) -> NotificationFanout:
+        """Sends the notifications of a fan-out, resuming where it stopped.
+
+        Does nothing while another run holds the fan-out's lease.
+        `on_progress` is called with the fan-out after every committed chunk.
+        """
+
+        chunk_size = chunk_size or settings.NOTIFICATION_FANOUT_CHUNK_SIZE
+        lease = self._claim(db, fanout_id)
+        fanout = db.get(NotificationFanout, fanout_id, populate_existing=True)
+        if lease is None:
+            return fanout
+
+        try:
+            while True:
+                rows = db.execute(self._members(fanout, chunk_size)).all()
+                if not rows:
+                    break
+                events = self._send_chunk(db, fanout, rows)
+                lease = self._renew(db, fanout.id, lease)
+                if lease is None:
+                    db.rollback()
+                    logger.warning(
+                        f"Notification fan-out {fanout.id} was taken over by another run, stopping"
+                    )
+                    return fanout
+                db.commit()
+
+                broker.publish_many(events)
+                logger.info(
+                    f"Notification fan-out {fanout.id}: "
+                    f"{fanout.sent + fanout.skipped}/{fanout.total} members processed"
+                )
+                if on_progress is not None:
+                    on_progress(fanout)
+        except Exception as exc:
+            db.rollback()
+            fanout.status = "failed"
+            fanout.error = f"{type(exc).__name__}: {exc}"
+            db.commit()
+            raise
+
+        fanout.status = "completed"
+        fanout.finished_at = datetime.now(timezone.utc)
+        db.commit()
+        return fanout
+
+    @staticmethod
+    def _claim(db: Session, fanout_id: str) -> Optional[datetime]:
+        '''Takes the lease of a fan-out that is not completed nor running elsewhere'''
+
+        now = datetime.now(timezone.utc)
+        stale = now - timedelta(seconds=settings.NOTIFICATION_FANOUT_LEASE_TIMEOUT)
+        claimed = db.execute(
+            update(NotificationFanout)
+            .where(
+                NotificationFanout.id == fanout_id,
+                or_(
+                    NotificationFanout.status.in_(["pending", "failed"]),
+                    and_(
+                        NotificationFanout.status == "running",
+                        or_(NotificationFanout.locked_at.is_(None), NotificationFanout.locked_at <= stale),
+                    ),
+                ),
+            )
+            .values(status="running", locked_at=now)
+            .execution_options(synchronize_session=False)
+        ).rowcount == 1
+        db.commit()
+        return now if claimed else None
+
+    @staticmethod
+    def _renew(db: Session, fanout_id: str, lease: datetime) -> Optional[datetime]:
+        '''Extends the lease, in the chunk's transaction; None if another run took it'''
+
+        now = datetime.now(timezone.utc)
+        renewed = db.execute(
+            update(NotificationFanout)
+            .where(NotificationFanout.id == fanout_id, NotificationFanout.locked_at == lease)
+            .values(locked_at=now)
+            .execution_options(synchronize_session=False)
+        ).rowcount == 1
+        return now if renewed else None
+
+    def _send_chunk(self, db: Session, fanout: NotificationFanout, rows) -> List[Tuple[str, dict]]:
+        now = datetime.now(timezone.utc)
+        recipients = [user_id for user_id, opted_in in rows if opted_in]
+        notifications = [
+            {
+                "id": str(uuid7()),
+                "user_id": user_id,
+                "title": fanout.title,
+                "message": fanout.message,
+                "status": "unread",
+                "created_at": now,
+                "updated_at": now,
+            }
+            for user_id in recipients
+        ]
+        if notifications:
+            db.execute(insert(Notification), notifications)
+            notification_counter_service.increment_many(db, recipients)
+
+        fanout.sent += len(recipients)
+        fanout.skipped += len(rows) - len(recipients)
+        fanout.last_user_id = rows[-1][0]
+
+        fields = ("id", "user_id", "title", "message", "status")
+        return [
+            (
+                notification_channels(row["user_id"])[0],
+                {**{field: row[field] for field in fields}, "created_at": now.isoformat()},
+            )
+            for row in notifications
+        ]
+
+    def run_in_background(self, fanout_id: str):
+        """Runs a fan-out with its own session, e.g. from BackgroundTasks"""
+
+        with SessionLocal() as db:
+            try:
+                self.run(db, fanout_id)
+            except Exception as exc:
+                logger.error(f"Notification fan-out {fanout_id} failed: {exc}")
+
+    def resume_unfinished(self, db: Session) -> List[NotificationFanout]:
+        """Runs every fan-out that is pending, or was interrupted while running.
+
+        A fan-out still running elsewhere (its lease is fresh) is left alone.
+        """
+
+        stale = datetime.now(timezone.utc) - timedelta(
+            seconds=settings.NOTIFICATION_FANOUT_LEASE_TIMEOUT
+        )
+        unfinished = (
+            db.query(NotificationFanout.id)
+            .filter(
+                or_(
+                    NotificationFanout.status == "pending",
+                    and_(
+                        NotificationFanout.status == "running",
+                        or_(NotificationFanout.locked_at.is_(None), NotificationFanout.locked_at <= stale),
+                    ),
+                )
+            )
+            .order_by(NotificationFanout.created_at)
+            .all()
+        )
+        # run() claims each one again, in case another process got there first
+        return [self.run(db, fanout_id) for (fanout_id,) in unfinished]
+
+
+notification_fanout_service = NotificationFanoutService()
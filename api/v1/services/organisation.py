@@ -4,7 +4,7 @@ import logging
 from typing import Any, Optional, Annotated
 from fastapi import HTTPException, Depends, status
 from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_
+from sqlalchemy import and_
 from fastapi import HTTPException, status
 from sqlalchemy import select
 from api.core.base.services import Service
@@ -18,6 +18,8 @@ from api.v1.models.associations import user_organisation_association
 from api.v1.models.permissions.user_org_role import user_organisation_roles
 from api.v1.models.organisation import Organisation
 from api.v1.models.user import User
+from api.v1.services.permissions.resolver import UserCache, permission_resolver
+from api.utils.settings import settings
 from api.v1.schemas.organisation import (
     CreateUpdateOrganisation,
     AddUpdateOrganisationRole,
@@ -27,18 +29,27 @@ from api.v1.schemas.organisation import (
 from api.db.database import get_db
 
 
+# organisations (with the user's roles) returned at login, per user
+user_organisations_cache = permission_resolver.follow(
+    UserCache(
+        ttl=settings.PERMISSION_CACHE_TTL,
+        max_users=settings.PERMISSION_CACHE_MAX_USERS,
+    )
+)
+
+
 class OrganisationService(Service):
     """Organisation service functionality"""
 
     def get_role_id(self, db: Session, role: str):
         '''Returns the role id associated with a role'''
 
-        role_ = db.query(Role).filter(Role.name == role).first()
+        role_id = permission_resolver.role_id(db, role)
 
-        if not role_:
+        if not role_id:
             raise HTTPException(status_code=404, detail="Admin role not found")
 
-        return role_.id
+        return role_id
     
 
     def create(self, db: Session, schema: CreateUpdateOrganisation, user: User):
@@ -62,8 +73,8 @@ class OrganisationService(Service):
         )
         db.execute(stmt)
         db.commit()
-        admin_role = db.query(Role).filter_by(name="admin").first()
-        if not admin_role:
+        admin_role_id = permission_resolver.role_id(db, "admin")
+        if not admin_role_id:
             admin_role = Role(
                 name="admin",
                 description="Organization Admin",
@@ -75,7 +86,7 @@ class OrganisationService(Service):
             user_role_stmt = user_organisation_roles.insert().values(
                 user_id=user.id,
                 organisation_id=new_organisation.id,
-                role_id=admin_role.id,
+                role_id=admin_role_id,
                 is_owner=True,
             )
             db.execute(user_role_stmt)
@@ -109,12 +120,7 @@ class OrganisationService(Service):
 
     def get_organisation_user_role(self, user_id: str, org_id: str, db: Session):
         try:
-            stmt = select(user_organisation_association.c.role).where(
-                user_organisation_association.c.user_id == user_id,
-                user_organisation_association.c.organisation_id == org_id,
-            )
-            result = db.execute(stmt).scalar_one_or_none()
-            return result
+            return permission_resolver.membership(db, user_id, org_id).role
         except Exception as e:
             print(f"An error occurred: {e}")
             return None
@@ -153,15 +159,7 @@ class OrganisationService(Service):
         if role not in ['user', 'guest', 'admin', 'owner']:
             raise HTTPException(status_code=400, detail="Invalid role")
 
-        stmt = user_organisation_association.select().where(
-            user_organisation_association.c.user_id == user.id,
-            user_organisation_association.c.organisation_id == org.id,
-            user_organisation_association.c.role == role,
-        )
-
-        result = db.execute(stmt).fetchone()
-
-        if result is None:
+        if permission_resolver.membership(db, user.id, org.id).role != role:
             raise HTTPException(status_code=403, detail=f"Permission denied as user is not of {role} role")
 
 
@@ -326,56 +324,54 @@ class OrganisationService(Service):
     def retrieve_user_organizations(self, user: User,
                                     db: Annotated[Session, Depends(get_db)]):
         """
-        Retrieves all organizations a user belongs to.
+        Retrieves all organizations a user belongs to, each with the user's
+        roles in it, in one query. Cached per user until their memberships
+        or one of the organisations change.
        
         Args:
             user: the user to retrieve the organizations
         """
-        builtin_roles = ['user', 'admin', 'manager', 'guest']
-
-        user_organisations = db.query(Organisation).join(
-            user_organisation_association,
-            Organisation.id == user_organisation_association.c.organisation_id
-        ).filter(
-            user_organisation_association.c.user_id == user.id
+        cached = user_organisations_cache.get(user.id)
+        if cached is not None:
+            return list(cached) or None
+
+        rows = db.execute(
+            select(Organisation, user_organisation_association.c.role, Role.name)
+            .join(
+                user_organisation_association,
+                Organisation.id == user_organisation_association.c.organisation_id,
+            )
+            .outerjoin(
+                user_organisation_roles,
+                and_(
+                    user_organisation_roles.c.organisation_id == Organisation.id,
+                    user_organisation_roles.c.user_id == user.id,
+                ),
+            )
+            .outerjoin(Role, Role.id == user_organisation_roles.c.role_id)
+            .where(user_organisation_association.c.user_id == user.id)
         ).all()
-       
-        if user_organisations:
-            organisation_roles = db.query(
-                Role
-                ).outerjoin(
-                    user_organisation_roles,
-                    Role.id == user_organisation_roles.c.role_id,
-                ).filter(
-                    or_(
-                        and_(
-                            user_organisation_roles.c.user_id == user.id,
-                            Role.is_builtin == False
-                        ),
-                        Role.is_builtin == True
-                    )
-                ).all()
-
-            if len(organisation_roles) < 1:
-                organisation_roles = builtin_roles
-            else:
-                organisation_roles = [role.name for role in organisation_roles if role]
-
-            return [OrganisationData(
-                id=org.id,
-                created_at=org.created_at,
-                updated_at=org.updated_at,
-                name=org.name,
-                email=org.email,
-                industry=org.industry,
-                user_role=organisation_roles,
-                type=org.type,
-                country=org.country,
-                state=org.state,
-                address=org.address,
-                description=org.description,
-                organisation_id=org.id
-            ) for org in user_organisations]
+
+        organisations = [OrganisationData(
+            id=org.id,
+            created_at=org.created_at,
+            updated_at=org.updated_at,
+            name=org.name,
+            email=org.email,
+            industry=org.industry,
+            user_role=list(dict.fromkeys(role for role in (membership_role, role_name) if role)),
+            type=org.type,
+            country=org.country,
+            state=org.state,
+            address=org.address,
+            description=org.description,
+            organisation_id=org.id
+        ) for org, membership_role, role_name in rows]
+
+        user_organisations_cache.set(
+            user.id, organisations, org_ids=[org.id for org in organisations]
+        )
+        return list(organisations) or None
 
 
 organisation_service = OrganisationService()
@@ -0,0 +1,106 @@
+import time
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from api.v1.models.permissions.permissions import Permission
+from api.v1.models.permissions.role import Role
+from api.utils.settings import settings
+from api.v1.models.permissions.role_permissions import role_permissions
+
+
+@dataclass(frozen=True)
+class RoleEntry:
+    """A role, the titles of the permissions granted to it and their bitset"""
+
+    id: str
+    name: str
+    is_builtin: bool
+    permissions: FrozenSet[str]
+    mask: int = 0
+
+
+class RoleCatalog:
+    """In-memory copy of the roles, permissions and role_permissions tables.
+
+    Loaded at startup; the tables are small and rarely written. Each
+    permission title gets a bit, so a role's permissions are one integer and
+    a check is a single AND. Writes made through this worker mark it stale;
+    it is also reloaded once older than `max_age` seconds, to pick up
+    writes made by other workers.
+    """
+
+    def __init__(self, max_age: Optional[float] = None):
+        self.max_age = max_age
+        self.loaded_at = 0.0
+        self.roles_by_id: Dict[str, RoleEntry] = {}
+        self.roles_by_name: Dict[str, RoleEntry] = {}
+        self.permissions: Dict[str, str] = {}  # permission id -> title
+        self.bits: Dict[str, int] = {}  # permission title -> bit
+        self.loaded = False
+
+    def load(self, db: Session):
+        '''Replaces the catalog with the current contents of the database'''
+
+        permissions = dict(db.execute(select(Permission.id, Permission.title)).all())
+        bits = {title: 1 << index for index, title in enumerate(sorted(permissions.values()))}
+        granted: Dict[str, set] = {}
+        for role_id, permission_id in db.execute(
+            select(role_permissions.c.role_id, role_permissions.c.permission_id)
+        ):
+            if permission_id in permissions:
+                granted.setdefault(role_id, set()).add(permissions[permission_id])
+
+        roles = [
+            RoleEntry(
+                id=role_id,
+                name=name,
+                is_builtin=bool(is_builtin),
+                permissions=frozenset(granted.get(role_id, ())),
+                mask=sum(bits[title] for title in granted.get(role_id, ())),
+            )
+            for role_id, name, is_builtin in db.execute(
+                select(Role.id, Role.name, Role.is_builtin)
+            )
+        ]
+
+        # swap whole dicts so readers never see a half built catalog
+        self.permissions = permissions
+        self.bits = bits
+        self.roles_by_id = {role.id: role for role in roles}
+        self.roles_by_name = {role.name: role for role in roles}
+        self.loaded = True
+        self.loaded_at = time.monotonic()
+
+    def ensure_loaded(self, db: Session):
+        expired = self.max_age and time.monotonic() - self.loaded_at > self.max_age
+        if not self.loaded or expired:
+            self.load(db)
+
+    def role(self, name: str) -> Optional[RoleEntry]:
+        return self.roles_by_name.get(name)
+
+    def mask(self, *titles: str) -> Optional[int]:
+        '''Bitset of `titles`; None if any of them is not a known permission'''
+
+        try:
+            return sum(self.bits[title] for title in set(titles))
+        except KeyError:
+            return None
+
+    def invalidate(self):
+        '''Marks the catalog stale; it is reloaded on next use'''
+
+        self.loaded = False
+
+    def clear(self):
+        self.roles_by_id = {}
+        self.roles_by_name = {}
+        self.permissions = {}
+        self.bits = {}
+        self.loaded = False
+
+
+role_catalog = RoleCatalog(max_age=settings.PERMISSION_CACHE_TTL)
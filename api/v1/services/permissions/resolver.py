@@ -0,0 +1,284 @@
+"""Cached role and permission resolution for authorization checks.
+
+Role definitions come from `role_catalog` (roles, permissions and
+role_permissions held in memory as bitsets). What a user is in an
+organisation, i.e. their `user_organisation.role` and their
+`user_organisation_roles.role_id`, is cached per (user, organisation) for
+PERMISSION_CACHE_TTL seconds, so repeated checks do not touch the database.
+
+Invalidation is automatic: session hooks watch every write that can change
+the answer. Core statements on the role and membership tables, and ORM
+changes to roles, permissions, users and organisations, are all watched.
+The affected entries are dropped when the transaction ends. The cache is
+per worker, so another worker's write is only seen once the entry expires.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from api.utils.settings import settings
+from api.v1.models.associations import user_organisation_association
+from api.v1.models.organisation import Organisation
+from api.v1.models.permissions.permissions import Permission
+from api.v1.models.permissions.role import Role
+from api.v1.models.permissions.user_org_role import user_organisation_roles
+from api.v1.models.user import User
+from api.v1.services.permissions.catalog import RoleCatalog, role_catalog
+
+
+CATALOG_TABLES = {"roles", "permissions", "role_permissions"}
+MEMBERSHIP_TABLES = {user_organisation_association.name, user_organisation_roles.name}
+
+
+@dataclass(frozen=True)
+class Membership:
+    """A user's standing in one organisation; all None when not a member"""
+
+    role: Optional[str] = None  # user_organisation.role, e.g. "owner"
+    role_id: Optional[str] = None  # user_organisation_roles.role_id
+    is_owner: bool = False
+
+    @property
+    def is_member(self) -> bool:
+        return self.role is not None or self.role_id is not None
+
+
+class UserCache:
+    """Per-user values that depend on memberships, e.g. a user's organisations.
+
+    Follows a resolver's invalidations (see `PermissionResolver.follow`), and
+    entries also expire after `ttl` seconds.
+    """
+
+    def __init__(self, ttl: float = 60, max_users: int = 10000):
+        self.ttl = ttl
+        self.max_users = max_users
+        # user id -> (expires_at, organisation ids, value)
+        self._entries: "OrderedDict[str, Tuple[float, FrozenSet[str], Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(str(user_id))
+            if entry is None or entry[0] <= time.monotonic():
+                return None
+            self._entries.move_to_end(str(user_id))
+            return entry[2]
+
+    def set(self, user_id: str, value: Any, org_ids: Iterable[str] = ()):
+        with self._lock:
+            self._entries[str(user_id)] = (
+                time.monotonic() + self.ttl,
+                frozenset(str(org_id) for org_id in org_ids),
+                value,
+            )
+            self._entries.move_to_end(str(user_id))
+            while len(self._entries) > self.max_users:
+                self._entries.popitem(last=False)
+
+    def invalidate_user(self, user_id: str):
+        with self._lock:
+            self._entries.pop(str(user_id), None)
+
+    def invalidate_organisation(self, org_id: str):
+        with self._lock:
+            for user_id in [
+                user_id for user_id, entry in self._entries.items() if str(org_id) in entry[1]
+            ]:
+                del self._entries[user_id]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class PermissionResolver:
+    """Answers "what can this user do in this organisation" from memory"""
+
+    def __init__(self, catalog: RoleCatalog, ttl: float = 60, max_users: int = 10000):
+        self.catalog = catalog
+        self.ttl = ttl
+        self.max_users = max_users
+        # user id -> {organisation id -> (expires_at, membership)}
+        self._users: "OrderedDict[str, Dict[str, Tuple[float, Membership]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._info_key = f"permission_invalidations_{id(self)}"
+        self._followers: List[UserCache] = []
+
+    def follow(self, cache: UserCache) -> UserCache:
+        '''Makes `cache` drop entries whenever this resolver does'''
+
+        self._followers.append(cache)
+        return cache
+
+    def membership(self, db: Session, user_id: str, org_id: str) -> Membership:
+        user_id, org_id = str(user_id), str(org_id)
+        with self._lock:
+            entry = self._users.get(user_id, {}).get(org_id)
+            if entry is not None and entry[0] > time.monotonic():
+                self._users.move_to_end(user_id)
+                return entry[1]
+
+        membership = self._load(db, user_id, org_id)
+        with self._lock:
+            self._users.setdefault(user_id, {})[org_id] = (time.monotonic() + self.ttl, membership)
+            self._users.move_to_end(user_id)
+            while len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+        return membership
+
+    def _load(self, db: Session, user_id: str, org_id: str) -> Membership:
+        role = db.execute(
+            select(user_organisation_association.c.role).where(
+                user_organisation_association.c.user_id == user_id,
+                user_organisation_association.c.organisation_id == org_id,
+            )
+        ).scalar_one_or_none()
+        assignment = db.execute(
+            select(user_organisation_roles.c.role_id, user_organisation_roles.c.is_owner).where(
+                user_organisation_roles.c.user_id == user_id,
+                user_organisation_roles.c.organisation_id == org_id,
+            )
+        ).first()
+        return Membership(
+            role=role,
+            role_id=assignment.role_id if assignment else None,
+            is_owner=bool(assignment.is_owner) if assignment else False,
+        )
+
+    def role_id(self, db: Session, name: str) -> Optional[str]:
+        '''Id of the role called `name`, from the catalog'''
+
+        self.catalog.ensure_loaded(db)
+        role = self.catalog.role(name)
+        return role.id if role else None
+
+    def permission_mask(self, db: Session, user_id: str, org_id: str) -> int:
+        '''Bitset of the permissions the user holds in the organisation'''
+
+        membership = self.membership(db, user_id, org_id)
+        self.catalog.ensure_loaded(db)
+        mask = 0
+        if membership.role_id in self.catalog.roles_by_id:
+            mask |= self.catalog.roles_by_id[membership.role_id].mask
+        if membership.role in self.catalog.roles_by_name:
+            mask |= self.catalog.roles_by_name[membership.role].mask
+        return mask
+
+    def has_permissions(self, db: Session, user_id: str, org_id: str, *titles: str) -> bool:
+        '''Whether the user holds every one of the permissions `titles` in the organisation'''
+
+        self.catalog.ensure_loaded(db)
+        wanted = self.catalog.mask(*titles)
+        if wanted is None:
+            return False
+        return self.permission_mask(db, user_id, org_id) & wanted == wanted
+
+    def invalidate_user(self, user_id: str):
+        with self._lock:
+            self._users.pop(str(user_id), None)
+        for cache in self._followers:
+            cache.invalidate_user(user_id)
+
+    def invalidate_organisation(self, org_id: str):
+        with self._lock:
+            for organisations in self._users.values():
+                organisations.pop(str(org_id), None)
+        for cache in self._followers:
+            cache.invalidate_organisation(org_id)
+
+    def clear(self):
+        with self._lock:
+            self._users.clear()
+        for cache in self._followers:
+            cache.clear()
+
+    # Invalidation hooks, attached to every Session by `install`
+
+    def install(self, session_class=Session):
+        event.listen(session_class, "do_orm_execute", self._on_execute)
+        event.listen(session_class, "after_flush", self._on_flush)
+        # on rollback too: entries cached after the write may have seen it
+        event.listen(session_class, "after_commit", self._apply_pending)
+        event.listen(session_class, "after_rollback", self._apply_pending)
+
+    def _pending(self, session: Session) -> Dict[str, Set]:
+        return session.info.setdefault(
+            self._info_key,
+            {"catalog": set(), "users": set(), "organisations": set(), "all": set()},
+        )
+
+    def _on_execute(self, state):
+        if not (state.is_insert or state.is_update or state.is_delete):
+            return
+        table = getattr(getattr(state.statement, "table", None), "name", None)
+        if table in CATALOG_TABLES:
+            self._pending(state.session)["catalog"].add(True)
+        elif table in MEMBERSHIP_TABLES:
+            users = _bound_values(state, "user_id")
+            pending = self._pending(state.session)
+            if users:
+                pending["users"].update(users)
+            else:
+                pending["all"].add(True)
+
+    def _on_flush(self, session: Session, flush_context):
+        pending = self._pending(session)
+        for instance in (*session.new, *session.dirty, *session.deleted):
+            if isinstance(instance, (Role, Permission)):
+                pending["catalog"].add(True)
+            elif isinstance(instance, User):
+                pending["users"].add(instance.id)
+            elif isinstance(instance, Organisation):
+                pending["organisations"].add(instance.id)
+
+    def _apply_pending(self, session: Session):
+        pending = session.info.pop(self._info_key, None)
+        if not pending:
+            return
+        if pending["catalog"]:
+            self.catalog.invalidate()
+            # cached values may carry role names
+            for cache in self._followers:
+                cache.clear()
+        if pending["all"]:
+            self.clear()
+            return
+        for user_id in pending["users"]:
+            self.invalidate_user(user_id)
+        for org_id in pending["organisations"]:
+            self.invalidate_organisation(org_id)
+
+
+def _bound_values(state, column: str) -> Set[str]:
+    '''Values bound for `column` in a Core statement (values or where clause)'''
+
+    params = [state.statement.compile().params]
+    if isinstance(state.parameters, dict):
+        params.append(state.parameters)
+    elif state.parameters:
+        params.extend(state.parameters)
+    values = set()
+    for group in params:
+        for key, value in group.items():
+            if value is None or not (key == column or key.startswith(f"{column}_")):
+                continue
+            if isinstance(value, (list, tuple, set)):
+                values.update(str(item) for item in value)
+            else:
+                values.add(str(value))
+    return values
+
+
+permission_resolver = PermissionResolver(
+    role_catalog,
+    ttl=settings.PERMISSION_CACHE_TTL,
+    max_users=settings.PERMISSION_CACHE_MAX_USERS,
+)
+permission_resolver.install()
@@ -109,6 +109,7 @@ class RoleService:
         if role.name not in ['user', 'guest', 'admin', 'owner']:
             raise HTTPException(status_code=400, detail="Invalid role")
 
+        # guards a write, so it reads the database rather than the resolver's cache
         stmt = user_organisation_roles.select().where(
             user_organisation_roles.c.user_id == user_id,
             user_organisation_roles.c.organisation_id == org_id,
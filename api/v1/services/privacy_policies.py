@@ -1,6 +1,7 @@
 from typing import Any, Optional
 from sqlalchemy.orm import Session
 from api.core.base.services import Service
+from api.utils.response_cache import invalidates_cache
 from api.v1.models.privacy import PrivacyPolicy
 from api.v1.schemas.privacy_policies import PrivacyPolicyCreate, PrivacyPolicyUpdate
 from api.utils.db_validators import check_model_existence
@@ -9,6 +10,7 @@ from api.utils.db_validators import check_model_existence
 class PrivacyService(Service):
     """Privacy Services"""
 
+    @invalidates_cache("privacy_policy")
     def create(self, db: Session, schema: PrivacyPolicyCreate):
         '''Create a new Privacy'''
 
@@ -41,6 +43,7 @@ class PrivacyService(Service):
         return privacy
     
 
+    @invalidates_cache("privacy_policy")
     def update(self, db: Session, privacy_id: str, schema: PrivacyPolicyUpdate):
         '''Updates a Privacy'''
 
@@ -56,6 +59,7 @@ class PrivacyService(Service):
         return privacy
     
 
+    @invalidates_cache("privacy_policy")
     def delete(self, db: Session, privacy_id: str):
         '''Deletes a privacy service'''
         
@@ -1,6 +1,7 @@
 from typing import Any, Optional, List
 from sqlalchemy.orm import Session
 from api.core.base.services import Service
+from api.utils.response_cache import invalidates_cache
 from api.v1.models.regions import Region
 from api.v1.schemas.regions import RegionUpdate, RegionCreate
 from api.utils.db_validators import check_model_existence
@@ -9,6 +10,7 @@ from fastapi import HTTPException
 class RegionService(Service):
     """Region Services"""
 
+    @invalidates_cache("region")
     def create(self, db: Session, schema: RegionCreate, user_id: str):
         '''Create a new Region'''
         region_exists = db.query(Region).filter_by(user_id=user_id).first()
@@ -43,6 +45,7 @@ class RegionService(Service):
         return region
     
 
+    @invalidates_cache("region")
     def update(self, db: Session, region_id: str, schema: RegionUpdate):
         '''Updates a Region'''
 
@@ -58,6 +61,7 @@ class RegionService(Service):
         return region
     
 
+    @invalidates_cache("region")
     def delete(self, db: Session, region_id: str):
         '''Deletes a region service'''
         
@@ -1,11 +1,33 @@
-from twilio.rest import Client
+from functools import lru_cache
+
 from api.utils.settings import settings
 
-client = Client(settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN)
 
-def send_sms(phone_number: str, message: str):
+@lru_cache
+def get_client():
+    '''Creates the Twilio client on first use rather than at import'''
+
+    from twilio.rest import Client
+
+    from api.utils.provider_sdks import TwilioHTTPClient
+
+    return Client(
+        settings.TWILIO_ACCOUNT_SID,
+        settings.TWILIO_AUTH_TOKEN,
+        http_client=TwilioHTTPClient(),
+    )
+
+
+def __getattr__(name):
+    # keeps `sms_twilio.client` working for callers that reach for it directly
+    if name == "client":
+        return get_client()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+async def send_sms(phone_number: str, message: str):
     try:
-        message = client.messages.create(
+        message = await get_client().messages.create_async(
             body=message,
             from_=settings.TWILIO_PHONE_NUMBER,
             to=phone_number
@@ -13,4 +35,4 @@ def send_sms(phone_number: str, message: str):
         return {"status": "success", "sid": message.sid}
     except Exception as e:
         return {"status": "error", "detail": str(e)}
-    
\ No newline at end of file
+    
@@ -2,17 +2,32 @@ from sqlalchemy.orm import Session
 from api.v1.models.user import User
 from api.v1.models.billing_plan import BillingPlan, UserSubscription
 from api.v1.models.organisation import Organisation
-import stripe
 from sqlalchemy.orm import joinedload
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy import select, join
 from fastapi.encoders import jsonable_encoder
 from api.utils.success_response import success_response, fail_response
+from api.utils.idempotency import provider_idempotency
 import os
 from fastapi import HTTPException, status, Request
+from starlette.concurrency import run_in_threadpool
 from datetime import datetime, timedelta
+from functools import lru_cache
 
-stripe.api_key = os.getenv('STRIPE_SECRET_KEY')
+
+@lru_cache
+def get_stripe():
+    '''Imports and configures the Stripe SDK on first use, as it is slow to import'''
+
+    import stripe
+
+    from api.utils.provider_sdks import StripeHTTPClient
+
+    stripe.api_key = os.getenv('STRIPE_SECRET_KEY')
+    # requests go through the shared provider client, which does the retrying
+    stripe.default_http_client = StripeHTTPClient()
+    stripe.max_network_retries = 0
+    return stripe
 
 
 def get_all_plans(db: Session):
@@ -32,7 +47,7 @@ def get_plan_by_name(db: Session, plan_name: str):
     return db.query(BillingPlan).filter(BillingPlan.name == plan_name).first()
 
 
-def stripe_payment_request(db: Session, user_id: str, request: Request, plan_name: str):
+async def stripe_payment_request(db: Session, user_id: str, request: Request, plan_name: str):
 
     # base_url = request.base_url
     # base_urls = str(request.url.scheme) + "://" + str(request.url.netloc)
@@ -41,20 +56,24 @@ def stripe_payment_request(db: Session, user_id: str, request: Request, plan_nam
     success_url = f"{base_urls}payment" + "/success?session_id={CHECKOUT_SESSION_ID}"
     cancel_url = f"{base_urls}payment/pricing"
 
-    user = db.query(User).filter(User.id == user_id).first()
+    # the session is synchronous: keep its queries off the event loop
+    user = await run_in_threadpool(
+        lambda: db.query(User).filter(User.id == user_id).first()
+    )
 
     if not user:
         return fail_response(status_code=404, message="User not found")
 
-    plan = get_plan_by_name(db, plan_name)
+    plan = await run_in_threadpool(get_plan_by_name, db, plan_name)
 
     if not plan:
         return fail_response(status_code=404, message="Plan not found")
 
     if plan.name != "Free":
+        stripe = get_stripe()
         try:
             # Create a checkout session
-            checkout_session = stripe.checkout.Session.create(
+            checkout_session = await stripe.checkout.Session.create_async(
                 payment_method_types=['card'],
                 line_items=[{
                     'price_data': {
@@ -74,6 +93,8 @@ def stripe_payment_request(db: Session, user_id: str, request: Request, plan_nam
                     'user_id': user_id,
                     'plan_name': plan_name,
                 },
+                # a retried upgrade request gets the same session back from Stripe
+                **provider_idempotency("checkout"),
             )
 
             if checkout_session:
@@ -0,0 +1,196 @@
+"""In-process synthetic monitoring of the API groups.
+
+Every SYNTHETIC_MONITOR_INTERVAL seconds the monitor sends each group's
+probes through the application itself (httpx's ASGI transport, so no
+network, DNS or TLS is involved) and records one status per group in the
+API status store, exactly as a batch from the external status runs would be.
+
+Probes are side-effect free: public reads, and requests that must be
+rejected (no token, invalid body), so they can run against production data.
+Groups are probed concurrently, at most SYNTHETIC_MONITOR_CONCURRENCY at a
+time.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional
+
+import httpx
+from sqlalchemy import func, select
+from starlette.concurrency import run_in_threadpool
+
+from api.db.database import SessionLocal
+from api.utils.logger import logger
+from api.utils.settings import settings
+from api.v1.models.api_status import APIStatusSample
+from api.v1.schemas.api_status import APIStatusPost
+from api.v1.services.api_status import APIStatusService
+
+
+@dataclass(frozen=True)
+class Probe:
+    """One request of an API group's check and the status code it must return"""
+
+    api_group: str
+    method: str
+    path: str
+    expect: int = 200
+    json: Optional[dict] = None
+
+
+PROBES = (
+    Probe("Index", "GET", "/"),
+    Probe("Authentication", "POST", "/api/v1/auth/login", expect=422, json={"email": "", "password": ""}),
+    Probe("Authentication", "GET", "/api/v1/auth/@me", expect=401),
+    Probe("Waitlist", "POST", "/api/v1/waitlist/", expect=422, json={}),
+    Probe("Contact us", "GET", "/api/v1/contact", expect=401),
+    Probe("Dashboard", "GET", "/api/v1/dashboard/products", expect=401),
+    Probe("Newsletters", "GET", "/api/v1/newsletters"),
+    Probe("FAQ", "GET", "/api/v1/faqs"),
+    Probe("Testimonials", "GET", "/api/v1/testimonials"),
+    Probe("Regions", "GET", "/api/v1/regions"),
+    Probe("Blogs", "GET", "/api/v1/blogs/"),
+    Probe("Jobs", "GET", "/api/v1/jobs"),
+    Probe("Privacy policy", "GET", "/api/v1/privacy-policy"),
+)
+
+# worst first wins when a group's probes disagree
+SEVERITY = {"Operational": 0, "Degraded": 1, "Down": 2}
+
+
+class SyntheticMonitor:
+    """Probes the API groups in-process and records their status"""
+
+    user_agent = "hng-synthetic-monitor"
+
+    def __init__(
+        self,
+        probes: Iterable[Probe] = PROBES,
+        interval: float = 300,
+        concurrency: int = 4,
+        timeout: float = 10,
+        slow_ms: float = 2000,
+    ):
+        self.probes = tuple(probes)
+        self.interval = interval
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.slow_ms = slow_ms
+
+    @property
+    def groups(self) -> Dict[str, List[Probe]]:
+        groups: Dict[str, List[Probe]] = {}
+        for probe in self.probes:
+            groups.setdefault(probe.api_group, []).append(probe)
+        return groups
+
+    async def _check(self, client: httpx.AsyncClient, probe: Probe):
+        '''(status, response time in ms, details) of one probe'''
+
+        start = time.perf_counter()
+        try:
+            response = await asyncio.wait_for(
+                client.request(probe.method, probe.path, json=probe.json), self.timeout
+            )
+        except asyncio.TimeoutError:
+            return "Down", self.timeout * 1000, f"No response within {self.timeout}s"
+        except Exception as exc:
+            elapsed = (time.perf_counter() - start) * 1000
+            return "Down", elapsed, f"{type(exc).__name__}: {exc}"
+        elapsed = (time.perf_counter() - start) * 1000
+
+        request = f"{probe.method} {probe.path}"
+        if response.status_code >= 500:
+            return "Down", elapsed, f"{request} returned HTTP {response.status_code}"
+        if response.status_code != probe.expect:
+            return (
+                "Degraded",
+                elapsed,
+                f"{request} returned HTTP {response.status_code}, expected {probe.expect}",
+            )
+        if elapsed > self.slow_ms:
+            return "Degraded", elapsed, "High response time detected"
+        return "Operational", elapsed, "All tests passed"
+
+    async def _check_group(
+        self,
+        client: httpx.AsyncClient,
+        semaphore: asyncio.Semaphore,
+        api_group: str,
+        probes: List[Probe],
+    ) -> APIStatusPost:
+        async with semaphore:
+            checks = [await self._check(client, probe) for probe in probes]
+
+        status, _, details = max(checks, key=lambda check: SEVERITY[check[0]])
+        return APIStatusPost(
+            api_group=api_group,
+            status=status,
+            response_time=round(max(check[1] for check in checks), 2),
+            details=details,
+        )
+
+    async def probe(self, app) -> List[APIStatusPost]:
+        '''Runs every group's probes against `app` and returns their statuses'''
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport,
+            base_url="http://synthetic-monitor",
+            headers={"User-Agent": self.user_agent},
+        ) as client:
+            return await asyncio.gather(
+                *(
+                    self._check_group(client, semaphore, api_group, probes)
+                    for api_group, probes in self.groups.items()
+                )
+            )
+
+    def record(self, statuses: List[APIStatusPost]) -> int:
+        with SessionLocal() as db:
+            return APIStatusService.upsert_many(db, statuses)
+
+    def is_due(self) -> bool:
+        '''False when another worker recorded these groups within half an interval'''
+
+        with SessionLocal() as db:
+            last = db.execute(
+                select(func.max(APIStatusSample.checked_at)).where(
+                    APIStatusSample.api_group.in_(self.groups)
+                )
+            ).scalar()
+        if last is None:
+            return True
+        if last.tzinfo is None:
+            last = last.replace(tzinfo=timezone.utc)
+        return datetime.now(timezone.utc) - last >= timedelta(seconds=self.interval / 2)
+
+    async def run_once(self, app) -> List[APIStatusPost]:
+        statuses = await self.probe(app)
+        await run_in_threadpool(self.record, statuses)
+        failing = [status.api_group for status in statuses if status.status != "Operational"]
+        if failing:
+            logger.warning(f"Synthetic monitor: not operational: {', '.join(failing)}")
+        return statuses
+
+    async def run_forever(self, app):
+        '''Probes every `interval` seconds until cancelled; a failed round is only logged'''
+
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                if await run_in_threadpool(self.is_due):
+                    await self.run_once(app)
+            except Exception as exc:
+                logger.warning(f"Synthetic monitor round failed: {exc}")
+
+
+synthetic_monitor = SyntheticMonitor(
+    interval=settings.SYNTHETIC_MONITOR_INTERVAL,
+    concurrency=settings.SYNTHETIC_MONITOR_CONCURRENCY,
+    timeout=settings.SYNTHETIC_MONITOR_TIMEOUT,
+    slow_ms=settings.SYNTHETIC_MONITOR_SLOW_MS,
+)
@@ -5,6 +5,7 @@
 from sqlalchemy.orm import Session
 
 from api.core.base.services import Service
+from api.utils.response_cache import invalidates_cache
 from api.v1.models.team import TeamMember
 
 from api.utils.db_validators import check_model_existence
@@ -14,6 +15,7 @@ class TeamServices(Service):
     """Team services functionality"""
 
     @staticmethod
+    @invalidates_cache("team")
     def create(db: Session, schema) -> TeamMember:
         """Create a new job"""
 
@@ -35,6 +37,7 @@ class TeamServices(Service):
 
         return team
 
+    @invalidates_cache("team")
     def update(self, db, id, data):
         """Update a team"""
         team = check_model_existence(db, TeamMember, id)
@@ -44,6 +47,7 @@ class TeamServices(Service):
         db.refresh(team)
         return team
 
+    @invalidates_cache("team")
     def delete(self, db, id):
         """Delete a team"""
         check_model_existence(db, TeamMember, id)
@@ -1,5 +1,6 @@
 from sqlalchemy.orm import Session
 from api.core.base.services import Service
+from api.utils.response_cache import invalidates_cache
 from api.v1.models.terms import TermsAndConditions
 from api.v1.schemas.terms_and_conditions import UpdateTermsAndConditions
 from fastapi import HTTPException
@@ -20,6 +21,7 @@ class TermsAndConditionsService(Service):
     def fetch_all(self):
         return super().fetch_all()
 
+    @invalidates_cache("terms")
     def update(self, db: Session, id: str, data: UpdateTermsAndConditions):
         tc = db.query(TermsAndConditions).filter(TermsAndConditions.id == id).first()
         if not tc:
@@ -32,6 +34,7 @@ class TermsAndConditionsService(Service):
         db.refresh(tc)
         return tc
 
+    @invalidates_cache("terms")
     def delete(self, terms_id: str, db: Session, current_user: User):
         # Check if the terms and conditions exist
         tc = db.query(TermsAndConditions).filter(TermsAndConditions.id == terms_id).first()
@@ -1,5 +1,6 @@
 from sqlalchemy.orm import Session
 from api.core.base.services import Service
+from api.utils.response_cache import invalidates_cache
 from api.utils.db_validators import check_model_existence
 from api.v1.models.testimonial import Testimonial
 from api.v1.models.user import User
@@ -9,6 +10,7 @@ from api.v1.schemas.testimonial import CreateTestimonial
 class TestimonialService(Service):
     """Product service functionality"""
 
+    @invalidates_cache("testimonial")
     def create(self, db: Session,  user: User, data: CreateTestimonial):
         '''Create testimonial'''
         new_testimonial = Testimonial(
@@ -34,10 +36,12 @@ class TestimonialService(Service):
 
         return check_model_existence(db, Testimonial, id)
 
+    @invalidates_cache("testimonial")
     def update(self, db: Session, id: str, schema):
         """Updates a testimonial"""
         pass
 
+    @invalidates_cache("testimonial")
     def delete(self, db: Session, id: str):
         """Deletes a specific testimonial"""
 
@@ -46,6 +50,7 @@ class TestimonialService(Service):
         db.delete(testimonial)
         db.commit()
 
+    @invalidates_cache("testimonial")
     def delete_all(self, db: Session):
         """Delete all testimonials"""
         try:
@@ -3,8 +3,6 @@ from fastapi.staticfiles import StaticFiles
 import uvicorn, os
 from sqlalchemy.exc import IntegrityError
 from fastapi import HTTPException, Request
-from slowapi import Limiter
-from slowapi.util import get_remote_address
 from fastapi.templating import Jinja2Templates
 from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
@@ -15,18 +13,25 @@ from fastapi.middleware.cors import CORSMiddleware
 from starlette.requests import Request
 from starlette.middleware.sessions import SessionMiddleware  # required by google oauth
 
+from api.utils.idempotency import IdempotencyMiddleware
 from api.utils.json_response import JsonResponseDict
 from api.utils.logger import logger
+from api.utils.lifecycle import lifecycle
+from api.utils.metrics import PrometheusMiddleware, metrics_response
+from api.utils.profiler import ProfilingMiddleware
+from api.utils.rate_limit import limiter
 from api.v1.routes import api_version_one
 from api.utils.settings import settings
-from scripts.populate_db import populate_roles_and_permissions
+import api.utils.warmup  # registers the startup and shutdown steps
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    '''Lifespan function'''
+    '''Lifespan function: runs the startup and shutdown steps in api/utils/warmup.py'''
 
+    await lifecycle.startup(app)
     yield
+    await lifecycle.shutdown(app)
 
 
 app = FastAPI(
@@ -37,12 +42,12 @@ app = FastAPI(
 )
 
 
-# Initialize the rate limiter
-limiter = Limiter(key_func=get_remote_address)
+# Shared rate limiter used by every router
 app.state.limiter = limiter
 
 # Set up email templates and css static files
 email_templates = Jinja2Templates(directory='api/core/dependencies/email/templates')
+app.state.email_templates = email_templates
 
 # MEDIA_DIR = os.path.expanduser('~/.media')
 MEDIA_DIR = './media'
@@ -67,6 +72,13 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(
+    IdempotencyMiddleware,
+    # payment and checkout POSTs, which clients may retry
+    paths=("/api/v1/transactions/flutterwave", "/api/v1/payment/stripe/upgrade-plan"),
+)
+app.add_middleware(ProfilingMiddleware)
+app.add_middleware(PrometheusMiddleware)
 
 app.include_router(api_version_one)
 
@@ -77,11 +89,26 @@ async def get_root(request: Request) -> dict:
     )
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return metrics_response()
+
+
 @app.get("/probe", tags=["Home"])
 async def probe():
     return {"message": "I am the Python FastAPI API responding"}
 
 
+@app.get("/ready", tags=["Home"])
+async def ready():
+    """Readiness: 200 once the startup steps have warmed this worker, 503 until then"""
+
+    return JSONResponse(
+        status_code=200 if lifecycle.ready else 503,
+        content=lifecycle.status(),
+    )
+
+
 # REGISTER EXCEPTION HANDLERS
 @app.exception_handler(HTTPException)
 async def http_exception(request: Request, exc: HTTPException):
@@ -94,6 +121,7 @@ async def http_exception(request: Request, exc: HTTPException):
             "status_code": exc.status_code,
             "message": exc.detail,
         },
+        headers=getattr(exc, "headers", None),
     )
 
 
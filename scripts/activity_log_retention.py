@@ -0,0 +1,48 @@
+"""Removes activity logs older than the retention period, a month at a time.
+
+Run periodically (e.g. daily from cron) with:
+    python -m scripts.activity_log_retention [--months N] [--archive] [--dry-run]
+
+On PostgreSQL whole monthly partitions are dropped (or detached with
+--archive, to be dumped and dropped by hand) and the coming months'
+partitions are created. Elsewhere the old rows are removed with one DELETE.
+"""
+import argparse
+from datetime import datetime, timezone
+
+from api.db.database import engine
+from api.db.partitions import add_months, month_start
+from api.utils.logger import logger
+from api.utils.settings import settings
+from api.v1.services.activity_logs import activity_log_partitions
+
+
+def apply_retention(months: int = None, archive: bool = None, dry_run: bool = False):
+    '''Retire the months before the retention window; returns the SQL run'''
+
+    months = settings.ACTIVITY_LOG_RETENTION_MONTHS if months is None else months
+    archive = settings.ACTIVITY_LOG_ARCHIVE if archive is None else archive
+    # keep the current month and the `months` - 1 before it
+    before = add_months(month_start(datetime.now(timezone.utc).date()), 1 - months)
+
+    with engine.begin() as conn:
+        statements = activity_log_partitions.retire(
+            conn, before, archive=archive, dry_run=dry_run
+        )
+        if not dry_run:
+            statements += activity_log_partitions.ensure(conn)
+
+    if not dry_run:
+        logger.info(f"Activity log retention: removed logs before {before}")
+    return statements
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--months", type=int, help="months to keep, including the current one")
+    parser.add_argument("--archive", action="store_true", default=None, help="detach instead of dropping")
+    parser.add_argument("--dry-run", action="store_true", help="print the changes only")
+    args = parser.parse_args()
+
+    for statement in apply_retention(args.months, args.archive, args.dry_run):
+        print(f"{statement};")
@@ -0,0 +1,168 @@
+"""Compares text ids with compact UUID ids: index size and join speed.
+
+Builds a parent/child pair of scratch tables for each id type, fills them
+with uuid7 ids, and reports table and index sizes and the time of a join on
+the foreign key. Run with:
+    python -m scripts.benchmark_uuid_keys [--rows 100000] [--database-url URL]
+
+On PostgreSQL the tables are created in the target database and dropped
+afterwards; on SQLite each variant gets its own temporary database file.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from sqlalchemy import (
+    Column,
+    ForeignKey,
+    Index,
+    LargeBinary,
+    MetaData,
+    String,
+    Table,
+    create_engine,
+    insert,
+    text,
+)
+from sqlalchemy.dialects import postgresql
+from uuid_extensions import uuid7
+
+
+JOIN_QUERY = (
+    "SELECT count(*) FROM {child} c JOIN {parent} p ON c.parent_id = p.id "
+    "WHERE p.id IN (SELECT parent_id FROM {child} WHERE kind = 'a')"
+)
+
+
+def id_type(variant: str, dialect: str):
+    if variant == "text":
+        return String
+    return postgresql.UUID(as_uuid=False) if dialect == "postgresql" else LargeBinary(16)
+
+
+def make_tables(variant: str, dialect: str):
+    metadata = MetaData()
+    ids = id_type(variant, dialect)
+    parent = Table(
+        f"bench_{variant}_parent", metadata,
+        Column("id", ids, primary_key=True),
+        Column("name", String, nullable=False),
+    )
+    child = Table(
+        f"bench_{variant}_child", metadata,
+        Column("id", ids, primary_key=True),
+        Column("parent_id", ids, ForeignKey(parent.c.id), nullable=False),
+        Column("kind", String, nullable=False),
+        Index(f"idx_bench_{variant}_child_parent_id", "parent_id"),
+    )
+    return metadata, parent, child
+
+
+def new_id(variant: str, dialect: str):
+    value = uuid7()
+    if variant == "text" or dialect == "postgresql":
+        return str(value)
+    return value.bytes
+
+
+def fill(engine, parent, child, variant: str, rows: int, batch: int = 5000):
+    dialect = engine.dialect.name
+    parent_ids = [new_id(variant, dialect) for _ in range(max(rows // 10, 1))]
+    with engine.begin() as conn:
+        for start in range(0, len(parent_ids), batch):
+            conn.execute(
+                insert(parent),
+                [{"id": pid, "name": "parent"} for pid in parent_ids[start:start + batch]],
+            )
+        for start in range(0, rows, batch):
+            conn.execute(
+                insert(child),
+                [
+                    {
+                        "id": new_id(variant, dialect),
+                        "parent_id": random.choice(parent_ids),
+                        "kind": random.choice("abcd"),
+                    }
+                    for _ in range(min(batch, rows - start))
+                ],
+            )
+        if dialect == "postgresql":
+            conn.exec_driver_sql(f"ANALYZE {parent.name}")
+            conn.exec_driver_sql(f"ANALYZE {child.name}")
+
+
+def sizes(engine, parent, child) -> dict:
+    with engine.connect() as conn:
+        if engine.dialect.name == "postgresql":
+            size = lambda relation: conn.execute(  # noqa: E731
+                text("SELECT pg_relation_size(CAST(:r AS regclass))"), {"r": relation}
+            ).scalar()
+            return {
+                "tables": size(parent.name) + size(child.name),
+                "pk_indexes": size(f"{parent.name}_pkey") + size(f"{child.name}_pkey"),
+                "fk_index": size(f"idx_bench_{parent.name.split('_')[1]}_child_parent_id"),
+            }
+        page_size = conn.exec_driver_sql("PRAGMA page_size").scalar()
+        page_count = conn.exec_driver_sql("PRAGMA page_count").scalar()
+        return {"database_file": page_size * page_count}
+
+
+def time_join(engine, parent, child, repeat: int = 5) -> float:
+    query = text(JOIN_QUERY.format(parent=parent.name, child=child.name))
+    best = float("inf")
+    with engine.connect() as conn:
+        conn.execute(query).scalar()  # warm the cache
+        for _ in range(repeat):
+            start = time.perf_counter()
+            conn.execute(query).scalar()
+            best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def benchmark(database_url: str, rows: int) -> dict:
+    results = {}
+    for variant in ("text", "uuid"):
+        if database_url.startswith("sqlite"):
+            handle, path = tempfile.mkstemp(suffix=".db")
+            os.close(handle)
+            engine = create_engine(f"sqlite:///{path}")
+        else:
+            path, engine = None, create_engine(database_url)
+
+        metadata, parent, child = make_tables(variant, engine.dialect.name)
+        metadata.drop_all(engine)
+        metadata.create_all(engine)
+        try:
+            fill(engine, parent, child, variant, rows)
+            results[variant] = {
+                **sizes(engine, parent, child),
+                "join_ms": round(time_join(engine, parent, child), 2),
+            }
+        finally:
+            metadata.drop_all(engine)
+            engine.dispose()
+            if path:
+                os.remove(path)
+    return results
+
+
+def default_url() -> str:
+    from api.db.database import engine
+
+    return engine.url.render_as_string(hide_password=False)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args()
+
+    results = benchmark(args.database_url or default_url(), args.rows)
+    print(f"{'metric':<14} {'text ids':>14} {'uuid ids':>14} {'change':>8}")
+    for metric in results["text"]:
+        before, after = results["text"][metric], results["uuid"][metric]
+        change = f"{(after - before) / before * 100:+.0f}%" if before else ""
+        print(f"{metric:<14} {before:>14} {after:>14} {change:>8}")
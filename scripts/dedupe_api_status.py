@@ -0,0 +1,21 @@
+"""Removes duplicate API status rows so `api_status.api_group` can be unique.
+
+Rows recorded concurrently before the unique constraint existed may share an
+api_group; the most recently updated one is kept. Run once before the
+migration that adds uq_api_status_api_group:
+    python -m scripts.dedupe_api_status
+"""
+from api.db.database import SessionLocal
+from api.utils.logger import logger
+from api.v1.services.api_status import APIStatusService
+
+
+def dedupe():
+    with SessionLocal() as db:
+        deleted = APIStatusService.deduplicate(db)
+    logger.info(f"Removed {deleted} duplicate API status row(s)")
+    return deleted
+
+
+if __name__ == "__main__":
+    print(f"Removed {dedupe()} duplicate API status row(s)")
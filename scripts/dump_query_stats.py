@@ -0,0 +1,46 @@
+"""Prints the slow query log merged across all workers.
+
+Workers write their statistics to QUERY_STATS_DIR every minute. Run with:
+    python -m scripts.dump_query_stats [--limit 20] [--sort p95_ms] [--explain]
+"""
+import argparse
+import sys
+
+from api.db.query_log import merge_snapshots
+from api.utils.settings import settings
+
+
+def dump_query_stats(snapshot_dir: str, limit: int, sort_by: str, explain: bool):
+    '''Print the heaviest statement fingerprints'''
+
+    entries = merge_snapshots(snapshot_dir)
+    entries.sort(key=lambda entry: entry[sort_by], reverse=True)
+
+    print(f"{'count':>8} {'total ms':>11} {'p50':>8} {'p95':>8} {'p99':>8} {'rows/q':>8}  statement")
+    for entry in entries[:limit]:
+        print(
+            f"{entry['count']:>8} {entry['total_ms']:>11.1f} {entry['p50_ms']:>8.1f} "
+            f"{entry['p95_ms']:>8.1f} {entry['p99_ms']:>8.1f} {entry['mean_rows']:>8.1f}  "
+            f"[{entry['id']}] {entry['statement']}"
+        )
+        if explain and entry["explain"]:
+            for line in entry["explain"].splitlines():
+                print(f"{'':>57}| {line}")
+    return entries[:limit]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dir", default=settings.QUERY_STATS_DIR)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument(
+        "--sort",
+        default="total_ms",
+        choices=["total_ms", "count", "mean_ms", "p95_ms", "p99_ms", "max_ms", "rows"],
+    )
+    parser.add_argument("--explain", action="store_true", help="print captured plans")
+    args = parser.parse_args()
+
+    if not args.dir:
+        sys.exit("QUERY_STATS_DIR is not set; pass --dir")
+    dump_query_stats(args.dir, args.limit, args.sort, args.explain)
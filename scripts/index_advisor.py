@@ -0,0 +1,89 @@
+"""Proposes indexes from the models and the slow query log.
+
+Run with:
+    python -m scripts.index_advisor [--stats-dir DIR] [--accept NAME ...]
+                                    [--compare] [--write-migration]
+
+--compare reports the plan of a lookup on each candidate before and after
+creating it (inside a rolled back transaction); run it against a seeded
+database, e.g. after `python -m scripts.seed`. --write-migration writes an
+Alembic revision creating the accepted candidates to alembic/versions.
+"""
+import argparse
+import os
+import sys
+from uuid import uuid4
+
+from api.db.index_advisor import IndexAdvisor, compare_plans, render_migration
+from api.db.query_log import merge_snapshots
+from api.utils.settings import settings
+
+
+def load_metadata():
+    '''Base metadata with every model registered, as alembic/env.py loads it'''
+
+    import api.v1.models  # noqa: F401
+    import api.v1.models.permissions.permissions  # noqa: F401
+    import api.v1.models.permissions.role  # noqa: F401
+    import api.v1.models.permissions.role_permissions  # noqa: F401
+    import api.v1.models.permissions.user_org_role  # noqa: F401
+    from api.v1.models.associations import Base
+
+    return Base.metadata
+
+
+def current_head():
+    from alembic.config import Config
+    from alembic.script import ScriptDirectory
+
+    return ScriptDirectory.from_config(Config("alembic.ini")).get_current_head()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--stats-dir", default=settings.QUERY_STATS_DIR)
+    parser.add_argument("--accept", nargs="*", help="candidate names to keep (default: all)")
+    parser.add_argument("--compare", action="store_true", help="EXPLAIN before/after on this database")
+    parser.add_argument("--write-migration", action="store_true")
+    args = parser.parse_args(argv)
+
+    statements = []
+    if args.stats_dir and os.path.isdir(args.stats_dir):
+        statements = merge_snapshots(args.stats_dir)
+
+    advice = IndexAdvisor(load_metadata()).advise(statements)
+    candidates = advice.candidates
+    if args.accept is not None:
+        candidates = [c for c in candidates if c.name in set(args.accept)]
+
+    for candidate in candidates:
+        print(f"{candidate.describe()}\n    {candidate.total_ms:.0f} ms; {'; '.join(candidate.reasons)}")
+    for note in advice.notes:
+        print(f"note: {note}")
+    if not candidates:
+        print("No missing indexes found")
+        return
+
+    if args.compare:
+        from api.db.database import engine
+
+        for comparison in compare_plans(engine, candidates):
+            costs = (
+                f"cost {comparison.before_cost} -> {comparison.after_cost}"
+                if comparison.before_cost is not None
+                else f"index used: {comparison.uses_index}"
+            )
+            print(f"\n{comparison.candidate.name}: {costs}\n  {comparison.query}")
+            print(f"  before: {comparison.before.splitlines()[0] if comparison.before else ''}")
+            print(f"  after:  {comparison.after.splitlines()[0] if comparison.after else ''}")
+
+    if args.write_migration:
+        revision = uuid4().hex[:12]
+        path = os.path.join("alembic", "versions", f"{revision}_add_advised_indexes.py")
+        with open(path, "w") as file:
+            file.write(render_migration(candidates, revision, current_head()))
+        print(f"\nWrote {path}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+"""HTTP load generator for checking how throughput scales with workers.
+
+Starts `serve.py` with each worker count in turn on a scratch port, drives
+it with several client processes for a fixed duration, and prints requests
+per second and latency percentiles. Run with:
+    python -m scripts.load_test --workers 1 2 4 --path /probe --duration 10
+
+With --url it only drives an already running server instead.
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+import httpx
+
+
+async def _drive(url: str, concurrency: int, duration: float):
+    latencies, errors = [], 0
+    deadline = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(limits=limits, timeout=10) as client:
+
+        async def user():
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                try:
+                    response = await client.get(url)
+                    if response.status_code >= 500:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - start)
+
+        await asyncio.gather(*(user() for _ in range(concurrency)))
+    return latencies, errors
+
+
+def _client_process(url, concurrency, duration, results):
+    results.put(asyncio.run(_drive(url, concurrency, duration)))
+
+
+def run_load(url: str, clients: int, concurrency: int, duration: float) -> dict:
+    '''Drives `url` from `clients` processes with `concurrency` connections each'''
+
+    results = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(target=_client_process, args=(url, concurrency, duration, results))
+        for _ in range(clients)
+    ]
+    for process in processes:
+        process.start()
+    latencies, errors = [], 0
+    for _ in processes:
+        batch, batch_errors = results.get()
+        latencies += batch
+        errors += batch_errors
+    for process in processes:
+        process.join()
+
+    latencies.sort()
+    percentile = lambda p: latencies[min(int(len(latencies) * p), len(latencies) - 1)] * 1000  # noqa: E731
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / duration, 1),
+        "p50_ms": round(percentile(0.50), 2) if latencies else 0,
+        "p99_ms": round(percentile(0.99), 2) if latencies else 0,
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_up(url: str, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(url, timeout=1)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    raise RuntimeError(f"server at {url} did not start")
+
+
+def start_server(app: str, workers: int, port: int, *extra) -> subprocess.Popen:
+    return subprocess.Popen(
+        [
+            sys.executable, "serve.py", "--app", app, "--host", "127.0.0.1",
+            "--port", str(port), "--workers", str(workers), "--log-level", "warning",
+            *extra,
+        ],
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--app", default="main:app")
+    parser.add_argument("--path", default="/probe")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, os.cpu_count() or 1])
+    parser.add_argument("--clients", type=int, default=max((os.cpu_count() or 2) // 2, 1))
+    parser.add_argument("--concurrency", type=int, default=32, help="connections per client")
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--url", help="drive a running server instead")
+    args = parser.parse_args(argv)
+
+    if args.url:
+        print(run_load(args.url, args.clients, args.concurrency, args.duration))
+        return
+
+    print(f"{'workers':>7} {'req/s':>10} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for workers in args.workers:
+        port = _free_port()
+        url = f"http://127.0.0.1:{port}{args.path}"
+        server = start_server(args.app, workers, port)
+        try:
+            wait_until_up(url)
+            result = run_load(url, args.clients, args.concurrency, args.duration)
+        finally:
+            server.send_signal(signal.SIGTERM)
+            server.wait(60)
+        print(
+            f"{workers:>7} {result['rps']:>10} {result['p50_ms']:>8} "
+            f"{result['p99_ms']:>8} {result['errors']:>7}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+"""Converts the id columns of the configured database to compact UUID storage.
+
+Run with:
+    python -m scripts.migrate_uuid_columns [--dry-run]
+
+then set DB_NATIVE_UUID=True and restart the application.
+"""
+import argparse
+
+from api.db.database import engine
+from api.db.uuid_migration import migrate
+from api.utils.logger import logger
+from api.utils.settings import settings
+from scripts.index_advisor import load_metadata
+
+
+def migrate_uuid_columns(dry_run: bool = False):
+    '''Convert text ids to native uuid (PostgreSQL) or BLOB(16) (SQLite)'''
+
+    summary = migrate(engine, load_metadata(), dry_run=dry_run)
+    if not dry_run:
+        logger.info(f"Converted id columns to UUID storage; {len(summary)} step(s)")
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dry-run", action="store_true", help="print the changes only")
+    args = parser.parse_args()
+
+    for line in migrate_uuid_columns(dry_run=args.dry_run) or ["Nothing to convert"]:
+        print(f"{line};" if line.startswith("ALTER") else line)
+    if not args.dry_run and not settings.DB_NATIVE_UUID:
+        print("Now set DB_NATIVE_UUID=True and restart the application")
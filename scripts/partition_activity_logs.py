@@ -0,0 +1,32 @@
+"""Converts the activity_logs table to monthly partitions (PostgreSQL).
+
+Run once, in a maintenance window, with:
+    python -m scripts.partition_activity_logs [--dry-run]
+
+New databases get the partitioned table from the models; this is for
+databases created before it was partitioned.
+"""
+import argparse
+
+from api.db.database import engine
+from api.utils.logger import logger
+from api.v1.services.activity_logs import activity_log_partitions
+
+
+def partition_activity_logs(dry_run: bool = False):
+    '''Rebuild activity_logs as a partitioned table, copying its rows'''
+
+    with engine.begin() as conn:
+        statements = activity_log_partitions.convert(conn, dry_run=dry_run)
+    if statements and not dry_run:
+        logger.info("Converted activity_logs to monthly partitions")
+    return statements
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dry-run", action="store_true", help="print the changes only")
+    args = parser.parse_args()
+
+    for statement in partition_activity_logs(dry_run=args.dry_run) or ["Nothing to convert"]:
+        print(f"{statement};" if statement != "Nothing to convert" else statement)
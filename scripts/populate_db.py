@@ -2,11 +2,12 @@ from api.db.database import get_db
 from api.v1.models.permissions.role import Role
 from api.v1.models.permissions.permissions import Permission
 
-db = next(get_db())
 
 def populate_roles_and_permissions():
     '''Function to populate database with roles and permissions'''
 
+    db = next(get_db())
+
     # Define roles
     roles = [
         {"name": "admin", "description": "Administrator with full access", "is_builtin": True},
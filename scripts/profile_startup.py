@@ -0,0 +1,118 @@
+"""Breaks down the API's cold start.
+
+Imports the app in a fresh interpreter with `-X importtime` and prints the
+slowest modules (cumulative) and the packages that cost the most in total
+(self time), then starts `serve.py` with one worker and measures the time
+until the first request is answered. Run with:
+    python -m scripts.profile_startup --top 25
+"""
+import argparse
+import re
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+import httpx
+
+from scripts.load_test import _free_port, start_server
+
+
+# Modules only needed by a few endpoints; importing the app must not load them
+LAZY_MODULES = ("stripe", "twilio.rest", "PIL.Image", "fastapi_mail", "premailer")
+
+# Seconds from process start to the first answered request
+TIME_TO_FIRST_REQUEST_BUDGET = 10.0
+
+_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def import_profile(app_module: str = "main") -> List[Tuple[str, int, int]]:
+    '''(module, self_us, cumulative_us) for every module imported by `app_module`'''
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {app_module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            rows.append((match.group(4), int(match.group(1)), int(match.group(2))))
+    return rows
+
+
+def by_package(rows) -> Dict[str, int]:
+    '''Self time per top level package, in microseconds'''
+
+    totals = defaultdict(int)
+    for module, self_us, _ in rows:
+        totals[module.split(".")[0]] += self_us
+    return dict(totals)
+
+
+def loaded_modules(app_module: str = "main") -> List[str]:
+    '''Names of all modules in sys.modules after importing `app_module`'''
+
+    result = subprocess.run(
+        [sys.executable, "-c", f"import sys, {app_module}; print('\\n'.join(sys.modules))"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return result.stdout.split()
+
+
+def time_to_first_request(app: str = "main:app", path: str = "/probe", timeout: float = 60) -> float:
+    '''Seconds from launching a single worker server to its first 200 response'''
+
+    port = _free_port()
+    start = time.perf_counter()
+    server = start_server(app, 1, port, "--max-requests", "0")
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                if httpx.get(f"http://127.0.0.1:{port}{path}", timeout=1).status_code == 200:
+                    return time.perf_counter() - start
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.05)
+        raise RuntimeError(f"server did not answer within {timeout}s")
+    finally:
+        server.terminate()
+        server.wait(30)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--no-serve", action="store_true", help="skip the time to first request")
+    args = parser.parse_args(argv)
+
+    rows = import_profile()
+    total = max(cumulative for _, _, cumulative in rows)
+    print(f"import main: {total / 1e6:.2f}s\n")
+
+    print(f"{'cumulative ms':>14} {'self ms':>8}  module")
+    for module, self_us, cumulative_us in sorted(rows, key=lambda row: -row[2])[: args.top]:
+        print(f"{cumulative_us / 1000:>14.1f} {self_us / 1000:>8.1f}  {module}")
+
+    print(f"\n{'self ms':>8}  package")
+    packages = sorted(by_package(rows).items(), key=lambda item: -item[1])
+    for package, self_us in packages[: args.top]:
+        print(f"{self_us / 1000:>8.1f}  {package}")
+
+    eager = [module for module in LAZY_MODULES if module in {row[0] for row in rows}]
+    if eager:
+        print(f"\nimported eagerly but meant to be lazy: {', '.join(eager)}")
+
+    if not args.no_serve:
+        elapsed = time_to_first_request()
+        print(f"\ntime to first request: {elapsed:.2f}s (budget {TIME_TO_FIRST_REQUEST_BUDGET}s)")
+
+
+if __name__ == "__main__":
+    main()
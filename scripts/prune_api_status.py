@@ -0,0 +1,23 @@
+"""Removes API status samples and rollups older than their retention periods.
+
+Recording a status already prunes at most once per API_STATUS_PRUNE_INTERVAL;
+run this (e.g. daily from cron) when statuses are recorded rarely:
+    python -m scripts.prune_api_status
+"""
+from api.db.database import SessionLocal
+from api.utils.logger import logger
+from api.v1.services.api_status import APIStatusService
+
+
+def prune():
+    with SessionLocal() as db:
+        deleted = APIStatusService.prune(db)
+    logger.info(
+        "API status pruned: "
+        + ", ".join(f"{count} {name}" for name, count in deleted.items())
+    )
+    return deleted
+
+
+if __name__ == "__main__":
+    print(prune())
@@ -0,0 +1,21 @@
+"""Deletes expired Idempotency-Key requests and their stored responses.
+
+Completing a request already prunes at most once per
+IDEMPOTENCY_PRUNE_INTERVAL; run this (e.g. daily from cron) when few
+requests carry the header:
+    python -m scripts.prune_idempotency_keys
+"""
+from api.db.database import SessionLocal
+from api.utils.logger import logger
+from api.v1.services.idempotency import IdempotencyService
+
+
+def prune():
+    with SessionLocal() as db:
+        deleted = IdempotencyService.prune(db)
+    logger.info(f"Idempotency keys pruned: {deleted}")
+    return deleted
+
+
+if __name__ == "__main__":
+    print(prune())
@@ -0,0 +1,25 @@
+"""Repairs drift in the denormalized blog/comment like and dislike counters.
+
+Run periodically (e.g. from cron) with:
+    python -m scripts.reconcile_like_counters
+"""
+from api.db.database import get_db
+from api.utils.logger import logger
+from api.v1.services.like_counter import like_counter_service
+
+
+def reconcile_like_counters():
+    '''Recompute like/dislike counters from the like tables'''
+
+    db = next(get_db())
+    try:
+        repaired = like_counter_service.reconcile(db)
+    finally:
+        db.close()
+
+    logger.info(f"Reconciled like counters; {repaired} value(s) repaired")
+    return repaired
+
+
+if __name__ == "__main__":
+    print(f"{reconcile_like_counters()} counter value(s) repaired")
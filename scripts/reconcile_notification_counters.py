@@ -0,0 +1,25 @@
+"""Repairs drift in the per-user unread notification counters.
+
+Run once after deploying the counters, then periodically (e.g. from cron):
+    python -m scripts.reconcile_notification_counters
+"""
+from api.db.database import get_db
+from api.utils.logger import logger
+from api.v1.services.notification_counter import notification_counter_service
+
+
+def reconcile_notification_counters():
+    '''Recompute unread counters from the notifications table'''
+
+    db = next(get_db())
+    try:
+        repaired = notification_counter_service.reconcile(db)
+    finally:
+        db.close()
+
+    logger.info(f"Reconciled notification counters; {repaired} counter(s) repaired")
+    return repaired
+
+
+if __name__ == "__main__":
+    print(f"{reconcile_notification_counters()} counter(s) repaired")
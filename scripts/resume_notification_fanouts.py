@@ -0,0 +1,29 @@
+"""Finishes organisation notification fan-outs that were interrupted.
+
+Run after a deploy or crash with:
+    python -m scripts.resume_notification_fanouts
+
+A fan-out still running in a worker renews its lease with every chunk and
+is left alone; one without a chunk for NOTIFICATION_FANOUT_LEASE_TIMEOUT
+seconds is resumed.
+"""
+from api.db.database import get_db
+from api.utils.logger import logger
+from api.v1.services.notification_fanout import notification_fanout_service
+
+
+def resume_notification_fanouts():
+    '''Run every pending or interrupted fan-out to completion'''
+
+    db = next(get_db())
+    try:
+        resumed = notification_fanout_service.resume_unfinished(db)
+    finally:
+        db.close()
+
+    logger.info(f"Resumed {len(resumed)} notification fan-out(s)")
+    return resumed
+
+
+if __name__ == "__main__":
+    print(f"{len(resume_notification_fanouts())} fan-out(s) resumed")
@@ -0,0 +1,27 @@
+"""Probes every API group once, in-process, and records the results.
+
+Useful after a deploy or to check a probe change without waiting for the
+scheduled round:
+    python -m scripts.run_synthetic_monitor [--dry-run]
+"""
+import argparse
+import asyncio
+
+from api.v1.services.synthetic_monitor import synthetic_monitor
+
+
+async def run(dry_run: bool = False):
+    from main import app
+
+    if dry_run:
+        return await synthetic_monitor.probe(app)
+    return await synthetic_monitor.run_once(app)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dry-run", action="store_true", help="print the results only")
+    args = parser.parse_args()
+
+    for status in asyncio.run(run(args.dry_run)):
+        print(f"{status.api_group:<20} {status.status:<12} {status.response_time:>10} ms  {status.details}")
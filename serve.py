@@ -0,0 +1,281 @@
+"""Production server for the API.
+
+Runs `main:app` with uvicorn (uvloop + httptools) in several worker
+processes sharing one listening socket, managed by a small supervisor:
+
+    * --workers N (default WEB_CONCURRENCY, else the number of CPUs)
+    * --preload imports the app once in the supervisor and forks the workers
+      from it, so they share its memory pages and start faster; import errors
+      surface before any worker starts. Without it workers are spawned fresh.
+    * --max-requests N recycles a worker after about N requests (plus up to
+      --max-requests-jitter, so the workers do not all restart together); the
+      supervisor starts a replacement as soon as it exits.
+    * SIGTERM / SIGINT drain: workers stop accepting connections, finish the
+      requests in flight for up to --graceful-timeout seconds, run the
+      lifespan shutdown and exit. Stragglers are killed after that.
+    * SIGHUP restarts the workers one at a time (new one up, then old one
+      drained), SIGTTIN / SIGTTOU add or remove a worker.
+
+Each worker runs the hooks in WORKER_STARTUP_HOOKS before serving; they
+give it its own database connection pool and a clean metrics slot.
+
+Several workers need the shared backends (PUBSUB_BACKEND, RESPONSE_CACHE_BACKEND,
+RATE_LIMIT_STORAGE, PROMETHEUS_MULTIPROC_DIR), as the Docker image sets them;
+with a per-worker one the supervisor logs an error at startup.
+
+Run with:
+    python serve.py --host 0.0.0.0 --port 7001
+    python serve.py --reload            # development: one process, autoreload
+"""
+
+import argparse
+import logging
+import multiprocessing
+import os
+import random
+import signal
+import sys
+import threading
+import time
+from typing import Callable, List, Optional
+
+import uvicorn
+
+from api.utils.settings import settings
+
+
+logger = logging.getLogger("uvicorn.error")
+
+APP = "main:app"
+
+
+def reset_db_pool():
+    '''Drops database connections inherited from the supervisor'''
+
+    from api.db.database import engine
+
+    # close=False leaves the parent's sockets alone; the worker opens its own
+    engine.dispose(close=False)
+
+
+def clear_metrics_slot():
+    '''Removes live metrics left by a previous process with the same pid'''
+
+    from api.utils.metrics import mark_process_dead
+
+    mark_process_dead(os.getpid())
+
+
+WORKER_STARTUP_HOOKS: List[Callable[[], None]] = [reset_db_pool, clear_metrics_slot]
+
+
+def per_worker_settings() -> List[str]:
+    '''Settings that keep state in each worker's memory, which other workers never see'''
+
+    shared = {
+        "PUBSUB_BACKEND": settings.PUBSUB_BACKEND != "memory",
+        "RESPONSE_CACHE_BACKEND": settings.RESPONSE_CACHE_BACKEND != "memory",
+        "RATE_LIMIT_STORAGE": settings.RATE_LIMIT_STORAGE != "memory",
+        "PROMETHEUS_MULTIPROC_DIR": bool(settings.PROMETHEUS_MULTIPROC_DIR),
+    }
+    return [name for name, is_shared in shared.items() if not is_shared]
+
+
+def run_worker(config: uvicorn.Config, sockets, max_requests: Optional[int]):
+    '''Worker process body: run the startup hooks, then serve until told to stop'''
+
+    config.limit_max_requests = max_requests
+    for hook in WORKER_STARTUP_HOOKS:
+        hook()
+    uvicorn.Server(config).run(sockets=sockets)
+
+
+class Supervisor:
+    """Keeps `workers` uvicorn worker processes running on a shared socket"""
+
+    def __init__(
+        self,
+        config: uvicorn.Config,
+        workers: int,
+        preload: bool = False,
+        max_requests: Optional[int] = None,
+        max_requests_jitter: int = 0,
+        graceful_timeout: int = 30,
+    ):
+        self.config = config
+        self.workers = workers
+        self.max_requests = max_requests
+        self.max_requests_jitter = max_requests_jitter
+        self.graceful_timeout = graceful_timeout
+        self.context = multiprocessing.get_context("fork" if preload else "spawn")
+        self.preload = preload
+        self.processes: List[multiprocessing.Process] = []
+        self.should_exit = threading.Event()
+        self.signals: List[int] = []
+        self.sockets = []
+
+    def worker_max_requests(self) -> Optional[int]:
+        if not self.max_requests:
+            return None
+        return self.max_requests + random.randint(0, self.max_requests_jitter)
+
+    def spawn(self) -> multiprocessing.Process:
+        process = self.context.Process(
+            target=run_worker,
+            args=(self.config, self.sockets, self.worker_max_requests()),
+        )
+        process.start()
+        logger.info(f"Started worker [{process.pid}]")
+        return process
+
+    def stop(self, process: multiprocessing.Process):
+        '''Asks `process` to drain and waits for it, killing it after the timeout'''
+
+        if process.is_alive():
+            os.kill(process.pid, signal.SIGTERM)
+        process.join(self.graceful_timeout + 5)
+        if process.is_alive():
+            logger.warning(f"Worker [{process.pid}] did not drain in time, killing it")
+            process.kill()
+            process.join()
+        self.reap(process)
+
+    def reap(self, process: multiprocessing.Process):
+        from api.utils.metrics import mark_process_dead
+
+        mark_process_dead(process.pid)
+
+    def run(self):
+        self.sockets = [self.config.bind_socket()]
+        if self.preload:
+            self.config.load()
+
+        for sig in (signal.SIGINT, signal.SIGTERM, signal.SIGHUP, signal.SIGTTIN, signal.SIGTTOU):
+            signal.signal(sig, lambda sig, frame: self.signals.append(sig))
+
+        logger.info(f"Started supervisor [{os.getpid()}] with {self.workers} worker(s)")
+        self.processes = [self.spawn() for _ in range(self.workers)]
+
+        while not self.should_exit.wait(0.5):
+            self.handle_signals()
+            self.replace_exited()
+
+        logger.info("Draining workers")
+        for process in self.processes:
+            if process.is_alive():
+                os.kill(process.pid, signal.SIGTERM)
+        deadline = time.monotonic() + self.graceful_timeout + 5
+        for process in self.processes:
+            process.join(max(deadline - time.monotonic(), 0))
+            if process.is_alive():
+                logger.warning(f"Worker [{process.pid}] did not drain in time, killing it")
+                process.kill()
+                process.join()
+            self.reap(process)
+        for sock in self.sockets:
+            sock.close()
+        logger.info(f"Stopped supervisor [{os.getpid()}]")
+
+    def replace_exited(self):
+        '''Restarts workers that exited: recycled after max requests, or crashed'''
+
+        for index, process in enumerate(self.processes):
+            if process.is_alive() or self.should_exit.is_set():
+                continue
+            process.join()
+            self.reap(process)
+            reason = "recycled" if process.exitcode == 0 else f"died (exit code {process.exitcode})"
+            logger.info(f"Worker [{process.pid}] {reason}")
+            self.processes[index] = self.spawn()
+
+    def handle_signals(self):
+        while self.signals:
+            sig = self.signals.pop(0)
+            if sig in (signal.SIGINT, signal.SIGTERM):
+                logger.info(f"Received {signal.Signals(sig).name}, shutting down")
+                self.should_exit.set()
+            elif sig == signal.SIGHUP:
+                logger.info("Received SIGHUP, restarting workers one at a time")
+                for index, process in enumerate(list(self.processes)):
+                    self.processes[index] = self.spawn()
+                    self.stop(process)
+            elif sig == signal.SIGTTIN:
+                self.workers += 1
+                self.processes.append(self.spawn())
+            elif sig == signal.SIGTTOU and self.workers > 1:
+                self.workers -= 1
+                self.stop(self.processes.pop())
+
+
+def build_config(args) -> uvicorn.Config:
+    return uvicorn.Config(
+        args.app,
+        host=args.host,
+        port=args.port,
+        loop="uvloop",
+        http="httptools",
+        lifespan="on",
+        proxy_headers=True,
+        forwarded_allow_ips=args.forwarded_allow_ips,
+        timeout_keep_alive=args.keep_alive,
+        timeout_graceful_shutdown=args.graceful_timeout,
+        backlog=args.backlog,
+        access_log=args.access_log,
+        log_level=args.log_level,
+    )
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the API in production")
+    parser.add_argument("--app", default=APP, help="ASGI app import string")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=7001)
+    parser.add_argument(
+        "--workers", type=int, default=settings.WEB_CONCURRENCY or os.cpu_count() or 1
+    )
+    parser.add_argument("--preload", action=argparse.BooleanOptionalAction, default=settings.SERVER_PRELOAD)
+    parser.add_argument("--max-requests", type=int, default=settings.SERVER_MAX_REQUESTS)
+    parser.add_argument("--max-requests-jitter", type=int, default=settings.SERVER_MAX_REQUESTS_JITTER)
+    parser.add_argument("--graceful-timeout", type=int, default=settings.SERVER_GRACEFUL_TIMEOUT)
+    parser.add_argument("--keep-alive", type=int, default=5)
+    parser.add_argument("--backlog", type=int, default=2048)
+    parser.add_argument("--forwarded-allow-ips", default="127.0.0.1")
+    parser.add_argument("--access-log", action=argparse.BooleanOptionalAction, default=False)
+    parser.add_argument("--log-level", default="info")
+    parser.add_argument("--reload", action="store_true", help="development only")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.reload:
+        uvicorn.run(args.app, host=args.host, port=args.port, reload=True, log_level=args.log_level)
+        return
+
+    config = build_config(args)
+    if args.workers <= 1 and not args.max_requests:
+        # a single worker needs no supervisor
+        uvicorn.Server(config).run()
+        return
+
+    unshared = per_worker_settings()
+    if args.workers > 1 and unshared:
+        # pushed events, cache invalidation, rate limits and metrics would
+        # each only reach the worker that produced them
+        logger.error(
+            f"Running {args.workers} workers with per-worker state ({', '.join(unshared)}); "
+            "set shared backends or --workers 1"
+        )
+
+    Supervisor(
+        config,
+        workers=max(args.workers, 1),
+        preload=args.preload,
+        max_requests=args.max_requests or None,
+        max_requests_jitter=args.max_requests_jitter,
+        graceful_timeout=args.graceful_timeout,
+    ).run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
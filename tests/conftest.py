@@ -15,3 +15,54 @@ def mock_send_email():
             add_task_mock.side_effect = lambda func, *args, **kwargs: func(*args, **kwargs)
             
             yield mock_email_sending
+
+
+@pytest.fixture(autouse=True)
+def clear_response_cache():
+    '''Keeps cached responses from leaking between tests'''
+    from api.utils.response_cache import response_cache
+
+    response_cache.clear()
+    yield
+    response_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def reset_rate_limits():
+    '''Gives every test a fresh rate limit budget'''
+    from api.utils.rate_limit import limiter
+
+    limiter.reset()
+    yield
+
+
+@pytest.fixture(autouse=True)
+def reset_permission_cache():
+    '''Keeps cached roles and memberships from leaking between tests'''
+    from api.v1.services.permissions.resolver import permission_resolver
+
+    permission_resolver.clear()
+    permission_resolver.catalog.clear()
+    yield
+
+
+@pytest.fixture(autouse=True)
+def discard_buffered_activity_logs():
+    '''Keeps activity logs queued by one test from being written during another'''
+    from api.v1.services.activity_logs import activity_log_writer
+
+    yield
+    activity_log_writer.clear()
+
+
+@pytest.fixture
+def provider_transport():
+    '''Answers outbound provider calls with a test's handler instead of the network'''
+    import httpx
+    from api.utils.http_client import provider_clients
+
+    def use(handler):
+        provider_clients.set_transport(httpx.MockTransport(handler))
+
+    yield use
+    provider_clients.set_transport(None)
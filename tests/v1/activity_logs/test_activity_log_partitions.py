@@ -0,0 +1,158 @@
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, create_mock_engine, insert, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.schema import CreateTable
+
+from api.db.partitions import MonthlyPartitions, add_months, month_start
+from api.v1.models.activity_logs import ActivityLog
+from api.v1.services.activity_logs import activity_log_service
+
+table = ActivityLog.__table__
+START = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'logs.db'}")
+    table.create(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db(engine):
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def add_logs(engine, user_id, count, start=START, step=timedelta(days=1)):
+    rows = [
+        {
+            "id": f"{user_id}-{index:03d}",
+            "user_id": user_id,
+            "action": f"action {index}",
+            "timestamp": start + step * index,
+        }
+        for index in range(count)
+    ]
+    with engine.begin() as conn:
+        conn.execute(insert(table), rows)
+
+
+def test_month_arithmetic():
+    assert month_start(date(2026, 3, 17)) == date(2026, 3, 1)
+    assert add_months(date(2026, 11, 1), 2) == date(2027, 1, 1)
+    assert add_months(date(2026, 1, 1), -1) == date(2025, 12, 1)
+
+
+def test_table_is_range_partitioned_on_postgres():
+    ddl = str(CreateTable(table).compile(dialect=postgresql.dialect()))
+
+    assert "PARTITION BY RANGE (timestamp)" in ddl
+    assert "PRIMARY KEY (timestamp, id)" in ddl
+    assert MonthlyPartitions(table, "timestamp").partition_name(date(2026, 2, 1)) == (
+        "activity_logs_2026_02"
+    )
+
+
+def test_pages_follow_the_cursor_newest_first(engine, db):
+    add_logs(engine, "user-1", 7)
+    add_logs(engine, "user-2", 3)
+
+    seen, cursor = [], None
+    while True:
+        logs, cursor = activity_log_service.fetch_page(db, user_id="user-1", limit=3, cursor=cursor)
+        seen.extend(log.id for log in logs)
+        if cursor is None:
+            break
+
+    assert seen == [f"user-1-{index:03d}" for index in reversed(range(7))]
+
+
+def test_page_is_limited_to_the_time_window(engine, db):
+    add_logs(engine, "user-1", 10)
+
+    logs, cursor = activity_log_service.fetch_page(
+        db,
+        user_id="user-1",
+        since=START + timedelta(days=2),
+        until=START + timedelta(days=5),
+    )
+
+    assert [log.id for log in logs] == ["user-1-004", "user-1-003", "user-1-002"]
+    assert cursor is None
+
+
+def test_logs_with_the_same_timestamp_are_not_skipped(engine, db):
+    add_logs(engine, "user-1", 5, step=timedelta(0))
+
+    first, cursor = activity_log_service.fetch_page(db, limit=2)
+    second, cursor = activity_log_service.fetch_page(db, limit=2, cursor=cursor)
+    third, cursor = activity_log_service.fetch_page(db, limit=2, cursor=cursor)
+
+    ids = [log.id for log in first + second + third]
+    assert sorted(ids) == [f"user-1-{index:03d}" for index in range(5)]
+    assert len(set(ids)) == 5
+    assert cursor is None
+
+
+def test_invalid_cursor_is_rejected(db):
+    with pytest.raises(HTTPException) as error:
+        activity_log_service.fetch_page(db, cursor="not-a-cursor")
+
+    assert error.value.status_code == 400
+
+
+def test_retention_removes_old_months_in_one_statement(engine):
+    add_logs(engine, "user-1", 4, step=timedelta(days=31))  # Jan to Apr
+    partitions = MonthlyPartitions(table, "timestamp")
+
+    with engine.begin() as conn:
+        statements = partitions.retire(conn, date(2026, 3, 15))
+
+    assert len(statements) == 1 and statements[0].startswith("DELETE")
+    with engine.connect() as conn:
+        kept = conn.execute(select(table.c.id).order_by(table.c.id)).scalars().all()
+    assert kept == ["user-1-002", "user-1-003"]
+
+
+def test_retention_can_archive_instead(engine):
+    add_logs(engine, "user-1", 4, step=timedelta(days=31))
+    partitions = MonthlyPartitions(table, "timestamp")
+
+    with engine.begin() as conn:
+        partitions.retire(conn, date(2026, 3, 1), archive=True)
+        archived = conn.exec_driver_sql("SELECT id FROM activity_logs_archive ORDER BY id")
+
+        assert [row[0] for row in archived] == ["user-1-000", "user-1-001"]
+
+
+def test_dry_run_changes_nothing(engine):
+    add_logs(engine, "user-1", 4, step=timedelta(days=31))
+    partitions = MonthlyPartitions(table, "timestamp")
+
+    with engine.begin() as conn:
+        partitions.retire(conn, date(2026, 3, 1), dry_run=True)
+
+    with engine.connect() as conn:
+        assert len(conn.execute(select(table.c.id)).all()) == 4
+
+
+def test_default_partition_is_created_with_the_table():
+    statements = []
+    mock = create_mock_engine(
+        "postgresql://", lambda sql, *args, **kwargs: statements.append(str(sql.compile(dialect=mock.dialect)))
+    )
+
+    table.create(mock, checkfirst=False)
+
+    assert "PARTITION BY RANGE (timestamp)" in statements[0]
+    assert any(
+        "activity_logs_default PARTITION OF activity_logs DEFAULT" in statement
+        for statement in statements
+    )
@@ -0,0 +1,132 @@
+import time
+from datetime import datetime, timezone
+from unittest.mock import MagicMock, patch
+
+import pytest
+from sqlalchemy import create_engine, event, func, select
+from sqlalchemy.pool import StaticPool
+
+from api.db.batch_writer import BatchWriter
+from api.v1.models.activity_logs import ActivityLog
+from api.v1.services.activity_logs import activity_log_service, activity_log_writer
+from api.utils.warmup import flush_activity_logs
+
+table = ActivityLog.__table__
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    table.create(engine)
+    engine.inserts = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("INSERT"):
+            engine.inserts.append(statement)
+
+    yield engine
+    engine.dispose()
+
+
+def make_row(action="login", user_id="user-1"):
+    return {
+        "id": f"{action}-{time.perf_counter_ns()}",
+        "user_id": user_id,
+        "action": action,
+        "timestamp": datetime.now(timezone.utc),
+    }
+
+
+def count_rows(engine):
+    with engine.connect() as conn:
+        return conn.execute(select(func.count()).select_from(table)).scalar_one()
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_buffered_rows_are_written_in_one_insert(engine):
+    writer = BatchWriter(table, engine=engine, flush_interval_ms=60000, max_batch=100)
+
+    for index in range(5):
+        assert writer.add(make_row(f"action-{index}"))
+    assert count_rows(engine) == 0
+
+    assert writer.flush() == 5
+    assert count_rows(engine) == 5
+    assert len(engine.inserts) == 1
+    writer.close()
+
+
+def test_full_batch_is_written_without_waiting_for_the_interval(engine):
+    writer = BatchWriter(table, engine=engine, flush_interval_ms=60000, max_batch=3)
+
+    for index in range(3):
+        writer.add(make_row(f"action-{index}"))
+
+    assert wait_for(lambda: count_rows(engine) == 3)
+    writer.close()
+
+
+def test_rows_are_written_every_interval(engine):
+    writer = BatchWriter(table, engine=engine, flush_interval_ms=20, max_batch=100)
+
+    writer.add(make_row())
+
+    assert wait_for(lambda: count_rows(engine) == 1)
+    writer.close()
+
+
+def test_full_buffer_drops_rows(engine):
+    writer = BatchWriter(
+        table, engine=engine, flush_interval_ms=60000, max_batch=100, max_buffer=2, put_timeout=0
+    )
+
+    assert writer.add(make_row("first"))
+    assert writer.add(make_row("second"))
+    assert not writer.add(make_row("third"))
+
+    assert writer.stats["dropped"] == 1
+    writer.close()
+    assert count_rows(engine) == 2
+
+
+def test_bad_row_does_not_lose_the_rest_of_the_batch(engine):
+    writer = BatchWriter(table, engine=engine, flush_interval_ms=60000, max_batch=100)
+
+    writer.add(make_row("first"))
+    writer.add(make_row(None))
+    writer.add(make_row("third"))
+
+    assert writer.flush() == 2
+    assert count_rows(engine) == 2
+    assert writer.stats["failed"] == 1
+    writer.close()
+
+
+def test_shutdown_writes_queued_activity_logs(engine):
+    with patch.object(activity_log_writer, "_engine", engine), patch.object(
+        activity_log_writer, "flush_interval", 60
+    ):
+        db = MagicMock()
+        db.query.return_value.filter.return_value.first.return_value = ("user-1",)
+        activity_log = activity_log_service.create_activity_log(
+            db=db, user_id="user-1", action="logout"
+        )
+        assert activity_log.action == "logout"
+        assert activity_log.id is not None and activity_log.timestamp is not None
+
+        flush_activity_logs(app=None)
+
+        with engine.connect() as conn:
+            rows = conn.execute(select(table.c.user_id, table.c.action)).all()
+    assert rows == [("user-1", "logout")]
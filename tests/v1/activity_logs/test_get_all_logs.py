@@ -104,3 +104,13 @@ def test_get_all_activity_logs_non_super_admin(mock_user_service, mock_db_sessio
                           'Authorization': f'Bearer {access_token}'})
 
     assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+def test_get_all_activity_logs_documents_the_page():
+    """Test that the documented response is the page the route returns."""
+    operation = app.openapi()["paths"][ACTIVITY_LOGS_ENDPOINT]["get"]
+    schema = operation["responses"]["200"]["content"]["application/json"]["schema"]
+
+    assert schema["$ref"].endswith("/ActivityLogPageResponse")
+    page = app.openapi()["components"]["schemas"]["ActivityLogPage"]
+    assert set(page["properties"]) == {"items", "next_cursor"}
@@ -1,7 +1,7 @@
 import pytest
 from fastapi.testclient import TestClient
 from unittest.mock import patch, MagicMock
-from requests.models import Response
+import httpx
 from main import app
 from api.v1.services.user import user_service
 from api.v1.models.user import User
@@ -35,7 +35,7 @@ def mock_google_oauth_service():
         yield mock_service
 
 @pytest.mark.usefixtures("mock_db_session", "mock_user_service", "mock_google_oauth_service")
-def test_google_login_existing_user(mock_user_service, mock_google_oauth_service, mock_db_session):
+def test_google_login_existing_user(mock_user_service, mock_google_oauth_service, mock_db_session, provider_transport):
     """Test Google login for an existing user."""
     email = "existinguser@example.com"
     mock_id_token = "mocked_id_token"
@@ -56,50 +56,60 @@ def test_google_login_existing_user(mock_user_service, mock_google_oauth_service
     mock_user_service.create_refresh_token.return_value = "mock_refresh_token"
 
     # Mock Google OAuth token info response
-    with patch("requests.get") as mock_get:
-        mock_response = MagicMock(spec=Response)
-        mock_response.status_code = 200
-        mock_response.json.return_value = {"email": email}
-        mock_get.return_value = mock_response
-
-        # Perform the API request
-        response = client.post("api/v1/auth/google", json={"id_token": "mock_id_token"})
-        # Assertions
-        assert response.status_code == status.HTTP_200_OK
-        response_json = response.json()
-        assert response_json["data"]["user"]["email"] == email
+    provider_transport(lambda request: httpx.Response(200, json={"email": email}))
+
+    # Perform the API request
+    response = client.post("api/v1/auth/google", json={"id_token": "mock_id_token"})
+    # Assertions
+    assert response.status_code == status.HTTP_200_OK
+    response_json = response.json()
+    assert response_json["data"]["user"]["email"] == email
 
 @pytest.mark.usefixtures("mock_db_session", "mock_user_service", "mock_google_oauth_service")
-def test_google_login_new_user(mock_user_service, mock_google_oauth_service, mock_db_session):
+def test_google_login_new_user(mock_user_service, mock_google_oauth_service, mock_db_session, provider_transport):
     """Test Google login for a new user."""
     email = "newuser@gmail.com"
     mock_id_token = "mocked_id_token"
 
     # Mock Google OAuth token info response
-    with patch("requests.get") as mock_get:
-        mock_response = MagicMock(spec=Response)
-        mock_response.status_code = 200
-        mock_response.json.return_value = {"email": email}
-        mock_get.return_value = mock_response
-
-        # Mock user retrieval returning None (new user)
-        mock_user_service.get_user_by_email.return_value = None
-
-        # Mock the GoogleOauthServices create method
-        mock_user = User(
-            id=str(uuid7()),
-            email=email,
-            first_name='New',
-            created_at=datetime.now(timezone.utc),
-            updated_at=datetime.now(timezone.utc)
-        )
-
-        mock_db_session.query.return_value.filter.return_value.first.return_value = mock_user
-
-        # Perform the API request
-        response = client.post("api/v1/auth/google", json={"id_token": mock_id_token})
-
-        # Assertions
-        assert response.status_code == status.HTTP_200_OK
-        response_json = response.json()
-        assert response_json["data"]["user"]["email"] == email
\ No newline at end of file
+    provider_transport(lambda request: httpx.Response(200, json={"email": email}))
+
+    # Mock user retrieval returning None (new user)
+    mock_user_service.get_user_by_email.return_value = None
+
+    # Mock the GoogleOauthServices create method
+    mock_user = User(
+        id=str(uuid7()),
+        email=email,
+        first_name='New',
+        created_at=datetime.now(timezone.utc),
+        updated_at=datetime.now(timezone.utc)
+    )
+
+    mock_db_session.query.return_value.filter.return_value.first.return_value = mock_user
+
+    # Perform the API request
+    response = client.post("api/v1/auth/google", json={"id_token": mock_id_token})
+
+    # Assertions
+    assert response.status_code == status.HTTP_200_OK
+    response_json = response.json()
+    assert response_json["data"]["user"]["email"] == email
+
+
+@pytest.mark.usefixtures("mock_db_session", "mock_user_service", "mock_google_oauth_service")
+def test_google_login_sends_the_token_as_a_query_parameter(provider_transport):
+    """The token is sent to Google's tokeninfo endpoint, and a rejected token is a 400."""
+    sent = []
+
+    def google(request):
+        sent.append(request)
+        return httpx.Response(400, json={"error": "invalid_token"})
+
+    provider_transport(google)
+
+    response = client.post("api/v1/auth/google", json={"id_token": "bad&token"})
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert sent[0].url.path == "/oauth2/v3/tokeninfo"
+    assert sent[0].url.params["id_token"] == "bad&token"
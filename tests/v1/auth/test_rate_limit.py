@@ -0,0 +1,92 @@
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi import FastAPI, Request, Response
+from fastapi.testclient import TestClient
+
+from api.utils.rate_limit import (
+    MemoryRateLimitStore,
+    RateLimit,
+    RateLimiter,
+    SQLiteRateLimitStore,
+    rate_limit_key,
+)
+from api.v1.services.user import user_service
+
+
+def make_app(limiter: RateLimiter):
+    app = FastAPI()
+
+    @app.post("/login")
+    @limiter.limit("10/minute", cost=5)
+    def login(request: Request, response: Response):
+        return {"ok": True}
+
+    @app.get("/cheap")
+    @limiter.limit("3/minute")
+    async def cheap(request: Request):
+        return {"ok": True}
+
+    return app
+
+
+def test_rate_limit_parse():
+    assert RateLimit.parse("1000/minute") == RateLimit(1000, 60)
+    assert RateLimit.parse("10 per 5 minutes") == RateLimit(10, 300)
+    with pytest.raises(ValueError):
+        RateLimit.parse("often")
+
+
+def test_cost_weights_and_headers():
+    client = TestClient(make_app(RateLimiter(MemoryRateLimitStore(), rate_limit_key)))
+
+    response = client.post("/login")
+    assert response.status_code == 200
+    assert response.headers["RateLimit-Limit"] == "10"
+    assert response.headers["RateLimit-Remaining"] == "5"
+    assert response.headers["RateLimit-Policy"] == "10;w=60"
+
+    assert client.post("/login").status_code == 200
+
+    # the third weighted call would exceed the budget
+    response = client.post("/login")
+    assert response.status_code == 429
+    assert response.headers["RateLimit-Remaining"] == "0"
+    assert int(response.headers["Retry-After"]) >= 1
+
+    # limits are tracked per route
+    assert client.get("/cheap").status_code == 200
+
+
+def test_authenticated_requests_are_keyed_per_user():
+    client = TestClient(make_app(RateLimiter(MemoryRateLimitStore(), rate_limit_key)))
+    user_a = user_service.create_access_token(user_id="user-a")
+    user_b = user_service.create_access_token(user_id="user-b")
+
+    for _ in range(3):
+        assert client.get("/cheap", headers={"Authorization": f"Bearer {user_a}"}).status_code == 200
+    assert client.get("/cheap", headers={"Authorization": f"Bearer {user_a}"}).status_code == 429
+
+    # another user, and anonymous callers, have their own budgets
+    assert client.get("/cheap", headers={"Authorization": f"Bearer {user_b}"}).status_code == 200
+    assert client.get("/cheap").status_code == 200
+
+
+def test_rate_limit_key_falls_back_to_ip_for_bad_tokens():
+    request = MagicMock(spec=Request)
+    request.headers = {"authorization": "Bearer not-a-jwt"}
+    request.client.host = "10.0.0.1"
+
+    assert rate_limit_key(request) == "ip:10.0.0.1"
+
+
+def test_sqlite_store_is_shared_between_workers(tmp_path):
+    path = str(tmp_path / "limits.db")
+    worker_1 = SQLiteRateLimitStore(path)
+    worker_2 = SQLiteRateLimitStore(path)
+    limit = RateLimit(3, 60)
+
+    assert worker_1.hit("ip:1", limit, 2).allowed
+    assert worker_2.hit("ip:1", limit, 1).allowed
+    assert not worker_1.hit("ip:1", limit, 1).allowed
+    assert worker_2.hit("ip:2", limit, 1).allowed
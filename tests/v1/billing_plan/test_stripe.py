@@ -93,4 +93,44 @@ def test_fetch_invalid_billing_plans(mock_user_service, mock_db_session):
         headers={"Authorization": f"Bearer {access_token}"},
     )
     print(response.json())
-    assert response.status_code == 404
\ No newline at end of file
+    assert response.status_code == 404
+
+@pytest.mark.asyncio
+async def test_checkout_queries_run_off_the_event_loop(provider_transport, monkeypatch):
+    import threading
+
+    import httpx
+    from api.v1.services.stripe_payment import get_stripe, stripe_payment_request
+
+    query_threads = []
+    session = MagicMock(spec=Session)
+
+    def query(model):
+        query_threads.append(threading.current_thread())
+        result = MagicMock()
+        result.filter.return_value.first.return_value = {User: mock_user, BillingPlan: mock_plan}[model]
+        return result
+
+    session.query.side_effect = query
+    checkout = {
+        "id": "cs_test_1",
+        "object": "checkout.session",
+        "url": "https://pay",
+        "cancel_url": "https://cancel",
+        "success_url": "https://success",
+        "customer_details": None,
+        "customer_email": email,
+        "created": 1,
+        "expires_at": 2,
+        "metadata": {},
+        "payment_method_types": ["card"],
+        "amount_total": 2999,
+    }
+    provider_transport(lambda request: httpx.Response(200, json=checkout))
+    monkeypatch.setattr(get_stripe(), "api_key", "sk_test_123")
+
+    response = await stripe_payment_request(session, user_id, MagicMock(), "Premium")
+
+    assert response.status_code == 200
+    assert len(query_threads) == 2
+    assert threading.current_thread() not in query_threads
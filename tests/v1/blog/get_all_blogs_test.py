@@ -1,4 +1,5 @@
 from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
 from unittest.mock import MagicMock
 
 import pytest
@@ -28,18 +29,16 @@ def client(db_session_mock):
 def test_get_all_blogs_empty(client, db_session_mock):
     # Mock data
     mock_blog_data = []
-    
-    mock_query = MagicMock()
-    mock_query.count.return_value = 0
-    db_session_mock.query.return_value.filter.return_value.offset.return_value.limit.return_value.all.return_value = mock_blog_data
 
-    db_session_mock.query.return_value = mock_query
+    db_session_mock.query.return_value.join.return_value.filter.return_value.order_by.return_value.offset.return_value.limit.return_value.all.return_value = mock_blog_data
 
     # Call the endpoint
     response = client.get("/api/v1/blogs")
 
     # Assert the response
     assert response.status_code == 200
+    assert response.json()['data']['total'] == 0
+    assert response.json()['data']['items'] == []
 
 def test_get_all_blogs_with_data(client, db_session_mock):
     blog_id = str(uuid7())
@@ -52,25 +51,26 @@ def test_get_all_blogs_with_data(client, db_session_mock):
 
     # Mock data
     mock_blog_data = [
-        Blog(
+        SimpleNamespace(
             id=blog_id,
-            author_id=author_id,
             title="Test Blog",
-            content="Test Content",
-            image_url="http://example.com/image.png",
-            tags=["test", "blog"],
-            is_deleted=False,
             excerpt="Test Excerpt",
+            image_url="http://example.com/image.png",
+            tags="test,blog",
+            likes_count=3,
+            dislikes_count=1,
+            comments_count=2,
             created_at=created_at,
-            updated_at=updated_at
+            updated_at=updated_at,
+            author_id=author_id,
+            first_name="Test",
+            last_name="Author",
+            avatar_url=None,
+            total=1,
         )
     ]
-    
-    mock_query = MagicMock()
-    mock_query.count.return_value = 1
-    db_session_mock.query.return_value.filter.return_value.offset.return_value.limit.return_value.all.return_value = mock_blog_data
 
-    db_session_mock.query.return_value = mock_query
+    db_session_mock.query.return_value.join.return_value.filter.return_value.order_by.return_value.offset.return_value.limit.return_value.all.return_value = mock_blog_data
 
     # Call the endpoint
     response = client.get("/api/v1/blogs")
@@ -78,4 +78,16 @@ def test_get_all_blogs_with_data(client, db_session_mock):
     # Assert the response
     assert response.status_code == 200
     assert len(response.json().get('data')) >= 1
+    item = response.json()['data']['items'][0]
+    assert item['id'] == blog_id
+    assert item['likes_count'] == 3
+    assert item['comments_count'] == 2
+    assert item['author']['id'] == author_id
+
+
+@pytest.mark.parametrize("query", ["limit=0", "limit=-5", "skip=-1"])
+def test_get_all_blogs_rejects_invalid_paging(client, db_session_mock, query):
+    response = client.get(f"/api/v1/blogs?{query}")
 
+    assert response.status_code == 422
+    assert not db_session_mock.method_calls
@@ -0,0 +1,92 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from uuid_extensions import uuid7
+
+from api.db.database import Base
+from api.v1.models import User, Blog, Comment
+from api.v1.services.blog import BlogService, FEED_EXCERPT_LENGTH
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(
+        bind=engine,
+        tables=[
+            Base.metadata.tables[name]
+            for name in ("users", "blogs", "blog_likes", "blog_dislikes", "comments")
+        ],
+    )
+    session = sessionmaker(bind=engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
+
+
+@pytest.fixture
+def author(db):
+    author = User(
+        id=str(uuid7()),
+        email="author@gmail.com",
+        first_name="Ada",
+        last_name="Lovelace",
+    )
+    db.add(author)
+    db.commit()
+    return author
+
+
+def test_feed_returns_counts_author_and_excerpt(db, author):
+    live = Blog(
+        id=str(uuid7()),
+        author_id=author.id,
+        title="Live",
+        content="x" * (FEED_EXCERPT_LENGTH + 50),
+        likes_count=4,
+        dislikes_count=1,
+    )
+    deleted = Blog(
+        id=str(uuid7()),
+        author_id=author.id,
+        title="Deleted",
+        content="gone",
+        is_deleted=True,
+    )
+    db.add_all([live, deleted])
+    db.add_all(
+        [
+            Comment(user_id=author.id, blog_id=live.id, content="first"),
+            Comment(user_id=author.id, blog_id=live.id, content="second"),
+        ]
+    )
+    db.commit()
+
+    total, items = BlogService(db).fetch_feed(skip=0, limit=10)
+
+    assert total == 1
+    assert [item.id for item in items] == [live.id]
+    item = items[0]
+    assert item.likes_count == 4
+    assert item.dislikes_count == 1
+    assert item.comments_count == 2
+    assert item.excerpt == "x" * FEED_EXCERPT_LENGTH
+    assert item.author.id == author.id
+    assert item.author.first_name == "Ada"
+
+
+def test_feed_total_past_last_page(db, author):
+    db.add_all(
+        [
+            Blog(author_id=author.id, title=f"Post {i}", content="body")
+            for i in range(3)
+        ]
+    )
+    db.commit()
+
+    total, items = BlogService(db).fetch_feed(skip=10, limit=10)
+
+    assert total == 3
+    assert items == []
@@ -5,6 +5,7 @@ from unittest.mock import MagicMock
 from datetime import datetime, timezone, timedelta
 
 from main import app
+from api.v1.models.blog import Blog
 from api.v1.routes.blog import get_db
 
 
@@ -26,18 +27,18 @@ def create_mock_blog(id: str, author_id: str, title: str, content: str):
     timezone_offset = -8.0
     tzinfo = timezone(timedelta(hours=timezone_offset))
     timeinfo = datetime.now(tzinfo)
-    return {
-        "id": id,
-        "author_id": author_id,
-        "title": title,
-        "content": content,
-        "image_url": "http://example.com/image.png",
-        "tags": "test,blog",
-        "is_deleted": False,
-        "excerpt": "Test Excerpt",
-        "created_at": timeinfo.isoformat(),
-        "updated_at": timeinfo.isoformat()
-    }
+    return Blog(
+        id=id,
+        author_id=author_id,
+        title=title,
+        content=content,
+        image_url="http://example.com/image.png",
+        tags="test,blog",
+        is_deleted=False,
+        excerpt="Test Excerpt",
+        created_at=timeinfo,
+        updated_at=timeinfo,
+    )
 
 
 def test_fetch_blog_by_id(client, db_session_mock):
@@ -50,6 +51,29 @@ def test_fetch_blog_by_id(client, db_session_mock):
     response = client.get(f"/api/v1/blogs/{id}")
 
     assert response.status_code == 200
+    assert response.headers["etag"].startswith('W/"')
+    assert "last-modified" in response.headers
+
+
+def test_fetch_blog_by_id_not_modified(client, db_session_mock):
+    id = "afa7addb-98a3-4603-8d3f-f36a31bcd1bd"
+    author_id = "7ca7a05d-1431-4b2c-8968-6c510e85831b"
+    mock_blog = create_mock_blog(id, author_id, "Test Title", "Test Content")
+
+    db_session_mock.query().filter().first.return_value = mock_blog
+
+    etag = client.get(f"/api/v1/blogs/{id}").headers["etag"]
+    response = client.get(f"/api/v1/blogs/{id}", headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+
+    # a newer version of the post invalidates the client's copy
+    mock_blog.updated_at = mock_blog.updated_at + timedelta(seconds=1)
+    response = client.get(f"/api/v1/blogs/{id}", headers={"If-None-Match": etag})
+
+    assert response.status_code == 200
 
 
 def test_fetch_blog_by_id_not_found(client, db_session_mock):
@@ -93,7 +93,7 @@ def test_successful_like(
     mock_create_blog_like.return_value = test_blog_like
 
     # mock like-count
-    mock_db_session.query().filter_by().count.return_value = 1
+    mock_db_session.query().filter_by().scalar.return_value = 1
 
     resp = make_request(test_blog.id, access_token_user)
     resp_d = resp.json()
@@ -0,0 +1,123 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from uuid_extensions import uuid7
+
+from main import app
+from api.db.database import Base, get_db
+from api.v1.models import User, Blog, BlogLike, Comment, CommentLike
+from api.v1.services.blog import BlogService
+from api.v1.services.comment_like import comment_like_service
+from api.v1.services.like_counter import like_counter_service
+from api.v1.services.user import user_service
+
+
+@pytest.fixture
+def db():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(
+        bind=engine,
+        tables=[
+            Base.metadata.tables[name]
+            for name in (
+                "users", "blogs", "blog_likes", "blog_dislikes",
+                "comments", "comment_likes", "comment_dislikes",
+            )
+        ],
+    )
+    session = sessionmaker(bind=engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
+
+
+@pytest.fixture
+def user(db):
+    user = User(
+        id=str(uuid7()),
+        email="counter@gmail.com",
+        password="hashedpassword",
+        first_name="test",
+        last_name="user",
+    )
+    db.add(user)
+    db.commit()
+    return user
+
+
+@pytest.fixture
+def blog(db, user):
+    blog = Blog(id=str(uuid7()), author_id=user.id, title="Title", content="Content")
+    db.add(blog)
+    db.commit()
+    return blog
+
+
+def test_blog_like_and_dislike_maintain_counters(db, user, blog):
+    blog_service = BlogService(db)
+
+    blog_service.create_blog_like(db, blog.id, user.id)
+    blog_service.create_blog_dislike(db, blog.id, user.id)
+    assert blog_service.num_of_likes(blog.id) == 1
+    assert blog_service.num_of_dislikes(blog.id) == 1
+
+    blog_service.delete_blog_like(blog.id, user.id)
+    blog_service.delete_blog_dislike(blog.id, user.id)
+    assert blog_service.num_of_likes(blog.id) == 0
+    assert blog_service.num_of_dislikes(blog.id) == 0
+
+
+def test_unlike_endpoints_remove_the_reaction_and_its_count(db, user, blog):
+    blog_service = BlogService(db)
+    blog_service.create_blog_like(db, blog.id, user.id)
+    blog_service.create_blog_dislike(db, blog.id, user.id)
+    app.dependency_overrides[get_db] = lambda: db
+    app.dependency_overrides[user_service.get_current_user] = lambda: user
+    client = TestClient(app)
+    try:
+        unliked = client.delete(f"/api/v1/blogs/{blog.id}/like")
+        undisliked = client.delete(f"/api/v1/blogs/{blog.id}/dislike")
+        again = client.delete(f"/api/v1/blogs/{blog.id}/like")
+    finally:
+        app.dependency_overrides = {}
+
+    assert unliked.status_code == 200
+    assert unliked.json()["data"]["objects_count"] == 0
+    assert undisliked.json()["data"]["objects_count"] == 0
+    assert again.status_code == 404
+    assert blog_service.num_of_likes(blog.id) == 0
+
+
+def test_comment_like_maintains_counter(db, user, blog):
+    comment = Comment(id=str(uuid7()), user_id=user.id, blog_id=blog.id, content="Hi")
+    db.add(comment)
+    db.commit()
+
+    like = comment_like_service.create(db, user_id=user.id, comment_id=comment.id)
+    db.refresh(comment)
+    assert comment.likes_count == 1
+
+    comment_like_service.delete(db, id=like.id)
+    db.refresh(comment)
+    assert comment.likes_count == 0
+
+
+def test_reconcile_repairs_drift(db, user, blog):
+    # a like written without going through the service leaves the counter stale
+    db.add(BlogLike(blog_id=blog.id, user_id=user.id))
+    db.commit()
+    db.refresh(blog)
+    assert blog.likes_count == 0
+
+    assert like_counter_service.reconcile(db) == 1
+    db.refresh(blog)
+    assert blog.likes_count == 1
+
+    # nothing left to repair
+    assert like_counter_service.reconcile(db) == 0
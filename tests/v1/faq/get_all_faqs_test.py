@@ -1,3 +1,4 @@
+from datetime import datetime, timezone
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -44,3 +45,32 @@ def test_get_all_faqs_grouped_by_category(mock_db_session, client):
         response = client.get('/api/v1/faqs')
 
     assert response.status_code == 200
+
+
+def test_get_all_faqs_not_modified(mock_db_session, client):
+    """Test that an unchanged FAQ collection is answered with 304 without being loaded."""
+
+    version = MagicMock(last_modified=datetime(2024, 8, 1, tzinfo=timezone.utc), total=3)
+    mock_db_session.query.return_value.filter.return_value.one.return_value = version
+
+    with patch.object(faq_service, 'fetch_all_grouped_by_category', return_value={}) as fetch:
+        first = client.get('/api/v1/faqs')
+        response = client.get(
+            '/api/v1/faqs', headers={'If-None-Match': first.headers['etag']}
+        )
+
+        assert response.status_code == 304
+        assert fetch.call_count == 1
+
+        response = client.get(
+            '/api/v1/faqs',
+            headers={'If-Modified-Since': 'Thu, 01 Aug 2024 00:00:00 GMT'},
+        )
+        assert response.status_code == 304
+
+        # a different search is a different representation
+        response = client.get(
+            '/api/v1/faqs?keyword=billing',
+            headers={'If-None-Match': first.headers['etag']},
+        )
+        assert response.status_code == 200
@@ -0,0 +1,89 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from api.db.database import get_db
+from api.utils.response_cache import (
+    CachedResponse,
+    LRUCacheBackend,
+    SQLiteCacheBackend,
+)
+from api.v1.schemas.faq import CreateFAQ
+from api.v1.services.faq import faq_service
+from main import app
+
+
+@pytest.fixture
+def mock_db_session():
+    db_session = MagicMock(spec=Session)
+    return db_session
+
+
+@pytest.fixture
+def client(mock_db_session):
+    app.dependency_overrides[get_db] = lambda: mock_db_session
+    client = TestClient(app)
+    yield client
+    app.dependency_overrides = {}
+
+
+def test_faqs_served_from_cache_until_a_write(mock_db_session, client):
+    """The FAQ listing is cached and purged when an FAQ is created."""
+
+    grouped = {"General": [{"question": "Q", "answer": "A"}]}
+
+    with patch.object(
+        faq_service, "fetch_all_grouped_by_category", return_value=grouped
+    ) as fetch:
+        first = client.get("/api/v1/faqs")
+        second = client.get("/api/v1/faqs")
+
+        assert first.status_code == second.status_code == 200
+        assert second.json() == first.json()
+        assert second.headers["etag"] == first.headers["etag"]
+        assert fetch.call_count == 1
+
+        # a different query string is cached separately
+        client.get("/api/v1/faqs?keyword=billing")
+        assert fetch.call_count == 2
+
+        faq_service.create(
+            mock_db_session,
+            CreateFAQ(question="New?", answer="Yes", category="General"),
+        )
+        client.get("/api/v1/faqs")
+        assert fetch.call_count == 3
+
+
+@pytest.mark.parametrize("backend_name", ["lru", "sqlite"])
+def test_backend_tag_invalidation(backend_name, tmp_path):
+    if backend_name == "lru":
+        backend = LRUCacheBackend(max_entries=2)
+    else:
+        backend = SQLiteCacheBackend(str(tmp_path / "cache.db"))
+
+    backend.set("/faqs", CachedResponse(body=b"faqs"), ["faq"], ttl=60)
+    backend.set("/plans", CachedResponse(body=b"plans"), ["billing_plan"], ttl=60)
+    assert backend.get("/faqs").body == b"faqs"
+
+    backend.invalidate_tags(["faq"])
+
+    assert backend.get("/faqs") is None
+    assert backend.get("/plans").body == b"plans"
+
+    backend.set("/expired", CachedResponse(body=b"old"), ["faq"], ttl=0)
+    assert backend.get("/expired") is None
+
+
+def test_lru_backend_evicts_least_recently_used():
+    backend = LRUCacheBackend(max_entries=2)
+    backend.set("a", CachedResponse(body=b"a"), ["t"], ttl=60)
+    backend.set("b", CachedResponse(body=b"b"), ["t"], ttl=60)
+    backend.get("a")
+    backend.set("c", CachedResponse(body=b"c"), ["t"], ttl=60)
+
+    assert backend.get("b") is None
+    assert backend.get("a").body == b"a"
+    assert backend.get("c").body == b"c"
@@ -0,0 +1,109 @@
+import pytest
+from sqlalchemy import (
+    Boolean,
+    Column,
+    ForeignKey,
+    MetaData,
+    String,
+    Table,
+    create_engine,
+    insert,
+)
+
+from api.db.index_advisor import IndexAdvisor, compare_plans, is_covered, render_migration
+from api.db.query_log import fingerprint
+from scripts.index_advisor import load_metadata
+
+
+@pytest.fixture
+def metadata():
+    metadata = MetaData()
+    Table("users", metadata, Column("id", String, primary_key=True), Column("email", String))
+    Table(
+        "posts",
+        metadata,
+        Column("id", String, primary_key=True),
+        Column("user_id", String, ForeignKey("users.id")),
+        Column("status", String),
+        Column("title", String),
+        Column("created_at", String),
+        Column("is_deleted", Boolean, default=False),
+    )
+    return metadata
+
+
+def test_unindexed_foreign_keys_are_proposed(metadata):
+    advice = IndexAdvisor(metadata).advise()
+
+    assert [c.describe() for c in advice.candidates] == [
+        "idx_posts_user_id ON posts (user_id)"
+    ]
+
+
+def test_statements_give_composite_and_partial_candidates(metadata):
+    statement = fingerprint(
+        "SELECT posts.id, posts.title FROM posts WHERE posts.user_id = %(user_id_1)s "
+        "AND posts.status = %(status_1)s AND posts.is_deleted = false "
+        "ORDER BY posts.created_at DESC LIMIT %(param_1)s"
+    )
+    search = fingerprint("SELECT * FROM posts WHERE posts.title ILIKE '%foo%'")
+
+    advice = IndexAdvisor(metadata).advise(
+        [{"id": "a", "statement": statement, "total_ms": 900}, {"id": "b", "statement": search, "total_ms": 5}]
+    )
+
+    top = advice.candidates[0]
+    assert top.describe() == (
+        "idx_posts_user_id_status_created_at_active ON posts "
+        "(user_id, status, created_at) WHERE is_deleted = false"
+    )
+    assert top.total_ms == 900
+    assert any("posts.title" in note for note in advice.notes)
+
+
+def test_hot_lookups_are_indexed_in_the_models():
+    tables = load_metadata().tables
+    hot = [
+        ("products", ["org_id"]),
+        ("sales", ["organisation_id"]),
+        ("comments", ["blog_id"]),
+        ("blog_likes", ["blog_id", "user_id"]),
+        ("blog_dislikes", ["blog_id", "user_id"]),
+        ("notifications", ["user_id"]),
+        ("activity_logs", ["user_id"]),
+        ("job_applications", ["job_id"]),
+        ("token_logins", ["token"]),
+        ("newsletter_subscribers", ["email"]),
+        ("waitlist", ["email"]),
+    ]
+    for table, columns in hot:
+        assert is_covered(tables[table], columns), table
+
+
+def test_render_migration_is_valid_python(metadata):
+    candidates = IndexAdvisor(metadata).advise().candidates
+    source = render_migration(candidates, revision="abc123", down_revision="prev")
+
+    compile(source, "migration.py", "exec")
+    assert "op.create_index(\n            'idx_posts_user_id'" in source
+    assert "down_revision: Union[str, None] = 'prev'" in source
+
+
+def test_compare_plans_rolls_back_the_index(metadata, tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'advisor.db'}")
+    metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(metadata.tables["users"]), [{"id": "u1"}])
+        conn.execute(
+            insert(metadata.tables["posts"]),
+            [{"id": f"p{i}", "user_id": "u1", "is_deleted": False} for i in range(50)],
+        )
+
+    [comparison] = compare_plans(engine, IndexAdvisor(metadata).advise().candidates)
+
+    assert "SCAN posts" in comparison.before
+    assert comparison.uses_index
+    with engine.connect() as conn:
+        assert not conn.exec_driver_sql(
+            "SELECT name FROM sqlite_master WHERE name = 'idx_posts_user_id'"
+        ).fetchall()
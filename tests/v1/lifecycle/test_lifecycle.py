@@ -0,0 +1,140 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+from fastapi.templating import Jinja2Templates
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from api.utils.lifecycle import Lifecycle, lifecycle
+from api.utils.warmup import compile_email_templates
+from api.v1.models.permissions.permissions import Permission
+from api.v1.models.permissions.role import Role
+from api.v1.models.permissions.role_permissions import role_permissions
+from api.v1.services.permissions.catalog import RoleCatalog
+from main import app
+
+
+APP = SimpleNamespace()
+
+
+def test_steps_run_in_order_and_shutdown_reverses():
+    calls = []
+    registry = Lifecycle()
+
+    @registry.on_startup("sync")
+    def sync_step(app):
+        calls.append("sync")
+
+    @registry.on_startup("async")
+    async def async_step(app):
+        calls.append("async")
+
+    @registry.on_shutdown("first")
+    def first(app):
+        calls.append("close first")
+
+    @registry.on_shutdown("second")
+    async def second(app):
+        calls.append("close second")
+
+    async def run():
+        await registry.startup(APP)
+        assert registry.ready
+        await registry.shutdown(APP)
+
+    asyncio.run(run())
+
+    assert calls == ["sync", "async", "close second", "close first"]
+    assert not registry.ready
+
+
+@pytest.mark.parametrize("required, ready", [(True, False), (False, True)])
+def test_failed_step_only_blocks_readiness_when_required(required, ready):
+    registry = Lifecycle()
+
+    @registry.on_startup("broken", required=required)
+    def broken(app):
+        raise RuntimeError("no database")
+
+    asyncio.run(registry.startup(APP))
+
+    assert registry.ready is ready
+    assert registry.status()["steps"][0]["error"] == "RuntimeError: no database"
+
+
+def test_background_workers_are_tracked_and_cancelled():
+    registry = Lifecycle()
+    stopped = []
+
+    @registry.background("ticker")
+    async def ticker(app):
+        try:
+            await asyncio.sleep(3600)
+        finally:
+            stopped.append(True)
+
+    @registry.background("crasher")
+    async def crasher(app):
+        raise RuntimeError("boom")
+
+    async def run():
+        await registry.startup(APP)
+        await asyncio.sleep(0)
+        states = registry.worker_states()
+        ready = registry.ready
+        await registry.shutdown(APP)
+        return states, ready
+
+    states, ready = asyncio.run(run())
+
+    assert states == {"ticker": "running", "crasher": "failed"}
+    assert ready is False
+    assert stopped == [True]
+
+
+def test_ready_endpoint_reports_readiness_separately_from_probe():
+    client = TestClient(app)
+
+    with patch.object(lifecycle, "started", False):
+        assert client.get("/ready").status_code == 503
+        assert client.get("/probe").status_code == 200
+
+    with patch.object(lifecycle, "started", True), patch.object(lifecycle, "results", []):
+        response = client.get("/ready")
+        assert response.status_code == 200
+        assert response.json()["ready"] is True
+
+
+def test_email_templates_are_compiled():
+    templates = Jinja2Templates(directory="api/core/dependencies/email/templates")
+    compile_email_templates(SimpleNamespace(state=SimpleNamespace(email_templates=templates)))
+
+    assert len(templates.env.cache) > 0
+
+
+def test_role_catalog_loads_roles_with_their_permissions():
+    engine = create_engine("sqlite://")
+    Role.metadata.create_all(
+        engine, tables=[Role.__table__, Permission.__table__, role_permissions]
+    )
+    with Session(engine) as db:
+        view, delete = Permission(title="view_user"), Permission(title="delete_user")
+        db.add_all(
+            [
+                Role(name="admin", is_builtin=True, permissions=[view, delete]),
+                Role(name="user", is_builtin=True, permissions=[view]),
+            ]
+        )
+        db.commit()
+
+        catalog = RoleCatalog()
+        catalog.load(db)
+
+    assert catalog.loaded
+    assert catalog.role("admin").permissions == {"view_user", "delete_user"}
+    assert catalog.role("user").permissions == {"view_user"}
+    assert catalog.role("missing") is None
+    assert catalog.roles_by_id[catalog.role("user").id].name == "user"
@@ -0,0 +1,67 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine, text
+
+from api.utils.metrics import PrometheusMiddleware, metrics_response
+
+
+engine = create_engine("sqlite://")
+
+
+def make_app():
+    app = FastAPI()
+    app.add_middleware(PrometheusMiddleware)
+
+    @app.get("/metrics")
+    def metrics():
+        return metrics_response()
+
+    @app.get("/items/{item_id}")
+    def get_item(item_id: str):
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            conn.execute(text("SELECT 2"))
+        return {"id": item_id}
+
+    return app
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+def test_requests_are_labelled_by_route_template():
+    client = TestClient(make_app())
+    labels = {"method": "GET", "route": "/items/{item_id}"}
+    before = sample("http_requests_total", status="200", **labels)
+    before_queries = sample("http_request_db_queries_sum", **labels)
+
+    assert client.get("/items/1").status_code == 200
+    assert client.get("/items/2").status_code == 200
+
+    assert sample("http_requests_total", status="200", **labels) == before + 2
+    assert sample("http_request_db_queries_sum", **labels) == before_queries + 4
+    assert sample("http_request_duration_seconds_count", **labels) >= 2
+
+
+def test_unmatched_paths_share_one_label():
+    client = TestClient(make_app())
+    labels = {"method": "GET", "route": "unmatched", "status": "404"}
+    before = sample("http_requests_total", **labels)
+
+    client.get("/nope/1")
+    client.get("/nope/2")
+
+    assert sample("http_requests_total", **labels) == before + 2
+
+
+def test_metrics_endpoint():
+    client = TestClient(make_app())
+    client.get("/items/1")
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'http_request_duration_seconds_bucket{le="0.005",method="GET",route="/items/{item_id}"}' in response.text
@@ -0,0 +1,224 @@
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from uuid_extensions import uuid7
+
+from main import app
+from api.db.database import get_db
+from api.utils.pubsub import broker
+from api.v1.models.notifications import (
+    Notification,
+    NotificationCounter,
+    NotificationFanout,
+    NotificationSetting,
+)
+from api.v1.models.organisation import Organisation
+from api.v1.models.permissions.user_org_role import user_organisation_roles
+from api.v1.models.user import User
+from api.v1.services import notification_fanout as fanout_module
+from api.v1.services.notification_fanout import notification_fanout_service
+from api.v1.services.organisation import organisation_service
+from api.v1.services.user import user_service
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    for model in (User, Organisation, NotificationSetting, Notification, NotificationCounter, NotificationFanout):
+        model.__table__.create(engine)
+    user_organisation_roles.create(engine)
+    engine.statements = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def record(conn, cursor, statement, parameters, context, executemany):
+        engine.statements.append(statement)
+
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db(engine):
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def org(db):
+    org = Organisation(id=str(uuid7()), name="Fan-out Org")
+    db.add(org)
+    db.commit()
+    return org
+
+
+def add_members(db, org, count, opted_out=()):
+    members = []
+    for index in range(count):
+        user = User(id=str(uuid7()), email=f"member{index}@example.com", password="x")
+        db.add(user)
+        members.append(user)
+    db.flush()
+    db.execute(
+        insert(user_organisation_roles),
+        [{"user_id": user.id, "organisation_id": org.id, "status": "active"} for user in members],
+    )
+    for index in opted_out:
+        db.add(NotificationSetting(user_id=members[index].id, mobile_push_notifications=False))
+    db.commit()
+    return [user.id for user in members]
+
+
+def test_run_sends_in_chunks_and_skips_opted_out_members(db, org, engine):
+    members = add_members(db, org, 5, opted_out=(1, 3))
+    for index in (0, 2):
+        db.add(NotificationSetting(user_id=members[index], mobile_push_notifications=True))
+    db.commit()
+    fanout = notification_fanout_service.create(
+        db, org.id, "Hello", "Everyone", setting="mobile_push_notifications"
+    )
+    engine.statements.clear()
+    progress = []
+
+    with patch.object(broker, "publish_many") as publish_many:
+        result = notification_fanout_service.run(
+            db, fanout.id, chunk_size=2, on_progress=lambda f: progress.append(f.sent + f.skipped)
+        )
+
+    # member 4 has no settings row, so the column default (false) applies
+    assert (result.status, result.total, result.sent, result.skipped) == ("completed", 5, 2, 3)
+    assert progress == [2, 4, 5]
+    recipients = {n.user_id for n in db.query(Notification).all()}
+    assert recipients == {members[0], members[2]}
+    assert {c.user_id: c.unread for c in db.query(NotificationCounter).all()} == {
+        members[0]: 1,
+        members[2]: 1,
+    }
+    inserts = [s for s in engine.statements if s.startswith("INSERT INTO notifications ")]
+    assert len(inserts) == 2  # the last chunk has no recipients
+    assert publish_many.call_count == 3
+
+
+def test_run_without_setting_notifies_every_active_member(db, org):
+    members = add_members(db, org, 3)
+    db.execute(
+        user_organisation_roles.update()
+        .where(user_organisation_roles.c.user_id == members[0])
+        .values(status="inactive")
+    )
+    db.commit()
+    fanout = notification_fanout_service.create(db, org.id, "Hello", "Everyone")
+
+    result = notification_fanout_service.run(db, fanout.id, chunk_size=10)
+
+    assert (result.total, result.sent, result.skipped) == (2, 2, 0)
+    assert {n.user_id for n in db.query(Notification).all()} == set(members[1:])
+
+
+def test_interrupted_fanout_resumes_after_last_member(db, org):
+    members = add_members(db, org, 4)
+    fanout = notification_fanout_service.create(db, org.id, "Hello", "Everyone")
+
+    def crash(fanout):
+        raise RuntimeError("worker killed")
+
+    with pytest.raises(RuntimeError):
+        notification_fanout_service.run(db, fanout.id, chunk_size=2, on_progress=crash)
+    db.refresh(fanout)
+    assert (fanout.status, fanout.sent, fanout.last_user_id) == ("failed", 2, members[1])
+
+    # killed while running: the lease was last renewed long ago
+    fanout.status = "running"
+    fanout.locked_at = datetime.now(timezone.utc) - timedelta(hours=1)
+    db.commit()
+    (result,) = notification_fanout_service.resume_unfinished(db)
+
+    assert (result.status, result.sent) == ("completed", 4)
+    assert sorted(n.user_id for n in db.query(Notification).all()) == sorted(members)
+
+
+def test_fanout_running_elsewhere_is_not_resumed(db, org):
+    add_members(db, org, 2)
+    fanout = notification_fanout_service.create(db, org.id, "Hello", "Everyone")
+    fanout.status = "running"
+    fanout.locked_at = datetime.now(timezone.utc)
+    db.commit()
+
+    assert notification_fanout_service.resume_unfinished(db) == []
+    assert notification_fanout_service.run(db, fanout.id).status == "running"
+    assert db.query(Notification).count() == 0
+
+
+def test_run_stops_when_its_lease_is_taken_over(db, org):
+    add_members(db, org, 4)
+    fanout = notification_fanout_service.create(db, org.id, "Hello", "Everyone")
+
+    def taken_over(fanout):
+        # another run took over the stale lease after the first chunk
+        db.query(NotificationFanout).update({"locked_at": datetime.now(timezone.utc)})
+        db.commit()
+
+    result = notification_fanout_service.run(db, fanout.id, chunk_size=2, on_progress=taken_over)
+
+    assert (result.status, result.sent) == ("running", 2)
+    assert db.query(Notification).count() == 2
+
+
+def test_unknown_setting_is_rejected(db, org):
+    with pytest.raises(Exception) as exc:
+        notification_fanout_service.create(db, org.id, "Hello", "Everyone", setting="nope")
+
+    assert exc.value.status_code == 400
+
+
+@pytest.fixture
+def admin(db):
+    user = User(id=str(uuid7()), email="admin@example.com", password="x")
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+
+@pytest.fixture
+def client(db, engine, admin):
+    app.dependency_overrides[get_db] = lambda: db
+    app.dependency_overrides[user_service.get_current_user] = lambda: admin
+    with patch.object(fanout_module, "SessionLocal", sessionmaker(bind=engine)):
+        yield TestClient(app)
+    app.dependency_overrides = {}
+
+
+def test_route_accepts_and_runs_fanout_in_background(client, db, org):
+    add_members(db, org, 3)
+
+    with patch.object(organisation_service, "get_organisation_user_role", return_value="admin"):
+        response = client.post(
+            f"/api/v1/notifications/organisations/{org.id}",
+            json={"title": "Hello", "message": "Everyone"},
+        )
+        assert response.status_code == 202
+        fanout_id = response.json()["data"]["id"]
+
+        progress = client.get(f"/api/v1/notifications/fan-outs/{fanout_id}").json()["data"]
+
+    assert progress["status"] == "completed"
+    assert (progress["total"], progress["sent"], progress["skipped"]) == (3, 3, 0)
+
+
+def test_route_requires_organisation_admin(client, db, org):
+    with patch.object(organisation_service, "get_organisation_user_role", return_value="member"):
+        response = client.post(
+            f"/api/v1/notifications/organisations/{org.id}",
+            json={"title": "Hello", "message": "Everyone"},
+        )
+
+    assert response.status_code == 403
+    assert db.query(NotificationFanout).count() == 0
@@ -0,0 +1,154 @@
+import asyncio
+import json
+import threading
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from uuid_extensions import uuid7
+
+from main import app
+from api.db.database import get_db
+from api.utils.pubsub import broker
+from api.v1.models.notifications import Notification, NotificationCounter
+from api.v1.models.user import User
+from api.v1.services.notification import notification_channels, notification_service
+from api.v1.services.user import user_service
+
+
+@pytest.fixture
+def db():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    User.__table__.create(engine)
+    Notification.__table__.create(engine)
+    NotificationCounter.__table__.create(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+@pytest.fixture
+def user(db):
+    user = User(id=str(uuid7()), email="stream@example.com", password="x")
+    db.add(user)
+    db.commit()
+    return user
+
+
+@pytest.fixture
+def client(db, user):
+    app.dependency_overrides[get_db] = lambda: db
+    app.dependency_overrides[user_service.get_current_user] = lambda: user
+    yield TestClient(app)
+    app.dependency_overrides = {}
+
+
+def parse_events(body: str):
+    events = []
+    for block in body.split("\n\n"):
+        fields = dict(
+            line.split(": ", 1) for line in block.splitlines() if line and not line.startswith(":")
+        )
+        if "data" in fields:
+            events.append((fields["id"], json.loads(fields["data"])))
+    return events
+
+
+def test_published_event_reaches_subscriber_from_another_thread():
+    async def run():
+        subscription = broker.subscribe("notifications:someone")
+        try:
+            thread = threading.Thread(
+                target=broker.publish, args=("notifications:someone", {"id": "1"})
+            )
+            thread.start()
+            thread.join()
+            return await subscription.get(timeout=1)
+        finally:
+            broker.unsubscribe(subscription)
+
+    assert asyncio.run(run()) == {"id": "1"}
+    assert broker.subscriber_count("notifications:someone") == 0
+
+
+def test_slow_subscriber_is_marked_lagged():
+    async def run():
+        subscription = broker.subscribe("busy")
+        try:
+            for index in range(broker.queue_size + 1):
+                broker.publish("busy", {"id": str(index)})
+            await asyncio.sleep(0)
+            return subscription.lagged
+        finally:
+            broker.unsubscribe(subscription)
+
+    assert asyncio.run(run())
+
+
+def test_sent_notification_is_streamed(db, user):
+    async def run():
+        subscription = broker.subscribe(*notification_channels(user.id))
+        stream = notification_service.stream(subscription, heartbeat=0.05)
+        try:
+            assert (await stream.__anext__()).startswith("retry:")
+            assert await stream.__anext__() == ": keep-alive\n\n"
+
+            notification_service.send_notification("Hello", "First", db, user_id=user.id)
+            notification_service.send_notification("Everyone", "Broadcast", db)
+            return [await stream.__anext__(), await stream.__anext__()]
+        finally:
+            await stream.aclose()
+
+    first, second = asyncio.run(run())
+
+    assert json.loads(first.split("data: ")[1])["title"] == "Hello"
+    assert json.loads(second.split("data: ")[1])["title"] == "Everyone"
+    assert broker.subscriber_count(f"notifications:{user.id}") == 0
+
+
+def test_other_users_notifications_are_not_streamed(db, user):
+    async def run():
+        subscription = broker.subscribe(*notification_channels(user.id))
+        stream = notification_service.stream(subscription, heartbeat=0.05)
+        try:
+            await stream.__anext__()
+            notification_service.send_notification("Private", "Not yours", db, user_id="other")
+            return await stream.__anext__()
+        finally:
+            await stream.aclose()
+
+    assert asyncio.run(run()) == ": keep-alive\n\n"
+
+
+def test_stream_resumes_from_last_event_id(client, db, user):
+    sent = [
+        notification_service.send_notification(f"Title {index}", "Message", db, user_id=user.id)
+        for index in range(3)
+    ]
+    notification_service.send_notification("Private", "Not yours", db, user_id=str(uuid7()))
+
+    subscribe = broker.subscribe
+
+    def subscribe_and_end(*channels):
+        # a lagged subscription ends the stream once the replay is sent
+        subscription = subscribe(*channels)
+        subscription.lagged = True
+        return subscription
+
+    with patch.object(broker, "subscribe", side_effect=subscribe_and_end):
+        response = client.get(
+            "/api/v1/notifications/stream", headers={"Last-Event-ID": sent[0].id}
+        )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert [event_id for event_id, _ in parse_events(response.text)] == [
+        sent[1].id,
+        sent[2].id,
+    ]
@@ -0,0 +1,158 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, update
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from uuid_extensions import uuid7
+
+from main import app
+from api.db.database import get_db
+from api.v1.models.notifications import Notification, NotificationCounter
+from api.v1.models.user import User
+from api.v1.services.notification import notification_service
+from api.v1.services.notification_counter import notification_counter_service
+from api.v1.services.user import user_service
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    for model in (User, Notification, NotificationCounter):
+        model.__table__.create(engine)
+    engine.statements = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def record(conn, cursor, statement, parameters, context, executemany):
+        engine.statements.append(statement)
+
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db(engine):
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def user(db):
+    user = User(id=str(uuid7()), email="counter@example.com", password="x")
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+
+@pytest.fixture
+def client(db, user):
+    app.dependency_overrides[get_db] = lambda: db
+    app.dependency_overrides[user_service.get_current_user] = lambda: user
+    yield TestClient(app)
+    app.dependency_overrides = {}
+
+
+def send(db, user, count):
+    return [
+        notification_service.send_notification(f"Title {index}", "Message", db, user_id=user.id)
+        for index in range(count)
+    ]
+
+
+def test_unread_count_follows_sends_reads_and_deletes(client, db, user):
+    sent = send(db, user, 3)
+    notification_service.send_notification("Everyone", "Broadcast", db)
+
+    assert client.get("/api/v1/notifications/unread-count").json()["data"] == {"unread_count": 3}
+
+    client.patch(f"/api/v1/notifications/{sent[0].id}")
+    client.patch(f"/api/v1/notifications/{sent[0].id}")  # already read
+    client.delete(f"/api/v1/notifications/{sent[1].id}")
+
+    assert client.get("/api/v1/notifications/unread-count").json()["data"] == {"unread_count": 1}
+
+
+def test_unread_count_is_one_lookup(client, db, user, engine):
+    send(db, user, 2)
+    db.refresh(user)
+    engine.statements.clear()
+
+    client.get("/api/v1/notifications/unread-count")
+
+    assert len(engine.statements) == 1
+    assert "notification_counters" in engine.statements[0]
+
+
+def test_mark_read_of_another_users_notification_is_not_found(client, db, user):
+    other = User(id=str(uuid7()), email="other@example.com", password="x")
+    db.add(other)
+    db.commit()
+    (notification,) = send(db, other, 1)
+
+    response = client.patch(f"/api/v1/notifications/{notification.id}")
+
+    assert response.status_code == 404
+
+
+def test_read_all_is_one_update(client, db, user, engine):
+    send(db, user, 5)
+    engine.statements.clear()
+
+    response = client.post("/api/v1/notifications/read-all")
+
+    assert response.json()["data"] == {"updated": 5, "unread_count": 0}
+    updates = [s for s in engine.statements if s.startswith("UPDATE notifications ")]
+    assert len(updates) == 1
+
+
+def test_read_all_keeps_notifications_it_did_not_see(client, db, user):
+    send(db, user, 2)
+    # a notification committed concurrently: counted, row not seen by the UPDATE
+    notification_counter_service.increment(db, user.id)
+    db.commit()
+
+    response = client.post("/api/v1/notifications/read-all")
+
+    assert response.json()["data"] == {"updated": 2, "unread_count": 1}
+
+
+def test_read_all_up_to_a_notification(client, db, user):
+    sent = send(db, user, 5)
+
+    response = client.post("/api/v1/notifications/read-all", json={"up_to": sent[2].id})
+
+    assert response.json()["data"] == {"updated": 3, "unread_count": 2}
+    statuses = {n.id: n.status for n in db.query(Notification).all()}
+    assert [statuses[n.id] for n in sent] == ["read", "read", "read", "unread", "unread"]
+
+
+def test_listing_is_paginated_by_cursor(client, db, user):
+    sent = send(db, user, 5)
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        data = client.get("/api/v1/notifications/current-user", params=params).json()["data"]
+        seen.extend(item["id"] for item in data["notifications"])
+        cursor = data["next_cursor"]
+        if cursor is None:
+            break
+
+    assert seen == [n.id for n in reversed(sent)]
+
+
+def test_missing_counter_is_computed_and_drift_reconciled(db, user):
+    send(db, user, 3)
+    db.execute(update(NotificationCounter).values(unread=42))
+    db.commit()
+
+    assert notification_counter_service.reconcile(db) == 1
+    assert notification_counter_service.unread_count(db, user.id) == 3
+
+    db.query(NotificationCounter).delete()
+    db.commit()
+    assert notification_counter_service.unread_count(db, user.id) == 3
+    assert db.get(NotificationCounter, user.id).unread == 3
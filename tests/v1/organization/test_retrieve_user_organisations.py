@@ -0,0 +1,105 @@
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+
+import api.v1.models  # noqa: F401
+from api.db.database import Base
+from api.v1.models.associations import user_organisation_association
+from api.v1.models.organisation import Organisation
+from api.v1.models.permissions.permissions import Permission
+from api.v1.models.permissions.role import Role
+from api.v1.models.permissions.user_org_role import user_organisation_roles
+from api.v1.models.user import User
+from api.v1.services.organisation import organisation_service
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(
+        engine,
+        tables=[
+            User.__table__,
+            Organisation.__table__,
+            Role.__table__,
+            Permission.__table__,
+            Base.metadata.tables["role_permissions"],
+            user_organisation_association,
+            user_organisation_roles,
+        ],
+    )
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    with Session(engine) as session:
+        user = User(email="member@example.com", first_name="a", last_name="b")
+        acme = Organisation(name="Acme", email="acme@example.com")
+        globex = Organisation(name="Globex", email="globex@example.com")
+        manager = Role(name="manager", is_builtin=False)
+        session.add_all([user, acme, globex, manager])
+        session.commit()
+        session.execute(
+            user_organisation_association.insert(),
+            [
+                {"user_id": user.id, "organisation_id": acme.id, "role": "owner"},
+                {"user_id": user.id, "organisation_id": globex.id, "role": "user"},
+            ],
+        )
+        session.execute(
+            user_organisation_roles.insert().values(
+                user_id=user.id, organisation_id=acme.id, role_id=manager.id, is_owner=True
+            )
+        )
+        session.commit()
+        session.statements, session.user, session.orgs = statements, user, (acme, globex)
+        yield session
+
+
+def test_each_organisation_carries_the_users_own_roles(db):
+    db.refresh(db.user)
+    db.statements.clear()
+    organisations = organisation_service.retrieve_user_organizations(db.user, db)
+
+    roles = {org.name: org.user_role for org in organisations}
+    assert roles == {"Acme": ["owner", "manager"], "Globex": ["user"]}
+    assert len([s for s in db.statements if s.startswith("SELECT")]) == 1
+
+
+def test_result_is_cached_until_membership_changes(db):
+    organisation_service.retrieve_user_organizations(db.user, db)
+    db.refresh(db.user)
+    db.statements.clear()
+
+    assert len(organisation_service.retrieve_user_organizations(db.user, db)) == 2
+    assert db.statements == []
+
+    acme, _ = db.orgs
+    db.execute(
+        user_organisation_association.delete().where(
+            user_organisation_association.c.user_id == db.user.id,
+            user_organisation_association.c.organisation_id == acme.id,
+        )
+    )
+    db.commit()
+
+    organisations = organisation_service.retrieve_user_organizations(db.user, db)
+    assert [org.name for org in organisations] == ["Globex"]
+
+
+def test_organisation_update_invalidates_members(db):
+    organisation_service.retrieve_user_organizations(db.user, db)
+
+    acme, _ = db.orgs
+    acme.name = "Acme Corp"
+    db.commit()
+
+    names = {org.name for org in organisation_service.retrieve_user_organizations(db.user, db)}
+    assert names == {"Acme Corp", "Globex"}
+
+
+def test_user_without_organisations(db):
+    loner = User(email="loner@example.com", first_name="c", last_name="d")
+    db.add(loner)
+    db.commit()
+
+    assert organisation_service.retrieve_user_organizations(loner, db) is None
@@ -1,8 +1,11 @@
+import json
+
 import pytest
 from uuid_extensions import uuid7
 from sqlalchemy.orm import Session
 from unittest.mock import MagicMock, patch
 from datetime import datetime, timezone
+import httpx
 from fastapi.testclient import TestClient
 
 from main import app
@@ -45,7 +48,6 @@ def mock_plan():
 
 @pytest.mark.asyncio
 @patch("api.v1.routes.payment_flutterwave.settings")
-@patch("api.v1.routes.payment_flutterwave.requests.post")
 @patch("api.v1.routes.payment_flutterwave.check_model_existence")
 @patch("api.v1.routes.payment_flutterwave.PaymentService")
 @patch("api.v1.routes.payment_flutterwave.uuid7")
@@ -53,9 +55,9 @@ async def test_pay_with_flutterwave_success(
     mock_uuid7, 
     mock_payment_service, 
     mock_check_model, 
-    mock_post, 
     mock_settings,
     mock_db_session, 
+    provider_transport,
     test_user, 
     mock_request, 
     mock_plan
@@ -65,7 +67,13 @@ async def test_pay_with_flutterwave_success(
     mock_settings.FLUTTERWAVE_SECRET = "test_secret_key"
     mock_uuid7.return_value = test_uuid
     mock_check_model.return_value = mock_plan
-    mock_post.return_value.json.return_value = {"data": {"link": "http://payment.url"}}
+    sent = []
+
+    def flutterwave(request):
+        sent.append(request)
+        return httpx.Response(200, json={"data": {"link": "http://payment.url"}})
+
+    provider_transport(flutterwave)
     mock_payment_service_instance = mock_payment_service.return_value
 
     result = await pay_with_flutterwave(mock_request, test_user, mock_db_session)
@@ -73,18 +81,18 @@ async def test_pay_with_flutterwave_success(
     # Assertions
     assert result.status_code == status.HTTP_200_OK
    
-    mock_post.assert_called_once_with(
-        "https://api.flutterwave.com/v3/payments",
-        json={
-            "tx_ref": str(test_uuid),
-            "amount": 100.00,
-            "currency": "USD",
-            "redirect_url": "http://example.com/redirect",
-            "payment_options": "card",
-            "customer": {"email": test_user.email}
-        },
-        headers={"Authorization": "Bearer test_secret_key"}
-    )
+    assert len(sent) == 1
+    assert sent[0].method == "POST"
+    assert str(sent[0].url) == "https://api.flutterwave.com/v3/payments"
+    assert sent[0].headers["Authorization"] == "Bearer test_secret_key"
+    assert json.loads(sent[0].content) == {
+        "tx_ref": str(test_uuid),
+        "amount": 100.00,
+        "currency": "USD",
+        "redirect_url": "http://example.com/redirect",
+        "payment_options": "card",
+        "customer": {"email": test_user.email}
+    }
 
     mock_payment_service_instance.create.assert_called_once_with(
         mock_db_session,
@@ -97,3 +105,82 @@ async def test_pay_with_flutterwave_success(
             "transaction_id": str(test_uuid)
         }
     )
+
+
+
+@pytest.mark.asyncio
+@patch("api.v1.routes.payment_flutterwave.check_model_existence")
+@patch("api.v1.routes.payment_flutterwave.PaymentService")
+async def test_pay_with_flutterwave_provider_down(
+    mock_payment_service,
+    mock_check_model,
+    mock_db_session,
+    test_user,
+    mock_request,
+    mock_plan,
+    provider_transport,
+):
+    from fastapi import HTTPException
+    from api.utils.http_client import provider_clients
+
+    mock_check_model.return_value = mock_plan
+    calls = []
+
+    def flutterwave(request):
+        calls.append(request)
+        return httpx.Response(500, json={"status": "error"})
+
+    provider_transport(flutterwave)
+    breaker = provider_clients.breakers["flutterwave"]
+    for _ in range(breaker.failure_threshold):
+        with pytest.raises(HTTPException) as error:
+            await pay_with_flutterwave(mock_request, test_user, mock_db_session)
+        assert error.value.status_code == 502
+
+    with pytest.raises(HTTPException) as error:
+        await pay_with_flutterwave(mock_request, test_user, mock_db_session)
+
+    # a POST is never retried, and the open breaker stops further calls
+    assert len(calls) == breaker.failure_threshold
+    assert error.value.status_code == 503
+    mock_payment_service.return_value.create.assert_not_called()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "reply, status_code",
+    [
+        (httpx.Response(422, json={"status": "error", "message": "invalid currency"}), 400),
+        (httpx.Response(200, json={"status": "error"}), 502),
+        (httpx.ConnectError("refused"), 502),
+    ],
+)
+@patch("api.v1.routes.payment_flutterwave.check_model_existence")
+@patch("api.v1.routes.payment_flutterwave.PaymentService")
+async def test_pay_with_flutterwave_failures(
+    mock_payment_service,
+    mock_check_model,
+    reply,
+    status_code,
+    mock_db_session,
+    test_user,
+    mock_request,
+    mock_plan,
+    provider_transport,
+):
+    from fastapi import HTTPException
+
+    mock_check_model.return_value = mock_plan
+
+    def flutterwave(request):
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+
+    provider_transport(flutterwave)
+    with pytest.raises(HTTPException) as error:
+        await pay_with_flutterwave(mock_request, test_user, mock_db_session)
+
+    # only the rejected request is the caller's fault
+    assert error.value.status_code == status_code
+    mock_payment_service.return_value.create.assert_not_called()
@@ -0,0 +1,320 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+
+import httpx
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+from uuid_extensions import uuid7
+
+from main import app as main_app
+from api.db.database import get_db
+from api.utils import idempotency as idempotency_module
+from api.utils.idempotency import IdempotencyMiddleware, provider_idempotency
+from api.v1.models import BillingPlan, User
+from api.v1.models.idempotency import IdempotencyKey
+from api.v1.services import idempotency as store_module
+from api.v1.services.idempotency import CLAIMED, PROCESSING, IdempotencyService
+from api.v1.services.user import user_service
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    # a file, so that concurrent requests each get their own connection
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'idempotency.db'}", connect_args={"check_same_thread": False}
+    )
+    IdempotencyKey.__table__.create(engine)
+    factory = sessionmaker(bind=engine)
+    with patch.object(idempotency_module, "SessionLocal", factory), patch.object(
+        store_module, "_last_pruned", float("inf")
+    ):
+        yield factory
+    engine.dispose()
+
+
+def payments_app():
+    app = FastAPI()
+    app.add_middleware(IdempotencyMiddleware, paths=("/pay",))
+    app.state.executed = 0
+
+    @app.post("/pay")
+    async def pay(request: Request):
+        app.state.executed += 1
+        body = await request.json()
+        await asyncio.sleep(body.get("delay", 0))
+        if body.get("fail"):
+            return JSONResponse(status_code=body.get("status", 502), content={"error": "provider"})
+        response = JSONResponse(
+            status_code=201,
+            content={"payment": app.state.executed, "provider_key": provider_idempotency("charge")},
+        )
+        response.set_cookie("session", "secret")
+        return response
+
+    @app.post("/profile")
+    async def profile():
+        app.state.executed += 1
+        return {"profile": app.state.executed}
+
+    return app
+
+
+def test_retry_is_replayed_without_executing_again(session_factory):
+    app = payments_app()
+    client = TestClient(app)
+    headers = {"Idempotency-Key": "order-1"}
+
+    first = client.post("/pay", json={"amount": 10}, headers=headers)
+    retry = client.post("/pay", json={"amount": 10}, headers=headers)
+
+    assert app.state.executed == 1
+    assert first.status_code == retry.status_code == 201
+    assert retry.json() == first.json()
+    assert retry.headers["idempotent-replayed"] == "true"
+    assert "idempotent-replayed" not in first.headers
+    # cookies are not stored
+    assert "set-cookie" in first.headers and "set-cookie" not in retry.headers
+
+
+def test_requests_without_key_always_execute(session_factory):
+    app = payments_app()
+    client = TestClient(app)
+
+    client.post("/pay", json={"amount": 10})
+    client.post("/pay", json={"amount": 10})
+
+    assert app.state.executed == 2
+
+
+def test_key_reused_for_another_request_is_refused(session_factory):
+    app = payments_app()
+    client = TestClient(app)
+    headers = {"Idempotency-Key": "order-1"}
+
+    client.post("/pay", json={"amount": 10}, headers=headers)
+    response = client.post("/pay", json={"amount": 99}, headers=headers)
+
+    assert response.status_code == 422
+    assert app.state.executed == 1
+
+
+def test_keys_are_per_caller(session_factory):
+    app = payments_app()
+    client = TestClient(app)
+
+    for user_id in (str(uuid7()), str(uuid7())):
+        token = user_service.create_access_token(user_id)
+        client.post(
+            "/pay",
+            json={"amount": 10},
+            headers={"Idempotency-Key": "order-1", "Authorization": f"Bearer {token}"},
+        )
+
+    assert app.state.executed == 2
+
+
+def test_server_error_releases_the_key(session_factory):
+    app = payments_app()
+    client = TestClient(app)
+    headers = {"Idempotency-Key": "order-1"}
+
+    assert client.post("/pay", json={"fail": True}, headers=headers).status_code == 502
+    assert client.post("/pay", json={"fail": True}, headers=headers).status_code == 502
+
+    assert app.state.executed == 2
+    with session_factory() as db:
+        assert db.query(IdempotencyKey).count() == 0
+
+
+@pytest.mark.parametrize("status_code", [401, 403, 408, 409, 425, 429])
+def test_retryable_and_auth_failures_release_the_key(session_factory, status_code):
+    app = payments_app()
+    client = TestClient(app)
+    headers = {"Idempotency-Key": "order-1"}
+    body = {"fail": True, "status": status_code}
+
+    assert client.post("/pay", json=body, headers=headers).status_code == status_code
+    retry = client.post("/pay", json=body, headers=headers)
+
+    assert "idempotent-replayed" not in retry.headers
+    assert app.state.executed == 2
+    with session_factory() as db:
+        assert db.query(IdempotencyKey).count() == 0
+
+
+def test_paths_not_listed_are_not_deduplicated(session_factory):
+    app = payments_app()
+    client = TestClient(app)
+    headers = {"Idempotency-Key": "order-1"}
+
+    first = client.post("/profile", headers=headers)
+    retry = client.post("/profile", headers=headers)
+
+    assert app.state.executed == 2
+    assert retry.json() != first.json()
+    with session_factory() as db:
+        assert db.query(IdempotencyKey).count() == 0
+
+
+def test_concurrent_duplicates_wait_for_the_first(session_factory):
+    app = payments_app()
+
+    async def send_both():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await asyncio.gather(
+                *(
+                    client.post("/pay", json={"delay": 0.3}, headers={"Idempotency-Key": "order-1"})
+                    for _ in range(3)
+                )
+            )
+
+    responses = asyncio.run(send_both())
+
+    assert app.state.executed == 1
+    assert {response.status_code for response in responses} == {201}
+    assert len({response.content for response in responses}) == 1
+    assert sum("idempotent-replayed" in response.headers for response in responses) == 2
+
+
+def test_duplicate_gives_up_after_the_wait_timeout(session_factory):
+    app = payments_app()
+
+    async def send_both():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            first = asyncio.create_task(
+                client.post("/pay", json={"delay": 0.5}, headers={"Idempotency-Key": "order-1"})
+            )
+            await asyncio.sleep(0.1)
+            duplicate = await client.post(
+                "/pay", json={"delay": 0.5}, headers={"Idempotency-Key": "order-1"}
+            )
+            return await first, duplicate
+
+    with patch.object(idempotency_module.settings, "IDEMPOTENCY_WAIT_TIMEOUT", 0.2):
+        first, duplicate = asyncio.run(send_both())
+
+    assert first.status_code == 201
+    assert duplicate.status_code == 409
+    assert app.state.executed == 1
+
+
+def test_provider_key_is_derived_from_the_callers_key(session_factory):
+    client = TestClient(payments_app())
+
+    one = client.post("/pay", json={}, headers={"Idempotency-Key": "order-1"}).json()
+    two = client.post("/pay", json={}, headers={"Idempotency-Key": "order-2"}).json()
+    plain = client.post("/pay", json={}).json()
+
+    assert len(one["provider_key"]["idempotency_key"]) == 64
+    assert one["provider_key"] != two["provider_key"]
+    assert plain["provider_key"] == {}
+
+
+def test_stale_claim_is_taken_over(session_factory):
+    now = datetime.now(timezone.utc)
+    claim = ("ip:1.2.3.4", "order-1", "POST", "/pay", "f" * 64)
+    with session_factory() as db:
+        assert IdempotencyService.claim(db, *claim, now=now)[0] == CLAIMED
+        assert IdempotencyService.claim(db, *claim, now=now + timedelta(seconds=5))[0] == PROCESSING
+        assert IdempotencyService.claim(db, *claim, now=now + timedelta(minutes=10))[0] == CLAIMED
+
+
+def test_prune_deletes_only_expired_keys(session_factory):
+    now = datetime.now(timezone.utc)
+    with session_factory() as db:
+        for index in range(3):
+            IdempotencyService.claim(
+                db, "ip:1.2.3.4", f"old-{index}", "POST", "/pay", "f" * 64, now=now - timedelta(days=2)
+            )
+        IdempotencyService.claim(db, "ip:1.2.3.4", "new", "POST", "/pay", "f" * 64, now=now)
+
+        assert IdempotencyService.prune(db, now) == 3
+        assert [row.key for row in db.query(IdempotencyKey)] == ["new"]
+
+
+@patch("api.v1.routes.payment_flutterwave.check_model_existence")
+@patch("api.v1.routes.payment_flutterwave.PaymentService")
+def test_flutterwave_retry_creates_one_payment(
+    mock_payment_service, mock_check_model, session_factory, provider_transport
+):
+    user = User(id=str(uuid7()), email="payer@example.com", password="x")
+    main_app.dependency_overrides[get_db] = lambda: MagicMock(spec=Session)
+    main_app.dependency_overrides[user_service.get_current_user] = lambda: user
+    mock_check_model.return_value = BillingPlan(id="1", price=100.0, currency="USD")
+    calls = []
+
+    def flutterwave(request):
+        calls.append(request)
+        return httpx.Response(200, json={"data": {"link": f"http://pay/{len(calls)}"}})
+
+    provider_transport(flutterwave)
+    client = TestClient(main_app)
+    body = {
+        "organisation_id": "org",
+        "plan_id": "1",
+        "billing_option": "Monthly",
+        "full_name": "Payer",
+        "redirect_url": "http://example.com/redirect",
+    }
+    try:
+        responses = [
+            client.post(
+                "/api/v1/transactions/flutterwave", json=body, headers={"Idempotency-Key": "checkout-1"}
+            )
+            for _ in range(2)
+        ]
+    finally:
+        main_app.dependency_overrides = {}
+
+    assert [response.status_code for response in responses] == [200, 200]
+    assert responses[1].json() == responses[0].json()
+    assert len(calls) == 1
+    mock_payment_service.return_value.create.assert_called_once()
+
+
+@patch("api.v1.routes.payment_flutterwave.check_model_existence")
+@patch("api.v1.routes.payment_flutterwave.PaymentService")
+def test_flutterwave_outage_is_not_replayed(
+    mock_payment_service, mock_check_model, session_factory, provider_transport
+):
+    user = User(id=str(uuid7()), email="payer@example.com", password="x")
+    main_app.dependency_overrides[get_db] = lambda: MagicMock(spec=Session)
+    main_app.dependency_overrides[user_service.get_current_user] = lambda: user
+    mock_check_model.return_value = BillingPlan(id="1", price=100.0, currency="USD")
+    replies = [httpx.Response(503), httpx.Response(200, json={"data": {"link": "http://pay/1"}})]
+    calls = []
+
+    def flutterwave(request):
+        calls.append(request)
+        return replies[len(calls) - 1]
+
+    provider_transport(flutterwave)
+    client = TestClient(main_app)
+    body = {
+        "organisation_id": "org",
+        "plan_id": "1",
+        "billing_option": "Monthly",
+        "full_name": "Payer",
+        "redirect_url": "http://example.com/redirect",
+    }
+    try:
+        responses = [
+            client.post(
+                "/api/v1/transactions/flutterwave", json=body, headers={"Idempotency-Key": "checkout-1"}
+            )
+            for _ in range(2)
+        ]
+    finally:
+        main_app.dependency_overrides = {}
+
+    assert [response.status_code for response in responses] == [502, 200]
+    assert "idempotent-replayed" not in responses[1].headers
+    assert len(calls) == 2
+    mock_payment_service.return_value.create.assert_called_once()
@@ -0,0 +1,218 @@
+import asyncio
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from api.utils.http_client import (
+    ProviderClients,
+    ProviderConfig,
+    ProviderError,
+    ProviderUnavailable,
+)
+
+
+def make_clients(handler, **config):
+    config = {"backoff": 0, "retries": 2, "failure_threshold": 3, **config}
+    clients = ProviderClients({"acme": ProviderConfig(**config)})
+    clients.set_transport(httpx.MockTransport(handler))
+    return clients
+
+
+def replies(*statuses):
+    '''A handler answering with `statuses` in turn; an exception instance is raised instead'''
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        reply = statuses[min(len(calls), len(statuses)) - 1]
+        if isinstance(reply, BaseException):
+            raise reply
+        return httpx.Response(reply)
+
+    return handler, calls
+
+
+def request(clients, method="GET", **kwargs):
+    async def send():
+        try:
+            return await clients.request("acme", method, "https://acme.test/v1/charges", **kwargs)
+        finally:
+            await clients.close()
+
+    return asyncio.run(send())
+
+
+def test_idempotent_request_is_retried_until_it_succeeds():
+    handler, calls = replies(503, 502, 200)
+
+    response = request(make_clients(handler))
+
+    assert response.status_code == 200
+    assert len(calls) == 3
+
+
+def test_post_is_not_retried_after_it_reached_the_provider():
+    handler, calls = replies(503, 200)
+
+    response = request(make_clients(handler), "POST", json={"amount": 100})
+
+    assert response.status_code == 503
+    assert len(calls) == 1
+
+
+def test_post_with_idempotency_key_is_retried():
+    handler, calls = replies(503, 200)
+
+    response = request(
+        make_clients(handler), "POST", json={"amount": 100}, headers={"Idempotency-Key": "abc"}
+    )
+
+    assert response.status_code == 200
+    assert len(calls) == 2
+
+
+def test_post_is_retried_when_it_was_never_sent():
+    handler, calls = replies(httpx.ConnectError("refused"), 200)
+
+    response = request(make_clients(handler), "POST")
+
+    assert response.status_code == 200
+    assert len(calls) == 2
+
+
+def test_post_read_timeout_is_not_retried():
+    handler, calls = replies(httpx.ReadTimeout("slow"), 200)
+
+    with pytest.raises(ProviderError):
+        request(make_clients(handler), "POST")
+    assert len(calls) == 1
+
+
+def test_no_response_after_retries_raises():
+    handler, calls = replies(httpx.ConnectError("refused"))
+
+    with pytest.raises(ProviderError) as error:
+        request(make_clients(handler))
+
+    assert error.value.provider == "acme"
+    assert len(calls) == 3
+
+
+def test_breaker_opens_then_lets_one_trial_through():
+    provider = {"status": 500, "calls": 0}
+
+    def handler(request):
+        provider["calls"] += 1
+        return httpx.Response(provider["status"])
+
+    clients = make_clients(handler, retries=0, reset_timeout=30)
+    breaker = clients.breakers["acme"]
+
+    for _ in range(3):
+        assert request(clients).status_code == 500
+    assert breaker.state == "open"
+
+    with pytest.raises(ProviderUnavailable):
+        request(clients)
+    assert provider["calls"] == 3
+
+    with patch("api.utils.http_client.time.monotonic", return_value=breaker.opened_at + 31):
+        assert breaker.state == "half-open"
+        # the trial fails, so the breaker opens again straight away
+        assert request(clients).status_code == 500
+        assert breaker.state == "open"
+    assert provider["calls"] == 4
+
+    provider["status"] = 200
+    with patch("api.utils.http_client.time.monotonic", return_value=breaker.opened_at + 31):
+        assert request(clients).status_code == 200
+    assert breaker.state == "closed"
+
+
+def open_breaker(clients):
+    breaker = clients.breakers["acme"]
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+    return breaker
+
+
+@pytest.mark.parametrize("interruption", [asyncio.CancelledError(), RuntimeError("bug")])
+def test_interrupted_trial_lets_the_next_call_try(interruption):
+    handler, calls = replies(interruption, 200)
+    clients = make_clients(handler, retries=0, reset_timeout=30)
+    breaker = open_breaker(clients)
+
+    with patch("api.utils.http_client.time.monotonic", return_value=breaker.opened_at + 31):
+        with pytest.raises(type(interruption)):
+            request(clients)
+        assert breaker.state == "half-open"
+        assert request(clients).status_code == 200
+    assert breaker.state == "closed"
+    assert len(calls) == 2
+
+
+def test_undecodable_response_is_a_provider_failure():
+    handler, calls = replies(httpx.DecodingError("garbled"))
+    clients = make_clients(handler, retries=0, failure_threshold=1)
+
+    with pytest.raises(ProviderError):
+        request(clients)
+
+    assert clients.breakers["acme"].state == "open"
+
+
+def test_replaced_clients_are_closed():
+    handler, calls = replies(200)
+    clients = make_clients(handler)
+
+    async def replace_transport():
+        await clients.request("acme", "GET", "https://acme.test/v1/charges")
+        replaced = clients.client
+        clients.set_transport(httpx.MockTransport(handler))
+        await asyncio.sleep(0)
+        await clients.close()
+        return replaced
+
+    assert asyncio.run(replace_transport()).is_closed
+
+    async def first_loop():
+        await clients.request("acme", "GET", "https://acme.test/v1/charges")
+        return clients.client
+
+    loop = asyncio.new_event_loop()
+    try:
+        replaced = loop.run_until_complete(first_loop())
+        request(clients)
+        assert replaced.is_closed
+    finally:
+        loop.close()
+
+
+def test_client_errors_do_not_trip_the_breaker():
+    handler, calls = replies(404)
+    clients = make_clients(handler, retries=0)
+
+    for _ in range(5):
+        request(clients)
+
+    assert clients.breakers["acme"].state == "closed"
+
+
+def test_stripe_sdk_goes_through_the_shared_client(provider_transport, monkeypatch):
+    from api.v1.services.stripe_payment import get_stripe
+
+    sent = []
+
+    def stripe_api(request):
+        sent.append(request)
+        return httpx.Response(200, json={"id": "cs_test_1", "object": "checkout.session", "url": "https://pay"})
+
+    provider_transport(stripe_api)
+    stripe = get_stripe()
+    monkeypatch.setattr(stripe, "api_key", "sk_test_123")
+
+    session = asyncio.run(stripe.checkout.Session.retrieve_async("cs_test_1"))
+
+    assert session.url == "https://pay"
+    assert sent[0].url.path == "/v1/checkout/sessions/cs_test_1"
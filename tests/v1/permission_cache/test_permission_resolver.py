@@ -0,0 +1,126 @@
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session, sessionmaker
+
+from api.v1.models.associations import user_organisation_association
+from api.v1.models.permissions.permissions import Permission
+from api.v1.models.permissions.role import Role
+from api.v1.models.permissions.role_permissions import role_permissions
+from api.v1.models.permissions.user_org_role import user_organisation_roles
+from api.v1.services.permissions.catalog import RoleCatalog
+from api.v1.services.permissions.resolver import PermissionResolver
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Role.metadata.create_all(
+        engine,
+        tables=[
+            Role.__table__,
+            Permission.__table__,
+            role_permissions,
+            user_organisation_roles,
+            user_organisation_association,
+        ],
+    )
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    class TestSession(Session):
+        pass
+
+    resolver = PermissionResolver(RoleCatalog(), ttl=60)
+    resolver.install(TestSession)
+    with sessionmaker(bind=engine, class_=TestSession)() as session:
+        view, manage = Permission(title="view_user"), Permission(title="manage_organisation")
+        admin = Role(name="admin", is_builtin=True, permissions=[view, manage])
+        member = Role(name="user", is_builtin=True, permissions=[view])
+        session.add_all([admin, member])
+        session.commit()
+        session.execute(
+            user_organisation_association.insert().values(
+                user_id="u1", organisation_id="o1", role="admin"
+            )
+        )
+        session.execute(
+            user_organisation_roles.insert().values(
+                user_id="u1", organisation_id="o1", role_id=member.id, is_owner=False
+            )
+        )
+        session.commit()
+        session.resolver, session.statements, session.roles = resolver, statements, (admin, member)
+        yield session
+
+
+def test_membership_is_served_from_memory_after_first_check(db):
+    resolver = db.resolver
+
+    assert resolver.has_permissions(db, "u1", "o1", "view_user")
+    db.statements.clear()
+
+    for _ in range(5):
+        assert resolver.membership(db, "u1", "o1").role == "admin"
+        assert resolver.has_permissions(db, "u1", "o1", "view_user")
+
+    assert db.statements == []
+
+
+def test_permissions_combine_both_role_sources_as_bitsets(db):
+    resolver = db.resolver
+
+    assert resolver.has_permissions(db, "u1", "o1", "view_user", "manage_organisation")
+    assert not resolver.has_permissions(db, "u1", "o1", "unknown_permission")
+    assert not resolver.has_permissions(db, "u2", "o1", "view_user")
+    assert not resolver.membership(db, "u2", "o1").is_member
+
+
+def test_core_membership_write_invalidates_on_commit(db):
+    resolver = db.resolver
+    assert resolver.membership(db, "u1", "o1").role == "admin"
+
+    db.execute(
+        user_organisation_association.update()
+        .where(
+            user_organisation_association.c.user_id == "u1",
+            user_organisation_association.c.organisation_id == "o1",
+        )
+        .values(role="user")
+    )
+    db.commit()
+
+    assert resolver.membership(db, "u1", "o1").role == "user"
+    assert not resolver.has_permissions(db, "u1", "o1", "manage_organisation")
+
+
+def test_role_permission_change_reloads_catalog(db):
+    resolver = db.resolver
+    admin, member = db.roles
+    assert not resolver.has_permissions(db, "u1", "o1", "delete_user")
+
+    delete = Permission(title="delete_user")
+    member.permissions.append(delete)
+    db.commit()
+
+    assert resolver.has_permissions(db, "u1", "o1", "delete_user")
+
+
+def test_role_id_comes_from_catalog(db):
+    resolver = db.resolver
+    admin, _ = db.roles
+
+    assert resolver.role_id(db, "admin") == admin.id
+    db.statements.clear()
+    assert resolver.role_id(db, "admin") == admin.id
+    assert resolver.role_id(db, "missing") is None
+    assert db.statements == []
+
+
+def test_rolled_back_write_does_not_leave_stale_entries(db):
+    resolver = db.resolver
+    db.execute(user_organisation_association.delete().where(user_organisation_association.c.user_id == "u1"))
+    assert resolver.membership(db, "u1", "o1").role is None
+
+    db.rollback()
+
+    assert resolver.membership(db, "u1", "o1").role == "admin"
@@ -0,0 +1,132 @@
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api.utils import profiler as profiler_module
+from api.utils.profiler import (
+    ProfileRecord,
+    ProfilingMiddleware,
+    SamplingProfiler,
+    profile_store,
+    profiler_config,
+)
+from api.v1.models.user import User
+from api.v1.services.user import user_service
+from main import app
+
+
+def busy_loop(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def make_app():
+    test_app = FastAPI()
+    test_app.add_middleware(ProfilingMiddleware)
+
+    @test_app.get("/slow")
+    def slow():
+        busy_loop(0.05)
+        return {"ok": True}
+
+    return test_app
+
+
+@pytest.fixture(autouse=True)
+def reset_profiler():
+    profile_store.clear()
+    profiler_config.reset()
+    yield
+    profile_store.clear()
+    profiler_config.reset()
+    profiler_config.sample_rate = 0
+
+
+def test_sampling_profiler_collects_folded_stacks():
+    with SamplingProfiler(interval=0.001) as sampler:
+        busy_loop(0.05)
+
+    assert sampler.samples > 0
+    assert "busy_loop (tests/v1/profiler/test_profiler.py" in sampler.collapsed()
+    stack, count = sampler.collapsed().splitlines()[0].rsplit(" ", 1)
+    assert int(count) >= 1
+
+
+def test_header_profiles_a_single_request():
+    client = TestClient(make_app())
+
+    with patch.object(profiler_module.settings, "PROFILER_TOKEN", "s3cret"):
+        assert "x-profile-id" not in client.get("/slow", headers={"X-Profile": "wrong"}).headers
+        response = client.get("/slow", headers={"X-Profile": "s3cret"})
+
+    record = profile_store.get(response.headers["x-profile-id"])
+    assert record.trigger == "header"
+    assert record.path == "/slow"
+    assert "slow (tests/v1/profiler/test_profiler.py" in record.collapsed
+
+
+def test_non_ascii_profile_header_is_just_a_wrong_token():
+    client = TestClient(make_app())
+
+    with patch.object(profiler_module.settings, "PROFILER_TOKEN", "s3cret"):
+        response = client.get("/slow", headers=[(b"X-Profile", "s3crét".encode("latin-1"))])
+
+    assert response.status_code == 200
+    assert "x-profile-id" not in response.headers
+
+
+def test_background_sampling_keeps_only_slow_requests():
+    client = TestClient(make_app())
+    profiler_config.sample_rate = 1
+
+    profiler_config.slow_threshold_ms = 10_000
+    client.get("/slow")
+    assert profile_store.all() == []
+
+    profiler_config.slow_threshold_ms = 1
+    client.get("/slow")
+    assert [record.trigger for record in profile_store.all()] == ["sampled"]
+
+
+def test_armed_path_is_profiled_once():
+    client = TestClient(make_app())
+    profiler_config.arm("/slow")
+
+    client.get("/slow")
+    client.get("/slow")
+
+    assert [record.trigger for record in profile_store.all()] == ["armed"]
+
+
+def test_download_profile_requires_super_admin():
+    profile_store.add(
+        ProfileRecord(
+            method="GET",
+            path="/slow",
+            status_code=200,
+            duration_ms=51.0,
+            trigger="header",
+            samples=1,
+            collapsed="MainThread;slow (main.py:1) 1\n",
+        )
+    )
+    record = profile_store.all()[0]
+    client = TestClient(app)
+
+    assert client.get(f"/api/v1/profiler/profiles/{record.id}").status_code == 401
+
+    app.dependency_overrides[user_service.get_current_super_admin] = lambda: MagicMock(spec=User)
+    try:
+        response = client.get(f"/api/v1/profiler/profiles/{record.id}")
+        listing = client.get("/api/v1/profiler/profiles")
+    finally:
+        app.dependency_overrides = {}
+
+    assert response.status_code == 200
+    assert response.text == "MainThread;slow (main.py:1) 1\n"
+    assert "attachment" in response.headers["content-disposition"]
+    assert listing.json()["data"][0]["id"] == record.id
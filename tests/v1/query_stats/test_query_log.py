@@ -0,0 +1,86 @@
+import time
+from unittest.mock import MagicMock
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+from api.db.query_log import QueryLog, fingerprint, merge_snapshots
+from api.v1.models.user import User
+from api.v1.services.user import user_service
+from main import app
+
+
+def test_fingerprint_normalizes_literals():
+    assert fingerprint(
+        "SELECT * FROM users WHERE email = 'a@b.c' AND id IN (1, 2, 3)"
+    ) == "SELECT * FROM users WHERE email = ? AND id IN (?+)"
+    assert fingerprint(
+        "SELECT users.id FROM users\n WHERE users.id = %(id_1)s LIMIT %(param_1)s"
+    ) == fingerprint("SELECT users.id FROM users WHERE users.id = ? LIMIT 10")
+    assert fingerprint("SELECT x::text FROM t1 WHERE name ILIKE '%bob%'") == (
+        "SELECT x::text FROM t1 WHERE name ILIKE ?"
+    )
+
+
+def test_statistics_per_fingerprint():
+    log = QueryLog(threshold_ms=10_000, sample_size=4)
+    for elapsed in (1, 2, 3, 4, 100):
+        log.record(f"SELECT * FROM blogs WHERE id = '{elapsed}'", elapsed, rows=1)
+
+    [stats] = log.snapshot()
+    assert stats["statement"] == "SELECT * FROM blogs WHERE id = ?"
+    assert stats["count"] == 5
+    assert stats["rows"] == 5
+    assert stats["max_ms"] == 100
+    # percentiles cover the 4 most recent executions
+    assert stats["p50_ms"] == 3
+    assert stats["p99_ms"] == 100
+
+
+def test_slow_statements_are_explained(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'explain.db'}")
+    log = QueryLog(threshold_ms=0, explain_interval=3600)
+    log.install(engine)
+
+    with engine.connect() as conn:
+        conn.execute(text("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)"))
+        conn.execute(text("SELECT * FROM items WHERE name = :name"), {"name": "a"})
+
+    deadline = time.monotonic() + 5
+    stats = None
+    while time.monotonic() < deadline:
+        stats = next(
+            entry for entry in log.snapshot() if entry["statement"].startswith("SELECT")
+        )
+        if stats["explain"]:
+            break
+        time.sleep(0.01)
+
+    assert "SCAN items" in stats["explain"]
+
+
+def test_snapshots_merge_across_workers(tmp_path, monkeypatch):
+    for pid, elapsed in ((101, 5), (102, 15)):
+        monkeypatch.setattr("api.db.query_log.os.getpid", lambda: pid)
+        log = QueryLog(snapshot_dir=str(tmp_path))
+        log.record("SELECT 1", elapsed)
+        log.write_snapshot()
+
+    [merged] = merge_snapshots(str(tmp_path))
+    assert merged["count"] == 2
+    assert merged["total_ms"] == 20
+    assert merged["max_ms"] == 15
+
+
+def test_query_stats_endpoint_requires_super_admin():
+    client = TestClient(app)
+    assert client.get("/api/v1/query-stats").status_code == 401
+
+    app.dependency_overrides[user_service.get_current_super_admin] = lambda: MagicMock(spec=User)
+    try:
+        response = client.get("/api/v1/query-stats", params={"sort_by": "p95_ms"})
+    finally:
+        app.dependency_overrides = {}
+
+    assert response.status_code == 200
+    assert isinstance(response.json()["data"], list)
@@ -10,6 +10,7 @@ from api.v1.models import User, Organisation
 from api.v1.services.user import user_service
 from api.v1.models.permissions.role import Role
 from api.v1.models.permissions.user_org_role import user_organisation_roles
+from api.v1.services.permissions.resolver import Membership, permission_resolver
 
 client = TestClient(app)
 
@@ -128,7 +129,7 @@ def test_remove_role_successful(
     access_token_user,
 ):
     mock_db_session.get.side_effect = [test_user, user_role, test_org, test_user]
-    mock_db_session.execute.return_value.scalar_one_or_none.return_value = admin_role
+    mock_db_session.execute.return_value.fetchone.return_value = user_role_relation
     mock_role_service.get_user_role_relation = user_role_relation
 
     # Make request
@@ -136,7 +137,9 @@ def test_remove_role_successful(
     put_url = (
         f"/api/v1/organisations/{test_org.id}/users/{test_user.id}/roles/{user_role.id}"
     )
-    response = client.put(put_url, headers=headers)
+    membership = Membership(role="admin", role_id=user_role.id)
+    with patch.object(permission_resolver, "membership", return_value=membership):
+        response = client.put(put_url, headers=headers)
     assert response.status_code == 200
     assert response.json()["message"] == "User successfully removed from role"
 
@@ -156,9 +159,9 @@ def test_remove_role_unsuccessful(
     )
 
     # NON-ADMIN
-    mock_db_session.execute.return_value.fetchone.return_value = None
     mock_db_session.get.side_effect = [test_org, test_user, user_role]
-    response = client.put(put_url, headers=headers)
+    with patch.object(permission_resolver, "membership", return_value=Membership(role="user")):
+        response = client.put(put_url, headers=headers)
     assert response.status_code == 403
     assert (
         response.json()["message"] == "Permission denied as user is not of admin role"
@@ -166,16 +169,17 @@ def test_remove_role_unsuccessful(
 
     # WRONG role_id
     mock_db_session.get.side_effect = [test_user, None, test_org, test_user]
-    mock_db_session.execute.return_value.fetchone.return_value = admin_role
     mock_role_service.get_user_role_relation = user_role_relation
-    response = client.put(put_url, headers=headers)
+    with patch.object(permission_resolver, "membership", return_value=Membership(role="admin")):
+        response = client.put(put_url, headers=headers)
     assert response.status_code == 404
     assert response.json()["message"] == "Role does not exist"
 
     # USER NOT IN ROLE
     mock_db_session.get.side_effect = [test_user, user_role, test_org, test_user]
-    mock_db_session.execute.return_value.fetchone.side_effect = [admin_role, None]
+    mock_db_session.execute.return_value.fetchone.return_value = None
     mock_role_service.get_user_role_relation = None
-    response = client.put(put_url, headers=headers)
+    with patch.object(permission_resolver, "membership", return_value=Membership(role="admin")):
+        response = client.put(put_url, headers=headers)
     assert response.status_code == 403
     assert response.json()["message"] == "User not found in role"
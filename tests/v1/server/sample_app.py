@@ -0,0 +1,17 @@
+import asyncio
+import os
+
+from fastapi import FastAPI
+
+app = FastAPI()
+
+
+@app.get("/pid")
+async def pid():
+    return {"pid": os.getpid()}
+
+
+@app.get("/slow")
+async def slow():
+    await asyncio.sleep(1)
+    return {"pid": os.getpid()}
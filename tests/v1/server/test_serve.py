@@ -0,0 +1,88 @@
+import signal
+import threading
+from unittest.mock import patch
+
+import httpx
+
+import serve
+from scripts.load_test import _free_port, run_load, start_server, wait_until_up
+
+
+APP = "tests.v1.server.sample_app:app"
+
+
+def test_defaults_come_from_settings():
+    args = serve.parse_args(["--workers", "3"])
+    config = serve.build_config(args)
+
+    assert args.workers == 3
+    assert config.loop == "uvloop"
+    assert config.http == "httptools"
+    assert config.app == "main:app"
+
+
+def test_per_worker_state_is_reported():
+    with patch.multiple(
+        serve.settings,
+        PUBSUB_BACKEND="postgres",
+        RESPONSE_CACHE_BACKEND="memory",
+        RATE_LIMIT_STORAGE="sqlite",
+        PROMETHEUS_MULTIPROC_DIR="",
+    ):
+        assert serve.per_worker_settings() == ["RESPONSE_CACHE_BACKEND", "PROMETHEUS_MULTIPROC_DIR"]
+
+    with patch.multiple(
+        serve.settings,
+        PUBSUB_BACKEND="postgres",
+        RESPONSE_CACHE_BACKEND="sqlite",
+        RATE_LIMIT_STORAGE="sqlite",
+        PROMETHEUS_MULTIPROC_DIR="/tmp/metrics",
+    ):
+        assert serve.per_worker_settings() == []
+
+
+def test_workers_are_recycled_and_drained_on_shutdown():
+    port = _free_port()
+    base = f"http://127.0.0.1:{port}"
+    server = start_server(APP, 2, port, "--max-requests", "3", "--max-requests-jitter", "0", "--preload")
+    try:
+        wait_until_up(f"{base}/pid")
+        pids = set()
+        for _ in range(20):
+            try:
+                pids.add(httpx.get(f"{base}/pid", timeout=5).json()["pid"])
+            except httpx.HTTPError:
+                pass  # a recycled worker may close a keep-alive connection
+        # each worker serves ~3 requests before the supervisor replaces it
+        assert len(pids) > 2
+
+        slow = {}
+        request = threading.Thread(
+            target=lambda: slow.update(response=httpx.get(f"{base}/slow", timeout=10))
+        )
+        request.start()
+        threading.Event().wait(0.3)
+        server.send_signal(signal.SIGTERM)
+        request.join()
+
+        # the in-flight request completes before the workers exit
+        assert slow["response"].status_code == 200
+        assert server.wait(30) == 0
+    finally:
+        if server.poll() is None:
+            server.kill()
+
+
+def test_load_generator_reports_throughput():
+    port = _free_port()
+    server = start_server(APP, 1, port)
+    try:
+        wait_until_up(f"http://127.0.0.1:{port}/pid")
+        result = run_load(f"http://127.0.0.1:{port}/pid", clients=1, concurrency=4, duration=1)
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(30)
+
+    assert result["requests"] > 0
+    assert result["errors"] == 0
+    assert result["rps"] > 0
@@ -1,10 +1,12 @@
+import asyncio
+
+import httpx
 import pytest
 from unittest.mock import MagicMock
 from fastapi.testclient import TestClient
 from main import app  
 from api.v1.services.sms_twilio import send_sms
 from unittest import mock
-from twilio.base.exceptions import TwilioRestException
 from api.v1.services.user import user_service
 from uuid_extensions import uuid7
 
@@ -12,33 +14,38 @@ client = TestClient(app)
 user_id = str(uuid7())
 
 
-@mock.patch('api.v1.services.sms_twilio.client.messages.create')
-def test_send_sms_twilio(create_message_mock):
+def test_send_sms_twilio(provider_transport):
     message = "Hi there"
     expected_sid = 'SM87105da94bff44b999e4e6eb90d8eb6a'
-    create_message_mock.return_value.sid = expected_sid
+    sent = []
+
+    def twilio(request):
+        sent.append(request)
+        return httpx.Response(201, json={"sid": expected_sid, "status": "queued"})
+
+    provider_transport(twilio)
 
     to = "<your-personal-number>"
-    sid = send_sms(to, message)
+    sid = asyncio.run(send_sms(to, message))
 
-    assert create_message_mock.called is True
+    assert len(sent) == 1
+    assert sent[0].url.path.endswith("/Messages.json")
     assert sid["sid"] == expected_sid
 
-@mock.patch('api.v1.services.sms_twilio.client.messages.create')
-def test_log_error_when_cannot_send_sms(create_message_mock, caplog):
+def test_log_error_when_cannot_send_sms(provider_transport):
     error_message = (
-        f"Unable to create record: The 'To' number "
+        f"The 'To' number "
         "<your-personal-number> is not a valid phone number."
     )
-    status = 500
-    uri = '/Accounts/ACXXXXXXXXXXXXXXXXX/Messages.json'
-    msg = error_message
-    create_message_mock.side_effect = TwilioRestException(status, uri, msg=error_message)
+    provider_transport(
+        lambda request: httpx.Response(400, json={"code": 21211, "message": error_message, "status": 400})
+    )
 
     to = "<your-personal-number>"
-    sid = send_sms(to, "Wrong message")
+    sid = asyncio.run(send_sms(to, "Wrong message"))
 
-    assert status == 500
+    assert sid["status"] == "error"
+    assert error_message in sid["detail"]
    
 def test_send_sms_error_invalid_phone_number():
     phone_number = "+25467uf445"
@@ -0,0 +1,26 @@
+from scripts.profile_startup import (
+    LAZY_MODULES,
+    TIME_TO_FIRST_REQUEST_BUDGET,
+    by_package,
+    import_profile,
+    loaded_modules,
+    time_to_first_request,
+)
+
+
+def test_heavy_integrations_are_not_imported_with_the_app():
+    loaded = set(loaded_modules())
+
+    assert not [module for module in LAZY_MODULES if module in loaded]
+
+
+def test_import_profile_breaks_down_by_package():
+    rows = import_profile("json")
+    packages = by_package(rows)
+
+    assert any(module == "json" for module, _, _ in rows)
+    assert packages["json"] > 0
+
+
+def test_time_to_first_request_within_budget():
+    assert time_to_first_request() < TIME_TO_FIRST_REQUEST_BUDGET
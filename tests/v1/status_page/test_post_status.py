@@ -64,7 +64,7 @@ def test_get_api_status(mock_fetch, db_session_mock, client):
     db_session_mock.commit.return_value = None
     db_session_mock.refresh.return_value = None
 
-    mock_fetch.return_value = mock_post_api_status()
+    mock_fetch.return_value = [mock_post_api_status()]
 
     response = client.get('/api/v1/api-status')
 
@@ -0,0 +1,214 @@
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+import gzip
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from main import app
+from api.db.database import get_db
+from api.v1.models.api_status import APIStatus, APIStatusRollup, APIStatusSample
+from api.v1.schemas.api_status import APIStatusPost
+from api.v1.services import api_status as api_status_module
+from api.v1.services.api_status import APIStatusService, bucket_start, percentile
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    for model in (APIStatus, APIStatusSample, APIStatusRollup):
+        model.__table__.create(engine)
+    engine.statements = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def record(conn, cursor, statement, parameters, context, executemany):
+        engine.statements.append(statement)
+
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db(engine):
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+@pytest.fixture(autouse=True)
+def no_pruning():
+    with patch.object(api_status_module, "_last_pruned", float("inf")):
+        yield
+
+
+@pytest.fixture
+def client(db):
+    app.dependency_overrides[get_db] = lambda: db
+    yield TestClient(app)
+    app.dependency_overrides = {}
+
+
+def post(db, status, response_time, group="Blog API"):
+    return APIStatusService.upsert(
+        db,
+        APIStatusPost(api_group=group, status=status, response_time=response_time, details="-"),
+    )
+
+
+def test_percentile_is_nearest_rank():
+    values = list(range(1, 101))
+
+    assert percentile(values, 50) == 50
+    assert percentile(values, 95) == 95
+    assert percentile([7], 95) == 7
+    assert percentile([], 50) is None
+
+
+def test_history_is_appended_and_rolled_up(db):
+    for status, response_time in [("Operational", 100), ("Degraded", 300), ("Down", None), ("Operational", 200)]:
+        post(db, status, response_time)
+
+    assert db.query(APIStatus).count() == 1
+    assert db.query(APIStatusSample).count() == 4
+    rollups = {r.period: r for r in db.query(APIStatusRollup).all()}
+    assert set(rollups) == {"hour", "day"}
+    for rollup in rollups.values():
+        assert (rollup.samples, rollup.up, rollup.p50, rollup.p95) == (4, 3, 200, 300)
+
+
+def test_only_the_touched_buckets_are_recomputed(db, engine):
+    now = datetime.now(timezone.utc)
+    db.add_all(
+        APIStatusSample(api_group="Blog API", status="Operational", response_time=10, checked_at=now - timedelta(days=day))
+        for day in range(5)
+    )
+    db.commit()
+    engine.statements.clear()
+
+    APIStatusService.refresh_rollups(db, [("Blog API", now)])
+
+    selects = [s for s in engine.statements if s.startswith("SELECT") and "api_status_samples" in s]
+    assert len(selects) == 1  # today's samples cover this hour and this day
+    assert {r.period: r.samples for r in db.query(APIStatusRollup).all()} == {"hour": 1, "day": 1}
+
+
+def test_get_returns_current_status_with_rollups(client, db):
+    post(db, "Operational", 120)
+    post(db, "Down", None)
+    post(db, "Operational", 80, group="Auth API")
+
+    response = client.get("/api/v1/api-status")
+
+    assert response.status_code == 200
+    groups = {item["api_group"]: item for item in response.json()["data"]}
+    blog = groups["Blog API"]
+    assert blog["status"] == "Down"
+    assert blog["uptime_24h"] == 50.0
+    assert blog["uptime_30d"] == 50.0
+    assert [(h["samples"], h["p50_response_time"]) for h in blog["hourly"]] == [(2, 120)]
+    assert groups["Auth API"]["daily"][0]["uptime"] == 100.0
+
+
+def test_get_is_cached_until_a_status_is_recorded(client, db, engine):
+    post(db, "Operational", 120)
+    client.get("/api/v1/api-status")
+    engine.statements.clear()
+
+    client.get("/api/v1/api-status")
+    assert engine.statements == []
+
+    post(db, "Down", None)
+    data = client.get("/api/v1/api-status").json()["data"]
+    assert data[0]["status"] == "Down"
+
+
+def test_prune_deletes_old_rows_in_one_statement_per_table(db, engine):
+    now = datetime.now(timezone.utc)
+    old, recent = now - timedelta(days=400), now - timedelta(hours=1)
+    for checked_at in (old, old, recent):
+        db.add(APIStatusSample(api_group="Blog API", status="Operational", checked_at=checked_at))
+    for period in ("hour", "day"):
+        for moment in (old, recent):
+            db.add(APIStatusRollup(api_group="Blog API", period=period, bucket=bucket_start(moment, period), samples=1, up=1))
+    db.commit()
+    engine.statements.clear()
+
+    deleted = APIStatusService.prune(db, now=now)
+
+    assert deleted == {"samples": 2, "hour": 1, "day": 1}
+    assert len([s for s in engine.statements if s.startswith("DELETE")]) == 3
+    assert db.query(APIStatusSample).count() == 1
+    assert db.query(APIStatusRollup).count() == 2
+
+
+def test_delete_all_is_set_based(db, engine):
+    post(db, "Operational", 120)
+    post(db, "Operational", 90, group="Auth API")
+    engine.statements.clear()
+
+    assert APIStatusService.delete_all(db) == 2
+    assert len([s for s in engine.statements if s.startswith("DELETE")]) == 3
+    assert db.query(APIStatusRollup).count() == 0
+
+
+def batch(*statuses):
+    return {
+        "statuses": [
+            {"api_group": group, "status": status, "response_time": response_time, "details": "-"}
+            for group, status, response_time in statuses
+        ]
+    }
+
+
+def test_batch_is_one_upsert_and_one_sample_insert(client, db, engine):
+    post(db, "Operational", 120)
+    engine.statements.clear()
+
+    response = client.post(
+        "/api/v1/api-status/batch",
+        json=batch(("Blog API", "Operational", 90), ("Auth API", "Operational", 40), ("Blog API", "Down", None)),
+    )
+
+    assert response.status_code == 201
+    assert response.json()["data"] == {"api_groups": 2, "samples": 3}
+    writes = [s.split(" (")[0] for s in engine.statements if s.startswith("INSERT")]
+    assert writes == [
+        "INSERT INTO api_status",
+        "INSERT INTO api_status_samples",
+        "INSERT INTO api_status_rollups",
+    ]
+    current = {s.api_group: s.status for s in db.query(APIStatus).all()}
+    assert current == {"Blog API": "Down", "Auth API": "Operational"}
+    assert db.query(APIStatusSample).count() == 4
+    hourly = db.query(APIStatusRollup).filter_by(api_group="Blog API", period="hour").one()
+    assert (hourly.samples, hourly.up) == (3, 2)
+
+
+def test_batch_accepts_gzip_bodies(client, db):
+    body = gzip.compress(json.dumps(batch(("Blog API", "Operational", 90))).encode())
+
+    response = client.post(
+        "/api/v1/api-status/batch",
+        content=body,
+        headers={"Content-Type": "application/json", "Content-Encoding": "gzip"},
+    )
+
+    assert response.status_code == 201
+    assert db.query(APIStatus).one().api_group == "Blog API"
+
+
+def test_batch_rejects_invalid_and_oversized_gzip(client):
+    headers = {"Content-Type": "application/json", "Content-Encoding": "gzip"}
+
+    assert client.post("/api/v1/api-status/batch", content=b"not gzip", headers=headers).status_code == 400
+
+    body = gzip.compress(json.dumps(batch(("Blog API", "Operational", 90))).encode())
+    with patch("api.utils.gzip_request.MAX_DECOMPRESSED_SIZE", 16):
+        assert client.post("/api/v1/api-status/batch", content=body, headers=headers).status_code == 413
@@ -0,0 +1,130 @@
+import asyncio
+from unittest.mock import patch
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.routing import APIRoute
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from main import app as main_app
+from api.v1.models.api_status import APIStatus, APIStatusRollup, APIStatusSample
+from api.v1.services import synthetic_monitor as monitor_module
+from api.v1.services.synthetic_monitor import PROBES, Probe, SyntheticMonitor
+
+
+def probed_app():
+    app = FastAPI()
+    app.state.active = app.state.peak = 0
+
+    @app.get("/ok")
+    async def ok():
+        app.state.active += 1
+        app.state.peak = max(app.state.peak, app.state.active)
+        await asyncio.sleep(0.02)
+        app.state.active -= 1
+        return {}
+
+    @app.get("/slow")
+    async def slow():
+        await asyncio.sleep(0.05)
+        return {}
+
+    @app.get("/private")
+    async def private():
+        raise HTTPException(status_code=401)
+
+    @app.get("/broken")
+    async def broken():
+        raise HTTPException(status_code=503)
+
+    @app.get("/hang")
+    async def hang():
+        await asyncio.sleep(5)
+
+    return app
+
+
+def test_each_group_gets_its_worst_probe():
+    monitor = SyntheticMonitor(
+        probes=[
+            Probe("Fine", "GET", "/ok"),
+            Probe("Fine", "GET", "/private", expect=401),
+            Probe("Slow", "GET", "/slow"),
+            Probe("Wrong", "GET", "/private"),
+            Probe("Broken", "GET", "/ok"),
+            Probe("Broken", "GET", "/broken"),
+            Probe("Hanging", "GET", "/hang"),
+        ],
+        timeout=0.5,
+        slow_ms=40,
+    )
+
+    statuses = {s.api_group: s for s in asyncio.run(monitor.probe(probed_app()))}
+
+    assert {group: s.status for group, s in statuses.items()} == {
+        "Fine": "Operational",
+        "Slow": "Degraded",
+        "Wrong": "Degraded",
+        "Broken": "Down",
+        "Hanging": "Down",
+    }
+    assert statuses["Slow"].response_time >= 40
+    assert statuses["Wrong"].details == "GET /private returned HTTP 401, expected 200"
+    assert statuses["Broken"].details == "GET /broken returned HTTP 503"
+
+
+def test_groups_run_concurrently_within_the_bound():
+    app = probed_app()
+    monitor = SyntheticMonitor(
+        probes=[Probe(f"Group {index}", "GET", "/ok") for index in range(8)], concurrency=3
+    )
+
+    statuses = asyncio.run(monitor.probe(app))
+
+    assert len(statuses) == 8
+    assert app.state.peak == 3
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    for model in (APIStatus, APIStatusSample, APIStatusRollup):
+        model.__table__.create(engine)
+    factory = sessionmaker(bind=engine)
+    with patch.object(monitor_module, "SessionLocal", factory), patch(
+        "api.v1.services.api_status._last_pruned", float("inf")
+    ):
+        yield factory
+    engine.dispose()
+
+
+def test_round_is_recorded_and_not_repeated_by_another_worker(session_factory):
+    monitor = SyntheticMonitor(
+        probes=[Probe("Fine", "GET", "/ok"), Probe("Wrong", "GET", "/private")], interval=60
+    )
+    assert monitor.is_due()
+
+    asyncio.run(monitor.run_once(probed_app()))
+
+    with session_factory() as db:
+        assert {s.api_group: s.status for s in db.query(APIStatus).all()} == {
+            "Fine": "Operational",
+            "Wrong": "Degraded",
+        }
+        assert db.query(APIStatusSample).count() == 2
+    assert not monitor.is_due()
+
+
+def test_probes_target_existing_routes():
+    routes = {
+        (method, route.path)
+        for route in main_app.routes
+        if isinstance(route, APIRoute)
+        for method in route.methods
+    }
+
+    assert [probe for probe in PROBES if (probe.method, probe.path) not in routes] == []
@@ -9,7 +9,7 @@ import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
 from unittest.mock import Mock, patch
-from requests.models import Response as RequestsResponse
+import httpx
 from api.v1.models.user import User
 from api.v1.schemas.google_oauth import OAuthToken
 from main import app
@@ -35,10 +35,7 @@ def mock_google_profile_response():
         "picture": "https://example.com/avatar.jpg",
         "locale": "en"
     }
-    response = Mock(spec=RequestsResponse)
-    response.status_code = 200
-    response.json.return_value = profile_data
-    yield response
+    yield httpx.Response(200, json=profile_data)
 
 @pytest.fixture
 def mock_google_services():
@@ -59,16 +56,15 @@ def mock_user_services():
         mock_create_refresh_token.return_value = "refresh_token_example"
         yield mock_create_access_token, mock_create_refresh_token
 
-@patch("requests.get")
 def test_google_login(
-    mock_requests_get, 
+    provider_transport, 
     mock_db_session, 
     mock_google_profile_response, 
     mock_google_services, 
     mock_user_services, 
     mock_send_email
 ):
-    mock_requests_get.return_value = mock_google_profile_response
+    provider_transport(lambda request: mock_google_profile_response)
     
     token_request = OAuthToken(id_token="valid_token")
     response = client.post("api/v1/auth/google", json=token_request.dict(), headers={"Content-Type": "application/json"})
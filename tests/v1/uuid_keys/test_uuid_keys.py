@@ -0,0 +1,131 @@
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import Column, ForeignKey, MetaData, String, Table, create_engine, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.schema import CreateTable
+from uuid_extensions import uuid7
+
+from api.db.types import UUIDString
+from api.db.uuid_migration import migrate, uuid_columns
+from api.utils.settings import settings
+from scripts.benchmark_uuid_keys import benchmark
+
+
+def make_metadata():
+    metadata = MetaData()
+    Table("owners", metadata, Column("id", UUIDString, primary_key=True), Column("name", String))
+    Table(
+        "pets",
+        metadata,
+        Column("id", UUIDString, primary_key=True),
+        Column("owner_id", UUIDString, ForeignKey("owners.id")),
+    )
+    return metadata
+
+
+def ddl(metadata, dialect):
+    return str(CreateTable(metadata.tables["pets"]).compile(dialect=dialect))
+
+
+def test_ids_stay_text_by_default():
+    metadata = make_metadata()
+    assert "id VARCHAR NOT NULL" in ddl(metadata, sqlite.dialect())
+    assert "owner_id VARCHAR" in ddl(metadata, postgresql.dialect())
+
+
+@patch.object(settings, "DB_NATIVE_UUID", True)
+def test_native_uuid_storage():
+    metadata = make_metadata()
+    assert "id UUID NOT NULL" in ddl(metadata, postgresql.dialect())
+    assert "owner_id BLOB" in ddl(metadata, sqlite.dialect())
+
+    engine = create_engine("sqlite://")
+    metadata.create_all(engine)
+    owner_id, pet_id = str(uuid7()), str(uuid7())
+    owners, pets = metadata.tables["owners"], metadata.tables["pets"]
+    with engine.begin() as conn:
+        conn.execute(insert(owners), {"id": owner_id, "name": "ada"})
+        conn.execute(insert(pets), {"id": pet_id, "owner_id": owner_id})
+
+        row = conn.execute(
+            select(pets.c.id, owners.c.name)
+            .join(owners, pets.c.owner_id == owners.c.id)
+            .where(owners.c.id == owner_id)
+        ).one()
+        stored = conn.exec_driver_sql("SELECT typeof(id), length(id) FROM pets").one()
+
+    assert row.id == pet_id
+    assert row.name == "ada"
+    assert tuple(stored) == ("blob", 16)
+
+
+@patch.object(settings, "DB_NATIVE_UUID", True)
+def test_malformed_id_is_not_found():
+    from fastapi.testclient import TestClient
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.pool import StaticPool
+
+    from api.db.database import get_db
+    from api.v1.models.regions import Region
+    from main import app
+
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Region.__table__.create(engine)
+    Session = sessionmaker(bind=engine)
+
+    def session():
+        with Session() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = session
+    try:
+        response = TestClient(app).get("/api/v1/regions/not-a-uuid")
+    finally:
+        app.dependency_overrides = {}
+        engine.dispose()
+
+    assert response.status_code == 404
+
+
+def test_sqlite_migration_converts_existing_ids(tmp_path):
+    metadata = make_metadata()
+    assert uuid_columns(metadata) == {"owners": ["id"], "pets": ["id", "owner_id"]}
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'app.db'}")
+    metadata.create_all(engine)
+    owner_id = str(uuid7())
+    with engine.begin() as conn:
+        conn.execute(insert(metadata.tables["owners"]), {"id": owner_id, "name": "ada"})
+        conn.execute(insert(metadata.tables["pets"]), {"id": str(uuid7()), "owner_id": owner_id})
+
+    assert migrate(engine, metadata, dry_run=True) == ["3 id value(s) to convert to BLOB(16)"]
+    assert migrate(engine, metadata) == ["3 id value(s) converted to BLOB(16)"]
+    assert migrate(engine, metadata) == ["0 id value(s) converted to BLOB(16)"]
+
+    with patch.object(settings, "DB_NATIVE_UUID", True):
+        native = create_engine(f"sqlite:///{tmp_path / 'app.db'}")
+        pets = metadata.tables["pets"]
+        with native.connect() as conn:
+            assert conn.execute(select(pets.c.owner_id).where(pets.c.owner_id == owner_id)).scalar() == owner_id
+
+
+def test_sqlite_migration_rejects_non_uuid_ids(tmp_path):
+    metadata = make_metadata()
+    engine = create_engine(f"sqlite:///{tmp_path / 'app.db'}")
+    metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(metadata.tables["owners"]), {"id": "owner-1", "name": "ada"})
+
+    with pytest.raises(ValueError, match="owners.id"):
+        migrate(engine, metadata)
+
+
+def test_benchmark_reports_both_variants():
+    results = benchmark("sqlite://", rows=500)
+
+    assert set(results) == {"text", "uuid"}
+    assert results["uuid"]["database_file"] < results["text"]["database_file"]
+    assert results["uuid"]["join_ms"] >= 0
@@ -1,12 +1,14 @@
-import requests
+import gzip
 import json
 
+import requests
+
 # Define the API endpoint
 BASE_URL = "https://staging.api-python.boilerplate.hng.tech"
 API_ENDPOINT = f"{BASE_URL}/api/v1/api-status"
 
 
-# Function to parse result.json and post the data to the endpoint
+# Function to parse result.json and post all results to the batch endpoint in one request
 def parse_and_post_results():
     try:
         with open('result.json') as f:
@@ -15,12 +17,13 @@ def parse_and_post_results():
         print(f"Error reading result.json: {e}")
         return
 
+    statuses = []
     for item in data.get('run', {}).get('executions', []):
         api_group = item.get('item', {}).get('name')
         status_code = item.get('response', {}).get('code')
         response_time = item.get('item', {}).get('responseTime')
 
-        if status_code >= 500:
+        if status_code is None or status_code >= 500:
             status = 'Down'
             details = item.get('response', {}).get('status', 'No status available')
         else:
@@ -39,24 +42,34 @@ def parse_and_post_results():
                         details = f"Test failed: {assertion.get('error').get('message', 'No error message')}"
                     break
 
-        payload = {
+        statuses.append({
             "api_group": api_group,
             "status": status,
             "response_time": response_time,
             "details": details,
-        }
-
-        try:
-        # send a POST request to create
-            response = requests.post(API_ENDPOINT, json=payload)
-
-            # Check response status
-            if response.status_code in (200, 201):
-                print(f"Successfully updated/created record for {api_group}.")
-            else:
-                print(f"Failed to update/create record for {api_group}: {response.content}")
-        except requests.RequestException as e:
-            print(f"Error posting data to API: {e}")
+        })
+
+    if not statuses:
+        print("No executions found in result.json")
+        return
+
+    body = gzip.compress(json.dumps({"statuses": statuses}).encode())
+    try:
+        # send every result in one gzip-compressed request
+        response = requests.post(
+            f"{API_ENDPOINT}/batch",
+            data=body,
+            headers={"Content-Type": "application/json", "Content-Encoding": "gzip"},
+            timeout=30,
+        )
+
+        if response.status_code in (200, 201):
+            print(f"Successfully recorded {len(statuses)} API status result(s).")
+        else:
+            print(f"Failed to record API status results: {response.content}")
+    except requests.RequestException as e:
+        print(f"Error posting data to API: {e}")
+
 
 # Run the function
 parse_and_post_results()